@@ -22,8 +22,50 @@ def create_app(config_name='default'):
     global supabase
     url = app.config.get('SUPABASE_URL')
     key = app.config.get('SUPABASE_KEY')
-    if url and key:
-        supabase = create_client(url, key)
+    client = None
+    if app.config.get('SUPABASE_BACKEND') == 'local':
+        # In-process stand-in for offline benchmarks (app/utils/local_supabase.py)
+        from app.utils.local_supabase import LocalSupabase
+        client = LocalSupabase.from_config(app.config)
+    elif url and key:
+        client = create_client(url, key)
+    if client is not None:
+        supabase = client
+        if app.config.get('SUPABASE_REQUEST_LOADER', True):
+            # Memoize repeat reads within a request (app/utils/supabase_loader.py)
+            from app.utils.supabase_loader import RequestScopedClient
+            supabase = RequestScopedClient(supabase)
+
+    from app.utils import supabase_loader
+    supabase_loader.init_app(app)
+
+    # Per-route call counts, Server-Timing and /metrics (app/utils/request_metrics.py)
+    from app.utils import request_metrics
+    request_metrics.init_app(app)
+
+    # Configure background push delivery
+    from app.services.push_notification_service import ExpoPushService
+    ExpoPushService.init_app(app)
+
+    # Configure catalog cache TTLs
+    from app.utils.catalog_cache import catalog_cache
+    catalog_cache.configure(
+        ttls=app.config.get('CATALOG_CACHE_TTLS'),
+        default_ttl=app.config.get('CATALOG_CACHE_DEFAULT_TTL')
+    )
+
+    # Configure shared void feed page TTL
+    from app.services.void_feed_service import VoidFeedService
+    VoidFeedService.configure(app.config.get('VOID_FEED_CACHE_TTL', 5))
+
+    # Configure write-behind void reaction counters
+    from app.services.void_counter_service import void_counters
+    void_counters.configure(
+        enabled=app.config.get('VOID_COUNTER_WRITE_BEHIND', True),
+        flush_interval=app.config.get('VOID_COUNTER_FLUSH_MS', 500) / 1000,
+        max_pending_events=app.config.get('VOID_COUNTER_FLUSH_EVENTS', 200),
+        retention=app.config.get('VOID_FEED_CACHE_TTL', 5)
+    )
     
     # Configure CORS
     CORS(app, 
@@ -49,6 +91,8 @@ def create_app(config_name='default'):
     from app.routes.mission_routes import mission_bp
     from app.routes.sanity_routes import sanity_bp
     from app.routes.void_routes import void_bp
+    from app.routes.dashboard_routes import dashboard_bp
+    from app.routes.admin_routes import admin_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(profile_bp, url_prefix='/api/profile')
@@ -66,6 +110,8 @@ def create_app(config_name='default'):
     app.register_blueprint(mission_bp, url_prefix='/api/missions')
     app.register_blueprint(sanity_bp, url_prefix='/api/sanity')
     app.register_blueprint(void_bp, url_prefix='/api/void')
+    app.register_blueprint(dashboard_bp, url_prefix='/api/dashboard')
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
 
     
     # Health check endpoint
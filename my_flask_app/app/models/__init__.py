@@ -1,4 +1,4 @@
-# Import all 37 models so Flask-Migrate can detect them
+# Import all 38 models so Flask-Migrate can detect them
 from app.models.user import User
 from app.models.profile import Profile
 from app.models.user_balance import UserBalance
@@ -13,6 +13,7 @@ from app.models.bank_loan import BankLoan
 from app.models.liability import Liability
 from app.models.liability_item import LiabilityItem
 from app.models.notification import Notification
+from app.models.notification_archive import NotificationArchive
 from app.models.player_rental import PlayerRental
 from app.models.user_follow import UserFollow
 from app.models.chat_message import ChatMessage
@@ -57,6 +58,7 @@ __all__ = [
     'Liability',
     'LiabilityItem',
     'Notification',
+    'NotificationArchive',
     'PlayerRental',
     'UserFollow',
     'ChatMessage',
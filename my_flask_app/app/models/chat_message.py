@@ -16,6 +16,11 @@ class ChatMessage(db.Model):
     created_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
+    # Conversation pages (see supabase/migrations/20261017040000_chat_conversations.sql)
+    __table_args__ = (
+        db.Index('idx_chat_messages_pair_timestamp', 'sender_id', 'recipient_id', 'timestamp'),
+    )
+
     def to_dict(self):
         return {
             'id': str(self.id),
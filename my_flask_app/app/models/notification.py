@@ -14,7 +14,11 @@ class Notification(db.Model):
     asset_id = db.Column(UUID(as_uuid=True))
     related_user_id = db.Column(UUID(as_uuid=True))
     read = db.Column(db.Boolean, default=False, nullable=False)
+    collapse_key = db.Column(db.Text)  # Same-key unread rows within a window are merged (NotificationService.notify)
+    group_count = db.Column(db.Integer, default=1, nullable=False)  # Events merged into this row
     created_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+    # Moved only by notify() when a digest grows; marking read must not resync the row
+    updated_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow, nullable=False)
 
     def to_dict(self):
         return {
@@ -24,5 +28,6 @@ class Notification(db.Model):
             'title': self.title,
             'message': self.message,
             'read': self.read,
+            'group_count': self.group_count,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
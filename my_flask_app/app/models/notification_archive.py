@@ -0,0 +1,22 @@
+from datetime import datetime
+from app import db
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+
+class NotificationArchive(db.Model):
+    """Read notifications moved out of `notifications` by jobs/archive_notifications.py"""
+    __tablename__ = 'notifications_archive'
+
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = db.Column(UUID(as_uuid=True), nullable=False, index=True)
+    type = db.Column(db.String(50), nullable=False)
+    title = db.Column(db.String(255), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    asset_id = db.Column(UUID(as_uuid=True))
+    related_user_id = db.Column(UUID(as_uuid=True))
+    read = db.Column(db.Boolean, default=True, nullable=False)
+    collapse_key = db.Column(db.Text)
+    group_count = db.Column(db.Integer, default=1, nullable=False)
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False)
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=False)
+    archived_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow, nullable=False)
@@ -0,0 +1,92 @@
+"""
+Repositories for the hot tables
+===============================
+
+🎓 LEARNING: Every read in the routes goes through PostgREST - an HTTP request
+to Supabase, which runs the SQL, serializes the rows to JSON, and sends them
+back for us to parse. For the tables read on almost every screen that hop is
+most of the cost, while Flask-SQLAlchemy already holds a pooled connection to
+the same database.
+
+A repository is one table behind a small interface, with two backends:
+
+    repo = get_repository('transactions', supabase)
+    repo.find_many('*', order_by='created_at', desc=True, limit=20, user_id=uid)
+    repo.find_one('net_worth, credit_score', user_id=uid)
+    repo.count(user_id=uid, read=False)
+
+- 'postgrest':  the supabase client (so request memoization still applies)
+- 'sqlalchemy': a Core SELECT on db.session over the connection pool
+
+Both return the same JSON-shaped dicts, so a route switches backend by
+configuration only:
+
+    REPOSITORY_BACKEND = 'postgrest'                  # default for every table
+    REPOSITORY_BACKENDS = {'transactions': 'sqlalchemy'}  # per-table override
+
+Only simple reads fit this interface: equality / IN filters, ordering,
+limit and offset. Embedded resources, or_ keysets and writes stay on the
+supabase client (writes go through RPCs and RLS-aware services anyway).
+
+benchmarks/repository_benchmark.py times each query shape on both backends.
+"""
+
+from typing import Any, Optional
+
+from flask import current_app, has_app_context
+
+from app.repositories.base import Repository
+from app.repositories.postgrest_repository import PostgrestRepository
+from app.repositories.sql_repository import SqlRepository
+
+# Tables read on nearly every screen
+HOT_TABLES = (
+    'profiles',
+    'user_balances',
+    'user_assets',
+    'transactions',
+    'notifications',
+    'player_mission_progress',
+)
+
+BACKENDS = ('postgrest', 'sqlalchemy')
+
+
+def backend_for(table: str) -> str:
+    """Configured backend for a table"""
+    if not has_app_context():
+        return 'postgrest'
+    overrides = current_app.config.get('REPOSITORY_BACKENDS') or {}
+    backend = overrides.get(table, current_app.config.get('REPOSITORY_BACKEND', 'postgrest'))
+    if backend not in BACKENDS:
+        raise ValueError(f'Unknown repository backend {backend!r} for {table}')
+    return backend
+
+
+def get_repository(table: str, client: Any = None, backend: Optional[str] = None) -> Repository:
+    """
+    Repository for a table on its configured backend
+
+    Args:
+        client: supabase client for the PostgREST backend; defaults to
+                app.supabase (pass the route module's own so tests can swap it)
+        backend: Force a backend instead of reading the config
+    """
+    backend = backend or backend_for(table)
+    if backend == 'sqlalchemy':
+        return SqlRepository(table)
+    if client is None:
+        import app
+        client = app.supabase
+    return PostgrestRepository(table, client)
+
+
+__all__ = [
+    'BACKENDS',
+    'HOT_TABLES',
+    'PostgrestRepository',
+    'Repository',
+    'SqlRepository',
+    'backend_for',
+    'get_repository',
+]
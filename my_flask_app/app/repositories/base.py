@@ -0,0 +1,58 @@
+"""
+Repository interface shared by both backends (see app/repositories/__init__.py)
+
+Filters are keyword arguments: a scalar means `column = value`, a list or
+tuple means `column IN (...)`. Rows come back as plain dicts shaped like
+PostgREST's JSON (UUIDs and timestamps as strings, numerics as numbers), so
+callers can't tell which backend served them.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+OrderBy = Union[str, Sequence[Tuple[str, bool]]]  # 'created_at' or [('created_at', True), ...] (desc flag)
+
+
+def parse_columns(columns: str) -> Optional[List[str]]:
+    """'a, b' -> ['a', 'b']; '*' -> None (all columns)"""
+    names = [c.strip() for c in columns.split(',') if c.strip()]
+    if not names or names == ['*']:
+        return None
+    for name in names:
+        if '(' in name or ':' in name or name == '*':
+            raise ValueError(f'Unsupported column expression for a repository read: {name!r}')
+    return names
+
+
+def normalize_order(order_by: Optional[OrderBy], desc: bool = False) -> List[Tuple[str, bool]]:
+    if order_by is None:
+        return []
+    if isinstance(order_by, str):
+        return [(order_by, desc)]
+    return [(column, bool(is_desc)) for column, is_desc in order_by]
+
+
+class Repository(ABC):
+    """Reads from one table; see PostgrestRepository and SqlRepository"""
+
+    backend = 'abstract'
+
+    def __init__(self, table: str):
+        self.table = table
+
+    def find_one(self, columns: str = '*', **filters: Any) -> Optional[Dict[str, Any]]:
+        """First matching row, or None"""
+        rows = self.find_many(columns, limit=1, **filters)
+        return rows[0] if rows else None
+
+    @abstractmethod
+    def find_many(self, columns: str = '*', order_by: Optional[OrderBy] = None, desc: bool = False,
+                  limit: Optional[int] = None, offset: int = 0, **filters: Any) -> List[Dict[str, Any]]:
+        """Matching rows in order; offset requires limit (ValueError otherwise)"""
+
+    @abstractmethod
+    def count(self, **filters: Any) -> int:
+        """Number of matching rows"""
+
+    def __repr__(self) -> str:
+        return f'<{type(self).__name__} {self.table}>'
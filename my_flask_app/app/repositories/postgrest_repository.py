@@ -0,0 +1,39 @@
+"""
+PostgREST backend: every read is an HTTP request through the supabase client
+"""
+
+from typing import Any, Dict, List, Optional
+
+from app.repositories.base import OrderBy, Repository, normalize_order, parse_columns
+
+
+class PostgrestRepository(Repository):
+    backend = 'postgrest'
+
+    def __init__(self, table: str, client: Any):
+        super().__init__(table)
+        self.client = client
+
+    def _filtered(self, query, filters: Dict[str, Any]):
+        for column, value in filters.items():
+            if isinstance(value, (list, tuple, set)):
+                query = query.in_(column, [str(v) for v in value])
+            else:
+                query = query.eq(column, value)
+        return query
+
+    def find_many(self, columns: str = '*', order_by: Optional[OrderBy] = None, desc: bool = False,
+                  limit: Optional[int] = None, offset: int = 0, **filters: Any) -> List[Dict[str, Any]]:
+        parse_columns(columns)  # Same column rules as the SQL backend
+        query = self._filtered(self.client.table(self.table).select(columns), filters)
+        for column, is_desc in normalize_order(order_by, desc):
+            query = query.order(column, desc=is_desc)
+        if limit is not None:
+            query = query.range(offset, offset + limit - 1) if offset else query.limit(limit)
+        elif offset:
+            raise ValueError('offset requires limit')
+        return query.execute().data or []
+
+    def count(self, **filters: Any) -> int:
+        query = self._filtered(self.client.table(self.table).select('id', count='exact').limit(1), filters)
+        return query.execute().count or 0
@@ -0,0 +1,80 @@
+"""
+SQLAlchemy backend: reads straight from Postgres over the pooled connection
+used by Flask-SQLAlchemy, skipping the PostgREST HTTP hop and JSON round trip
+"""
+
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, select
+
+from app import db
+from app.repositories.base import OrderBy, Repository, normalize_order, parse_columns
+
+
+def _json_value(value: Any) -> Any:
+    """Match what PostgREST would have put in its JSON"""
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+class SqlRepository(Repository):
+    backend = 'sqlalchemy'
+
+    def __init__(self, table: str):
+        super().__init__(table)
+        import app.models  # noqa: F401  (registers every table on db.metadata)
+        try:
+            self.sa_table = db.metadata.tables[table]
+        except KeyError:
+            raise ValueError(f'No SQLAlchemy model for table {table!r}')
+
+    def _column(self, name: str):
+        try:
+            return self.sa_table.c[name]
+        except KeyError:
+            raise ValueError(f'Unknown column {self.table}.{name}')
+
+    def _coerce(self, column, value: Any) -> Any:
+        # UUID columns compare against uuid.UUID values
+        if getattr(column.type, 'as_uuid', False) and isinstance(value, str):
+            return uuid.UUID(value)
+        return value
+
+    def _where(self, statement, filters: Dict[str, Any]):
+        for name, value in filters.items():
+            column = self._column(name)
+            if isinstance(value, (list, tuple, set)):
+                statement = statement.where(column.in_([self._coerce(column, v) for v in value]))
+            else:
+                statement = statement.where(column == self._coerce(column, value))
+        return statement
+
+    def find_many(self, columns: str = '*', order_by: Optional[OrderBy] = None, desc: bool = False,
+                  limit: Optional[int] = None, offset: int = 0, **filters: Any) -> List[Dict[str, Any]]:
+        names = parse_columns(columns)
+        selected = [self._column(n) for n in names] if names else list(self.sa_table.c)
+        statement = self._where(select(*selected), filters)
+        for name, is_desc in normalize_order(order_by, desc):
+            column = self._column(name)
+            statement = statement.order_by(column.desc() if is_desc else column.asc())
+        if limit is not None:
+            statement = statement.limit(limit)
+            if offset:
+                statement = statement.offset(offset)
+        elif offset:
+            raise ValueError('offset requires limit')
+
+        result = db.session.execute(statement)
+        return [{key: _json_value(value) for key, value in row.items()} for row in result.mappings()]
+
+    def count(self, **filters: Any) -> int:
+        statement = self._where(select(func.count()).select_from(self.sa_table), filters)
+        return db.session.execute(statement).scalar() or 0
@@ -0,0 +1,30 @@
+"""
+Admin maintenance routes
+"""
+from flask import Blueprint, request, jsonify
+from app.utils.jwt_helper import require_admin
+from app.utils.catalog_cache import CATALOG_TABLES, invalidate_catalog
+
+admin_bp = Blueprint('admin', __name__)
+
+
+@admin_bp.route('/catalog/invalidate', methods=['POST'])
+@require_admin
+def invalidate_catalog_cache(current_user_id: str):
+    """
+    Drop cached catalog tables after a reseed or an admin edit (Admin only)
+
+    Body (optional): {"table": "assets"} - omit to drop every catalog table.
+    Clears the worker that serves the request; other workers catch up
+    within their CATALOG_CACHE_TTLS.
+    """
+    table = (request.get_json(silent=True) or {}).get('table')
+    if table is not None and table not in CATALOG_TABLES:
+        return jsonify({
+            'success': False,
+            'error': 'VALIDATION_ERROR',
+            'message': f'Unknown catalog table: {table}'
+        }), 400
+
+    removed = invalidate_catalog(table)
+    return jsonify({'success': True, 'data': {'table': table, 'removed': removed}}), 200
@@ -8,7 +8,9 @@ from decimal import Decimal
 import os
 import uuid
 from datetime import datetime
-from app.services.push_notification_service import ExpoPushService
+from app.services.notification_service import NotificationService
+from app.utils.catalog_cache import catalog_response
+from app.repositories import get_repository
 from app.models.profile import Profile
 from app import db
 
@@ -23,10 +25,9 @@ def purchase_asset(current_user_id: str):
     
     This endpoint:
     1. Validates the request
-    2. Checks if user has sufficient funds
-    3. Deducts money from balance
-    4. Creates or updates the asset record
-    5. Logs the transaction
+    2. Deducts money from balance (fails atomically on insufficient funds)
+    3. Creates or updates the asset record
+    4. Logs the transaction
     
     All operations are atomic - if any step fails, nothing is committed.
     """
@@ -48,17 +49,7 @@ def purchase_asset(current_user_id: str):
         asset = asset_response.data
         total_price = Decimal(str(asset['price'])) * quantity
         
-        # 2. Check if user has sufficient funds
-        current_balance = BalanceService.get_current_balance(current_user_id)
-        
-        if current_balance < total_price:
-            return jsonify({
-                'success': False,
-                'error': 'INSUFFICIENT_FUNDS',
-                'message': f'Insufficient funds. You need ${total_price} but only have ${current_balance}'
-            }), 400
-        
-        # 3. Determine asset type
+        # 2. Determine asset type
         category = asset.get('category', '')
         asset_type = (
             'property' if category == 'real_estate' else
@@ -67,7 +58,7 @@ def purchase_asset(current_user_id: str):
             'property'
         )
         
-        # 4. Check if asset already exists (for stocks/crypto, we stack)
+        # 3. Check if asset already exists (for stocks/crypto, we stack)
         should_update = False
         existing_asset_id = None
         new_quantity = quantity
@@ -86,14 +77,14 @@ def purchase_asset(current_user_id: str):
                 # Weighted average price
                 new_purchase_price = new_total_value / new_quantity
         
-        # 5. Deduct balance
+        # 4. Deduct balance (atomic; raises if the user can't cover it)
         balance_result = BalanceService.subtract_balance(
             user_id=current_user_id,
             amount=total_price,
             reason=f'Purchased {quantity} {asset["name"]}'
         )
         
-        # 6. Create or update asset
+        # 5. Create or update asset
         if should_update and existing_asset_id:
             supabase.table('user_assets').update({
                 'quantity': new_quantity,
@@ -115,32 +106,28 @@ def purchase_asset(current_user_id: str):
             
             result_asset_id = insert_response.data[0]['id'] if insert_response.data else None
         
-        # 7. Create notification
-        supabase.table('notifications').insert({
-            'user_id': current_user_id,
-            'type': 'financial_move',
-            'title': 'Asset Purchased',
-            'message': f'You purchased {quantity} {asset["name"]} for ${total_price:,.2f}',
-            'read': False
-        }).execute()
-        
-        # Send push notification
-        try:
-            ExpoPushService.send_notification_to_user(
-                supabase_client=supabase,
-                user_id=current_user_id,
-                title='💰 Asset Purchased',
-                body=f'You purchased {quantity} {asset["name"]} for ${total_price:,.2f}',
-                notification_type='financial_move',
-                data={
+        # 6. Create notification (rapid trades collapse into one digest)
+        NotificationService.notify(
+            supabase,
+            user_id=current_user_id,
+            type='financial_move',
+            title='Asset Purchased',
+            message=f'You purchased {quantity} {asset["name"]} for ${total_price:,.2f}',
+            collapse_key='asset_trade',
+            digest_title='Portfolio Activity',
+            digest_message='You made {count} trades',
+            push={
+                'title': '💰 Asset Purchased',
+                'body': f'You purchased {quantity} {asset["name"]} for ${total_price:,.2f}',
+                'notification_type': 'financial_move',
+                'data': {
                     'asset_id': result_asset_id,
                     'amount': float(total_price),
                     'quantity': quantity,
                     'transaction_type': 'investment'
                 }
-            )
-        except Exception as e:
-            print(f"Failed to send push notification: {str(e)}")
+            }
+        )
         
         return jsonify({
             'success': True,
@@ -181,12 +168,13 @@ def get_marketplace_assets():
     try:
         category = request.args.get('category')
         
-        query = supabase.table('assets').select('*')
-        if category:
-            query = query.eq('category', category)
+        def load_assets():
+            query = supabase.table('assets').select('*')
+            if category:
+                query = query.eq('category', category)
+            return query.execute().data
         
-        response = query.execute()
-        return jsonify({'success': True, 'data': response.data}), 200
+        return catalog_response('assets', load_assets, key=category)
     
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -197,8 +185,8 @@ def get_marketplace_assets():
 def get_user_assets(current_user_id: str):
     """Get all assets owned by the authenticated user"""
     try:
-        response = supabase.table('user_assets').select('*').eq('user_id', current_user_id).execute()
-        return jsonify({'success': True, 'data': response.data}), 200
+        assets = get_repository('user_assets', supabase).find_many('*', user_id=current_user_id)
+        return jsonify({'success': True, 'data': assets}), 200
     
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -299,32 +287,28 @@ def sell_asset(current_user_id: str, asset_id: str):
             print(f"Failed to update profile stats: {e}")
             db.session.rollback()
         
-        # 4. Create notification
-        supabase.table('notifications').insert({
-            'user_id': current_user_id,
-            'type': 'financial_move',
-            'title': 'Asset Sold',
-            'message': f'You sold {asset.get("name", "your asset")} for ${sale_value:,.2f} (Profit: ${profit:,.2f})',
-            'read': False
-        }).execute()
-        
-        # Send push notification
-        try:
-            ExpoPushService.send_notification_to_user(
-                supabase_client=supabase,
-                user_id=current_user_id,
-                title='💵 Asset Sold',
-                body=f'Sold {asset.get("name", "asset")} for ${sale_value:,.2f}. Profit: ${profit:,.2f}',
-                notification_type='financial_move',
-                data={
+        # 4. Create notification (rapid trades collapse into one digest)
+        NotificationService.notify(
+            supabase,
+            user_id=current_user_id,
+            type='financial_move',
+            title='Asset Sold',
+            message=f'You sold {asset.get("name", "your asset")} for ${sale_value:,.2f} (Profit: ${profit:,.2f})',
+            collapse_key='asset_trade',
+            digest_title='Portfolio Activity',
+            digest_message='You made {count} trades',
+            push={
+                'title': '💵 Asset Sold',
+                'body': f'Sold {asset.get("name", "asset")} for ${sale_value:,.2f}. Profit: ${profit:,.2f}',
+                'notification_type': 'financial_move',
+                'data': {
                     'asset_id': asset_id,
                     'amount': float(sale_value),
                     'profit': float(profit),
                     'transaction_type': 'asset_sale'
                 }
-            )
-        except Exception as e:
-            print(f"Failed to send push notification: {str(e)}")
+            }
+        )
         
         return jsonify({
             'success': True,
@@ -6,6 +6,7 @@ from flask import Blueprint, request, jsonify
 from pydantic import ValidationError
 from app.utils.jwt_helper import require_auth, require_admin
 from app.services.balance_service import BalanceService
+from app.repositories import get_repository
 from app.schemas.balance_schema import BalanceAddRequest, BalanceSubtractRequest, BalanceResponse
 
 balance_bp = Blueprint('balance', __name__)
@@ -27,9 +28,11 @@ def get_balance_history(current_user_id: str):
         limit = request.args.get('limit', 20, type=int)
         offset = request.args.get('offset', 0, type=int)
         
-        response = supabase.table('transactions').select('*').eq('user_id', current_user_id).order('created_at', desc=True).range(offset, offset + limit - 1).execute()
+        transactions = get_repository('transactions', supabase).find_many(
+            '*', order_by='created_at', desc=True, limit=limit, offset=offset, user_id=current_user_id
+        )
         
-        return jsonify({'success': True, 'data': response.data}), 200
+        return jsonify({'success': True, 'data': transactions}), 200
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
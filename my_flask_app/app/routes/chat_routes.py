@@ -1,6 +1,6 @@
 """
 Chat management routes
-Handles sending messages with JWT authentication to prevent impersonation
+Handles sending messages and reading conversations with JWT authentication to prevent impersonation
 """
 from flask import Blueprint, request, jsonify
 from pydantic import ValidationError
@@ -9,8 +9,7 @@ from app.schemas.chat_schema import SendMessageRequest, SendMessageResponse
 from app import supabase
 import os
 import uuid
-from datetime import datetime
-from app.services.push_notification_service import ExpoPushService
+from app.services.chat_service import ChatService, RecipientNotFoundError
 
 
 chat_bp = Blueprint('chat', __name__)
@@ -25,8 +24,9 @@ def send_message(current_user_id: str):
     This endpoint:
     1. Validates the request
     2. Verifies sender_id matches JWT (prevents impersonation)
-    3. Creates message with server-controlled sender_id
-    4. Creates notification for recipient
+    3. Creates message with server-controlled sender_id and the recipient's
+       notification in one call (ChatService.send)
+    4. Queues the push notification
     
     Security: sender_id is taken from JWT, not from request
     """
@@ -51,55 +51,9 @@ def send_message(current_user_id: str):
                 'message': 'You cannot send messages to yourself'
             }), 400
         
-        # Verify recipient exists
-        recipient_check = supabase.table('profiles').select('id').eq('user_id', str(data.recipient_id)).execute()
-        
-        if not recipient_check.data:
-            return jsonify({
-                'success': False,
-                'error': 'RECIPIENT_NOT_FOUND',
-                'message': 'Recipient user not found'
-            }), 404
-        
-        # Create message (sender_id from JWT, not request!)
-        message_id = str(uuid.uuid4())
-        supabase.table('chat_messages').insert({
-            'id': message_id,
-            'sender_id': current_user_id,  # From JWT - cannot be spoofed!
-            'recipient_id': str(data.recipient_id),
-            'content': content,
-            'status': 'sent',
-            'type': 'text',
-            'timestamp': datetime.utcnow().isoformat()
-        }).execute()
-        
-        # Create notification for recipient
-        supabase.table('notifications').insert({
-            'user_id': str(data.recipient_id),
-            'type': 'system',
-            'title': 'New Message',
-            'message': 'You have a new message',
-            'related_user_id': current_user_id,
-            'read': False
-        }).execute()
-        
-        # Send push notification to recipient
-        try:
-            ExpoPushService.send_notification_to_user(
-                supabase_client=supabase,
-                user_id=str(data.recipient_id),
-                title='💬 New Message',
-                body='You have a new message',
-                notification_type='chat',
-                data={
-                    'sender_id': current_user_id,
-                    'message_id': message_id,
-                    'navigate_to': f'/chat/{current_user_id}'
-                }
-            )
-        except Exception as e:
-            # Log error but don't fail the request
-            print(f"Failed to send push notification: {str(e)}")
+        # One round trip: message + notification, push queued in the background
+        sent = ChatService.send(supabase, current_user_id, str(data.recipient_id), content)
+        message_id = sent['message_id']
         
         return jsonify({
             'success': True,
@@ -114,6 +68,94 @@ def send_message(current_user_id: str):
             'message': 'Invalid request data',
             'details': e.errors()
         }), 400
+    except RecipientNotFoundError as e:
+        return jsonify({
+            'success': False,
+            'error': 'RECIPIENT_NOT_FOUND',
+            'message': str(e)
+        }), 404
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': 'OPERATION_FAILED',
+            'message': str(e)
+        }), 500
+
+
+@chat_bp.route('/conversations', methods=['GET'])
+@require_auth
+def get_conversations(current_user_id: str):
+    """
+    Get the caller's inbox: one entry per peer, most recent first
+    
+    Each entry has the peer's display fields, the last message and the
+    number of the peer's messages the caller hasn't read.
+    
+    Query Params:
+    - limit: conversations per page (default: 20, max: 50)
+    - cursor: next_cursor from the previous page
+    """
+    try:
+        limit = max(1, min(request.args.get('limit', 20, type=int), 50))
+        
+        page = ChatService.conversations(supabase, current_user_id, request.args.get('cursor'), limit)
+        
+        return jsonify({
+            'success': True,
+            'data': page['data'],
+            'next_cursor': page['next_cursor']
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': 'VALIDATION_ERROR',
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': 'OPERATION_FAILED',
+            'message': str(e)
+        }), 500
+
+
+@chat_bp.route('/history/<peer_id>', methods=['GET'])
+@require_auth
+def get_history(current_user_id: str, peer_id: str):
+    """
+    Get messages exchanged with one peer, newest first
+    
+    Query Params:
+    - limit: messages per page (default: 50, max: 100)
+    - cursor: next_cursor from the previous page (older messages)
+    """
+    try:
+        try:
+            peer_id = str(uuid.UUID(peer_id))
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'VALIDATION_ERROR',
+                'message': 'Invalid peer_id'
+            }), 400
+        
+        limit = max(1, min(request.args.get('limit', 50, type=int), 100))
+        
+        page = ChatService.history(supabase, current_user_id, peer_id, request.args.get('cursor'), limit)
+        
+        return jsonify({
+            'success': True,
+            'data': page['data'],
+            'next_cursor': page['next_cursor']
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': 'VALIDATION_ERROR',
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -0,0 +1,258 @@
+"""
+Composite dashboard route
+Serves everything the mobile home screen needs in one request with JWT authentication
+
+The home screen used to call 8 endpoints back to back. GET /api/dashboard runs
+the same queries concurrently on a shared thread pool, so server time is the
+slowest section rather than the sum, and the client makes one round trip.
+
+Query parameters:
+    sections=profile,balance,...   Only load these sections (default: all)
+    fields[assets]=id,name,value   Per-section field selection
+
+A section that fails (or exceeds DASHBOARD_SECTION_TIMEOUT) is reported under
+'errors' while the other sections are still returned. Fields must be plain
+column names; sections that select them from PostgREST only accept columns
+of their table, so a field can never smuggle in an embed like other(*).
+"""
+from flask import Blueprint, request, jsonify, current_app
+from app.utils.jwt_helper import require_auth
+from app.services.balance_service import BalanceService
+from app.services.profile_service import ProfileService
+from app.services.notification_service import NotificationService
+from app.repositories import get_repository
+from app.models.job import Job
+from app.models.liability import Liability
+from app.models.user_asset import UserAsset
+from app import supabase
+from concurrent.futures import ThreadPoolExecutor, wait
+import contextvars
+import re
+import threading
+import uuid
+
+dashboard_bp = Blueprint('dashboard', __name__)
+
+FIELDS_PARAM = re.compile(r'fields\[(\w+)\]')
+FIELD_NAME = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
+
+def _columns(fields):
+    """PostgREST select string for a field selection"""
+    return ','.join(fields) if fields else '*'
+
+
+def _load_profile(user_id, fields):
+    profile = ProfileService.get_profile_by_user_id(uuid.UUID(user_id))
+    return profile.to_dict() if profile else None
+
+
+def _load_balance(user_id, fields):
+    return float(BalanceService.get_current_balance(user_id))
+
+
+def _load_assets(user_id, fields):
+    return get_repository('user_assets', supabase).find_many(_columns(fields), user_id=user_id)
+
+
+def _load_liabilities(user_id, fields):
+    return supabase.table('liabilities').select(_columns(fields)).eq('user_id', user_id).execute().data
+
+
+def _load_jobs(user_id, fields):
+    return supabase.table('jobs').select(_columns(fields)).eq('user_id', user_id).eq('is_current', True).execute().data
+
+
+def _load_rental(user_id, fields):
+    response = supabase.table('player_rentals').select('*, rental_properties(*)').eq('player_id', user_id).eq('is_active', True).maybe_single().execute()
+    return response.data if response else None
+
+
+def _load_mission(user_id, fields):
+    from app.routes.mission_routes import load_active_mission
+    return load_active_mission(user_id)
+
+
+def _load_notifications(user_id, fields):
+    return {'unread': NotificationService.unread_count(supabase, user_id)}
+
+
+# Section name -> loader(user_id, fields); mirrors the standalone endpoints
+DASHBOARD_SECTIONS = {
+    'profile': _load_profile,              # /api/profile/dashboard
+    'balance': _load_balance,              # /api/balance/current
+    'assets': _load_assets,                # /api/assets/portfolio
+    'liabilities': _load_liabilities,      # /api/liabilities
+    'jobs': _load_jobs,                    # /api/jobs/current
+    'rental': _load_rental,                # /api/rentals/current
+    'mission': _load_mission,              # /api/missions/active
+    'notifications': _load_notifications,  # /api/notifications/unread
+}
+
+
+# Sections whose fields go into .select(): only columns of the table pass
+SELECTABLE_COLUMNS = {
+    'assets': frozenset(UserAsset.__table__.columns.keys()),
+    'liabilities': frozenset(Liability.__table__.columns.keys()),
+    'jobs': frozenset(Job.__table__.columns.keys()),
+}
+
+
+def _invalid_fields(section, fields):
+    known = SELECTABLE_COLUMNS.get(section)
+    return [f for f in fields if not FIELD_NAME.fullmatch(f) or (known is not None and f not in known)]
+
+
+def _project(value, fields):
+    """Keep only the requested fields of a row or list of rows"""
+    if not fields:
+        return value
+    if isinstance(value, dict):
+        return {k: v for k, v in value.items() if k in fields}
+    if isinstance(value, list):
+        return [_project(row, fields) for row in value]
+    return value
+
+
+# 🎓 One pool per worker process, shared by all requests, so concurrent
+# dashboards can't open an unbounded number of upstream connections
+_executor = None
+_executor_lock = threading.Lock()
+
+# Sections queued or running on the pool. A timed-out section can't be
+# stopped and keeps its thread until the upstream call returns, so past
+# DASHBOARD_MAX_PENDING new sections are shed instead of queueing behind it
+_pending = 0
+_pending_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=current_app.config.get('DASHBOARD_MAX_WORKERS', 8),
+                    thread_name_prefix='dashboard'
+                )
+    return _executor
+
+
+def _reserve(count, limit):
+    """Claim up to `count` pool slots; returns how many were granted"""
+    global _pending
+    with _pending_lock:
+        granted = max(0, min(count, limit - _pending))
+        _pending += granted
+        return granted
+
+
+def _release():
+    global _pending
+    with _pending_lock:
+        _pending -= 1
+
+
+def _run_section(app, loader, user_id, fields):
+    # Each worker thread needs its own app context (and SQLAlchemy session)
+    try:
+        with app.app_context():
+            return _project(loader(user_id, fields), fields)
+    finally:
+        _release()
+
+
+def load_dashboard(user_id, sections, fields, timeout):
+    """
+    Load sections concurrently
+
+    Returns:
+        (data, errors): section -> payload, section -> {'error', 'message'}
+    """
+    app = current_app._get_current_object()
+    executor = _get_executor()
+    admitted = _reserve(len(sections), current_app.config.get('DASHBOARD_MAX_PENDING', 32))
+
+    data = {}
+    errors = {
+        name: {'error': 'OVERLOADED', 'message': f'{name} was skipped, the dashboard pool is saturated'}
+        for name in sections[admitted:]
+    }
+    # Each section runs in a copy of this context, so its calls are metered
+    # against this request (app/utils/request_metrics.py)
+    futures = {}
+    for name in sections[:admitted]:
+        futures[name] = executor.submit(contextvars.copy_context().run, _run_section, app,
+                                        DASHBOARD_SECTIONS[name], user_id, fields.get(name))
+    wait(futures.values(), timeout=timeout)
+
+    for name, future in futures.items():
+        if not future.done():
+            if future.cancel():
+                _release()  # Never started, so _run_section won't release it
+            errors[name] = {'error': 'TIMEOUT', 'message': f'{name} did not load within {timeout}s'}
+            continue
+        try:
+            data[name] = future.result()
+        except Exception as e:
+            errors[name] = {'error': 'OPERATION_FAILED', 'message': str(e)}
+    return data, errors
+
+
+@dashboard_bp.route('', methods=['GET'])
+@dashboard_bp.route('/', methods=['GET'])
+@require_auth
+def get_dashboard(current_user_id: str):
+    """
+    Get every home screen section in one response
+
+    Response: {'success': True, 'data': {section: ...}, 'errors': {section: ...}, 'partial': bool}
+    """
+    requested = request.args.get('sections')
+    sections = [s.strip() for s in requested.split(',') if s.strip()] if requested else list(DASHBOARD_SECTIONS)
+
+    unknown = [s for s in sections if s not in DASHBOARD_SECTIONS]
+    if unknown:
+        return jsonify({
+            'success': False,
+            'error': 'VALIDATION_ERROR',
+            'message': f"Unknown sections: {', '.join(unknown)}. Valid: {', '.join(DASHBOARD_SECTIONS)}"
+        }), 400
+
+    fields = {}
+    for key, value in request.args.items():
+        match = FIELDS_PARAM.fullmatch(key)
+        if match:
+            fields[match.group(1)] = [f.strip() for f in value.split(',') if f.strip()]
+
+    invalid = {section: _invalid_fields(section, names) for section, names in fields.items()}
+    invalid = {section: names for section, names in invalid.items() if names}
+    if invalid:
+        return jsonify({
+            'success': False,
+            'error': 'VALIDATION_ERROR',
+            'message': 'Unknown fields: ' + '; '.join(
+                f"{section}: {', '.join(names)}" for section, names in sorted(invalid.items()))
+        }), 400
+
+    data, errors = load_dashboard(
+        current_user_id,
+        sections,
+        fields,
+        timeout=current_app.config.get('DASHBOARD_SECTION_TIMEOUT', 5)
+    )
+
+    if sections and not data:
+        return jsonify({
+            'success': False,
+            'error': 'OPERATION_FAILED',
+            'message': 'All dashboard sections failed',
+            'errors': errors
+        }), 500
+
+    return jsonify({
+        'success': True,
+        'data': data,
+        'errors': errors,
+        'partial': bool(errors)
+    }), 200
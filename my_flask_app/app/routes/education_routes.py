@@ -10,8 +10,10 @@ from app.schemas.education_schema import CourseEnrollmentRequest, CourseCompleti
 import os
 import uuid
 import random
+from decimal import Decimal
 from datetime import datetime
 from app.services.push_notification_service import ExpoPushService
+from app.utils.catalog_cache import catalog_response
 from app import supabase
 
 education_bp = Blueprint('education', __name__)
@@ -21,8 +23,10 @@ education_bp = Blueprint('education', __name__)
 def get_courses():
     """Get available courses"""
     try:
-        response = supabase.table('courses').select('*').order('cost').execute()
-        return jsonify({'success': True, 'data': response.data}), 200
+        return catalog_response(
+            'courses',
+            lambda: supabase.table('courses').select('*').order('cost').execute().data
+        )
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -45,10 +49,9 @@ def enroll_in_course(current_user_id: str):
     This endpoint:
     1. Validates the request
     2. Checks if already enrolled
-    3. Checks if user has sufficient funds
-    4. Deducts course cost
-    5. Creates enrollment record
-    6. Logs transaction
+    3. Deducts course cost (fails atomically on insufficient funds)
+    4. Creates enrollment record
+    5. Logs transaction
     """
     try:
         # Validate request
@@ -76,25 +79,16 @@ def enroll_in_course(current_user_id: str):
                 'message': 'You have already enrolled in or completed this course.'
             }), 400
         
-        # 3. Check if user has sufficient funds
-        current_balance = BalanceService.get_current_balance(current_user_id)
+        # 3. Deduct course cost (atomic; raises if the user can't cover it)
         course_cost = Decimal(str(course['cost']))
         
-        if current_balance < course_cost:
-            return jsonify({
-                'success': False,
-                'error': 'INSUFFICIENT_FUNDS',
-                'message': f"You don't have enough cash to enroll in this course. Need ${course_cost}, have ${current_balance}"
-            }), 400
-        
-        # 4. Deduct course cost
         balance_result = BalanceService.subtract_balance(
             user_id=current_user_id,
             amount=course_cost,
             reason=f"Enrolled in {course['title']}"
         )
         
-        # 5. Create enrollment record
+        # 4. Create enrollment record
         enrollment_id = str(uuid.uuid4())
         supabase.table('user_courses').insert({
             'id': enrollment_id,
@@ -8,7 +8,9 @@ from app.utils.jwt_helper import require_auth
 from app.schemas.follow_schema import FollowUserRequest, FollowUserResponse
 from app import supabase
 from datetime import datetime
-from app.services.push_notification_service import ExpoPushService
+from app.services.notification_service import NotificationService
+from app.services.leaderboard_service import LeaderboardService, LEADERBOARD_METRICS, DEFAULT_METRIC
+from app.services.user_search_service import UserSearchService
 
 follow_bp = Blueprint('follow', __name__)
 
@@ -66,31 +68,27 @@ def follow_user(current_user_id: str):
             'created_at': datetime.utcnow().isoformat()
         }).execute()
         
-        # Create notification for followed user
-        supabase.table('notifications').insert({
-            'user_id': str(data.target_user_id),
-            'type': 'follow',
-            'title': 'New Follower',
-            'message': 'Someone started following you!',
-            'related_user_id': current_user_id,
-            'read': False
-        }).execute()
-        
-        # Send push notification
-        try:
-            ExpoPushService.send_notification_to_user(
-                supabase_client=supabase,
-                user_id=str(data.target_user_id),
-                title='👥 New Follower',
-                body='Someone started following you!',
-                notification_type='follow',
-                data={
+        # Notify followed user (a burst of follows becomes one "N new followers" digest)
+        NotificationService.notify(
+            supabase,
+            user_id=str(data.target_user_id),
+            type='follow',
+            title='New Follower',
+            message='Someone started following you!',
+            collapse_key='follow',
+            digest_title='New Followers',
+            digest_message='{count} new followers',
+            related_user_id=current_user_id,
+            push={
+                'title': '👥 New Follower',
+                'body': 'Someone started following you!',
+                'notification_type': 'follow',
+                'data': {
                     'follower_id': current_user_id,
                     'navigate_to': f'/users/{current_user_id}'
                 }
-            )
-        except Exception as e:
-            print(f"Failed to send push notification: {str(e)}")
+            }
+        )
         
         return jsonify({
             'success': True,
@@ -154,53 +152,89 @@ def unfollow_user(current_user_id: str, target_user_id: str):
         }), 500
 
 
+def _leaderboard_metric():
+    """sort_by query param, falling back to net_worth like before"""
+    sort_by = request.args.get('sort_by', DEFAULT_METRIC)
+    return sort_by if sort_by in LEADERBOARD_METRICS else DEFAULT_METRIC
+
+
 @follow_bp.route('/leaderboard', methods=['GET'])
 @require_auth
 def get_leaderboard(current_user_id: str):
     """
     Get leaderboard data sorted by specified metric
     
+    Served from the in-memory snapshot in LeaderboardService.
+    
     Query Params:
-    - sort_by: net_worth | monthly_income | credit_score | trading_profits (default: net_worth)
+    - sort_by: net_worth | monthly_income | credit_score | trading_profits | sanity (default: net_worth)
     - limit: max results (default: 50, max: 100)
+    - cursor: next_cursor from the previous page
     """
     try:
-        from app.models.profile import Profile
-        from sqlalchemy import desc
-        from app import db
-        
-        # Get query parameters
-        sort_by = request.args.get('sort_by', 'net_worth')
-        limit = min(int(request.args.get('limit', 50)), 100)
+        sort_by = _leaderboard_metric()
+        limit = max(1, min(int(request.args.get('limit', 50)), 100))
         
-        # Validate sort_by
-        valid_sort_fields = ['net_worth', 'monthly_income', 'credit_score', 'trading_profits', 'sanity']
-        if sort_by not in valid_sort_fields:
-            sort_by = 'net_worth'
-            
-        # Determine sort column
-        sort_column = getattr(Profile, sort_by)
+        page = LeaderboardService.top(sort_by, limit, request.args.get('cursor'))
         
-        # Query database
-        profiles = db.session.query(Profile)\
-            .order_by(desc(sort_column))\
-            .limit(limit)\
-            .all()
-            
-        # Format response
-        leaderboard_data = []
-        for index, profile in enumerate(profiles):
-            data = profile.to_dict()
-            data['rank'] = index + 1
-            leaderboard_data.append(data)
-            
         return jsonify({
             'success': True,
-            'data': leaderboard_data
+            'data': page['data'],
+            'next_cursor': page['next_cursor'],
+            'total': page['total']
         }), 200
         
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': 'VALIDATION_ERROR',
+            'message': str(e)
+        }), 400
     except Exception as e:
         print(f"Leaderboard error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'OPERATION_FAILED',
+            'message': str(e)
+        }), 500
+
+
+@follow_bp.route('/leaderboard/around-me', methods=['GET'])
+@require_auth
+def get_leaderboard_around_me(current_user_id: str):
+    """
+    Get the players ranked just above and below the current user
+    
+    Query Params:
+    - sort_by: same metrics as /leaderboard (default: net_worth)
+    - window: players on each side (default: 5, max: 25)
+    """
+    try:
+        sort_by = _leaderboard_metric()
+        window = max(0, min(int(request.args.get('window', 5)), 25))
+        
+        result = LeaderboardService.around(sort_by, current_user_id, window)
+        if result is None:
+            return jsonify({
+                'success': False,
+                'error': 'NOT_RANKED',
+                'message': 'You will appear on the leaderboard after the next refresh'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'data': result['data'],
+            'rank': result['rank'],
+            'total': result['total']
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': 'OPERATION_FAILED',
+            'message': str(e)
+        }), 500
+
 @follow_bp.route('/mentors', methods=['GET'])
 def get_mentors():
     """Get list of potential mentors"""
@@ -214,32 +248,46 @@ def get_mentors():
 
 @follow_bp.route('/search', methods=['GET'])
 def search_users():
-    """Search for users"""
+    """
+    Search for users by username
+    
+    Served from the in-memory index in UserSearchService.
+    
+    Query Params:
+    - query: text to search for
+    - limit: max results (default: 20, max: 50)
+    - mode: all (prefix + fuzzy, default) | prefix
+    
+    Returns display fields only (user_id, username, profile_picture_url,
+    wealth_level) plus match type and score, best match first.
+    """
     try:
         query = request.args.get('query', '')
-        if not query:
+        if not query.strip():
              return jsonify({'success': True, 'data': []}), 200
-             
-        response = supabase.table('profiles').select('*').ilike('username', f'%{query}%').execute()
-        return jsonify({'success': True, 'data': response.data}), 200
+        
+        limit = max(1, min(request.args.get('limit', 20, type=int), 50))
+        fuzzy = request.args.get('mode', 'all') != 'prefix'
+        
+        results = UserSearchService.search(query[:64], limit=limit, fuzzy=fuzzy)
+        return jsonify({'success': True, 'data': results}), 200
     except Exception as e:
          return jsonify({'success': False, 'error': str(e)}), 500
 
 @follow_bp.route('/rank/<user_id>', methods=['GET'])
 def get_user_rank(user_id: str):
-    """Get specific user's rank"""
+    """Get specific user's rank (optional ?sort_by=, default net_worth)"""
     try:
-        # Logic to calculate rank (can be expensive, maybe optimized via view?)
-        # For now, simple count query
-        profile_res = supabase.table('profiles').select('net_worth').eq('user_id', user_id).single().execute()
-        if not profile_res.data:
-             return jsonify({'success': False, 'error': 'User not found'}), 404
-             
-        net_worth = profile_res.data['net_worth']
+        sort_by = _leaderboard_metric()
         
-        # Count users with greater net worth
-        count_res = supabase.table('profiles').select('id', count='exact').gt('net_worth', net_worth).execute()
-        rank = count_res.count + 1
+        # O(log n) bisect on the leaderboard snapshot
+        rank = LeaderboardService.rank_of(sort_by, user_id)
+        if rank is None:
+            # Joined after the snapshot was built: rank their current value
+            profile_res = supabase.table('profiles').select(sort_by).eq('user_id', user_id).maybe_single().execute()
+            if not profile_res or not profile_res.data:
+                 return jsonify({'success': False, 'error': 'User not found'}), 404
+            rank = LeaderboardService.rank_of(sort_by, user_id, profile_res.data[sort_by])
         
         return jsonify({'success': True, 'data': rank}), 200
     except Exception as e:
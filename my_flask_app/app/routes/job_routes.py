@@ -13,6 +13,7 @@ import os
 import uuid
 from datetime import datetime
 from app.services.push_notification_service import ExpoPushService
+from app.utils.catalog_cache import catalog_response
 
 job_bp = Blueprint('job', __name__)
 
@@ -21,8 +22,10 @@ job_bp = Blueprint('job', __name__)
 def get_available_jobs():
     """Get available jobs from the market"""
     try:
-        response = supabase.table('jobs_market').select('*').execute()
-        return jsonify({'success': True, 'data': response.data}), 200
+        return catalog_response(
+            'jobs_market',
+            lambda: supabase.table('jobs_market').select('*').execute().data
+        )
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
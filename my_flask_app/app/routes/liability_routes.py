@@ -4,9 +4,12 @@ from app.services.liability_service import LiabilityService
 from app.services.balance_service import BalanceService
 from app.utils.jwt_helper import require_auth
 from app.schemas.liability_schema import LiabilityPurchaseRequest, LiabilityPurchaseResponse, LiabilitySellResponse
+from app import supabase
 import uuid
+from decimal import Decimal
 from datetime import datetime
 from app.services.push_notification_service import ExpoPushService
+from app.utils.catalog_cache import catalog_response
 
 liability_bp = Blueprint('liability', __name__)
 
@@ -19,10 +22,9 @@ def purchase_liability(current_user_id: str):
     
     This endpoint:
     1. Validates the request
-    2. Checks if user has sufficient funds
-    3. Deducts money from balance
-    4. Creates the liability record
-    5. Logs the transaction
+    2. Deducts money from balance (fails atomically on insufficient funds)
+    3. Creates the liability record
+    4. Logs the transaction
     
     All operations are atomic - if any step fails, nothing is committed.
     """
@@ -48,17 +50,7 @@ def purchase_liability(current_user_id: str):
         purchase_price = item['base_price']
         monthly_cost = item['monthly_cost']
         
-        # Check if user has sufficient funds
-        current_balance = BalanceService.get_current_balance(current_user_id)
-        
-        if current_balance < purchase_price:
-            return jsonify({
-                'success': False,
-                'error': 'INSUFFICIENT_FUNDS',
-                'message': f'Insufficient funds. You need ${purchase_price} but only have ${current_balance}'
-            }), 400
-        
-        # Deduct balance
+        # Deduct balance (atomic; raises if the user can't cover it)
         balance_result = BalanceService.subtract_balance(
             user_id=current_user_id,
             amount=purchase_price,
@@ -161,8 +153,10 @@ def get_luxury_items():
     """Get available luxury items"""
     try:
         # Assuming 'luxury_items' table exists
-        response = supabase.table('luxury_items').select('*').execute()
-        return jsonify({'success': True, 'data': response.data}), 200
+        return catalog_response(
+            'luxury_items',
+            lambda: supabase.table('luxury_items').select('*').execute().data
+        )
     except Exception as e:
          return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -66,16 +66,10 @@ def make_life_event_choice(current_user_id: str):
         # 4. Apply balance changes
         net_impact = Decimal(str(choice.get('benefit', 0))) - Decimal(str(choice.get('cost', 0)))
         
-        if net_impact > 0:
-            balance_result = BalanceService.add_balance(
+        if net_impact != 0:
+            balance_result = BalanceService.apply_delta(
                 user_id=current_user_id,
-                amount=net_impact,
-                reason=f"{event['title']} - {choice['choice_label']}"
-            )
-        elif net_impact < 0:
-            balance_result = BalanceService.subtract_balance(
-                user_id=current_user_id,
-                amount=abs(net_impact),
+                delta=net_impact,
                 reason=f"{event['title']} - {choice['choice_label']}"
             )
         else:
@@ -104,7 +98,7 @@ def make_life_event_choice(current_user_id: str):
             
             # Apply penalty
             burnout_cost = Decimal(500)
-            BalanceService.subtract_balance(
+            balance_result = BalanceService.subtract_balance(
                 user_id=current_user_id,
                 amount=burnout_cost,
                 reason="Medical Bill: Burnout Recovery"
@@ -5,13 +5,14 @@ Handles loan applications with JWT authentication
 from flask import Blueprint, request, jsonify
 from pydantic import ValidationError
 from app.utils.jwt_helper import require_auth
-from app.services.balance_service import BalanceService
+from app.services.balance_service import BalanceService, InsufficientFundsError
 from app.schemas.loan_schema import LoanApplicationRequest
 from app import supabase
 from decimal import Decimal
 import uuid
 from datetime import datetime
 from app.services.push_notification_service import ExpoPushService
+from app.utils.catalog_cache import catalog_response
 
 loan_bp = Blueprint('loan', __name__)
 
@@ -23,12 +24,10 @@ def get_available_loans():
     Returns a list of loans where borrower_id is NULL (templates)
     """
     try:
-        response = supabase.table('bank_loans').select('*').is_('borrower_id', 'null').eq('status', 'available').execute()
-        
-        return jsonify({
-            'success': True,
-            'data': response.data
-        }), 200
+        return catalog_response(
+            'bank_loans',
+            lambda: supabase.table('bank_loans').select('*').is_('borrower_id', 'null').eq('status', 'available').execute().data
+        )
     except Exception as e:
         return jsonify({
             'success': False,
@@ -164,11 +163,10 @@ def repay_loan(current_user_id: str, liability_id: str = None):
     
     This endpoint:
     1. Validates the loan belongs to the user
-    2. Checks if user has sufficient funds
-    3. Deducts payment amount from balance
-    4. Updates loan remaining balance
-    5. If fully paid, marks loan as completed
-    6. Logs the transaction
+    2. Deducts payment amount from balance (fails atomically on insufficient funds)
+    3. Updates loan remaining balance
+    4. If fully paid, marks loan as completed
+    5. Logs the transaction
     
     Request body:
     {
@@ -207,24 +205,14 @@ def repay_loan(current_user_id: str, liability_id: str = None):
         if payment_amount > remaining_amount:
             payment_amount = remaining_amount
         
-        # 2. Check if user has sufficient funds
-        current_balance = BalanceService.get_current_balance(current_user_id)
-        
-        if current_balance < payment_amount:
-            return jsonify({
-                'success': False,
-                'error': 'INSUFFICIENT_FUNDS',
-                'message': f'Insufficient funds. You need ${payment_amount} but only have ${current_balance}'
-            }), 400
-        
-        # 3. Deduct payment from balance
+        # 2. Deduct payment from balance (atomic; raises if the user can't cover it)
         balance_result = BalanceService.subtract_balance(
             user_id=current_user_id,
             amount=payment_amount,
             reason=f'Loan payment for {loan.get("name", "loan")}'
         )
         
-        # 4. Update loan
+        # 3. Update loan
         new_remaining_amount = remaining_amount - payment_amount
         is_fully_paid = new_remaining_amount <= 0
         
@@ -266,6 +254,12 @@ def repay_loan(current_user_id: str, liability_id: str = None):
             'new_balance': float(balance_result['new_balance'])
         }), 200
         
+    except InsufficientFundsError as e:
+        return jsonify({
+            'success': False,
+            'error': 'INSUFFICIENT_FUNDS',
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -5,11 +5,66 @@ from decimal import Decimal
 import os
 import uuid
 from datetime import datetime
-from app.services.push_notification_service import ExpoPushService
+from app.services.notification_service import NotificationService
+from app.utils.catalog_cache import catalog_cache
+from app.repositories import get_repository
+from app.utils.query_budget import query_budget
 
 mission_bp = Blueprint('mission', __name__)
 
 
+def _shape_mission(mission):
+    """Build the user-independent part of an /available mission document"""
+    # Format constraints for response
+    constraints = {
+        'income_multiplier': float(mission.get('income_multiplier', 1.0)),
+        'expense_multiplier': float(mission.get('expense_multiplier', 1.0)),
+        'can_change_job': mission.get('can_change_job', True),
+        'can_buy_assets': mission.get('can_buy_assets', True),
+        'can_take_loans': mission.get('can_take_loans', True),
+        'can_rent_property': mission.get('can_rent_property', True),
+        'can_sell_assets': mission.get('can_sell_assets', True),
+        'can_buy_lifestyle_items': mission.get('can_buy_lifestyle_items', True),
+        'allowed_asset_types': mission.get('allowed_asset_types'),
+        'max_loan_amount': float(mission.get('max_loan_amount')) if mission.get('max_loan_amount') else None,
+        'allowed_loan_types': mission.get('allowed_loan_types'),
+        'max_monthly_spending': float(mission.get('max_monthly_spending')) if mission.get('max_monthly_spending') else None,
+    }
+    
+    return {
+        'id': mission['id'],
+        'name': mission['name'],
+        'description': mission['description'],
+        'short_description': mission.get('short_description'),
+        'icon': mission.get('icon', '🎯'),
+        'category': mission['category'],
+        'difficulty': mission['difficulty'],
+        'duration_months': mission['duration_months'],
+        'learning_objectives': mission.get('learning_objectives', []),
+        'affects_main_game': mission.get('affects_main_game', True),
+        'constraints': constraints,
+        'decision_points': mission.get('mission_decision_points', []),
+        'success_criteria': mission.get('mission_success_criteria', [])
+    }
+
+
+def load_mission_catalog():
+    """
+    All missions with decision points and success criteria, already shaped.
+    
+    Served from the catalog cache ('integrated_missions' TTL in config.py);
+    POST /api/admin/catalog/invalidate {"table": "integrated_missions"}
+    after editing missions.
+    """
+    def loader():
+        missions_response = supabase.table('integrated_missions').select(
+            '*, mission_decision_points(*), mission_success_criteria(*)'
+        ).execute()
+        return [_shape_mission(mission) for mission in (missions_response.data or [])]
+    
+    return catalog_cache.get('integrated_missions', loader).data
+
+
 @mission_bp.route('/available', methods=['GET'])
 @require_auth
 def get_available_missions(current_user_id: str):
@@ -17,31 +72,27 @@ def get_available_missions(current_user_id: str):
     Get all missions available to the current user.
     
     This endpoint:
-    1. Fetches all missions from the database
-    2. Checks prerequisites (net worth, completed missions, etc.)
+    1. Takes the shaped mission catalog from the cache
+    2. Looks up the user's completed missions and active flag
     3. Returns filtered list of missions the player can start
     """
     try:
         # Get user profile to check prerequisites
-        profile_response = supabase.table('profiles').select(
-            'net_worth, monthly_income, credit_score'
-        ).eq('user_id', current_user_id).single().execute()
+        profile = get_repository('profiles', supabase).find_one(
+            'net_worth, monthly_income, credit_score', user_id=current_user_id
+        )
         
-        if not profile_response.data:
+        if not profile:
             return jsonify({
                 'success': False,
                 'error': 'PROFILE_NOT_FOUND',
                 'message': 'User profile not found'
             }), 404
         
-        profile = profile_response.data
-        
         # Get all missions with their decision points and success criteria
-        missions_response = supabase.table('integrated_missions').select(
-            '*, mission_decision_points(*), mission_success_criteria(*)'
-        ).execute()
+        missions = load_mission_catalog()
         
-        if not missions_response.data:
+        if not missions:
             return jsonify({
                 'success': True,
                 'data': []
@@ -52,64 +103,30 @@ def get_available_missions(current_user_id: str):
             'mission_id'
         ).eq('player_id', current_user_id).eq('completed', True).execute()
         
-        completed_mission_ids = [m['mission_id'] for m in (completed_response.data or [])]
+        completed_mission_ids = {m['mission_id'] for m in (completed_response.data or [])}
         
         # Get active mission (if any)
-        active_response = supabase.table('player_mission_progress').select(
-            'mission_id'
-        ).eq('player_id', current_user_id).eq('is_active', True).execute()
+        active_mission = get_repository('player_mission_progress', supabase).find_one(
+            'mission_id', player_id=current_user_id, is_active=True
+        )
         
-        has_active_mission = bool(active_response.data)
+        has_active_mission = active_mission is not None
         
         # Filter missions based on prerequisites
         available_missions = []
-        for mission in missions_response.data:
-            # Skip if already completed
-            if mission['id'] in completed_mission_ids:
-                continue
-            
-            # Skip if user already has an active mission
-            if has_active_mission:
-                continue
-            
-            # Check prerequisites (simplified - you can expand this)
-            # For now, we'll allow all missions
-            can_start = True
-            prerequisite_reasons = []
-            
-            # Format constraints for response
-            constraints = {
-                'income_multiplier': float(mission.get('income_multiplier', 1.0)),
-                'expense_multiplier': float(mission.get('expense_multiplier', 1.0)),
-                'can_change_job': mission.get('can_change_job', True),
-                'can_buy_assets': mission.get('can_buy_assets', True),
-                'can_take_loans': mission.get('can_take_loans', True),
-                'can_rent_property': mission.get('can_rent_property', True),
-                'can_sell_assets': mission.get('can_sell_assets', True),
-                'can_buy_lifestyle_items': mission.get('can_buy_lifestyle_items', True),
-                'allowed_asset_types': mission.get('allowed_asset_types'),
-                'max_loan_amount': float(mission.get('max_loan_amount')) if mission.get('max_loan_amount') else None,
-                'allowed_loan_types': mission.get('allowed_loan_types'),
-                'max_monthly_spending': float(mission.get('max_monthly_spending')) if mission.get('max_monthly_spending') else None,
-            }
-            
-            available_missions.append({
-                'id': mission['id'],
-                'name': mission['name'],
-                'description': mission['description'],
-                'short_description': mission.get('short_description'),
-                'icon': mission.get('icon', '🎯'),
-                'category': mission['category'],
-                'difficulty': mission['difficulty'],
-                'duration_months': mission['duration_months'],
-                'learning_objectives': mission.get('learning_objectives', []),
-                'affects_main_game': mission.get('affects_main_game', True),
-                'constraints': constraints,
-                'decision_points': mission.get('mission_decision_points', []),
-                'success_criteria': mission.get('mission_success_criteria', []),
-                'can_start': can_start,
-                'prerequisite_reasons': prerequisite_reasons
-            })
+        if not has_active_mission:
+            for mission in missions:
+                # Skip if already completed
+                if mission['id'] in completed_mission_ids:
+                    continue
+                
+                # Check prerequisites (simplified - you can expand this)
+                # For now, we'll allow all missions
+                available_missions.append(dict(
+                    mission,
+                    can_start=True,
+                    prerequisite_reasons=[]
+                ))
         
         return jsonify({
             'success': True,
@@ -127,6 +144,7 @@ def get_available_missions(current_user_id: str):
 
 @mission_bp.route('/start', methods=['POST'])
 @require_auth
+@query_budget('missions.start', max_calls=12, max_repeats=2)
 def start_mission(current_user_id: str):
     """
     Start a mission for the current user.
@@ -228,6 +246,7 @@ def start_mission(current_user_id: str):
             ).eq('mission_id', mission_id).execute()
             
             if criteria_response.data:
+                tracking_rows = []
                 for criteria in criteria_response.data:
                     # Calculate initial value based on metric
                     initial_value = 0
@@ -238,47 +257,50 @@ def start_mission(current_user_id: str):
                     elif criteria['metric'] == 'credit_score':
                         initial_value = profile.get('credit_score', 650)
                     
-                    supabase.table('player_mission_success_tracking').insert({
+                    tracking_rows.append({
                         'player_mission_id': player_mission_id,
                         'criteria_id': criteria['id'],
                         'current_value': initial_value,
                         'is_met': False
-                    }).execute()
+                    })
+                
+                # One insert for every criterion
+                supabase.table('player_mission_success_tracking').insert(tracking_rows).execute()
         
-        # Get the created progress
+        # Get the created progress; the mission row was read above, so it is
+        # attached here rather than re-read through the integrated_missions join
         progress_response = supabase.table('player_mission_progress').select(
-            '*, integrated_missions(*)'
+            '*'
         ).eq('id', player_mission_id).single().execute()
+        progress = progress_response.data
+        if progress:
+            progress['integrated_missions'] = mission
         
         # Create notification
-        supabase.table('notifications').insert({
-            'user_id': current_user_id,
-            'type': 'mission',
-            'title': '🎯 Mission Started',
-            'message': f'You started the mission: {mission["name"]}',
-            'read': False
-        }).execute()
-        
-        # Send push notification
-        try:
-            ExpoPushService.send_notification_to_user(
-                supabase_client=supabase,
-                user_id=current_user_id,
-                title='🎯 Mission Started',
-                body=f'You started: {mission["name"]}',
-                notification_type='mission',
-                data={
+        NotificationService.notify(
+            supabase,
+            user_id=current_user_id,
+            type='mission',
+            title='🎯 Mission Started',
+            message=f'You started the mission: {mission["name"]}',
+            collapse_key='mission',
+            digest_title='🎯 Mission Progress',
+            digest_message='{count} mission updates',
+            push={
+                'title': '🎯 Mission Started',
+                'body': f'You started: {mission["name"]}',
+                'notification_type': 'mission',
+                'data': {
                     'mission_id': mission_id,
                     'player_mission_id': player_mission_id
                 }
-            )
-        except Exception as e:
-            print(f"Failed to send push notification: {str(e)}")
+            }
+        )
         
         return jsonify({
             'success': True,
             'message': f'Mission "{mission["name"]}" started successfully',
-            'data': progress_response.data
+            'data': progress
         }), 200
         
     except Exception as e:
@@ -289,6 +311,56 @@ def start_mission(current_user_id: str):
         }), 500
 
 
+def load_active_mission(player_id: str):
+    """
+    Load the player's active mission with tracking and decision state.
+    
+    Returns None when there is no active mission. Shared by /active and the
+    composite /api/dashboard endpoint.
+    """
+    # Get active mission with full details
+    progress_response = supabase.table('player_mission_progress').select(
+        '*, integrated_missions(*)'
+    ).eq('player_id', player_id).eq('is_active', True).execute()
+    
+    if not progress_response.data:
+        return None
+    
+    progress = progress_response.data[0]
+    mission_id = progress['mission_id']
+    
+    # Get success criteria tracking
+    tracking_response = supabase.table('player_mission_success_tracking').select(
+        '*, mission_success_criteria(*)'
+    ).eq('player_mission_id', progress['id']).execute()
+    
+    # Get decision points for this mission
+    decisions_response = supabase.table('mission_decision_points').select(
+        '*, mission_decision_options(*)'
+    ).eq('mission_id', mission_id).execute()
+    
+    # Get player's decisions
+    player_decisions_response = supabase.table('player_mission_decisions').select(
+        '*'
+    ).eq('player_mission_id', progress['id']).execute()
+    
+    player_decision_ids = [d['decision_point_id'] for d in (player_decisions_response.data or [])]
+    
+    # Find next decision point
+    next_decision = None
+    for decision in (decisions_response.data or []):
+        if decision['month'] == progress['current_month'] and decision['id'] not in player_decision_ids:
+            next_decision = decision
+            break
+    
+    return {
+        'progress': progress,
+        'success_criteria_tracking': tracking_response.data or [],
+        'next_decision': next_decision,
+        'decisions_made': player_decisions_response.data or []
+    }
+
+
 @mission_bp.route('/active', methods=['GET'])
 @require_auth
 def get_active_mission(current_user_id: str):
@@ -298,53 +370,18 @@ def get_active_mission(current_user_id: str):
     Returns the mission progress, constraints, and current status.
     """
     try:
-        # Get active mission with full details
-        progress_response = supabase.table('player_mission_progress').select(
-            '*, integrated_missions(*)'
-        ).eq('player_id', current_user_id).eq('is_active', True).execute()
+        active_mission = load_active_mission(current_user_id)
         
-        if not progress_response.data:
+        if active_mission is None:
             return jsonify({
                 'success': True,
                 'data': None,
                 'message': 'No active mission'
             }), 200
         
-        progress = progress_response.data[0]
-        mission_id = progress['mission_id']
-        
-        # Get success criteria tracking
-        tracking_response = supabase.table('player_mission_success_tracking').select(
-            '*, mission_success_criteria(*)'
-        ).eq('player_mission_id', progress['id']).execute()
-        
-        # Get decision points for this mission
-        decisions_response = supabase.table('mission_decision_points').select(
-            '*, mission_decision_options(*)'
-        ).eq('mission_id', mission_id).execute()
-        
-        # Get player's decisions
-        player_decisions_response = supabase.table('player_mission_decisions').select(
-            '*'
-        ).eq('player_mission_id', progress['id']).execute()
-        
-        player_decision_ids = [d['decision_point_id'] for d in (player_decisions_response.data or [])]
-        
-        # Find next decision point
-        next_decision = None
-        for decision in (decisions_response.data or []):
-            if decision['month'] == progress['current_month'] and decision['id'] not in player_decision_ids:
-                next_decision = decision
-                break
-        
         return jsonify({
             'success': True,
-            'data': {
-                'progress': progress,
-                'success_criteria_tracking': tracking_response.data or [],
-                'next_decision': next_decision,
-                'decisions_made': player_decisions_response.data or []
-            }
+            'data': active_mission
         }), 200
         
     except Exception as e:
@@ -433,27 +470,24 @@ def make_decision(current_user_id: str):
         
         if immediate_cash != 0:
             from app.services.balance_service import BalanceService
-            if immediate_cash > 0:
-                BalanceService.add_balance(
-                    user_id=current_user_id,
-                    amount=Decimal(str(immediate_cash)),
-                    reason=f'Mission decision: {option.get("label", "Decision reward")}'
-                )
-            else:
-                BalanceService.subtract_balance(
-                    user_id=current_user_id,
-                    amount=Decimal(str(abs(immediate_cash))),
-                    reason=f'Mission decision: {option.get("label", "Decision cost")}'
-                )
+            default_label = 'Decision reward' if immediate_cash > 0 else 'Decision cost'
+            BalanceService.apply_delta(
+                user_id=current_user_id,
+                delta=Decimal(str(immediate_cash)),
+                reason=f'Mission decision: {option.get("label", default_label)}'
+            )
         
         # Create notification
-        supabase.table('notifications').insert({
-            'user_id': current_user_id,
-            'type': 'mission',
-            'title': '📖 Decision Made',
-            'message': f'You chose: {option.get("label", "Option")}',
-            'read': False
-        }).execute()
+        NotificationService.notify(
+            supabase,
+            user_id=current_user_id,
+            type='mission',
+            title='📖 Decision Made',
+            message=f'You chose: {option.get("label", "Option")}',
+            collapse_key='mission',
+            digest_title='🎯 Mission Progress',
+            digest_message='{count} mission updates'
+        )
         
         return jsonify({
             'success': True,
@@ -507,13 +541,16 @@ def abandon_mission(current_user_id: str):
         }).eq('id', progress['id']).execute()
         
         # Create notification
-        supabase.table('notifications').insert({
-            'user_id': current_user_id,
-            'type': 'mission',
-            'title': '❌ Mission Abandoned',
-            'message': f'You abandoned the mission: {mission_name}',
-            'read': False
-        }).execute()
+        NotificationService.notify(
+            supabase,
+            user_id=current_user_id,
+            type='mission',
+            title='❌ Mission Abandoned',
+            message=f'You abandoned the mission: {mission_name}',
+            collapse_key='mission',
+            digest_title='🎯 Mission Progress',
+            digest_message='{count} mission updates'
+        )
         
         return jsonify({
             'success': True,
@@ -898,18 +935,11 @@ def acknowledge_story_event(current_user_id: str, event_id: str):
         immediate_cash = float(event.get('immediate_cash', 0))
         if immediate_cash != 0:
             from app.services.balance_service import BalanceService
-            if immediate_cash > 0:
-                BalanceService.add_balance(
-                    user_id=current_user_id,
-                    amount=Decimal(str(immediate_cash)),
-                    reason=f'Story event: {event.get("title", "Mission story")}'
-                )
-            else:
-                BalanceService.subtract_balance(
-                    user_id=current_user_id,
-                    amount=Decimal(str(abs(immediate_cash))),
-                    reason=f'Story event: {event.get("title", "Mission story")}'
-                )
+            BalanceService.apply_delta(
+                user_id=current_user_id,
+                delta=Decimal(str(immediate_cash)),
+                reason=f'Story event: {event.get("title", "Mission story")}'
+            )
             impacts_applied['cash_change'] = immediate_cash
         
         # Note: Happiness, stress, and motivation changes would be applied
@@ -6,6 +6,7 @@ from flask import Blueprint, request, jsonify
 from pydantic import ValidationError, BaseModel, Field
 from app.utils.jwt_helper import require_auth
 from app.services.push_notification_service import ExpoPushService
+from app.services.notification_service import NotificationService
 from app import supabase
 import os
 import uuid
@@ -63,6 +64,9 @@ def register_push_token(current_user_id: str):
                 'message': 'User profile not found'
             }), 404
         
+        # Keep the push token cache in step with the profile
+        ExpoPushService.token_resolver.set(current_user_id, data.push_token)
+        
         return jsonify({
             'success': True,
             'message': 'Push token registered successfully'
@@ -115,6 +119,10 @@ def unregister_push_token(current_user_id: str):
                 'message': 'User profile not found'
             }), 404
         
+        # Stop pushing to the logged-out device right away (on this worker;
+        # others stop within PUSH_TOKEN_CACHE_TTL)
+        ExpoPushService.token_resolver.set(current_user_id, None)
+        
         return jsonify({
             'success': True,
             'message': 'Push token unregistered successfully'
@@ -148,7 +156,8 @@ def test_push_notification(current_user_id: str):
             title=test_data.title,
             body=test_data.body,
             notification_type='test',
-            data={'test': True}
+            data={'test': True},
+            background=False  # Report the real Expo result
         )
         
         if success:
@@ -216,11 +225,33 @@ def mark_notification_read(current_user_id: str, notification_id: str):
 @notification_bp.route('/', methods=['GET'])
 @require_auth
 def get_all_notifications(current_user_id: str):
-    """Get all notifications"""
+    """
+    Get notifications, newest first, or only what changed since the last sync
+    
+    Query Params:
+    - limit: rows per page (default: 20, max: 100)
+    - cursor: next_cursor from the previous page (older rows)
+    - since: high_water_mark from a previous response; returns only rows
+      created or updated after it, oldest first (repeat while has_more)
+    """
     try:
-        limit = request.args.get('limit', 20, type=int)
-        response = supabase.table('notifications').select('*').eq('user_id', current_user_id).order('created_at', desc=True).limit(limit).execute()
-        return jsonify({'success': True, 'data': response.data}), 200
+        limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+        page = NotificationService.list_page(
+            supabase,
+            current_user_id,
+            cursor=request.args.get('cursor'),
+            since=request.args.get('since'),
+            limit=limit
+        )
+        return jsonify({
+            'success': True,
+            'data': page['data'],
+            'next_cursor': page['next_cursor'],
+            'high_water_mark': page['high_water_mark'],
+            'has_more': page['has_more']
+        }), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -228,10 +259,9 @@ def get_all_notifications(current_user_id: str):
 @notification_bp.route('/unread', methods=['GET'])
 @require_auth
 def get_unread_count(current_user_id: str):
-    """Get count of unread notifications"""
+    """Get count of unread notifications (maintained counter, see NotificationService)"""
     try:
-        response = supabase.table('notifications').select('id', count='exact').eq('user_id', current_user_id).eq('read', False).execute()
-        return jsonify({'success': True, 'data': response.count}), 200
+        return jsonify({'success': True, 'data': NotificationService.unread_count(supabase, current_user_id)}), 200
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -239,9 +269,18 @@ def get_unread_count(current_user_id: str):
 @notification_bp.route('/read-all', methods=['PUT'])
 @require_auth
 def mark_all_read(current_user_id: str):
-    """Mark all notifications as read"""
+    """
+    Mark notifications as read
+    
+    Body (optional): {"up_to": high_water_mark} marks only the rows up to
+    that mark, so anything that arrived after the client's last sync stays
+    unread. Without it, every unread notification is marked.
+    """
     try:
-        supabase.table('notifications').update({'read': True}).eq('user_id', current_user_id).eq('read', False).execute()
-        return jsonify({'success': True, 'message': 'All marked as read'}), 200
+        up_to = (request.get_json(silent=True) or {}).get('up_to')
+        marked = NotificationService.mark_read(supabase, current_user_id, up_to=up_to)
+        return jsonify({'success': True, 'message': 'All marked as read', 'marked': marked}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
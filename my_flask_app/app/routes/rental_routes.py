@@ -13,6 +13,7 @@ import os
 import uuid
 from datetime import datetime
 from app.services.push_notification_service import ExpoPushService
+from app.utils.catalog_cache import catalog_response
 
 rental_bp = Blueprint('rental', __name__)
 
@@ -21,8 +22,10 @@ rental_bp = Blueprint('rental', __name__)
 def get_available_rentals():
     """Get available rental properties"""
     try:
-        response = supabase.table('rental_properties').select('*').execute()
-        return jsonify({'success': True, 'data': response.data}), 200
+        return catalog_response(
+            'rental_properties',
+            lambda: supabase.table('rental_properties').select('*').execute().data
+        )
     except Exception as e:
          return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -57,10 +60,9 @@ def rent_property(current_user_id: str):
     This endpoint:
     1. Validates the request
     2. Checks for existing active rental
-    3. Checks if user has sufficient funds for first month
-    4. Deducts first month's rent
-    5. Creates rental record
-    6. Logs transaction
+    3. Deducts first month's rent (fails atomically on insufficient funds)
+    4. Creates rental record
+    5. Logs transaction
     """
     try:
         # Validate request
@@ -88,25 +90,16 @@ def rent_property(current_user_id: str):
                 'message': 'You are currently renting a property. You must move out before renting a new one.'
             }), 400
         
-        # 3. Check if user has sufficient funds
-        current_balance = BalanceService.get_current_balance(current_user_id)
+        # 3. Deduct first month's rent (atomic; raises if the user can't cover it)
         monthly_rent = Decimal(str(property_data['monthly_rent']))
         
-        if current_balance < monthly_rent:
-            return jsonify({
-                'success': False,
-                'error': 'INSUFFICIENT_FUNDS',
-                'message': f"You don't have enough cash for the first month's rent. Need ${monthly_rent}, have ${current_balance}"
-            }), 400
-        
-        # 4. Deduct first month's rent
         balance_result = BalanceService.subtract_balance(
             user_id=current_user_id,
             amount=monthly_rent,
             reason=f"First month rent for {property_data['name']}"
         )
         
-        # 5. Create rental record
+        # 4. Create rental record
         rental_id = str(uuid.uuid4())
         supabase.table('player_rentals').insert({
             'id': rental_id,
@@ -117,7 +110,7 @@ def rent_property(current_user_id: str):
             'rented_at': datetime.utcnow().isoformat()
         }).execute()
         
-        # 6. Create notification
+        # 5. Create notification
         supabase.table('notifications').insert({
             'user_id': current_user_id,
             'type': 'financial_move',
@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
 from app import supabase
 from app.utils.jwt_helper import require_auth
-from app.services.balance_service import BalanceService
+from app.services.balance_service import BalanceService, InsufficientFundsError
 from app.models.profile import Profile
 from app import db
 from decimal import Decimal
@@ -29,18 +29,16 @@ def recover_sanity(current_user_id: str):
         cost = Decimal(action['cost'])
         sanity_gain = action['sanity']
         
-        # 1. Check Balance
+        # 1. Deduct cost (atomic; fails if the user can't cover it)
         if cost > 0:
-            current_balance = BalanceService.get_current_balance(current_user_id)
-            if current_balance < cost:
-                 return jsonify({'success': False, 'message': 'Insufficient funds'}), 400
-                 
-            # Deduct cost
-            BalanceService.subtract_balance(
-                user_id=current_user_id,
-                amount=cost,
-                reason=f"Sanity Recovery: {action_key.replace('_', ' ').title()}"
-            )
+            try:
+                BalanceService.subtract_balance(
+                    user_id=current_user_id,
+                    amount=cost,
+                    reason=f"Sanity Recovery: {action_key.replace('_', ' ').title()}"
+                )
+            except InsufficientFundsError:
+                return jsonify({'success': False, 'message': 'Insufficient funds'}), 400
             
         # 2. Update Sanity
         profile_res = supabase.table('profiles').select('sanity').eq('user_id', current_user_id).single().execute()
@@ -1,15 +1,28 @@
-
 """
 Service layer for balance operations
 Handles business logic for adding/subtracting user balance
+
+All mutations go through the `apply_balance_delta` Postgres function
+(supabase/migrations/20261017000000_apply_balance_delta.sql), which applies
+the delta, enforces sufficient funds and writes the ledger row in a single
+atomic statement. One round trip, and no lost updates when the same user
+fires concurrent requests.
 """
 from decimal import Decimal
 from typing import Dict, Any
-import uuid
-from datetime import datetime
 from app import supabase
 
 
+class InsufficientFundsError(Exception):
+    """Raised when a debit would take the balance below zero"""
+
+    def __init__(self, current_balance: Decimal, required: Decimal):
+        self.current_balance = current_balance
+        self.required = required
+        # Routes match on 'Insufficient funds' in str(e), keep the wording
+        super().__init__(f'Insufficient funds. Current balance: ${current_balance}, Required: ${required}')
+
+
 class BalanceService:
     """Service for managing user balances"""
     
@@ -25,6 +38,44 @@ class BalanceService:
             print(f'Error getting balance: {e}')
             raise Exception('Failed to retrieve balance')
     
+    @staticmethod
+    def apply_delta(user_id: str, delta: Decimal, reason: str, category: str = 'balance_adjustment') -> Dict[str, Any]:
+        """
+        Atomically apply a signed balance change and record the transaction
+        
+        Args:
+            user_id: UUID of the user
+            delta: Positive to credit, negative to debit
+            reason: Transaction description
+            category: Transaction category
+            
+        Returns:
+            Dict with success status, new balance, and transaction ID
+            
+        Raises:
+            InsufficientFundsError: If a debit exceeds the current balance
+            Exception: If the user has no balance row or the call fails
+        """
+        delta = Decimal(str(delta))
+        response = supabase.rpc('apply_balance_delta', {
+            'p_user_id': user_id,
+            'p_delta': str(delta),
+            'p_description': reason,
+            'p_category': category
+        }).execute()
+        
+        result = response.data or {}
+        if not result.get('success'):
+            if result.get('error') == 'INSUFFICIENT_FUNDS':
+                raise InsufficientFundsError(Decimal(str(result.get('current_balance', 0))), abs(delta))
+            raise Exception(f"Balance update rejected: {result.get('error', 'UNKNOWN_ERROR')}")
+        
+        return {
+            'success': True,
+            'new_balance': Decimal(str(result['new_balance'])),
+            'transaction_id': result['transaction_id']
+        }
+    
     @staticmethod
     def add_balance(user_id: str, amount: Decimal, reason: str) -> Dict[str, Any]:
         """
@@ -39,34 +90,9 @@ class BalanceService:
             Dict with success status, new balance, and transaction ID
         """
         try:
-            # Get current balance
-            current_balance = BalanceService.get_current_balance(user_id)
-            new_balance = current_balance + amount
-            
-            # Update balance
-            supabase.table('user_balances').update({
-                'current_balance': float(new_balance),
-                'updated_at': datetime.utcnow().isoformat()
-            }).eq('user_id', user_id).execute()
-            
-            # Create transaction record
-            transaction_id = str(uuid.uuid4())
-            supabase.table('transactions').insert({
-                'id': transaction_id,
-                'user_id': user_id,
-                'type': 'income',
-                'category': 'balance_adjustment',
-                'amount': float(amount),
-                'description': reason,
-                'created_at': datetime.utcnow().isoformat()
-            }).execute()
-            
-            return {
-                'success': True,
-                'new_balance': new_balance,
-                'transaction_id': transaction_id,
-                'message': f'Successfully added ${amount} to balance'
-            }
+            result = BalanceService.apply_delta(user_id, Decimal(str(amount)), reason)
+            result['message'] = f'Successfully added ${amount} to balance'
+            return result
         except Exception as e:
             print(f'Error adding balance: {e}')
             raise Exception(f'Failed to add balance: {str(e)}')
@@ -85,42 +111,15 @@ class BalanceService:
             Dict with success status, new balance, and transaction ID
             
         Raises:
-            Exception: If insufficient funds or operation fails
+            InsufficientFundsError: If the user cannot cover the amount
+            Exception: If the operation fails
         """
         try:
-            # Get current balance
-            current_balance = BalanceService.get_current_balance(user_id)
-            
-            # Check if user has sufficient funds
-            if current_balance < amount:
-                raise Exception(f'Insufficient funds. Current balance: ${current_balance}, Required: ${amount}')
-            
-            new_balance = current_balance - amount
-            
-            # Update balance
-            supabase.table('user_balances').update({
-                'current_balance': float(new_balance),
-                'updated_at': datetime.utcnow().isoformat()
-            }).eq('user_id', user_id).execute()
-            
-            # Create transaction record
-            transaction_id = str(uuid.uuid4())
-            supabase.table('transactions').insert({
-                'id': transaction_id,
-                'user_id': user_id,
-                'type': 'expense',
-                'category': 'balance_adjustment',
-                'amount': float(amount),
-                'description': reason,
-                'created_at': datetime.utcnow().isoformat()
-            }).execute()
-            
-            return {
-                'success': True,
-                'new_balance': new_balance,
-                'transaction_id': transaction_id,
-                'message': f'Successfully subtracted ${amount} from balance'
-            }
+            result = BalanceService.apply_delta(user_id, -Decimal(str(amount)), reason)
+            result['message'] = f'Successfully subtracted ${amount} from balance'
+            return result
+        except InsufficientFundsError:
+            raise
         except Exception as e:
             print(f'Error subtracting balance: {e}')
             raise Exception(f'Failed to subtract balance: {str(e)}')
@@ -0,0 +1,238 @@
+"""
+Chat inbox and history
+======================
+
+🎓 LEARNING: The app used to read chat_messages straight from Supabase with
+unbounded queries - the inbox pulled every message the user ever sent or
+received just to show one line per conversation.
+
+- conversations(): one grouped query (the chat_conversations Postgres
+  function, supabase/migrations/20261017040000_chat_conversations.sql)
+  returns one row per peer with the latest message and the unread count.
+- history(): newest messages first, keyset-paginated on (timestamp, id).
+
+Both are served by the (sender_id, recipient_id, timestamp) index, so the
+cost of a page doesn't grow with the length of the conversation.
+
+CURSORS:
+next_cursor encodes the (timestamp, id) of the last row on the page. New
+messages arriving at the top never shift later pages, unlike offset paging.
+
+SENDING:
+send() is one round trip: the send_chat_message Postgres function writes the
+message and the recipient's notification together. Recipients are checked
+against a per-worker existence cache first - known users skip the profile
+lookup, known non-users are rejected without touching the database - and
+the push is handed to ExpoPushService's background queue, unless the
+message collapsed into the recipient's unread digest for this sender, which
+already pushed once.
+"""
+
+import base64
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.push_notification_service import ExpoPushService
+
+HISTORY_COLUMNS = 'id, sender_id, recipient_id, content, status, type, timestamp'
+PEER_COLUMNS = 'user_id, username, profile_picture_url'
+
+
+def encode_chat_cursor(timestamp: str, key: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([timestamp, key]).encode()).decode()
+
+
+def decode_chat_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Inverse of encode_chat_cursor; raises ValueError on garbage
+
+    The key is a message id (history) or peer id (inbox) and both values end
+    up in a PostgREST filter or RPC argument, so they are parsed and
+    re-rendered rather than passed through as the client sent them.
+    """
+    try:
+        timestamp, key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(timestamp).isoformat(), str(uuid.UUID(key))
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+class RecipientNotFoundError(Exception):
+    """Raised when messaging a user_id that has no profile"""
+
+
+class UserExistenceCache:
+    """
+    Cached user_id -> has a profile
+
+    Profiles are created at signup and practically never deleted, so known
+    users are kept for `ttl` seconds. Unknown ids are kept only for
+    `negative_ttl`, so a user who signs up right after a failed send can be
+    messaged shortly after.
+    """
+
+    def __init__(self, ttl: float = 600, negative_ttl: float = 30, max_size: int = 50000):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, bool]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> Optional[bool]:
+        """True / False if known, None if we have to ask the database"""
+        with self._lock:
+            entry = self._entries.get(str(user_id))
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            self._entries.move_to_end(str(user_id))
+            return entry[1]
+
+    def set(self, user_id: str, exists: bool) -> None:
+        with self._lock:
+            ttl = self.ttl if exists else self.negative_ttl
+            self._entries[str(user_id)] = (time.monotonic() + ttl, exists)
+            self._entries.move_to_end(str(user_id))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(str(user_id), None)
+
+
+class ChatService:
+    known_users = UserExistenceCache()
+
+    @classmethod
+    def send(cls, supabase, sender_id: str, recipient_id: str, content: str) -> Dict[str, Any]:
+        """
+        Write a message and the recipient's notification in one call,
+        then queue the push if the notification opened a new digest
+
+        Returns:
+            {'message_id': str, 'timestamp': str}
+
+        Raises:
+            RecipientNotFoundError: If the recipient has no profile
+        """
+        recipient_id = str(recipient_id)
+        known = cls.known_users.get(recipient_id)
+        if known is False:
+            raise RecipientNotFoundError('Recipient user not found')
+
+        message_id = str(uuid.uuid4())
+        result = supabase.rpc('send_chat_message', {
+            'p_sender_id': sender_id,
+            'p_recipient_id': recipient_id,
+            'p_content': content,
+            'p_message_id': message_id,
+            'p_verify_recipient': known is None
+        }).execute().data or {}
+
+        if not result.get('success'):
+            error = result.get('error', 'UNKNOWN_ERROR')
+            if error == 'RECIPIENT_NOT_FOUND':
+                cls.known_users.set(recipient_id, False)
+                raise RecipientNotFoundError('Recipient user not found')
+            raise Exception(f'Message rejected: {error}')
+        cls.known_users.set(recipient_id, True)
+
+        # A message folded into the sender's unread digest was already
+        # pushed when that digest opened: one push per digest, not per message.
+        # Queued: the token lookup and Expo request happen on the push worker
+        if not result.get('notification_collapsed'):
+            ExpoPushService.send_notification_to_user(
+                supabase_client=supabase,
+                user_id=recipient_id,
+                title='💬 New Message',
+                body='You have a new message',
+                notification_type='chat',
+                data={
+                    'sender_id': sender_id,
+                    'message_id': message_id,
+                    'navigate_to': f'/chat/{sender_id}'
+                }
+            )
+
+        return {'message_id': result.get('message_id', message_id), 'timestamp': result.get('timestamp')}
+
+    @staticmethod
+    def conversations(supabase, user_id: str, cursor: Optional[str] = None,
+                      limit: int = 20) -> Dict[str, Any]:
+        """
+        One page of the inbox, most recent conversation first
+
+        Returns:
+            {'data': [{'peer': {...}, 'last_message': {...}, 'unread_count': int}],
+             'next_cursor': str | None}
+        """
+        params = {'p_user_id': user_id, 'p_limit': limit + 1}
+        if cursor:
+            params['p_before_timestamp'], params['p_before_peer_id'] = decode_chat_cursor(cursor)
+        rows = supabase.rpc('chat_conversations', params).execute().data or []
+        page = rows[:limit]
+
+        # Peer display fields for the whole page in one query
+        peers = {}
+        peer_ids = [row['peer_id'] for row in page]
+        if peer_ids:
+            result = supabase.table('profiles').select(PEER_COLUMNS).in_('user_id', peer_ids).execute()
+            peers = {p['user_id']: p for p in (result.data or [])}
+
+        data = [{
+            'peer': peers.get(row['peer_id'], {'user_id': row['peer_id'], 'username': None,
+                                               'profile_picture_url': None}),
+            'last_message': {
+                'id': row['message_id'],
+                'sender_id': row['sender_id'],
+                'recipient_id': row['recipient_id'],
+                'content': row['content'],
+                'status': row['status'],
+                'type': row['type'],
+                'timestamp': row['timestamp']
+            },
+            'unread_count': row['unread_count']
+        } for row in page]
+
+        return {
+            'data': data,
+            'next_cursor': encode_chat_cursor(page[-1]['timestamp'], page[-1]['peer_id']) if len(rows) > limit else None
+        }
+
+    @staticmethod
+    def history(supabase, user_id: str, peer_id: str, cursor: Optional[str] = None,
+                limit: int = 50) -> Dict[str, Any]:
+        """
+        One page of messages between user_id and peer_id, newest first
+
+        Returns:
+            {'data': [message dicts], 'next_cursor': str | None}
+        """
+        # Sender and recipient both in {user, peer}: exactly this conversation,
+        # since messages to yourself are rejected by /send
+        query = supabase.table('chat_messages')\
+            .select(HISTORY_COLUMNS)\
+            .in_('sender_id', [user_id, peer_id])\
+            .in_('recipient_id', [user_id, peer_id])
+        if cursor:
+            timestamp, message_id = decode_chat_cursor(cursor)
+            # (timestamp, id) < (cursor.timestamp, cursor.id), newest first
+            query = query.or_(
+                f'timestamp.lt."{timestamp}",and(timestamp.eq."{timestamp}",id.lt.{message_id})'
+            )
+        # One extra row tells us whether there is a next page
+        rows = query.order('timestamp', desc=True).order('id', desc=True).limit(limit + 1).execute().data or []
+
+        messages: List[Dict[str, Any]] = rows[:limit]
+        return {
+            'data': messages,
+            'next_cursor': encode_chat_cursor(messages[-1]['timestamp'], messages[-1]['id']) if len(rows) > limit else None
+        }
@@ -0,0 +1,280 @@
+"""
+Leaderboard snapshots
+=====================
+
+🎓 LEARNING: /api/social/leaderboard used to run ORDER BY <metric> DESC LIMIT n
+over every profile on each request, and /rank/<user_id> counted every profile
+with a higher net worth. Both get slower as the player base grows.
+
+Instead, each worker keeps a snapshot of the display columns of all profiles
+plus one sorted key list per metric:
+
+    keys = [(-value, user_id), ...]   # ascending = highest value first
+
+- Top N / next page:  slice after bisect_right(keys, cursor)       O(log n + N)
+- Rank of a value:    bisect_left(keys, (-value,)) + 1             O(log n)
+- Players around me:  bisect to the player's key, slice a window   O(log n + w)
+
+Every rank shown - on page rows, around-me rows, /rank - is the competition
+rank of the row's value, so tied players share a number everywhere.
+
+The snapshot is rebuilt from one query every LEADERBOARD_REFRESH_SECONDS.
+Profile writes made through ProfileService are applied incrementally in
+between, so a player sees their own new rank right away.
+
+LOCKING:
+Each snapshot has a short mutation lock held by writers for one upsert and
+by readers for one page - never for the rebuild scan. A rebuild runs under
+its own lock that writers don't touch; writes that land while it scans are
+replayed onto the new snapshot before it is published.
+"""
+
+import base64
+import json
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app
+
+from app import db
+from app.models.profile import Profile
+
+LEADERBOARD_METRICS = ('net_worth', 'monthly_income', 'credit_score', 'trading_profits', 'sanity')
+DEFAULT_METRIC = 'net_worth'
+
+# Columns kept per player; rows are rendered like Profile.to_dict()
+DISPLAY_COLUMNS = (
+    'id', 'user_id', 'username', 'net_worth', 'monthly_income', 'credit_score', 'wealth_level',
+    'experience_points', 'sanity', 'trading_profits', 'has_completed_onboarding',
+    'profile_picture_url', 'created_at'
+)
+
+
+def _metric_value(value: Any) -> float:
+    return float(value) if value else 0.0
+
+
+def _display_row(source: Any) -> Tuple:
+    """Compact tuple of display values from a Profile or a query row"""
+    get = (lambda c: source.get(c)) if isinstance(source, dict) else (lambda c: getattr(source, c, None))
+    row = []
+    for column in DISPLAY_COLUMNS:
+        value = get(column)
+        if column in ('id', 'user_id'):
+            value = str(value) if value is not None else None
+        elif column in ('net_worth', 'monthly_income', 'trading_profits'):
+            value = float(value) if value else 0
+        elif column == 'created_at':
+            value = value.isoformat() if hasattr(value, 'isoformat') else value
+        row.append(value)
+    return tuple(row)
+
+
+def encode_cursor(key: Tuple[float, str]) -> str:
+    """Opaque cursor for the last (−value, user_id) key of a page"""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    """Inverse of encode_cursor; raises ValueError on garbage"""
+    try:
+        negative_value, user_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (float(negative_value), str(user_id))
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+class MetricRanking:
+    """Players ordered by one metric, highest first (ties by user_id)"""
+
+    def __init__(self, values: Dict[str, float]):
+        self.values = dict(values)
+        self.keys: List[Tuple[float, str]] = sorted((-v, uid) for uid, v in self.values.items())
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def rank_of_value(self, value: float) -> int:
+        """Competition rank: 1 + number of players with a strictly higher value"""
+        return bisect_left(self.keys, (-value,)) + 1
+
+    def position(self, user_id: str) -> Optional[int]:
+        """0-based index of the player in the ordering, or None if unranked"""
+        value = self.values.get(user_id)
+        if value is None:
+            return None
+        return bisect_left(self.keys, (-value, user_id))
+
+    def page(self, after: Optional[Tuple[float, str]], limit: int) -> Tuple[int, List[Tuple[float, str]]]:
+        """(start position, keys) of the page following the `after` key"""
+        start = bisect_right(self.keys, after) if after is not None else 0
+        return start, self.keys[start:start + limit]
+
+    def upsert(self, user_id: str, value: float) -> None:
+        self.remove(user_id)
+        self.values[user_id] = value
+        insort(self.keys, (-value, user_id))
+
+    def remove(self, user_id: str) -> None:
+        position = self.position(user_id)
+        if position is not None:
+            del self.keys[position]
+            del self.values[user_id]
+
+
+class LeaderboardSnapshot:
+    """Display rows for every player plus one MetricRanking per metric"""
+
+    def __init__(self, rows: Dict[str, Tuple], built_at: float):
+        self.rows = rows
+        self.built_at = built_at
+        self.lock = threading.Lock()  # Held for one upsert or one read
+        metric_index = {m: DISPLAY_COLUMNS.index(m) for m in LEADERBOARD_METRICS}
+        self.rankings = {
+            metric: MetricRanking({uid: _metric_value(row[i]) for uid, row in rows.items()})
+            for metric, i in metric_index.items()
+        }
+
+    def render(self, ranking: MetricRanking, key: Tuple[float, str]) -> Dict[str, Any]:
+        """Display row for one ranking key, with its competition rank"""
+        data = dict(zip(DISPLAY_COLUMNS, self.rows[key[1]]))
+        data['rank'] = ranking.rank_of_value(-key[0])
+        return data
+
+    def upsert(self, row: Tuple) -> None:
+        user_id = row[DISPLAY_COLUMNS.index('user_id')]
+        with self.lock:
+            self.rows[user_id] = row
+            for metric, ranking in self.rankings.items():
+                ranking.upsert(user_id, _metric_value(row[DISPLAY_COLUMNS.index(metric)]))
+
+
+class LeaderboardService:
+    _snapshot: Optional[LeaderboardSnapshot] = None
+    _rebuild_lock = threading.Lock()  # One rebuild at a time; writers never wait on it
+    _replay_lock = threading.Lock()
+    _replay: Optional[List[Tuple]] = None  # Rows written while a rebuild scans
+
+    @staticmethod
+    def build_snapshot() -> LeaderboardSnapshot:
+        """Load the display columns of every profile in one query"""
+        columns = [getattr(Profile, c) for c in DISPLAY_COLUMNS]
+        rows = {}
+        for record in db.session.query(*columns).yield_per(5000):
+            row = _display_row(record)
+            rows[row[1]] = row
+        return LeaderboardSnapshot(rows, time.monotonic())
+
+    @classmethod
+    def snapshot(cls) -> LeaderboardSnapshot:
+        """
+        Current snapshot, rebuilt once LEADERBOARD_REFRESH_SECONDS have passed
+
+        While one request rebuilds, others keep serving the previous snapshot.
+        """
+        max_age = current_app.config.get('LEADERBOARD_REFRESH_SECONDS', 60)
+        current = cls._snapshot
+        if current is not None and time.monotonic() - current.built_at < max_age:
+            return current
+
+        if not cls._rebuild_lock.acquire(blocking=current is None):
+            return current
+        try:
+            current = cls._snapshot
+            if current is None or time.monotonic() - current.built_at >= max_age:
+                current = cls._rebuild()
+            return current
+        finally:
+            cls._rebuild_lock.release()
+
+    @classmethod
+    def _rebuild(cls) -> LeaderboardSnapshot:
+        with cls._replay_lock:
+            cls._replay = []
+        try:
+            fresh = cls.build_snapshot()
+        except Exception:
+            with cls._replay_lock:
+                cls._replay = None
+            raise
+        with cls._replay_lock:
+            # The scan may have read these rows before they were written
+            for row in cls._replay:
+                fresh.upsert(row)
+            cls._replay = None
+            cls._snapshot = fresh
+        return fresh
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Drop the snapshot; the next request rebuilds it"""
+        cls._snapshot = None
+
+    @classmethod
+    def record_player(cls, profile: Any) -> None:
+        """Apply one profile's new values to the live snapshot (no-op if none built)"""
+        if profile is None:
+            return
+        row = _display_row(profile)
+        with cls._replay_lock:
+            if cls._replay is not None:
+                cls._replay.append(row)
+            current = cls._snapshot
+        if current is not None:
+            current.upsert(row)
+
+    @classmethod
+    def top(cls, metric: str, limit: int, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        One page of the leaderboard
+
+        Returns:
+            {'data': rows with 'rank', 'next_cursor': str | None, 'total': int}
+        """
+        after = decode_cursor(cursor) if cursor else None
+        snap = cls.snapshot()
+        ranking = snap.rankings[metric]
+        with snap.lock:
+            start, keys = ranking.page(after, limit)
+            data = [snap.render(ranking, key) for key in keys]
+            total = len(ranking)
+        has_more = start + len(keys) < total
+        return {
+            'data': data,
+            'next_cursor': encode_cursor(keys[-1]) if keys and has_more else None,
+            'total': total
+        }
+
+    @classmethod
+    def around(cls, metric: str, user_id: str, window: int) -> Optional[Dict[str, Any]]:
+        """`window` players either side of user_id, or None if the player is unranked"""
+        snap = cls.snapshot()
+        ranking = snap.rankings[metric]
+        with snap.lock:
+            position = ranking.position(user_id)
+            if position is None:
+                return None
+            start = max(0, position - window)
+            keys = ranking.keys[start:position + window + 1]
+            return {
+                'data': [snap.render(ranking, key) for key in keys],
+                'rank': ranking.rank_of_value(ranking.values[user_id]),
+                'total': len(ranking)
+            }
+
+    @classmethod
+    def rank_of(cls, metric: str, user_id: str, value: Optional[float] = None) -> Optional[int]:
+        """
+        Competition rank of a player (ties share a rank)
+
+        `value` ranks a player that joined after the snapshot was built.
+        """
+        snap = cls.snapshot()
+        ranking = snap.rankings[metric]
+        with snap.lock:
+            value = ranking.values.get(user_id, value)
+            if value is None:
+                return None
+            return ranking.rank_of_value(_metric_value(value))
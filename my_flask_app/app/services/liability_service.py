@@ -7,7 +7,7 @@ from typing import Optional, List, Dict
 import uuid
 from datetime import datetime, date
 from decimal import Decimal
-from sqlalchemy import func
+from sqlalchemy import Numeric, case, func, literal, or_
 
 class LiabilityService:
     # Depreciation rates
@@ -15,6 +15,9 @@ class LiabilityService:
     YEAR_2_PLUS_MONTHLY_RATE = Decimal('0.0025')  # 3% annual / 12 months = ~0.25% monthly
     MINIMUM_VALUE_PERCENTAGE = Decimal('0.05')  # 5% floor
     
+    # Rows per UPDATE in apply_monthly_depreciation_bulk
+    BULK_DEPRECIATION_CHUNK_SIZE = 5000
+    
     @staticmethod
     def calculate_depreciation(player_liability: PlayerLiability) -> Dict:
         """
@@ -69,10 +72,12 @@ class LiabilityService:
         }
     
     @staticmethod
-    def apply_monthly_depreciation(player_id: Optional[uuid.UUID] = None) -> Dict:
+    def apply_monthly_depreciation(player_id: Optional[uuid.UUID] = None, partition=None) -> Dict:
         """
         Apply monthly depreciation to all active liabilities.
         If player_id is provided, only depreciate that player's liabilities.
+        If partition (app.utils.job_runner.Partition) is provided, only
+        depreciate liabilities whose player_id falls in its range.
         Returns count of updated liabilities and total depreciation amount.
         """
         query = PlayerLiability.query.filter_by(is_active=True)
@@ -80,6 +85,9 @@ class LiabilityService:
         if player_id:
             query = query.filter_by(player_id=player_id)
         
+        if partition is not None:
+            query = partition.apply(query, PlayerLiability.player_id)
+        
         liabilities = query.all()
         updated_count = 0
         total_depreciation = Decimal('0')
@@ -111,6 +119,92 @@ class LiabilityService:
             'date': today.isoformat()
         }
     
+    @staticmethod
+    def apply_monthly_depreciation_bulk(player_id: Optional[uuid.UUID] = None, partition=None,
+                                        chunk_size: Optional[int] = None) -> Dict:
+        """
+        Set-based version of apply_monthly_depreciation.
+        Applies the year-1 / year-2+ rates and the 5% floor in SQL, one UPDATE
+        per chunk of chunk_size liabilities (walked by id range), committing
+        each chunk. No rows are loaded into the session.
+        Idempotent per month: liabilities whose last_depreciation_date is
+        already in the current month are left alone, so a re-run (or a resumed
+        job) never depreciates twice.
+        Returns the same updated_count / total_depreciation summary.
+        """
+        chunk_size = chunk_size or LiabilityService.BULK_DEPRECIATION_CHUNK_SIZE
+        today = date.today()
+        month_start = today.replace(day=1)
+        
+        # Same arithmetic as calculate_depreciation, as SQL expressions
+        current_value = func.coalesce(PlayerLiability.current_value, PlayerLiability.purchase_price)
+        minimum_value = PlayerLiability.purchase_price * literal(LiabilityService.MINIMUM_VALUE_PERCENTAGE, Numeric(6, 4))
+        rate = case(
+            (func.coalesce(PlayerLiability.months_owned, 0) < 12,
+             literal(LiabilityService.YEAR_1_MONTHLY_RATE, Numeric(6, 4))),
+            else_=literal(LiabilityService.YEAR_2_PLUS_MONTHLY_RATE, Numeric(6, 4))
+        )
+        depreciated = current_value - current_value * rate
+        new_value = case((depreciated < minimum_value, minimum_value), else_=depreciated)
+        
+        def due(query):
+            query = query.filter(
+                PlayerLiability.is_active.is_(True),
+                current_value > minimum_value,
+                or_(PlayerLiability.last_depreciation_date.is_(None),
+                    PlayerLiability.last_depreciation_date < month_start)
+            )
+            if player_id:
+                query = query.filter(PlayerLiability.player_id == player_id)
+            if partition is not None:
+                query = partition.apply(query, PlayerLiability.player_id)
+            return query
+        
+        updated_count = 0
+        total_depreciation = Decimal('0')
+        last_id = None
+        
+        while True:
+            # Upper bound of the next chunk = the chunk_size-th due id after last_id
+            bounds = due(db.session.query(PlayerLiability.id))
+            if last_id is not None:
+                bounds = bounds.filter(PlayerLiability.id > last_id)
+            upper_id = bounds.order_by(PlayerLiability.id).offset(chunk_size - 1).limit(1).scalar()
+            
+            def in_chunk(query):
+                query = due(query)
+                if last_id is not None:
+                    query = query.filter(PlayerLiability.id > last_id)
+                if upper_id is not None:
+                    query = query.filter(PlayerLiability.id <= upper_id)
+                return query
+            
+            count, amount = in_chunk(
+                db.session.query(func.count(PlayerLiability.id), func.sum(current_value - new_value))
+            ).one()
+            
+            if count:
+                # SET expressions read the pre-update row, like the Python loop did
+                in_chunk(PlayerLiability.query).update({
+                    PlayerLiability.current_value: new_value,
+                    PlayerLiability.months_owned: func.coalesce(PlayerLiability.months_owned, 0) + 1,
+                    PlayerLiability.last_depreciation_date: today
+                }, synchronize_session=False)
+                db.session.commit()
+                
+                updated_count += count
+                total_depreciation += Decimal(str(amount or 0))
+            
+            if upper_id is None:
+                break
+            last_id = upper_id
+        
+        return {
+            'updated_count': updated_count,
+            'total_depreciation': float(total_depreciation),
+            'date': today.isoformat()
+        }
+    
     @staticmethod
     def sell_liability(player_liability_id: uuid.UUID, player_id: uuid.UUID) -> Dict:
         """
@@ -6,13 +6,38 @@ from app.models.profile import Profile
 from app.models.user_asset import UserAsset
 from app.models.liability import Liability
 from app.models.user_balance import UserBalance
-from typing import Dict, List, Optional
+from sqlalchemy import func
+from typing import Dict, List, Optional, Tuple
 import uuid
 from datetime import datetime, timedelta
 
+
+class MentorTemplates:
+    """Mentors and active message templates, loaded once for a batch run"""
+
+    def __init__(self):
+        self.mentors_by_role = {}
+        for mentor in Mentor.query.order_by(Mentor.created_at).all():
+            self.mentors_by_role.setdefault(mentor.role, mentor)
+
+        self.messages = {}
+        for message in MentorMessage.query.filter_by(is_active=True).order_by(MentorMessage.created_at).all():
+            self.messages.setdefault((message.mentor_id, message.trigger_type), message)
+
+    def lookup(self, mentor_role: str, trigger_type: str) -> Tuple[Optional[Mentor], Optional[MentorMessage]]:
+        """Mentor for a role and its template for a trigger (either may be None)"""
+        mentor = self.mentors_by_role.get(mentor_role)
+        if not mentor:
+            return None, None
+        return mentor, self.messages.get((mentor.id, trigger_type))
+
+
 class MentorService:
     """Service for analyzing player financial data and generating mentor advice"""
 
+    # Players analyzed per grouped-aggregate round in analyze_players_batch
+    BATCH_CHUNK_SIZE = 500
+
     @staticmethod
     def analyze_player_finances(player_id: uuid.UUID) -> Dict:
         """Analyze player's financial situation and return metrics"""
@@ -27,7 +52,12 @@ class MentorService:
 
         # Get assets
         assets = UserAsset.query.filter_by(user_id=player_id).all()
-        total_assets = sum([float(asset.value) for asset in assets])
+        
+        # Asset diversification
+        asset_types = {}
+        for asset in assets:
+            asset_type = asset.asset_type
+            asset_types[asset_type] = asset_types.get(asset_type, 0) + float(asset.value)
         
         # Get liabilities
         liabilities = Liability.query.filter_by(user_id=player_id).all()
@@ -37,16 +67,159 @@ class MentorService:
         # Get balance
         balance = UserBalance.query.filter_by(user_id=player_id).first()
         cash = float(balance.current_balance) if balance else 0
+        
+        # Current jobs (income stagnation + work hours)
+        current_jobs = Job.query.filter_by(user_id=player_id, is_current=True).all()
+        oldest_job_start = min(job.start_date for job in current_jobs) if current_jobs else None
+        work_hours_per_week = max([job.work_hours_per_week or 40 for job in current_jobs]) if current_jobs else 0
+        
+        # Transactions in last 30 days
+        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+        recent_expenses = Transaction.query.filter(
+            Transaction.user_id == player_id,
+            Transaction.type == 'expense',
+            Transaction.transaction_date >= thirty_days_ago
+        ).all()
+        recent_income = Transaction.query.filter(
+            Transaction.user_id == player_id,
+            Transaction.type == 'income',
+            Transaction.transaction_date >= thirty_days_ago
+        ).all()
+        
+        return MentorService._build_metrics(
+            profile=profile,
+            cash=cash,
+            asset_types=asset_types,
+            total_purchase_price=sum([float(asset.purchase_price or 0) for asset in assets]),
+            asset_count=len(assets),
+            first_asset_date=min([asset.purchase_date for asset in assets]) if assets else None,
+            total_liabilities=total_liabilities,
+            total_monthly_debt=total_monthly_debt,
+            oldest_job_start=oldest_job_start,
+            work_hours_per_week=work_hours_per_week,
+            total_expenses=sum([float(t.amount) for t in recent_expenses]),
+            total_income_actual=sum([float(t.amount) for t in recent_income])
+        )
+
+    @staticmethod
+    def analyze_players_batch(player_ids: List[uuid.UUID]) -> Dict[uuid.UUID, Dict]:
+        """
+        Analyze many players at once with grouped aggregate queries
+        
+        Produces the same metrics dict as analyze_player_finances for every
+        player with a profile, but with six queries per BATCH_CHUNK_SIZE
+        players instead of ~8 per player.
+        
+        Returns:
+            Dict of player_id -> metrics (players without a profile are omitted)
+        """
+        from app.models.transaction import Transaction
+        from app.models.job import Job
+        
+        results = {}
+        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+        
+        for i in range(0, len(player_ids), MentorService.BATCH_CHUNK_SIZE):
+            chunk = player_ids[i:i + MentorService.BATCH_CHUNK_SIZE]
+            
+            profiles = Profile.query.filter(Profile.user_id.in_(chunk)).all()
+            if not profiles:
+                continue
+            
+            # Assets per (player, type)
+            asset_stats = {}
+            asset_rows = db.session.query(
+                UserAsset.user_id,
+                UserAsset.asset_type,
+                func.sum(UserAsset.value),
+                func.sum(func.coalesce(UserAsset.purchase_price, 0)),
+                func.count(UserAsset.id),
+                func.min(UserAsset.purchase_date)
+            ).filter(UserAsset.user_id.in_(chunk)).group_by(UserAsset.user_id, UserAsset.asset_type).all()
+            for user_id, asset_type, value, purchase_total, count, first_date in asset_rows:
+                stats = asset_stats.setdefault(user_id, {'types': {}, 'purchase': 0.0, 'count': 0, 'first': None})
+                stats['types'][asset_type] = float(value or 0)
+                stats['purchase'] += float(purchase_total or 0)
+                stats['count'] += count
+                if first_date and (stats['first'] is None or first_date < stats['first']):
+                    stats['first'] = first_date
+            
+            # Liabilities per player
+            liability_stats = {
+                user_id: (float(amount or 0), float(monthly or 0))
+                for user_id, amount, monthly in db.session.query(
+                    Liability.user_id,
+                    func.sum(Liability.amount),
+                    func.sum(Liability.monthly_payment)
+                ).filter(Liability.user_id.in_(chunk)).group_by(Liability.user_id).all()
+            }
+            
+            # Cash balances
+            balances = {
+                user_id: float(balance)
+                for user_id, balance in db.session.query(
+                    UserBalance.user_id, UserBalance.current_balance
+                ).filter(UserBalance.user_id.in_(chunk)).all()
+            }
+            
+            # Current jobs per player
+            job_stats = {
+                user_id: (oldest_start, hours)
+                for user_id, oldest_start, hours in db.session.query(
+                    Job.user_id,
+                    func.min(Job.start_date),
+                    func.max(func.coalesce(Job.work_hours_per_week, 40))
+                ).filter(Job.user_id.in_(chunk), Job.is_current.is_(True)).group_by(Job.user_id).all()
+            }
+            
+            # Income / expense totals over the last 30 days
+            flows = {}
+            for user_id, tx_type, total in db.session.query(
+                Transaction.user_id,
+                Transaction.type,
+                func.sum(Transaction.amount)
+            ).filter(
+                Transaction.user_id.in_(chunk),
+                Transaction.type.in_(['expense', 'income']),
+                Transaction.transaction_date >= thirty_days_ago
+            ).group_by(Transaction.user_id, Transaction.type).all():
+                flows[(user_id, tx_type)] = float(total or 0)
+            
+            for profile in profiles:
+                user_id = profile.user_id
+                assets = asset_stats.get(user_id, {'types': {}, 'purchase': 0.0, 'count': 0, 'first': None})
+                total_liabilities, total_monthly_debt = liability_stats.get(user_id, (0, 0))
+                oldest_job_start, work_hours = job_stats.get(user_id, (None, 0))
+                
+                results[user_id] = MentorService._build_metrics(
+                    profile=profile,
+                    cash=balances.get(user_id, 0),
+                    asset_types=assets['types'],
+                    total_purchase_price=assets['purchase'],
+                    asset_count=assets['count'],
+                    first_asset_date=assets['first'],
+                    total_liabilities=total_liabilities,
+                    total_monthly_debt=total_monthly_debt,
+                    oldest_job_start=oldest_job_start,
+                    work_hours_per_week=work_hours,
+                    total_expenses=flows.get((user_id, 'expense'), 0),
+                    total_income_actual=flows.get((user_id, 'income'), 0)
+                )
+        
+        return results
+
+    @staticmethod
+    def _build_metrics(profile: Profile, cash: float, asset_types: Dict[str, float],
+                       total_purchase_price: float, asset_count: int, first_asset_date,
+                       total_liabilities: float, total_monthly_debt: float,
+                       oldest_job_start, work_hours_per_week: int,
+                       total_expenses: float, total_income_actual: float) -> Dict:
+        """Turn a player's raw aggregates into the metrics dict used by check_triggers"""
+        total_assets = sum(asset_types.values())
 
         # Calculate metrics
         net_worth = float(profile.net_worth) if profile.net_worth else 0
         monthly_income = float(profile.monthly_income) if profile.monthly_income else 0
-        
-        # Asset diversification
-        asset_types = {}
-        for asset in assets:
-            asset_type = asset.asset_type
-            asset_types[asset_type] = asset_types.get(asset_type, 0) + float(asset.value)
 
         max_concentration = max(asset_types.values()) / total_assets if total_assets > 0 else 0
 
@@ -57,7 +230,6 @@ class MentorService:
         # === NEW METRICS USING EXISTING DATA ===
         
         # 1. Asset growth (compare purchase price vs current value)
-        total_purchase_price = sum([float(asset.purchase_price or 0) for asset in assets])
         asset_growth_percentage = ((total_assets - total_purchase_price) / total_purchase_price) if total_purchase_price > 0 else 0
         
         # 2. Passive income (from assets with monthly_income)
@@ -66,36 +238,19 @@ class MentorService:
         passive_income_ratio = passive_income / monthly_income if monthly_income > 0 else 0
         
         # 3. First asset check
-        asset_count = len(assets)
-        first_asset_date = min([asset.purchase_date for asset in assets]) if assets else None
         is_first_asset = asset_count == 1 if first_asset_date else False
         
-        # 4. Income stagnation (check job history)
-        current_jobs = Job.query.filter_by(user_id=player_id, is_current=True).all()
+        # 4. Income stagnation (oldest current job)
         income_stagnant_months = 0
-        if current_jobs:
-            oldest_job = min(current_jobs, key=lambda j: j.start_date)
-            months_in_job = (datetime.utcnow() - oldest_job.start_date).days / 30
+        if oldest_job_start:
+            months_in_job = (datetime.utcnow() - oldest_job_start).days / 30
             # If same job for 6+ months with no salary change, it's stagnant
             income_stagnant_months = int(months_in_job) if months_in_job >= 6 else 0
         
         # 5. Expense ratio (from transactions in last 30 days)
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_expenses = Transaction.query.filter(
-            Transaction.user_id == player_id,
-            Transaction.type == 'expense',
-            Transaction.transaction_date >= thirty_days_ago
-        ).all()
-        total_expenses = sum([float(t.amount) for t in recent_expenses])
         expense_ratio = total_expenses / monthly_income if monthly_income > 0 else 0
         
         # 6. Cash flow (income - expenses)
-        recent_income = Transaction.query.filter(
-            Transaction.user_id == player_id,
-            Transaction.type == 'income',
-            Transaction.transaction_date >= thirty_days_ago
-        ).all()
-        total_income_actual = sum([float(t.amount) for t in recent_income])
         cash_flow = total_income_actual - total_expenses
         
         # 7. Inactivity (days since last update)
@@ -116,11 +271,6 @@ class MentorService:
         # 11. Engagement days (from profile)
         engagement_days = profile.engagement_days if profile else 0
         
-        # 12. Work hours (from current job)
-        work_hours_per_week = 0
-        if current_jobs:
-            work_hours_per_week = max([job.work_hours_per_week or 40 for job in current_jobs])
-        
         return {
             'net_worth': net_worth,
             'total_assets': total_assets,
@@ -408,22 +558,30 @@ class MentorService:
         return triggers
 
     @staticmethod
-    def generate_personalized_message(player_id: uuid.UUID, trigger: Dict, username: str) -> Optional[Dict]:
-        """Generate a personalized mentor message"""
-        
-        # Get mentor by role
-        mentor = Mentor.query.filter_by(role=trigger['mentor_role']).first()
-        if not mentor:
-            return None
-
-        # Get message template
-        message_template = MentorMessage.query.filter_by(
-            mentor_id=mentor.id,
-            trigger_type=trigger['type'],
-            is_active=True
-        ).first()
-
-        if not message_template:
+    def generate_personalized_message(player_id: uuid.UUID, trigger: Dict, username: str,
+                                      templates: Optional[MentorTemplates] = None) -> Optional[Dict]:
+        """
+        Generate a personalized mentor message
+        
+        Pass preloaded `templates` (batch jobs) to skip the mentor and
+        template queries.
+        """
+        
+        if templates is not None:
+            mentor, message_template = templates.lookup(trigger['mentor_role'], trigger['type'])
+        else:
+            # Get mentor by role
+            mentor = Mentor.query.filter_by(role=trigger['mentor_role']).first()
+            message_template = None
+            if mentor:
+                # Get message template
+                message_template = MentorMessage.query.filter_by(
+                    mentor_id=mentor.id,
+                    trigger_type=trigger['type'],
+                    is_active=True
+                ).first()
+
+        if not mentor or not message_template:
             return None
 
         # Personalize message
@@ -458,6 +616,34 @@ class MentorService:
         
         return interaction
 
+    @staticmethod
+    def send_mentor_messages_bulk(messages: List[Tuple[uuid.UUID, Dict, Dict]]) -> int:
+        """
+        Save many mentor interactions with a single commit
+        
+        Args:
+            messages: (player_id, mentor_data, metrics) tuples
+            
+        Returns:
+            Number of interactions inserted
+        """
+        if not messages:
+            return 0
+        
+        db.session.add_all([
+            PlayerMentorInteraction(
+                player_id=player_id,
+                mentor_id=mentor_data['mentor'].id,
+                message_id=mentor_data['message_template'].id,
+                message_content=mentor_data['personalized_message'],
+                trigger_type=mentor_data['message_template'].trigger_type,
+                player_data_snapshot=metrics
+            )
+            for player_id, mentor_data, metrics in messages
+        ])
+        db.session.commit()
+        return len(messages)
+
     @staticmethod
     def mark_advice_followed(interaction_id: uuid.UUID, points: int = 10):
         """Mark that player followed mentor advice and award points"""
@@ -0,0 +1,274 @@
+"""
+Notification digests and unread counters
+========================================
+
+🎓 LEARNING: Every follow, message, purchase, sale and mission step used to
+insert its own notifications row and fire its own push. Busy players piled
+up thousands of rows, and /api/notifications/unread counted them all with
+count='exact' on every poll.
+
+notify() goes through the `notify` Postgres function
+(supabase/migrations/20261017060000_notification_digest.sql):
+
+    follow #1  -> new row "Someone started following you!"       + push
+    follow #2  -> same row, group_count=2, "2 new followers"     (no push)
+    ...
+    read it, or wait NOTIFICATION_COLLAPSE_WINDOW -> the next follow starts a new row
+
+Events only collapse into an *unread* row with the same collapse_key, so a
+player who has seen the digest gets a fresh notification (and push) next time.
+
+UNREAD COUNTS:
+Triggers keep notification_counters.unread_count in step with every insert,
+read flip and delete (including the app marking rows read client-side), so
+unread_count() is a primary key lookup.
+
+ARCHIVING:
+archive_read() moves read notifications older than NOTIFICATION_ARCHIVE_DAYS
+into notifications_archive in chunks; jobs/archive_notifications.py runs it
+per user_id partition.
+
+PAGING AND SYNC:
+Lists are ordered by (updated_at, id), so a digest that just grew moves back
+to the top. Every response carries a high_water_mark - the newest
+(updated_at, id) the client has now seen:
+
+    GET /api/notifications/?cursor=<next_cursor>      older rows, newest first
+    GET /api/notifications/?since=<high_water_mark>   only rows created or
+                                                      updated since, oldest first
+    PUT /api/notifications/read-all {"up_to": <high_water_mark>}
+                                                      marks read only what the
+                                                      client has actually shown
+
+Marking a row read doesn't touch updated_at, so it never reorders the list.
+"""
+
+import base64
+import json
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from flask import current_app, has_app_context
+
+from app import db
+from app.models.notification import Notification
+from app.models.notification_archive import NotificationArchive
+from app.services.push_notification_service import ExpoPushService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COLLAPSE_WINDOW = 3600  # seconds
+ARCHIVE_CHUNK_SIZE = 1000
+
+LIST_COLUMNS = 'id, user_id, type, title, message, asset_id, related_user_id, read, group_count, created_at, updated_at'
+
+ARCHIVE_COLUMNS = (
+    'id', 'user_id', 'type', 'title', 'message', 'asset_id', 'related_user_id',
+    'read', 'collapse_key', 'group_count', 'created_at', 'updated_at'
+)
+
+
+def _collapse_window() -> int:
+    if has_app_context():
+        return current_app.config.get('NOTIFICATION_COLLAPSE_WINDOW', DEFAULT_COLLAPSE_WINDOW)
+    return DEFAULT_COLLAPSE_WINDOW
+
+
+def encode_notification_cursor(row: Dict[str, Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps([row['updated_at'], row['id']]).encode()).decode()
+
+
+def decode_notification_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Inverse of encode_notification_cursor; raises ValueError on garbage
+
+    Both values end up inside a PostgREST or_ filter, so they are parsed and
+    re-rendered rather than passed through as the client sent them.
+    """
+    try:
+        updated_at, notification_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(updated_at).isoformat(), str(uuid.UUID(notification_id))
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+def _before(cursor: str, inclusive: bool = False) -> str:
+    """PostgREST or_ filter for (updated_at, id) < cursor (<= if inclusive)"""
+    updated_at, notification_id = decode_notification_cursor(cursor)
+    op = 'lte' if inclusive else 'lt'
+    return f'updated_at.lt."{updated_at}",and(updated_at.eq."{updated_at}",id.{op}.{notification_id})'
+
+
+def _after(cursor: str) -> str:
+    """PostgREST or_ filter for (updated_at, id) > cursor"""
+    updated_at, notification_id = decode_notification_cursor(cursor)
+    return f'updated_at.gt."{updated_at}",and(updated_at.eq."{updated_at}",id.gt.{notification_id})'
+
+
+class NotificationService:
+    @staticmethod
+    def notify(supabase, user_id: str, type: str, title: str, message: str,
+               collapse_key: Optional[str] = None,
+               digest_title: Optional[str] = None,
+               digest_message: Optional[str] = None,
+               related_user_id: Optional[str] = None,
+               asset_id: Optional[str] = None,
+               push: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Record a notification, merging it into an unread digest when possible
+
+        Args:
+            collapse_key: Events with the same key merge while unread
+                          (e.g. 'follow', 'asset_trade'); None never merges
+            digest_title / digest_message: Text once merged; '{count}' is
+                          replaced with the number of events
+            push: kwargs for ExpoPushService.send_notification_to_user
+                  (title, body, notification_type, data); only sent when a
+                  new row is created, so a digest costs one push
+
+        Returns:
+            {'notification_id', 'collapsed', 'group_count'}
+        """
+        response = supabase.rpc('notify', {
+            'p_user_id': str(user_id),
+            'p_type': type,
+            'p_title': title,
+            'p_message': message,
+            'p_collapse_key': collapse_key,
+            'p_window_seconds': _collapse_window(),
+            'p_digest_title': digest_title,
+            'p_digest_message': digest_message,
+            'p_related_user_id': str(related_user_id) if related_user_id else None,
+            'p_asset_id': str(asset_id) if asset_id else None
+        }).execute()
+
+        result = response.data or {}
+        if not result.get('success'):
+            raise Exception(f"Notification rejected: {result.get('error', 'UNKNOWN_ERROR')}")
+
+        if push and not result.get('collapsed'):
+            try:
+                ExpoPushService.send_notification_to_user(supabase_client=supabase, user_id=str(user_id), **push)
+            except Exception as e:
+                # Log error but don't fail the request
+                logger.error(f"Failed to send push notification: {str(e)}")
+
+        return {
+            'notification_id': result.get('notification_id'),
+            'collapsed': bool(result.get('collapsed')),
+            'group_count': result.get('group_count', 1)
+        }
+
+    @staticmethod
+    def unread_count(supabase, user_id: str) -> int:
+        """Maintained unread count (0 for users who never had a notification)"""
+        response = supabase.table('notification_counters')\
+            .select('unread_count')\
+            .eq('user_id', str(user_id))\
+            .maybe_single()\
+            .execute()
+        return (response.data or {}).get('unread_count', 0) if response else 0
+
+    @staticmethod
+    def list_page(supabase, user_id: str, cursor: Optional[str] = None, since: Optional[str] = None,
+                  limit: int = 20) -> Dict[str, Any]:
+        """
+        One page of notifications
+
+        Without `since`: newest first, continuing after `cursor`.
+        With `since` (a previous high_water_mark): only rows created or
+        updated after it, oldest first, so paging through the delta moves
+        the mark forward.
+
+        Returns:
+            {'data': [...], 'next_cursor': str | None,
+             'high_water_mark': str | None, 'has_more': bool}
+        """
+        query = supabase.table('notifications').select(LIST_COLUMNS).eq('user_id', str(user_id))
+        if since:
+            query = query.or_(_after(since)).order('updated_at').order('id')
+        else:
+            if cursor:
+                query = query.or_(_before(cursor))
+            query = query.order('updated_at', desc=True).order('id', desc=True)
+        # One extra row tells us whether there is a next page
+        rows = query.limit(limit + 1).execute().data or []
+
+        page = rows[:limit]
+        has_more = len(rows) > limit
+
+        if since:
+            high_water_mark = encode_notification_cursor(page[-1]) if page else since
+            next_cursor = None
+        else:
+            # Only the first page starts at the newest row; deeper pages keep
+            # whatever mark the client already has
+            high_water_mark = encode_notification_cursor(page[0]) if page and not cursor else None
+            next_cursor = encode_notification_cursor(page[-1]) if has_more else None
+
+        return {
+            'data': page,
+            'next_cursor': next_cursor,
+            'high_water_mark': high_water_mark,
+            'has_more': has_more
+        }
+
+    @staticmethod
+    def mark_read(supabase, user_id: str, up_to: Optional[str] = None) -> int:
+        """
+        Mark unread notifications read, optionally only up to a high_water_mark
+
+        Returns:
+            Number of notifications marked read
+        """
+        query = supabase.table('notifications')\
+            .update({'read': True}, count='exact', returning='minimal')\
+            .eq('user_id', str(user_id))\
+            .eq('read', False)
+        if up_to:
+            query = query.or_(_before(up_to, inclusive=True))
+        return query.execute().count or 0
+
+    @staticmethod
+    def archive_read(older_than_days: int = 30, partition=None,
+                     chunk_size: int = ARCHIVE_CHUNK_SIZE) -> int:
+        """
+        Move read notifications older than the cutoff to notifications_archive
+
+        Each chunk is one INSERT ... SELECT plus one DELETE by id, committed
+        together, so an interrupted run never loses or duplicates a row.
+
+        Returns:
+            Number of notifications archived
+        """
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        columns = [getattr(Notification, c) for c in ARCHIVE_COLUMNS]
+        archived = 0
+
+        while True:
+            query = db.session.query(Notification.id).filter(
+                Notification.read.is_(True),
+                Notification.created_at < cutoff
+            )
+            if partition is not None:
+                query = partition.apply(query, Notification.user_id)
+            ids = [row.id for row in query.order_by(Notification.id).limit(chunk_size)]
+            if not ids:
+                break
+
+            db.session.execute(
+                NotificationArchive.__table__.insert().from_select(
+                    list(ARCHIVE_COLUMNS),
+                    db.session.query(*columns).filter(Notification.id.in_(ids))
+                )
+            )
+            db.session.query(Notification).filter(Notification.id.in_(ids)).delete(synchronize_session=False)
+            db.session.commit()
+            archived += len(ids)
+
+            if len(ids) < chunk_size:
+                break
+
+        return archived
@@ -1,5 +1,7 @@
 from app import db
 from app.models.profile import Profile
+from app.services.leaderboard_service import LeaderboardService
+from app.services.user_search_service import UserSearchService
 from sqlalchemy.exc import IntegrityError
 from typing import Optional
 import uuid
@@ -20,6 +22,8 @@ class ProfileService:
             )
             db.session.add(profile)
             db.session.commit()
+            LeaderboardService.record_player(profile)
+            UserSearchService.record_profile(profile)
             return profile
         except IntegrityError:
             db.session.rollback()
@@ -37,6 +41,9 @@ class ProfileService:
                 setattr(profile, key, value)
 
         db.session.commit()
+        LeaderboardService.record_player(profile)
+        if 'username' in kwargs or 'profile_picture_url' in kwargs:
+            UserSearchService.record_profile(profile)
         return profile
 
     @staticmethod
@@ -46,6 +53,7 @@ class ProfileService:
         if profile:
             profile.net_worth = net_worth
             db.session.commit()
+            LeaderboardService.record_player(profile)
         return profile
 
     @staticmethod
@@ -55,4 +63,5 @@ class ProfileService:
         if profile:
             profile.credit_score = max(300, min(850, credit_score))  # Clamp between 300-850
             db.session.commit()
+            LeaderboardService.record_player(profile)
         return profile
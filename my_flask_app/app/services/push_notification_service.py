@@ -3,20 +3,345 @@ Push Notification Service for Expo Push Notifications
 
 This service handles sending push notifications to mobile devices via the Expo Push API.
 It supports single and batch notification sending with proper error handling.
+
+Pushes sent from request handlers go through an in-process delivery queue:
+the route only enqueues, and a worker thread coalesces pending messages into
+MAX_BATCH_SIZE batches over a pooled keep-alive session, retrying transient
+failures with backoff. Call ExpoPushService.flush() before the process (or a
+Lambda invocation) ends so nothing is left behind.
+
+Without the queue (Lambda, tests) pushes made during a request are held
+until the response is ready and delivered together, so a handler that
+notifies several users still costs one token lookup and one Expo request.
 """
+import atexit
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
 import requests
-from typing import List, Dict, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from typing import Any, Callable, List, Dict, Optional, Tuple
 import logging
 from datetime import datetime
+from flask import g, has_request_context
 
 logger = logging.getLogger(__name__)
 
 
+class PushDeliveryQueue:
+    """
+    Background queue that batches push messages for delivery
+
+    Jobs are dicts with a ready Expo `message` and, until resolved, the
+    `user_id` and `supabase_client` used to look up the push token. The
+    worker thread is started lazily (and restarted after a fork, since
+    gunicorn workers don't inherit threads).
+    """
+
+    def __init__(self, deliver: Callable[[List[Dict[str, Any]]], None],
+                 max_batch_size: int, flush_interval: float = 0.2):
+        self._deliver = deliver
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.enabled = True
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def enqueue(self, job: Dict[str, Any]) -> None:
+        """Hand a job to the worker thread"""
+        self._ensure_worker()
+        self._queue.put(job)
+
+    def pending(self) -> int:
+        """Jobs queued or currently being delivered"""
+        return self._queue.unfinished_tasks
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every queued job has been delivered (or dropped)
+
+        Returns:
+            True if the queue drained, False if the timeout expired first
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='expo-push-delivery', daemon=True)
+            self._thread.start()
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        """Wait for one job, then coalesce whatever arrives within flush_interval"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            try:
+                self._deliver(batch)
+            except Exception as e:
+                logger.error(f"Push delivery batch failed: {str(e)}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+class PushTokenResolver:
+    """
+    Cached user_id -> push_token lookups with bulk resolution
+
+    Tokens change only through /register-token, /update-token and
+    /unregister-token, which call set() - but only on the worker that served
+    them. Every other worker keeps its copy until it expires, so `ttl`
+    (PUSH_TOKEN_CACHE_TTL) is kept short: it bounds how long a logged-out
+    device can still receive a user's pushes. Only real tokens are cached;
+    users without one are looked up again on every push, so a freshly
+    registered device starts receiving pushes right away.
+    """
+
+    # Max ids per profiles `in` filter (keeps the PostgREST URL short)
+    LOOKUP_CHUNK_SIZE = 200
+
+    def __init__(self, ttl: float = 30, max_size: int = 50000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, Optional[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get_cached(self, user_id: str) -> Tuple[bool, Optional[str]]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] <= time.monotonic():
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return True, entry[1]
+
+    def set(self, user_id: str, push_token: Optional[str]) -> None:
+        """Record a user's current token (None = no token registered)"""
+        if not push_token or self.ttl <= 0:
+            self.invalidate(user_id)
+            return
+        with self._lock:
+            self._entries[str(user_id)] = (time.monotonic() + self.ttl, push_token)
+            self._entries.move_to_end(str(user_id))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """Forget one user's token, or every token if user_id is None"""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(str(user_id), None)
+
+    def resolve(self, supabase_client, user_id: str) -> Optional[str]:
+        """Push token for one user (cached)"""
+        return self.resolve_many(supabase_client, [user_id]).get(str(user_id))
+
+    def resolve_many(self, supabase_client, user_ids: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Push tokens for many users, querying only the cache misses
+
+        Misses are fetched with one `profiles.user_id in (...)` query per
+        LOOKUP_CHUNK_SIZE ids. Users without a profile or token map to None
+        and stay misses.
+
+        Returns:
+            Dict of user_id -> push_token (or None)
+        """
+        resolved: Dict[str, Optional[str]] = {}
+        missing: List[str] = []
+        for user_id in dict.fromkeys(str(u) for u in user_ids):
+            found, token = self._get_cached(user_id)
+            if found:
+                resolved[user_id] = token
+            else:
+                missing.append(user_id)
+
+        for i in range(0, len(missing), self.LOOKUP_CHUNK_SIZE):
+            chunk = missing[i:i + self.LOOKUP_CHUNK_SIZE]
+            result = supabase_client.table('profiles').select('user_id, push_token').in_('user_id', chunk).execute()
+            tokens = {str(row['user_id']): row.get('push_token') for row in (result.data or [])}
+            for user_id in chunk:
+                token = tokens.get(user_id)
+                if user_id not in tokens:
+                    logger.warning(f"No profile found for user_id: {user_id}")
+                elif not token:
+                    logger.info(f"User {user_id} has no push token registered")
+                self.set(user_id, token)
+                resolved[user_id] = token
+
+        return resolved
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+
 class ExpoPushService:
     """Service for sending push notifications via Expo Push Notification Service"""
     
     EXPO_PUSH_URL = "https://exp.host/--/api/v2/push/send"
     MAX_BATCH_SIZE = 100  # Expo's recommended batch size
+    MAX_RETRIES = 3  # Retries for timeouts, connection errors, 429 and 5xx
+    RETRY_BACKOFF_SECONDS = 0.5  # Doubles on each retry
+    REQUEST_HEADERS = {
+        "Accept": "application/json",
+        "Accept-Encoding": "gzip, deflate",
+        "Content-Type": "application/json"
+    }
+    
+    _session: Optional[requests.Session] = None
+    _session_lock = threading.Lock()
+    _queue: Optional[PushDeliveryQueue] = None
+    token_resolver = PushTokenResolver()
+    
+    @classmethod
+    def get_session(cls) -> requests.Session:
+        """Shared keep-alive session so pushes reuse TLS connections to Expo"""
+        if cls._session is None:
+            with cls._session_lock:
+                if cls._session is None:
+                    session = requests.Session()
+                    session.headers.update(cls.REQUEST_HEADERS)
+                    session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=10))
+                    cls._session = session
+        return cls._session
+    
+    @classmethod
+    def get_queue(cls) -> PushDeliveryQueue:
+        """Per-process delivery queue"""
+        if cls._queue is None:
+            with cls._session_lock:
+                if cls._queue is None:
+                    cls._queue = PushDeliveryQueue(cls._deliver_queued, cls.MAX_BATCH_SIZE)
+        return cls._queue
+    
+    @classmethod
+    def init_app(cls, app) -> None:
+        """Apply the push config and deliver each request's held pushes"""
+        cls.get_queue().enabled = app.config.get('PUSH_QUEUE_ENABLED', True)
+        cls.token_resolver.ttl = app.config.get('PUSH_TOKEN_CACHE_TTL', 30)
+
+        @app.after_request
+        def deliver_request_pushes(response):
+            jobs = g.pop('_request_pushes', None)
+            if jobs:
+                try:
+                    cls._deliver_queued(jobs)
+                except Exception as e:
+                    logger.error(f"Request push batch failed: {str(e)}")
+            return response
+    
+    @classmethod
+    def flush(cls, timeout: Optional[float] = 10) -> bool:
+        """
+        Wait for queued pushes to be delivered
+        
+        Call on worker shutdown and at the end of each Lambda invocation
+        (Lambda freezes background threads once the response is returned).
+        
+        Returns:
+            True if nothing is left pending
+        """
+        if cls._queue is None:
+            return True
+        return cls._queue.flush(timeout)
+    
+    @classmethod
+    def _post_messages(cls, messages: List[Dict], timeout: int = 10) -> List[Dict]:
+        """
+        POST a batch to Expo, retrying transient failures with backoff
+        
+        Returns:
+            The list of push tickets from Expo (one per message)
+            
+        Raises:
+            requests.exceptions.RequestException: If every attempt failed
+        """
+        attempt = 0
+        while True:
+            try:
+                response = cls.get_session().post(cls.EXPO_PUSH_URL, json=messages, timeout=timeout)
+                if response.status_code == 429 or response.status_code >= 500:
+                    raise requests.exceptions.HTTPError(
+                        f"Expo returned {response.status_code}", response=response
+                    )
+                response.raise_for_status()
+                return response.json().get('data') or []
+            except (requests.exceptions.Timeout,
+                    requests.exceptions.ConnectionError,
+                    requests.exceptions.HTTPError) as e:
+                status = getattr(getattr(e, 'response', None), 'status_code', None)
+                retryable = status is None or status == 429 or status >= 500
+                if not retryable or attempt >= cls.MAX_RETRIES:
+                    raise
+                delay = cls.RETRY_BACKOFF_SECONDS * (2 ** attempt)
+                logger.warning(f"Push request failed ({str(e)}), retrying in {delay}s")
+                time.sleep(delay)
+                attempt += 1
+    
+    @classmethod
+    def _deliver_queued(cls, jobs: List[Dict[str, Any]]) -> None:
+        """Worker-side delivery: resolve tokens in bulk, then send one batched request"""
+        tokens: Dict[str, Optional[str]] = {}
+        by_client: Dict[int, Tuple[Any, List[str]]] = {}
+        for job in jobs:
+            if not job['message'].get('to'):
+                client = job['supabase_client']
+                by_client.setdefault(id(client), (client, []))[1].append(job['user_id'])
+        for client, user_ids in by_client.values():
+            tokens.update(cls.token_resolver.resolve_many(client, user_ids))
+        
+        messages = []
+        for job in jobs:
+            push_token = job['message'].get('to') or tokens.get(str(job['user_id']))
+            if not cls.validate_push_token(push_token):
+                continue
+            messages.append(dict(job['message'], to=push_token))
+        
+        if not messages:
+            return
+        
+        try:
+            tickets = cls._post_messages(messages)
+        except Exception as e:
+            logger.error(f"Queued push batch of {len(messages)} failed: {str(e)}")
+            return
+        
+        failed = [t for t in tickets if t.get('status') != 'ok']
+        for ticket in failed:
+            logger.warning(f"Queued notification failed: {ticket.get('message')}")
+        logger.info(f"Queued pushes delivered: {len(tickets) - len(failed)} success, {len(failed)} failed")
     
     @staticmethod
     def validate_push_token(token: str) -> bool:
@@ -82,22 +407,11 @@ class ExpoPushService:
         }
         
         try:
-            response = requests.post(
-                cls.EXPO_PUSH_URL,
-                json=[message],
-                headers={
-                    "Accept": "application/json",
-                    "Content-Type": "application/json"
-                },
-                timeout=10
-            )
-            
-            response.raise_for_status()
-            result = response.json()
+            tickets = cls._post_messages([message], timeout=10)
             
             # Check for errors in response
-            if result.get('data') and len(result['data']) > 0:
-                ticket = result['data'][0]
+            if tickets:
+                ticket = tickets[0]
                 
                 if ticket.get('status') == 'error':
                     error_msg = ticket.get('message', 'Unknown error')
@@ -174,22 +488,11 @@ class ExpoPushService:
             batch = messages[i:i + cls.MAX_BATCH_SIZE]
             
             try:
-                response = requests.post(
-                    cls.EXPO_PUSH_URL,
-                    json=batch,
-                    headers={
-                        "Accept": "application/json",
-                        "Content-Type": "application/json"
-                    },
-                    timeout=30
-                )
-                
-                response.raise_for_status()
-                result = response.json()
+                tickets = cls._post_messages(batch, timeout=30)
                 
                 # Count successes and failures
-                if result.get('data'):
-                    for ticket in result['data']:
+                if tickets:
+                    for ticket in tickets:
                         if ticket.get('status') == 'ok':
                             success_count += 1
                         else:
@@ -211,12 +514,19 @@ class ExpoPushService:
         title: str,
         body: str,
         notification_type: str = 'system',
-        data: Optional[Dict] = None
+        data: Optional[Dict] = None,
+        background: bool = True
     ) -> bool:
         """
         Convenience method to send notification to a user by user_id
         Fetches push token from database and sends notification
         
+        By default the push is handed to the delivery queue and this returns
+        immediately; the token lookup and Expo request happen on the worker
+        thread. With the queue off, a push made inside a request is held and
+        sent with the request's other pushes once the response is ready.
+        Pass background=False to send inline and get the real result.
+        
         Args:
             supabase_client: Supabase client instance
             user_id: User ID to send notification to
@@ -224,29 +534,42 @@ class ExpoPushService:
             body: Notification body
             notification_type: Type of notification for data payload
             data: Additional custom data
+            background: Queue the push instead of sending it inline
             
         Returns:
-            True if sent successfully, False otherwise
+            True if queued / sent successfully, False otherwise
         """
         try:
-            # Fetch user's push token
-            result = supabase_client.table('profiles').select('push_token').eq('user_id', user_id).execute()
+            # Prepare data payload
+            notification_data = data or {}
+            notification_data['type'] = notification_type
+            notification_data['timestamp'] = datetime.utcnow().isoformat()
             
-            if not result.data or len(result.data) == 0:
-                logger.warning(f"No profile found for user_id: {user_id}")
-                return False
+            job = {
+                'supabase_client': supabase_client,
+                'user_id': user_id,
+                'message': {
+                    "sound": 'default',
+                    "title": title,
+                    "body": body,
+                    "data": notification_data,
+                    "priority": 'high',
+                    "channelId": 'default'
+                }
+            }
+            if background and cls.get_queue().enabled:
+                cls.get_queue().enqueue(job)
+                return True
+            if background and has_request_context():
+                g.setdefault('_request_pushes', []).append(job)
+                return True
             
-            push_token = result.data[0].get('push_token')
+            # Fetch user's push token
+            push_token = cls.token_resolver.resolve(supabase_client, user_id)
             
             if not push_token:
-                logger.info(f"User {user_id} has no push token registered")
                 return False
             
-            # Prepare data payload
-            notification_data = data or {}
-            notification_data['type'] = notification_type
-            notification_data['timestamp'] = datetime.utcnow().isoformat()
-            
             # Send notification
             success, error = cls.send_push_notification(
                 push_token=push_token,
@@ -260,3 +583,7 @@ class ExpoPushService:
         except Exception as e:
             logger.error(f"Error sending notification to user {user_id}: {str(e)}")
             return False
+
+
+# Deliver anything still queued when the interpreter exits
+atexit.register(ExpoPushService.flush, 5)
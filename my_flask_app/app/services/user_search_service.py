@@ -0,0 +1,264 @@
+"""
+Username search index
+=====================
+
+🎓 LEARNING: /api/social/search used to run ilike('username', '%query%') with
+select('*') and no limit. A leading wildcard can't use the username index, so
+every keystroke of search-as-you-type was a sequential scan returning whole
+profile rows.
+
+Each worker now keeps a small in-memory index of (user_id, username, display
+fields), rebuilt every USER_SEARCH_REFRESH_SECONDS and updated in place when
+ProfileService creates or renames a profile:
+
+- Prefix:  one sorted list of lowercase usernames per name length. Shorter
+           names rank higher, so lengths are walked upward and the walk stops
+           after `limit` matches instead of scanning every name with the prefix
+- Fuzzy:   trigram -> user_ids postings (the same trigrams pg_trgm uses),
+           scored by shared / total trigrams, so typos still match. Trigrams
+           shared by more than MAX_TRIGRAM_POSTINGS users (the padded first
+           letter, '  a') are skipped when collecting candidates
+
+Ranking tiers: exact > prefix > substring > fuzzy, then score, then shorter
+names first.
+
+A published index is never mutated, so searches run without a lock. A new
+or renamed profile produces a copy that shares the base structures and adds
+the row to a small overlay of recent upserts (searched by a linear scan, and
+hiding the row's base entries), so a write costs O(overlay), not O(users).
+The overlay is folded into a fresh base once it reaches MAX_OVERLAY rows,
+and is dropped anyway by the next rebuild, which reads those rows from the
+database.
+"""
+
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Set, Tuple
+
+from flask import current_app
+
+from app import db
+from app.models.profile import Profile
+
+DISPLAY_FIELDS = ('user_id', 'username', 'profile_picture_url', 'wealth_level')
+MIN_FUZZY_SCORE = 0.3
+MAX_TRIGRAM_POSTINGS = 1000
+MAX_OVERLAY = 1000
+
+EXACT, PREFIX, SUBSTRING, FUZZY = 3, 2, 1, 0
+MATCH_NAMES = {EXACT: 'exact', PREFIX: 'prefix', SUBSTRING: 'substring', FUZZY: 'fuzzy'}
+
+
+def trigrams(text: str) -> Set[str]:
+    """pg_trgm-style trigrams: lowercase, padded with two spaces in front and one behind"""
+    padded = f'  {text.lower()} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class UsernameIndex:
+    """
+    Prefix + trigram index over usernames, plus an overlay of recent upserts
+
+    upsert()/remove() change the base in place and are for an index nobody
+    searches yet; use upserted() to update a published one.
+    """
+
+    def __init__(self, rows: Optional[List[Tuple]] = None):
+        self.rows: Dict[str, Tuple] = {}
+        self.by_length: Dict[int, List[Tuple[str, str]]] = {}  # len -> sorted (lowercase name, user_id)
+        self.postings: Dict[str, Set[str]] = {}
+        self.overlay: Dict[str, Tuple] = {}  # user_id -> row, overrides the base entries
+        self.built_at = time.monotonic()
+        for row in rows or []:
+            self._add(row)
+        for names in self.by_length.values():
+            names.sort()
+
+    def _add(self, row: Tuple) -> None:
+        user_id, username = row[0], row[1]
+        self.rows[user_id] = row
+        name = username.lower()
+        self.by_length.setdefault(len(name), []).append((name, user_id))
+        for gram in trigrams(username):
+            self.postings.setdefault(gram, set()).add(user_id)
+
+    def remove(self, user_id: str) -> None:
+        row = self.rows.pop(user_id, None)
+        if row is None:
+            return
+        key = (row[1].lower(), user_id)
+        names = self.by_length.get(len(key[0]), [])
+        position = bisect_left(names, key)
+        if position < len(names) and names[position] == key:
+            del names[position]
+            if not names:
+                del self.by_length[len(key[0])]
+        for gram in trigrams(row[1]):
+            users = self.postings.get(gram)
+            if users:
+                users.discard(user_id)
+                if not users:
+                    del self.postings[gram]
+
+    def upsert(self, row: Tuple) -> None:
+        self.remove(row[0])
+        self.rows[row[0]] = row
+        name = row[1].lower()
+        insort(self.by_length.setdefault(len(name), []), (name, row[0]))
+        for gram in trigrams(row[1]):
+            self.postings.setdefault(gram, set()).add(row[0])
+
+    def upserted(self, row: Tuple) -> 'UsernameIndex':
+        """Copy with `row` applied; the base is shared, only the overlay is copied"""
+        if len(self.overlay) >= MAX_OVERLAY:
+            merged = dict(self.rows)
+            merged.update(self.overlay)
+            merged[row[0]] = row
+            clone = UsernameIndex(list(merged.values()))
+        else:
+            clone = UsernameIndex()
+            clone.rows = self.rows
+            clone.by_length = self.by_length
+            clone.postings = self.postings
+            clone.overlay = dict(self.overlay)
+            clone.overlay[row[0]] = row
+        clone.built_at = self.built_at
+        return clone
+
+    def _row(self, user_id: str) -> Tuple:
+        return self.overlay.get(user_id) or self.rows[user_id]
+
+    def search(self, query: str, limit: int, fuzzy: bool = True) -> List[Dict]:
+        """Ranked display rows for query, best first"""
+        needle = query.strip().lower()
+        if not needle:
+            return []
+
+        scored: Dict[str, Tuple[int, float]] = {}
+
+        # Prefix matches (includes the exact match), shortest names first
+        for length in sorted(n for n in self.by_length if n >= len(needle)):
+            names = self.by_length[length]
+            position = bisect_left(names, (needle, ''))
+            while position < len(names) and len(scored) < limit:
+                name, user_id = names[position]
+                if not name.startswith(needle):
+                    break
+                if user_id not in self.overlay:
+                    scored[user_id] = (EXACT if name == needle else PREFIX, len(needle) / length)
+                position += 1
+            if len(scored) >= limit:
+                break
+        for user_id, row in self.overlay.items():
+            name = row[1].lower()
+            if name.startswith(needle):
+                scored[user_id] = (EXACT if name == needle else PREFIX, len(needle) / len(name))
+
+        # Substring and typo matches through the trigram postings
+        if fuzzy and len(needle) >= 3:
+            query_grams = trigrams(needle)
+            candidates: Set[str] = set()
+            for gram in query_grams:
+                users = self.postings.get(gram, ())
+                if len(users) <= MAX_TRIGRAM_POSTINGS:
+                    candidates.update(users)
+            candidates.update(self.overlay)
+            for user_id in candidates:
+                if user_id in scored:
+                    continue
+                name = self._row(user_id)[1].lower()
+                name_grams = trigrams(name)
+                score = len(query_grams & name_grams) / len(query_grams | name_grams)
+                if needle in name:
+                    scored[user_id] = (SUBSTRING, score)
+                elif score >= MIN_FUZZY_SCORE:
+                    scored[user_id] = (FUZZY, score)
+
+        ranked = sorted(
+            scored.items(),
+            key=lambda item: (-item[1][0], -item[1][1], len(self._row(item[0])[1]), self._row(item[0])[1].lower())
+        )[:limit]
+
+        results = []
+        for user_id, (tier, score) in ranked:
+            data = dict(zip(DISPLAY_FIELDS, self._row(user_id)))
+            data['match'] = MATCH_NAMES[tier]
+            data['score'] = round(score, 3)
+            results.append(data)
+        return results
+
+
+def _display_row(source) -> Tuple:
+    get = (lambda f: source.get(f)) if isinstance(source, dict) else (lambda f: getattr(source, f, None))
+    return (str(get('user_id')), get('username') or '', get('profile_picture_url'), get('wealth_level'))
+
+
+class UserSearchService:
+    _index: Optional[UsernameIndex] = None
+    _write_lock = threading.Lock()  # Serializes index swaps; searches never take it
+    _build_lock = threading.Lock()  # One rebuild at a time; readers keep the old index
+    _replay: Optional[List[Tuple]] = None  # Rows recorded while a rebuild scans
+
+    @staticmethod
+    def build_index() -> UsernameIndex:
+        """Load the display fields of every profile in one query"""
+        columns = [getattr(Profile, f) for f in DISPLAY_FIELDS]
+        rows = [_display_row(record) for record in db.session.query(*columns).yield_per(5000)]
+        return UsernameIndex(rows)
+
+    @classmethod
+    def index(cls) -> UsernameIndex:
+        """Current index, rebuilt once USER_SEARCH_REFRESH_SECONDS have passed"""
+        max_age = current_app.config.get('USER_SEARCH_REFRESH_SECONDS', 300)
+        current = cls._index
+        if current is not None and time.monotonic() - current.built_at < max_age:
+            return current
+
+        if not cls._build_lock.acquire(blocking=current is None):
+            return current
+        try:
+            current = cls._index
+            if current is None or time.monotonic() - current.built_at >= max_age:
+                current = cls._rebuild()
+            return current
+        finally:
+            cls._build_lock.release()
+
+    @classmethod
+    def _rebuild(cls) -> UsernameIndex:
+        with cls._write_lock:
+            cls._replay = []
+        try:
+            fresh = cls.build_index()
+        except Exception:
+            with cls._write_lock:
+                cls._replay = None
+            raise
+        with cls._write_lock:
+            # The scan may have read these profiles before they were written
+            for row in cls._replay:
+                fresh.upsert(row)
+            cls._replay = None
+            cls._index = fresh
+        return fresh
+
+    @classmethod
+    def invalidate(cls) -> None:
+        cls._index = None
+
+    @classmethod
+    def record_profile(cls, profile) -> None:
+        """Index a new or renamed profile right away (no-op before the first build)"""
+        if profile is None:
+            return
+        row = _display_row(profile)
+        with cls._write_lock:
+            if cls._replay is not None:
+                cls._replay.append(row)
+            if cls._index is not None:
+                cls._index = cls._index.upserted(row)
+
+    @classmethod
+    def search(cls, query: str, limit: int = 20, fuzzy: bool = True) -> List[Dict]:
+        return cls.index().search(query, limit, fuzzy)
@@ -0,0 +1,221 @@
+"""
+Write-behind reaction counters
+==============================
+
+🎓 LEARNING: A viral void post gets a burst of oof/same taps, and every tap
+used to update the same void_posts row. Each update takes that row's lock, so
+the taps queue behind each other in Postgres.
+
+With write-behind, a tap only records the reaction row
+(toggle_void_reaction with p_apply_counters => false) and hands its counter
+delta to this per-worker aggregator:
+
+    tap  -> add(post_id, +1, 0)        pending[post_id] += delta (in memory)
+    tick -> flush()                    one apply_void_reaction_counts RPC
+                                       for every post touched since the last tick
+
+A flush happens every VOID_COUNTER_FLUSH_MS, or sooner once
+VOID_COUNTER_FLUSH_EVENTS taps are pending. 300 taps on one post within a
+tick become a single +300 update.
+
+READS:
+Counts read from the database (or from a cached feed page) don't include
+deltas that are still pending. apply() adds them back, plus deltas flushed
+after the page was loaded, so readers never see a count go backwards.
+
+SHUTDOWN:
+Pending deltas live only in this process. flush() runs at interpreter exit,
+in gunicorn's worker_exit hook and at the end of every Lambda invocation.
+A failed flush keeps the deltas and retries on the next tick.
+
+RETRIES:
+Each batch is sent with a UUID that apply_void_reaction_counts records
+together with the update (20261017080000_void_counter_batches.sql). A batch
+that raised is resent unchanged under the same id before anything newer, so
+a call that committed but lost its response is not applied twice.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 0.5  # seconds
+DEFAULT_MAX_PENDING_EVENTS = 200
+
+
+def _write_counts(rows: List[Dict[str, Any]], batch_id: str) -> None:
+    # Looked up at call time: the flusher thread may outlive app reloads
+    import app
+    app.supabase.rpc('apply_void_reaction_counts', {'p_deltas': rows, 'p_batch_id': batch_id}).execute()
+
+
+class VoidCounterAggregator:
+    """
+    Per-process buffer of oof/same deltas, flushed in batches
+
+    The flusher thread is started lazily (and restarted after a fork, since
+    gunicorn workers don't inherit threads).
+    """
+
+    def __init__(self, write: Callable[[List[Dict[str, Any]], str], None] = _write_counts,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 max_pending_events: int = DEFAULT_MAX_PENDING_EVENTS,
+                 clock: Callable[[], float] = time.monotonic):
+        self._write = write
+        self.flush_interval = flush_interval
+        self.max_pending_events = max_pending_events
+        self.retention = 0.0  # Seconds flushed deltas are kept for cached pages
+        self.enabled = True
+        self._clock = clock
+        self._pending: Dict[str, List[int]] = {}   # post_id -> [oof, same], not yet sent
+        self._inflight: Dict[str, List[int]] = {}  # Batch being written by flush()
+        self._batch_id: Optional[str] = None       # Id of that batch, kept across retries
+        self._flushed: Deque[Tuple[float, str, int, int]] = deque()
+        self._events = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def configure(self, enabled: Optional[bool] = None, flush_interval: Optional[float] = None,
+                  max_pending_events: Optional[int] = None, retention: Optional[float] = None) -> None:
+        if enabled is not None:
+            self.enabled = enabled
+        if flush_interval is not None:
+            self.flush_interval = flush_interval
+        if max_pending_events is not None:
+            self.max_pending_events = max_pending_events
+        if retention is not None:
+            self.retention = retention
+
+    def add(self, post_id: str, oof_delta: int = 0, same_delta: int = 0) -> None:
+        """Buffer one tap's counter delta"""
+        if not oof_delta and not same_delta:
+            return
+        with self._lock:
+            delta = self._pending.setdefault(str(post_id), [0, 0])
+            delta[0] += oof_delta
+            delta[1] += same_delta
+            self._events += 1
+            full = self._events >= self.max_pending_events
+        self._ensure_worker()
+        if full:
+            self._wake.set()
+
+    def pending(self, post_id: str, since: Optional[float] = None) -> Tuple[int, int]:
+        """
+        Deltas not yet visible in a read of post_id
+
+        Args:
+            since: clock() time the row was read; deltas flushed after it are
+                   included too (for rows served from a cache)
+        """
+        post_id = str(post_id)
+        oof = same = 0
+        with self._lock:
+            for source in (self._pending, self._inflight):
+                delta = source.get(post_id)
+                if delta:
+                    oof += delta[0]
+                    same += delta[1]
+            if since is not None:
+                for flushed_at, flushed_id, flushed_oof, flushed_same in self._flushed:
+                    if flushed_at > since and flushed_id == post_id:
+                        oof += flushed_oof
+                        same += flushed_same
+        return oof, same
+
+    def apply(self, post: Dict[str, Any], since: Optional[float] = None) -> Dict[str, Any]:
+        """Add pending deltas to a post dict's oof_count/same_count in place"""
+        oof, same = self.pending(post['id'], since)
+        if oof or same:
+            post['oof_count'] = max(0, (post.get('oof_count') or 0) + oof)
+            post['same_count'] = max(0, (post.get('same_count') or 0) + same)
+        return post
+
+    def now(self) -> float:
+        return self._clock()
+
+    def flush(self) -> bool:
+        """
+        Write every pending delta in one RPC
+
+        A batch left over from a failed flush is resent first, unchanged and
+        under its original id; deltas added since then go out as a new batch.
+
+        Returns:
+            True if nothing is left pending
+        """
+        with self._flush_lock:
+            if not self._send_inflight():
+                return False
+            with self._lock:
+                self._inflight = {post_id: delta for post_id, delta in self._pending.items()
+                                  if delta[0] or delta[1]}
+                self._batch_id = str(uuid.uuid4()) if self._inflight else None
+                self._pending = {}
+                self._events = 0
+            return self._send_inflight()
+
+    def _send_inflight(self) -> bool:
+        with self._lock:
+            rows = [
+                {'post_id': post_id, 'oof': delta[0], 'same': delta[1]}
+                for post_id, delta in sorted(self._inflight.items())
+            ]
+            batch_id = self._batch_id
+        if not rows:
+            return True
+
+        try:
+            self._write(rows, batch_id)
+        except Exception as e:
+            # Keep the batch and its id; the next flush resends it as is
+            logger.error(f"Void counter flush failed ({len(rows)} posts): {str(e)}")
+            return False
+
+        with self._lock:
+            flushed_at = self._clock()
+            for row in rows:
+                self._flushed.append((flushed_at, row['post_id'], row['oof'], row['same']))
+            self._inflight = {}
+            self._batch_id = None
+            self._prune(flushed_at)
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'pending_posts': len(self._pending) + len(self._inflight), 'pending_events': self._events}
+
+    def _prune(self, now: float) -> None:
+        while self._flushed and self._flushed[0][0] <= now - self.retention:
+            self._flushed.popleft()
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='void-counter-flush', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+
+# 🎓 One aggregator per worker process
+void_counters = VoidCounterAggregator()
+
+# Write anything still pending when the interpreter exits
+atexit.register(void_counters.flush)
@@ -0,0 +1,133 @@
+"""
+Void feed
+=========
+
+🎓 LEARNING: /api/void/feed used to fetch the latest 50 posts with select('*')
+for every reader, with no way to ask for the next page.
+
+The feed is now split in two:
+
+1. The shared part - a page of posts, identical for every reader. Pages are
+   keyset-paginated on (created_at, id), newest first, and each page is kept
+   in a short-TTL cache, so a burst of readers costs one query per interval.
+2. The personal part - the reader's own reactions to that page (one .in_()
+   query) and is_mine, overlaid on a copy of the shared rows.
+
+CURSORS:
+next_cursor encodes the (created_at, id) of the last post on the page. New
+posts arriving at the top never shift later pages, unlike offset paging.
+
+COUNTS:
+Reaction deltas still buffered by the write-behind aggregator (or flushed
+after the page was cached) are added to oof_count/same_count per reader.
+"""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.void_counter_service import void_counters
+from app.utils.catalog_cache import CatalogCache
+
+FEED_COLUMNS = 'id, user_id, content, oof_count, same_count, created_at'
+DEFAULT_FEED_TTL = 5  # seconds
+
+# 🎓 Shared feed pages per worker, keyed by (cursor, limit)
+feed_cache = CatalogCache(default_ttl=DEFAULT_FEED_TTL)
+
+
+def encode_feed_cursor(post: Dict[str, Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps([post['created_at'], post['id']]).encode()).decode()
+
+
+def decode_feed_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Inverse of encode_feed_cursor; raises ValueError on garbage
+
+    Both values end up inside a PostgREST or_ filter, so they are parsed and
+    re-rendered rather than passed through as the client sent them.
+    """
+    try:
+        created_at, post_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at).isoformat(), str(uuid.UUID(post_id))
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+class VoidFeedService:
+    @staticmethod
+    def configure(ttl: int) -> None:
+        """Set the shared page TTL (called from create_app); 0 disables caching"""
+        feed_cache.configure(default_ttl=ttl)
+
+    @staticmethod
+    def invalidate() -> None:
+        """Drop cached pages, e.g. after a post is created, edited or deleted"""
+        feed_cache.invalidate()
+
+    @staticmethod
+    def _load_page(supabase, cursor: Optional[str], limit: int) -> Dict[str, Any]:
+        loaded_at = void_counters.now()
+        query = supabase.table('void_posts').select(FEED_COLUMNS)
+        if cursor:
+            created_at, post_id = decode_feed_cursor(cursor)
+            # (created_at, id) < (cursor.created_at, cursor.id), newest first
+            query = query.or_(
+                f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{post_id})'
+            )
+        # One extra row tells us whether there is a next page
+        rows = query.order('created_at', desc=True).order('id', desc=True).limit(limit + 1).execute().data or []
+
+        posts = rows[:limit]
+        return {
+            'posts': posts,
+            'next_cursor': encode_feed_cursor(posts[-1]) if len(rows) > limit else None,
+            'loaded_at': loaded_at
+        }
+
+    @staticmethod
+    def shared_page(supabase, cursor: Optional[str], limit: int) -> Dict[str, Any]:
+        """The reader-independent page, served from the short-TTL cache"""
+        if cursor:
+            decode_feed_cursor(cursor)  # Reject bad cursors before caching anything
+        return feed_cache.get(
+            'void_posts',
+            lambda: VoidFeedService._load_page(supabase, cursor, limit),
+            key=(cursor, limit)
+        ).data
+
+    @staticmethod
+    def feed_for_user(supabase, user_id: str, cursor: Optional[str] = None,
+                      limit: int = 50) -> Dict[str, Any]:
+        """
+        A feed page with the reader's overlay
+
+        Returns:
+            {'data': [post dicts with my_reaction / is_mine], 'next_cursor': str | None}
+        """
+        page = VoidFeedService.shared_page(supabase, cursor, limit)
+        posts: List[Dict[str, Any]] = page['posts']
+
+        reaction_map = {}
+        post_ids = [p['id'] for p in posts]
+        if post_ids:
+            reactions_res = supabase.table('void_reactions')\
+                .select('post_id, reaction_type')\
+                .eq('user_id', user_id)\
+                .in_('post_id', post_ids)\
+                .execute()
+            reaction_map = {r['post_id']: r['reaction_type'] for r in (reactions_res.data or [])}
+
+        data = [void_counters.apply({
+            'id': p['id'],
+            'content': p['content'],
+            'oof_count': p['oof_count'],
+            'same_count': p['same_count'],
+            'created_at': p['created_at'],
+            'my_reaction': reaction_map.get(p['id'], None),
+            'is_mine': p['user_id'] == user_id
+        }, since=page['loaded_at']) for p in posts]
+
+        return {'data': data, 'next_cursor': page['next_cursor']}
@@ -0,0 +1,82 @@
+"""
+Service layer for void reactions
+Handles toggling oof/same reactions on void posts
+
+Every tap goes through the `toggle_void_reaction` Postgres function
+(supabase/migrations/20261017020000_toggle_void_reaction.sql). It writes the
+reaction row, both counters and the poster's capped sanity reward in one
+atomic call, so a tap is a single round trip and concurrent taps on the same
+post can't overwrite each other's counts.
+
+With write-behind enabled (VOID_COUNTER_WRITE_BEHIND), the function only
+records the reaction and returns the counter deltas, which are batched per
+post by app/services/void_counter_service.py instead of locking the post row
+on every tap.
+"""
+from typing import Dict, Any
+from app import supabase
+from app.services.void_counter_service import void_counters
+
+REACTION_TYPES = ('oof', 'same')
+
+
+class PostNotFoundError(Exception):
+    """Raised when reacting to a post that doesn't exist (or was deleted)"""
+
+
+class VoidReactionService:
+    """Service for void post reactions"""
+
+    @staticmethod
+    def toggle(user_id: str, post_id: str, reaction_type: str) -> Dict[str, Any]:
+        """
+        Add, switch or remove the user's reaction to a post
+
+        Tapping the same reaction again removes it; tapping the other one
+        switches. A 'same' from someone other than the poster gives the
+        poster +1 sanity (capped at 100).
+
+        Returns:
+            Dict with action ('added' | 'removed' | 'switched'), the user's
+            reaction afterwards (or None), and the post's new counts
+
+        Raises:
+            ValueError: If reaction_type isn't 'oof' or 'same'
+            PostNotFoundError: If the post doesn't exist
+        """
+        if reaction_type not in REACTION_TYPES:
+            raise ValueError('Invalid reaction')
+
+        params = {
+            'p_user_id': user_id,
+            'p_post_id': post_id,
+            'p_reaction_type': reaction_type
+        }
+        if void_counters.enabled:
+            params['p_apply_counters'] = False
+        response = supabase.rpc('toggle_void_reaction', params).execute()
+
+        result = response.data or {}
+        if not result.get('success'):
+            error = result.get('error', 'UNKNOWN_ERROR')
+            if error == 'POST_NOT_FOUND':
+                raise PostNotFoundError('Post not found')
+            if error == 'INVALID_REACTION':
+                raise ValueError('Invalid reaction')
+            raise Exception(f'Reaction rejected: {error}')
+
+        counts = {
+            'id': post_id,
+            'oof_count': result.get('oof_count', 0),
+            'same_count': result.get('same_count', 0)
+        }
+        if void_counters.enabled:
+            void_counters.add(post_id, result.get('oof_delta', 0), result.get('same_delta', 0))
+            void_counters.apply(counts)
+
+        return {
+            'action': result['action'],
+            'reaction': result.get('reaction'),
+            'oof_count': counts['oof_count'],
+            'same_count': counts['same_count']
+        }
@@ -0,0 +1,188 @@
+"""
+In-process cache for static catalog tables
+==========================================
+
+🎓 LEARNING: Catalog tables (assets, jobs_market, rental_properties, courses,
+luxury_items, bank_loans templates) only change when we reseed, yet every
+marketplace/browse request used to make a full PostgREST round trip.
+
+This module keeps the last result per (table, key) in worker memory for a
+per-table TTL and serves it with an ETag, so repeat browses from the app are
+answered with a 304 and no database time at all.
+
+USAGE IN ROUTES:
+```python
+from app.utils.catalog_cache import catalog_response
+
+@job_bp.route('/available', methods=['GET'])
+def get_available_jobs():
+    return catalog_response(
+        'jobs_market',
+        lambda: supabase.table('jobs_market').select('*').execute().data
+    )
+```
+
+INVALIDATION:
+- Entries expire after CATALOG_CACHE_TTLS[table] seconds (config.py)
+- invalidate_catalog('assets') drops one table, invalidate_catalog() drops all;
+  admins trigger it with POST /api/admin/catalog/invalidate after a reseed
+- Each gunicorn worker / Lambda container has its own cache, so the TTL is the
+  upper bound on staleness across processes after a reseed
+"""
+
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from flask import Response, jsonify, request
+
+# Seconds an entry stays fresh when the table has no explicit TTL
+DEFAULT_CATALOG_TTL = 300
+
+# Tables served through this cache (the ones /api/admin/catalog/invalidate accepts)
+CATALOG_TABLES = (
+    'assets', 'jobs_market', 'rental_properties', 'courses', 'luxury_items',
+    'bank_loans', 'integrated_missions'
+)
+
+
+class CatalogEntry:
+    """A cached catalog result with its ETag"""
+
+    __slots__ = ('data', 'etag', 'expires_at')
+
+    def __init__(self, data: Any, etag: str, expires_at: float):
+        self.data = data
+        self.etag = etag
+        self.expires_at = expires_at
+
+
+def compute_etag(data: Any) -> str:
+    """Stable content hash of a JSON-serializable payload"""
+    encoded = json.dumps(data, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+
+class CatalogCache:
+    """
+    Thread-safe TTL cache keyed by (table, key)
+
+    A TTL of 0 (or less) disables caching for that table; the loader is then
+    called on every request, which keeps behaviour identical to the uncached
+    routes while still producing ETags.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, int]] = None,
+                 default_ttl: int = DEFAULT_CATALOG_TTL,
+                 clock: Callable[[], float] = time.monotonic):
+        self._ttls: Dict[str, int] = dict(ttls or {})
+        self._default_ttl = default_ttl
+        self._clock = clock
+        self._entries: Dict[Tuple[str, Hashable], CatalogEntry] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, ttls: Optional[Dict[str, int]] = None,
+                  default_ttl: Optional[int] = None) -> None:
+        """Replace TTL settings (called from create_app) and drop stale entries"""
+        with self._lock:
+            if ttls is not None:
+                self._ttls = dict(ttls)
+            if default_ttl is not None:
+                self._default_ttl = default_ttl
+            self._entries.clear()
+
+    def ttl_for(self, table: str) -> int:
+        """TTL in seconds for a table"""
+        return self._ttls.get(table, self._default_ttl)
+
+    def get(self, table: str, loader: Callable[[], Any],
+            key: Hashable = None) -> CatalogEntry:
+        """
+        Return the cached entry for (table, key), calling loader on a miss
+
+        Loader exceptions propagate and nothing is cached, so a failed
+        PostgREST call is retried on the next request.
+        """
+        ttl = self.ttl_for(table)
+        cache_key = (table, key)
+        now = self._clock()
+
+        if ttl > 0:
+            with self._lock:
+                entry = self._entries.get(cache_key)
+                if entry is not None and entry.expires_at > now:
+                    self.hits += 1
+                    return entry
+
+        data = loader()
+        entry = CatalogEntry(data, compute_etag(data), now + ttl)
+
+        with self._lock:
+            self.misses += 1
+            if ttl > 0:
+                self._entries[cache_key] = entry
+        return entry
+
+    def invalidate(self, table: Optional[str] = None) -> int:
+        """
+        Drop cached entries for one table, or for every table if None
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            if table is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+
+            stale = [k for k in self._entries if k[0] == table]
+            for k in stale:
+                del self._entries[k]
+            return len(stale)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+
+# 🎓 GLOBAL: One cache per worker process (see supabase_client.py for why that's fine)
+catalog_cache = CatalogCache()
+
+
+def invalidate_catalog(table: Optional[str] = None) -> int:
+    """Invalidation hook: call after reseeding or editing a catalog table"""
+    return catalog_cache.invalidate(table)
+
+
+def catalog_response(table: str, loader: Callable[[], Any],
+                     key: Hashable = None) -> Tuple[Response, int]:
+    """
+    Serve a catalog table as {'success': True, 'data': [...]} with ETag/304 support
+
+    Args:
+        table: Catalog table name (selects the TTL and invalidation group)
+        loader: Zero-arg callable returning the rows (only called on a miss)
+        key: Extra cache key for filtered variants (e.g. category)
+
+    Returns:
+        (response, status) tuple, matching the other route handlers
+    """
+    entry = catalog_cache.get(table, loader, key)
+    max_age = max(catalog_cache.ttl_for(table), 0)
+
+    if entry.etag in request.if_none_match:
+        response = Response(status=304)
+        status = 304
+    else:
+        response = jsonify({'success': True, 'data': entry.data})
+        status = 200
+
+    response.set_etag(entry.etag)
+    response.headers['Cache-Control'] = f'public, max-age={max_age}'
+    return response, status
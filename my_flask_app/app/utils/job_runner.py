@@ -0,0 +1,402 @@
+"""
+Partitioned Job Runner
+======================
+
+🎓 LEARNING: The scheduled jobs under jobs/ used to be one loop over every
+player, committing (or calling Expo) once per row. That is fine for a few
+hundred players and hopeless for the maintenance window once we have a few
+hundred thousand.
+
+This runner splits the user-id space into N contiguous UUID ranges and runs
+each range ("partition") on a thread or process pool:
+
+    user_id space:  |--- p0 ---|--- p1 ---|--- p2 ---| ... |--- pN-1 ---|
+
+Each partition:
+- Runs inside its own app context (its own SQLAlchemy session/connection)
+- Walks its range in user_id order and reports progress via ctx.advance()
+- Writes a small checkpoint file, so a killed run resumes after the last
+  user it finished instead of starting over (and double-charging loans)
+- Logs its throughput (items/s) when it finishes
+
+USAGE IN A JOB:
+```python
+from app.utils.job_runner import JobRunner
+
+def _process_partition(ctx):
+    query = ctx.partition.apply(Profile.query, Profile.user_id)
+    if ctx.cursor:
+        query = query.filter(Profile.user_id > ctx.cursor)
+    for profile in query.order_by(Profile.user_id):
+        ...
+        ctx.advance(profile.user_id, events_triggered=1)
+
+JobRunner('trigger_random_events', _process_partition, run_key=date.today().isoformat()).run()
+```
+
+CONNECTION BUDGET:
+Every concurrent partition holds one database connection, so concurrency is
+min(JOB_WORKERS, JOB_DB_CONNECTION_BUDGET). Keep the budget within the
+pool size (threads) or the database's spare connections (processes).
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import re
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARTITIONS = int(os.environ.get('JOB_PARTITIONS', 8))
+DEFAULT_WORKERS = int(os.environ.get('JOB_WORKERS', 4))
+DEFAULT_DB_CONNECTION_BUDGET = int(os.environ.get('JOB_DB_CONNECTION_BUDGET', 4))
+DEFAULT_EXECUTOR = os.environ.get('JOB_EXECUTOR', 'thread')
+DEFAULT_CHECKPOINT_DIR = os.environ.get(
+    'JOB_CHECKPOINT_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                 'jobs', '.checkpoints')
+)
+
+_UUID_SPACE = 1 << 128
+
+
+class Partition(NamedTuple):
+    """A half-open user_id range [lower, upper); None means unbounded"""
+
+    index: int
+    lower: Optional[uuid.UUID]
+    upper: Optional[uuid.UUID]
+
+    def contains(self, user_id) -> bool:
+        """True if user_id (UUID or string) falls in this partition"""
+        value = user_id if isinstance(user_id, uuid.UUID) else uuid.UUID(str(user_id))
+        if self.lower is not None and value < self.lower:
+            return False
+        if self.upper is not None and value >= self.upper:
+            return False
+        return True
+
+    def apply(self, query, column):
+        """Restrict a SQLAlchemy query to this partition's range of column"""
+        if self.lower is not None:
+            query = query.filter(column >= self.lower)
+        if self.upper is not None:
+            query = query.filter(column < self.upper)
+        return query
+
+    def apply_postgrest(self, query, column: str):
+        """Restrict a supabase-py (PostgREST) query to this partition's range of column"""
+        if self.lower is not None:
+            query = query.gte(column, str(self.lower))
+        if self.upper is not None:
+            query = query.lt(column, str(self.upper))
+        return query
+
+
+def user_id_partitions(count: int) -> List[Partition]:
+    """
+    Split the UUID space into `count` equal, contiguous partitions
+
+    UUIDs compare as 128-bit integers in both Python and Postgres, and random
+    (v4) UUIDs are uniformly spread, so equal ranges get roughly equal work.
+    """
+    count = max(1, count)
+    step = _UUID_SPACE // count
+    bounds = [None] + [uuid.UUID(int=step * i) for i in range(1, count)] + [None]
+    return [Partition(i, bounds[i], bounds[i + 1]) for i in range(count)]
+
+
+class PartitionCheckpoint:
+    """
+    Progress of one partition, persisted as JSON
+
+    One file per partition means process workers never write the same file,
+    so no cross-process locking is needed. Writes go through a temp file and
+    os.replace, so a crash mid-write leaves the previous checkpoint intact.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.cursor: Optional[str] = None
+        self.cursor_key: Optional[str] = None
+        self.done = False
+        self.processed = 0
+        self.counters: Dict[str, int] = {}
+
+    def load(self) -> 'PartitionCheckpoint':
+        if self.path and os.path.exists(self.path):
+            with open(self.path) as f:
+                state = json.load(f)
+            self.cursor = state.get('cursor')
+            self.cursor_key = state.get('cursor_key')
+            self.done = state.get('done', False)
+            self.processed = state.get('processed', 0)
+            self.counters = state.get('counters', {})
+        return self
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'cursor': self.cursor,
+                'cursor_key': self.cursor_key,
+                'done': self.done,
+                'processed': self.processed,
+                'counters': self.counters,
+            }, f)
+        os.replace(tmp_path, self.path)
+
+
+class PartitionContext:
+    """
+    Handed to the job's partition function
+
+    Attributes:
+        partition: The Partition being processed
+        cursor: Last user_id (UUID) finished by a previous, interrupted run, or None
+        cursor_key: Last item finished within that user (a string), for jobs
+            that checkpoint several items per user; None if the user is done
+    """
+
+    def __init__(self, partition: Partition, checkpoint: PartitionCheckpoint,
+                 checkpoint_every: int = 1):
+        self.partition = partition
+        self._checkpoint = checkpoint
+        self._checkpoint_every = max(1, checkpoint_every)
+        self._unsaved = 0
+        self.cursor = uuid.UUID(checkpoint.cursor) if checkpoint.cursor else None
+        self.cursor_key = checkpoint.cursor_key
+        self.processed = 0
+        self.counters: Dict[str, int] = {}
+        # Totals from the interrupted run, so the resumed summary is complete
+        self._base_processed = checkpoint.processed
+        self._base_counters = dict(checkpoint.counters)
+
+    def advance(self, cursor=None, processed: int = 1, cursor_key=None, **counters: int) -> None:
+        """
+        Record that everything up to and including `cursor` is finished
+
+        Call this only after the work for `cursor` is committed; a resumed run
+        restarts strictly after the last saved cursor.
+
+        Args:
+            cursor: Last user_id handled (UUID or string); None keeps the
+                current cursor, for jobs that commit a partition as a unit
+            processed: Items handled since the previous call
+            cursor_key: Last item handled for `cursor` (e.g. a loan id), when
+                one user's items are committed one at a time
+            **counters: Job-specific totals to add (e.g. messages_sent=2)
+        """
+        if cursor is not None:
+            self.cursor = cursor if isinstance(cursor, uuid.UUID) else uuid.UUID(str(cursor))
+            self.cursor_key = str(cursor_key) if cursor_key is not None else None
+        self.processed += processed
+        for name, value in counters.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+
+        self._unsaved += 1
+        if self._unsaved >= self._checkpoint_every:
+            self._save(done=False)
+
+    def add(self, **counters: int) -> None:
+        """Add to job-specific totals without moving the cursor"""
+        for name, value in counters.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def _save(self, done: bool) -> None:
+        checkpoint = self._checkpoint
+        checkpoint.cursor = str(self.cursor) if self.cursor else None
+        checkpoint.cursor_key = self.cursor_key
+        checkpoint.done = done
+        checkpoint.processed = self._base_processed + self.processed
+        checkpoint.counters = dict(self._base_counters)
+        for name, value in self.counters.items():
+            checkpoint.counters[name] = checkpoint.counters.get(name, 0) + value
+        checkpoint.save()
+        self._unsaved = 0
+
+
+def _safe_name(value: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', value)
+
+
+def _execute_partition(app, work: Callable[[PartitionContext], Any], partition: Partition,
+                       checkpoint_path: Optional[str], checkpoint_every: int) -> Dict[str, Any]:
+    """Run one partition inside its own app context and return its stats"""
+    checkpoint = PartitionCheckpoint(checkpoint_path).load()
+    stats = {
+        'partition': partition.index,
+        'processed': checkpoint.processed,
+        'counters': dict(checkpoint.counters),
+        'seconds': 0.0,
+        'items_per_second': 0.0,
+        'skipped': checkpoint.done,
+        'resumed': checkpoint.cursor is not None and not checkpoint.done,
+        'error': None,
+    }
+    if checkpoint.done:
+        return stats
+
+    ctx = PartitionContext(partition, checkpoint, checkpoint_every)
+    started = time.monotonic()
+
+    from app import db
+    with app.app_context():
+        try:
+            work(ctx)
+            ctx._save(done=True)
+        except Exception as e:
+            db.session.rollback()
+            # Keep what was committed so the next run resumes from there
+            ctx._save(done=False)
+            stats['error'] = str(e)
+            logger.error(f"Partition {partition.index} failed after {ctx.processed} items: {str(e)}")
+        finally:
+            db.session.remove()
+
+    elapsed = time.monotonic() - started
+    stats.update({
+        'processed': checkpoint.processed,
+        'counters': dict(checkpoint.counters),
+        'seconds': round(elapsed, 3),
+        'items_per_second': round(ctx.processed / elapsed, 2) if elapsed > 0 else 0.0,
+    })
+    logger.info(
+        f"Partition {partition.index}: {ctx.processed} items in {elapsed:.2f}s "
+        f"({stats['items_per_second']}/s)" + (' [resumed]' if stats['resumed'] else '')
+    )
+    return stats
+
+
+# 🎓 PROCESS WORKERS: each child builds its own app (and engine) once
+_worker_app = None
+
+
+def _init_process_worker(app_factory: Callable[[], Any]) -> None:
+    global _worker_app
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    _worker_app = app_factory()
+
+
+def _execute_partition_in_process(work, partition, checkpoint_path, checkpoint_every):
+    return _execute_partition(_worker_app, work, partition, checkpoint_path, checkpoint_every)
+
+
+class JobRunner:
+    """
+    Run a job's partition function over all user-id partitions
+
+    Args:
+        name: Job name (checkpoint directory and log prefix)
+        work: Callable(ctx: PartitionContext); must be a module-level function
+            when executor='process' so it can be pickled
+        run_key: Identifies one logical run (e.g. '2026-10' for a monthly
+            job). Re-running with the same key resumes/skips finished partitions
+        app_factory: Builds the Flask app (create_app by default)
+        partitions: Number of user-id ranges
+        workers: Requested concurrency
+        db_connection_budget: Hard cap on concurrent partitions
+        executor: 'thread' or 'process'
+        checkpoint_dir: Where checkpoint files go; None disables checkpointing
+        checkpoint_every: Save after this many ctx.advance() calls
+    """
+
+    def __init__(self, name: str, work: Callable[[PartitionContext], Any], run_key: str,
+                 app_factory: Optional[Callable[[], Any]] = None,
+                 partitions: int = DEFAULT_PARTITIONS,
+                 workers: int = DEFAULT_WORKERS,
+                 db_connection_budget: int = DEFAULT_DB_CONNECTION_BUDGET,
+                 executor: str = DEFAULT_EXECUTOR,
+                 checkpoint_dir: Optional[str] = DEFAULT_CHECKPOINT_DIR,
+                 checkpoint_every: int = 1):
+        if executor not in ('thread', 'process'):
+            raise ValueError(f"executor must be 'thread' or 'process', got {executor!r}")
+        if app_factory is None:
+            from app import create_app
+            app_factory = create_app
+
+        self.name = name
+        self.work = work
+        self.run_key = run_key
+        self.app_factory = app_factory
+        self.partitions = user_id_partitions(partitions)
+        self.max_workers = max(1, min(workers, db_connection_budget, len(self.partitions)))
+        self.executor = executor
+        self.checkpoint_dir = checkpoint_dir
+        self.checkpoint_every = checkpoint_every
+
+    def checkpoint_path(self, partition: Partition) -> Optional[str]:
+        if not self.checkpoint_dir:
+            return None
+        return os.path.join(self.checkpoint_dir, _safe_name(self.name), _safe_name(self.run_key),
+                            f'partition-{partition.index:04d}-of-{len(self.partitions):04d}.json')
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Process every partition and return a summary
+
+        Returns:
+            {
+                'processed': total items,
+                'counters': summed job-specific counters,
+                'partitions': per-partition stats,
+                'failed_partitions': indexes that raised (resume by re-running),
+                'seconds': wall time
+            }
+        """
+        started = time.monotonic()
+        logger.info(
+            f"[{self.name}] run {self.run_key}: {len(self.partitions)} partitions, "
+            f"{self.max_workers} {self.executor} workers"
+        )
+
+        if self.executor == 'process':
+            pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_process_worker,
+                initargs=(self.app_factory,)
+            )
+            submit = lambda p: pool.submit(_execute_partition_in_process, self.work, p,
+                                           self.checkpoint_path(p), self.checkpoint_every)
+        else:
+            # One app shared by all threads; each thread pushes its own context
+            app = self.app_factory()
+            pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                      thread_name_prefix=f'job-{self.name}')
+            submit = lambda p: pool.submit(_execute_partition, app, self.work, p,
+                                           self.checkpoint_path(p), self.checkpoint_every)
+
+        results = []
+        with pool:
+            futures = [submit(p) for p in self.partitions]
+            for future in as_completed(futures):
+                results.append(future.result())
+
+        results.sort(key=lambda s: s['partition'])
+        counters: Dict[str, int] = {}
+        for stats in results:
+            for name, value in stats['counters'].items():
+                counters[name] = counters.get(name, 0) + value
+
+        summary = {
+            'processed': sum(s['processed'] for s in results),
+            'counters': counters,
+            'partitions': results,
+            'failed_partitions': [s['partition'] for s in results if s['error']],
+            'seconds': round(time.monotonic() - started, 3),
+        }
+        logger.info(
+            f"[{self.name}] run {self.run_key} finished: {summary['processed']} items in "
+            f"{summary['seconds']}s, failed partitions: {summary['failed_partitions'] or 'none'}"
+        )
+        return summary
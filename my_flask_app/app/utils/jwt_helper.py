@@ -3,6 +3,10 @@ JWT Helper utilities for verifying Supabase JWT tokens
 """
 import jwt
 import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
 from functools import wraps
 from flask import request, jsonify
 from typing import Optional, Dict, Any
@@ -13,6 +17,77 @@ SUPABASE_JWT_SECRET = os.getenv('SUPABASE_JWT_SECRET')
 if not SUPABASE_JWT_SECRET:
     raise ValueError('SUPABASE_JWT_SECRET environment variable is required')
 
+# Max verified tokens kept per worker process
+JWT_CACHE_SIZE = int(os.getenv('JWT_CACHE_SIZE', '10000'))
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of already-verified token payloads
+
+    Mobile clients resend the same token on every request for its whole
+    lifetime, so after the first full HS256 verification we remember the
+    payload until the token's own `exp`. Keys are SHA-256 digests so raw
+    tokens never sit in memory. Tokens without `exp` are never cached.
+    """
+
+    def __init__(self, max_size: int = JWT_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(token: str) -> str:
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return the cached payload if present and not yet expired"""
+        key = self._digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, payload = entry
+            if time.time() >= expires_at:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, token: str, payload: Dict[str, Any]) -> None:
+        """Remember a verified payload until its exp claim"""
+        exp = payload.get('exp')
+        if self.max_size <= 0 or not isinstance(exp, (int, float)):
+            return
+
+        key = self._digest(token)
+        with self._lock:
+            self._entries[key] = (exp, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+
+# One cache per worker process
+token_cache = VerifiedTokenCache()
+
 
 def decode_jwt(token: str) -> Optional[Dict[str, Any]]:
     """
@@ -41,6 +116,26 @@ def decode_jwt(token: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+def decode_jwt_cached(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Decode a token, skipping verification if it was already verified
+    
+    Args:
+        token: The JWT token string
+        
+    Returns:
+        Decoded token payload if valid, None otherwise
+    """
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+    
+    payload = decode_jwt(token)
+    if payload:
+        token_cache.put(token, payload)
+    return payload
+
+
 def get_user_id_from_token(token: str) -> Optional[str]:
     """
     Extract user_id from JWT token
@@ -51,7 +146,7 @@ def get_user_id_from_token(token: str) -> Optional[str]:
     Returns:
         User ID if token is valid, None otherwise
     """
-    payload = decode_jwt(token)
+    payload = decode_jwt_cached(token)
     if payload:
         return payload.get('sub')  # 'sub' claim contains the user ID
     return None
@@ -135,7 +230,7 @@ def require_admin(f):
                 'message': 'Authorization token is required'
             }), 401
         
-        payload = decode_jwt(token)
+        payload = decode_jwt_cached(token)
         
         if not payload:
             return jsonify({
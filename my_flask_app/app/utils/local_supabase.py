@@ -0,0 +1,837 @@
+"""
+Local Supabase
+==============
+
+🎓 LEARNING: Every route talks to Supabase over HTTP, so until now the only
+way to measure a performance change was against a real project - slow to set
+up, shared with other people, and noisy. LocalSupabase is an in-process
+stand-in for the part of supabase-py the app uses, backed by SQLite (or a
+local Postgres), so benchmarks and load tests run on a laptop:
+
+```python
+# config / environment
+SUPABASE_BACKEND = 'local'
+LOCAL_SUPABASE_URL = 'sqlite://'        # or postgresql://localhost/moneyquest_bench
+LOCAL_SUPABASE_LATENCY_MS = 15          # injected per call, like a network hop
+LOCAL_SUPABASE_JITTER_MS = 5
+```
+
+create_app then publishes it as `app.supabase` (still wrapped by
+RequestScopedClient), so the request loader, /metrics, Server-Timing and
+query budgets all see it exactly as they see the real client.
+
+WHAT IS SUPPORTED:
+- table()/from_(): select (with embedded `other_table(cols)` joins and
+  count='exact'), insert, upsert, update, delete
+- filters: eq, neq, gt, gte, lt, lte, like, ilike, is_, in_, not_, or_
+  (PostgREST logic-tree syntax), filter, match
+- order, limit, offset, range, single, maybe_single
+- rpc(): Python twins of the SQL functions in supabase/migrations
+  (app/utils/local_supabase_functions.py); unknown functions fail like
+  PostgREST does, so callers take their fallback paths
+- auth.sign_up / auth.sign_in_with_password, issuing create_token() JWTs
+
+The schema is built from the SQLAlchemy models with PostgREST's JSON shapes:
+UUIDs and timestamps come back as strings, numerics as floats. Unsupported
+calls raise instead of silently returning something a real project wouldn't.
+
+LATENCY:
+Each execute() sleeps LATENCY_MS (+ up to JITTER_MS) before touching the
+database and outside of its lock, so concurrent requests overlap their
+waits the way they overlap HTTP round trips. With 0 latency the numbers
+show pure app overhead; with ~15ms they show what round-trip counts cost.
+"""
+
+import importlib
+import inspect
+import operator
+import pkgutil
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from gotrue.errors import AuthApiError
+from gotrue.types import AuthResponse, Session, User
+from postgrest.base_request_builder import APIResponse, SingleAPIResponse
+from postgrest.exceptions import APIError
+from sqlalchemy import (JSON, Boolean, Column, Date, DateTime, Float, Integer, MetaData, Numeric,
+                        String, Table, Text, and_, create_engine, func, not_, or_, select)
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError, StatementError
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.types import ARRAY, TypeDecorator, Uuid
+
+# Foreign keys that exist in Supabase but are not declared on the models;
+# PostgREST needs them to resolve select('*, rental_properties(*)')
+RELATIONSHIPS = {
+    ('player_rentals', 'property_id'): ('rental_properties', 'id'),
+    ('user_courses', 'course_id'): ('courses', 'id'),
+    ('player_liabilities', 'liability_id'): ('liability_items', 'id'),
+    ('void_posts', 'user_id'): ('profiles', 'user_id'),
+    ('void_reactions', 'post_id'): ('void_posts', 'id'),
+    ('player_mission_progress', 'mission_id'): ('integrated_missions', 'id'),
+    ('mission_decision_points', 'mission_id'): ('integrated_missions', 'id'),
+    ('mission_decision_options', 'decision_point_id'): ('mission_decision_points', 'id'),
+    ('mission_success_criteria', 'mission_id'): ('integrated_missions', 'id'),
+    ('player_mission_success_tracking', 'criteria_id'): ('mission_success_criteria', 'id'),
+}
+
+# Supabase table name -> model table name, where the two differ
+TABLE_ALIASES = {
+    'jobs_market': 'job_market',
+}
+
+_COMPARISONS = {
+    'eq': operator.eq,
+    'neq': operator.ne,
+    'gt': operator.gt,
+    'gte': operator.ge,
+    'lt': operator.lt,
+    'lte': operator.le,
+}
+
+
+def _error(message: str, code: str, details: Optional[str] = None, hint: Optional[str] = None) -> APIError:
+    return APIError({'message': message, 'code': code, 'details': details, 'hint': hint})
+
+
+# -- column types ----------------------------------------------------------
+# Values are stored the way PostgREST prints them, so rows need no
+# conversion on the way out and string filters compare correctly.
+
+class _Uuid(TypeDecorator):
+    impl = String(36)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            return str(value if isinstance(value, uuid.UUID) else uuid.UUID(str(value)))
+        except ValueError:
+            raise _error(f'invalid input syntax for type uuid: "{value}"', '22P02')
+
+
+class _Timestamp(TypeDecorator):
+    """ISO-8601 text with fixed precision, so text order is time order"""
+
+    impl = String(40)
+    cache_ok = True
+
+    def __init__(self, with_timezone: bool = False):
+        super().__init__()
+        self.with_timezone = with_timezone
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+            except ValueError:
+                raise _error(f'invalid input syntax for type timestamp: "{value}"', '22007')
+        elif isinstance(value, date) and not isinstance(value, datetime):
+            value = datetime(value.year, value.month, value.day)
+        if self.with_timezone:
+            value = value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+        elif value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.isoformat(timespec='microseconds')
+
+
+class _Date(TypeDecorator):
+    impl = String(10)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, datetime):
+            return value.date().isoformat()
+        if isinstance(value, date):
+            return value.isoformat()
+        try:
+            return date.fromisoformat(str(value)[:10]).isoformat()
+        except ValueError:
+            raise _error(f'invalid input syntax for type date: "{value}"', '22007')
+
+
+class _Number(TypeDecorator):
+    """numeric: accepts '12.50', Decimal or float, returns a JSON number"""
+
+    impl = Float
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, float):
+            return value
+        try:
+            return float(Decimal(str(value)))
+        except (InvalidOperation, ValueError):
+            raise _error(f'invalid input syntax for type numeric: "{value}"', '22P02')
+
+
+class _Bool(TypeDecorator):
+    """boolean: PostgREST filters arrive as 'true' / 'false'"""
+
+    impl = Boolean
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if isinstance(value, str):
+            lowered = value.lower()
+            if lowered not in ('true', 'false', 't', 'f'):
+                raise _error(f'invalid input syntax for type boolean: "{value}"', '22P02')
+            return lowered in ('true', 't')
+        return None if value is None else bool(value)
+
+
+def _local_type(column_type: Any) -> Any:
+    if isinstance(column_type, Uuid):  # Includes postgresql.UUID
+        return _Uuid()
+    if isinstance(column_type, (JSON, ARRAY)):  # JSONB is a JSON, postgresql.ARRAY an ARRAY
+        return JSON()
+    if isinstance(column_type, DateTime):
+        return _Timestamp(bool(column_type.timezone))
+    if isinstance(column_type, Date):
+        return _Date()
+    if isinstance(column_type, Numeric):  # Includes Float
+        return _Number()
+    if isinstance(column_type, Boolean):
+        return _Bool()
+    if isinstance(column_type, Integer):
+        return Integer()
+    if isinstance(column_type, String):  # Includes Text
+        return Text()
+    return column_type
+
+
+def _build_metadata(source: MetaData) -> MetaData:
+    """Copy the model tables with PostgREST-shaped column types"""
+    metadata = MetaData()
+    for table in source.sorted_tables:
+        columns = []
+        for column in table.columns:
+            columns.append(Column(
+                column.name, _local_type(column.type),
+                primary_key=column.primary_key,
+                nullable=column.nullable,
+                unique=bool(column.unique) and not column.primary_key,
+                default=column.default.arg if column.default is not None else None,
+                onupdate=column.onupdate.arg if column.onupdate is not None else None,
+            ))
+        Table(table.name, metadata, *columns)
+
+    # Maintained by a trigger in 20261017060000_notification_digest.sql; no model
+    Table('notification_counters', metadata,
+          Column('user_id', _Uuid(), primary_key=True),
+          Column('unread_count', Integer(), nullable=False, default=0),
+          Column('updated_at', _Timestamp(True), nullable=False,
+                 default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc)))
+
+    # 20261017080000_void_counter_batches.sql; no model
+    Table('void_counter_batches', metadata,
+          Column('batch_id', _Uuid(), primary_key=True),
+          Column('applied_at', _Timestamp(True), nullable=False))
+    return metadata
+
+
+# -- PostgREST syntax --------------------------------------------------------
+
+def _split_top(text: str) -> List[str]:
+    """Split on commas outside parentheses and double quotes"""
+    parts, depth, quoted, current = [], 0, False, []
+    for ch in text:
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == '(':
+            depth += 1
+        elif not quoted and ch == ')':
+            depth -= 1
+        elif not quoted and depth == 0 and ch == ',':
+            parts.append(''.join(current).strip())
+            current = []
+            continue
+        current.append(ch)
+    if current or parts:
+        parts.append(''.join(current).strip())
+    return [p for p in parts if p]
+
+
+def _unquote(value: str) -> str:
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1].replace('\\"', '"')
+    return value
+
+
+_EMBED = re.compile(r'^(?:(?P<alias>\w+):)?(?P<table>\w+)(?:!\w+)?\((?P<inner>.*)\)$', re.DOTALL)
+_COLUMN = re.compile(r'^(?:(?P<alias>\w+):)?(?P<column>\w+)(?:::\w+)?$')
+
+
+def _parse_select(text: str) -> List[Tuple]:
+    """
+    '*, rental_properties(name)' ->
+        [('*',), ('embed', 'rental_properties', 'rental_properties', [('column', 'name', 'name')])]
+    """
+    items = []
+    for part in _split_top(text or '*'):
+        if part == '*':
+            items.append(('*',))
+            continue
+        embed = _EMBED.match(part)
+        if embed:
+            items.append(('embed', embed['table'], embed['alias'] or embed['table'],
+                          _parse_select(embed['inner'])))
+            continue
+        column = _COLUMN.match(part)
+        if not column:
+            raise _error(f'local backend cannot parse select item {part!r}', 'PGRST100')
+        items.append(('column', column['column'], column['alias'] or column['column']))
+    return items
+
+
+def _column(table: Table, name: str) -> Column:
+    try:
+        return table.c[name]
+    except KeyError:
+        raise _error(f'column {table.name}.{name} does not exist', '42703')
+
+
+def _condition(table: Table, column: str, op: str, value: Any, negate: bool = False):
+    """SQL for one `column op value` filter"""
+    col = _column(table, column)
+    if op == 'in':
+        if isinstance(value, str):
+            value = [_unquote(v) for v in _split_top(value.strip()[1:-1])]
+        clause = col.in_(list(value))
+    elif op == 'is':
+        lowered = str(value).lower()
+        if lowered == 'null':
+            clause = col.is_(None)
+        elif lowered in ('true', 'false'):
+            clause = col.is_(lowered == 'true')
+        else:
+            raise _error(f'is. only accepts null, true or false, got {value!r}', 'PGRST100')
+    elif op in ('like', 'ilike'):
+        pattern = str(value).replace('*', '%')
+        clause = col.like(pattern) if op == 'like' else col.ilike(pattern)
+    elif op in _COMPARISONS:
+        clause = _COMPARISONS[op](col, value)
+    else:
+        raise _error(f'local backend does not support the {op!r} operator', 'PGRST100')
+    return not_(clause) if negate else clause
+
+
+def _logic_tree(table: Table, text: str, conjunction: str = 'or'):
+    """or_('a.eq.1,and(b.gt.2,c.is.null)') -> SQL"""
+    clauses = []
+    for item in _split_top(text):
+        negate = item.startswith('not.') and item[4:].startswith(('and(', 'or('))
+        if negate:
+            item = item[4:]
+        nested = re.match(r'^(and|or)\((.*)\)$', item, re.DOTALL)
+        if nested:
+            clause = _logic_tree(table, nested.group(2), nested.group(1))
+            clauses.append(not_(clause) if negate else clause)
+            continue
+        try:
+            column, rest = item.split('.', 1)
+            filter_negate = rest.startswith('not.')
+            op, value = (rest[4:] if filter_negate else rest).split('.', 1)
+        except ValueError:
+            raise _error(f'local backend cannot parse filter {item!r}', 'PGRST100')
+        clauses.append(_condition(table, column, op, value if op == 'in' else _unquote(value), filter_negate))
+    return or_(*clauses) if conjunction == 'or' else and_(*clauses)
+
+
+# -- query builder -----------------------------------------------------------
+
+class LocalQueryBuilder:
+    """
+    One table(...) chain; mutates and returns itself like postgrest's builders
+    """
+
+    def __init__(self, local: 'LocalSupabase', table_name: str):
+        self._local = local
+        self._table_name = table_name
+        self._method = 'select'
+        self._columns = '*'
+        self._payload: Any = None
+        self._count: Optional[str] = None
+        self._head = False
+        self._returning = 'representation'
+        self._on_conflict: Optional[str] = None
+        self._ignore_duplicates = False
+        self._filters: List[Tuple] = []
+        self._order: List[Tuple[str, bool, Optional[bool]]] = []
+        self._limit: Optional[int] = None
+        self._offset = 0
+        self._single: Optional[str] = None
+        self._negate_next = False
+
+    # -- verbs --------------------------------------------------------------
+    def select(self, *columns: str, count: Optional[str] = None, head: Optional[bool] = None) -> 'LocalQueryBuilder':
+        self._method = 'select'
+        self._columns = ','.join(columns) or '*'
+        self._count = count
+        self._head = bool(head)
+        return self
+
+    def insert(self, json: Any, *, count: Optional[str] = None, returning: str = 'representation',
+               upsert: bool = False, default_to_null: bool = True) -> 'LocalQueryBuilder':
+        self._method = 'upsert' if upsert else 'insert'
+        self._payload = json
+        self._count = count
+        self._returning = getattr(returning, 'value', returning)
+        return self
+
+    def upsert(self, json: Any, *, count: Optional[str] = None, returning: str = 'representation',
+               ignore_duplicates: bool = False, on_conflict: str = '',
+               default_to_null: bool = True) -> 'LocalQueryBuilder':
+        self.insert(json, count=count, returning=returning, upsert=True)
+        self._on_conflict = on_conflict or None
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, json: Dict[str, Any], *, count: Optional[str] = None,
+               returning: str = 'representation') -> 'LocalQueryBuilder':
+        self._method = 'update'
+        self._payload = json
+        self._count = count
+        self._returning = getattr(returning, 'value', returning)
+        return self
+
+    def delete(self, *, count: Optional[str] = None, returning: str = 'representation') -> 'LocalQueryBuilder':
+        self._method = 'delete'
+        self._count = count
+        self._returning = getattr(returning, 'value', returning)
+        return self
+
+    # -- filters ------------------------------------------------------------
+    @property
+    def not_(self) -> 'LocalQueryBuilder':
+        self._negate_next = True
+        return self
+
+    def _add(self, column: str, op: str, value: Any) -> 'LocalQueryBuilder':
+        self._filters.append(('filter', column, op, value, self._negate_next))
+        self._negate_next = False
+        return self
+
+    def eq(self, column: str, value: Any) -> 'LocalQueryBuilder':
+        return self._add(column, 'eq', value)
+
+    def neq(self, column: str, value: Any) -> 'LocalQueryBuilder':
+        return self._add(column, 'neq', value)
+
+    def gt(self, column: str, value: Any) -> 'LocalQueryBuilder':
+        return self._add(column, 'gt', value)
+
+    def gte(self, column: str, value: Any) -> 'LocalQueryBuilder':
+        return self._add(column, 'gte', value)
+
+    def lt(self, column: str, value: Any) -> 'LocalQueryBuilder':
+        return self._add(column, 'lt', value)
+
+    def lte(self, column: str, value: Any) -> 'LocalQueryBuilder':
+        return self._add(column, 'lte', value)
+
+    def like(self, column: str, pattern: str) -> 'LocalQueryBuilder':
+        return self._add(column, 'like', pattern)
+
+    def ilike(self, column: str, pattern: str) -> 'LocalQueryBuilder':
+        return self._add(column, 'ilike', pattern)
+
+    def is_(self, column: str, value: Any) -> 'LocalQueryBuilder':
+        return self._add(column, 'is', 'null' if value is None else value)
+
+    def in_(self, column: str, values: Iterable[Any]) -> 'LocalQueryBuilder':
+        return self._add(column, 'in', list(values))
+
+    def filter(self, column: str, operator: str, criteria: Any) -> 'LocalQueryBuilder':
+        if operator.startswith('not.'):
+            self._negate_next = True
+            operator = operator[4:]
+        return self._add(column, operator, _unquote(criteria) if isinstance(criteria, str) and operator != 'in'
+                         else criteria)
+
+    def match(self, query: Dict[str, Any]) -> 'LocalQueryBuilder':
+        for column, value in query.items():
+            self.eq(column, value)
+        return self
+
+    def or_(self, filters: str, reference_table: Optional[str] = None) -> 'LocalQueryBuilder':
+        if reference_table:
+            raise _error('local backend does not support or_ on embedded tables', 'PGRST100')
+        self._filters.append(('or', filters, self._negate_next))
+        self._negate_next = False
+        return self
+
+    # -- modifiers ----------------------------------------------------------
+    def order(self, column: str, *, desc: bool = False, nullsfirst: Optional[bool] = None,
+              foreign_table: Optional[str] = None) -> 'LocalQueryBuilder':
+        if foreign_table:
+            raise _error('local backend does not support ordering embedded tables', 'PGRST100')
+        self._order.append((column, desc, nullsfirst))
+        return self
+
+    def limit(self, size: int, *, foreign_table: Optional[str] = None) -> 'LocalQueryBuilder':
+        if foreign_table:
+            raise _error('local backend does not support limiting embedded tables', 'PGRST100')
+        self._limit = size
+        return self
+
+    def offset(self, size: int) -> 'LocalQueryBuilder':
+        self._offset = size
+        return self
+
+    def range(self, start: int, end: int, foreign_table: Optional[str] = None) -> 'LocalQueryBuilder':
+        self.limit(end - start + 1, foreign_table=foreign_table)
+        self._offset = start
+        return self
+
+    def single(self) -> 'LocalQueryBuilder':
+        self._single = 'single'
+        return self
+
+    def maybe_single(self) -> 'LocalQueryBuilder':
+        self._single = 'maybe'
+        return self
+
+    # -- execution ----------------------------------------------------------
+    def execute(self) -> Any:
+        self._local.delay()
+        table = self._local.get_table(self._table_name)
+        with self._local.transaction() as conn:
+            if self._method == 'select':
+                rows, count = self._select(conn, table)
+            else:
+                rows = getattr(self, f'_{self._method}')(conn, table)
+                count = len(rows) if self._count else None
+                self._local.run_triggers(conn, table.name, rows)
+                if self._returning == 'minimal':
+                    rows = []
+        return self._response(rows, count)
+
+    def _where(self, table: Table) -> list:
+        clauses = []
+        for entry in self._filters:
+            if entry[0] == 'or':
+                clause = _logic_tree(table, entry[1])
+                clauses.append(not_(clause) if entry[2] else clause)
+            else:
+                _, column, op, value, negate = entry
+                clauses.append(_condition(table, column, op, value, negate))
+        return clauses
+
+    def _select(self, conn, table: Table) -> Tuple[List[dict], Optional[int]]:
+        where = self._where(table)
+        count = None
+        if self._count:
+            count = conn.execute(select(func.count()).select_from(table).where(*where)).scalar()
+        if self._head:
+            return [], count
+
+        statement = select(table).where(*where)
+        for name, desc, nullsfirst in self._order:
+            column = _column(table, name)
+            ordered = column.desc() if desc else column.asc()
+            # Postgres puts NULLs last ascending and first descending
+            first = desc if nullsfirst is None else nullsfirst
+            statement = statement.order_by(ordered.nulls_first() if first else ordered.nulls_last())
+        if self._limit is not None:
+            statement = statement.limit(self._limit)
+        if self._offset:
+            statement = statement.offset(self._offset)
+
+        rows = [dict(row._mapping) for row in conn.execute(statement)]
+        return self._local.shape(conn, table, _parse_select(self._columns), rows), count
+
+    def _checked(self, table: Table, row: Dict[str, Any]) -> Dict[str, Any]:
+        for key in row:
+            if key not in table.c:
+                raise _error(f"Could not find the '{key}' column of '{self._table_name}' in the schema cache",
+                             'PGRST204')
+        return row
+
+    def _rows(self, table: Table) -> List[Dict[str, Any]]:
+        payload = self._payload if isinstance(self._payload, list) else [self._payload]
+        return [self._checked(table, dict(row)) for row in payload]
+
+    def _insert(self, conn, table: Table) -> List[dict]:
+        return [dict(conn.execute(table.insert().values(**row).returning(*table.c)).one()._mapping)
+                for row in self._rows(table)]
+
+    def _upsert(self, conn, table: Table) -> List[dict]:
+        keys = ([c.strip() for c in self._on_conflict.split(',')] if self._on_conflict
+                else [c.name for c in table.primary_key.columns])
+        written = []
+        for row in self._rows(table):
+            if all(key in row for key in keys):
+                match = and_(*(_column(table, key) == row[key] for key in keys))
+                if conn.execute(select(func.count()).select_from(table).where(match)).scalar():
+                    if self._ignore_duplicates:
+                        continue
+                    updated = conn.execute(table.update().where(match).values(**row).returning(*table.c))
+                    written.extend(dict(r._mapping) for r in updated)
+                    continue
+            written.append(dict(conn.execute(table.insert().values(**row).returning(*table.c)).one()._mapping))
+        return written
+
+    def _update(self, conn, table: Table) -> List[dict]:
+        statement = table.update().where(*self._where(table)).values(**self._checked(table, dict(self._payload)))
+        return [dict(row._mapping) for row in conn.execute(statement.returning(*table.c))]
+
+    def _delete(self, conn, table: Table) -> List[dict]:
+        statement = table.delete().where(*self._where(table))
+        return [dict(row._mapping) for row in conn.execute(statement.returning(*table.c))]
+
+    def _response(self, rows: List[dict], count: Optional[int]) -> Any:
+        if self._single is None:
+            return APIResponse.model_construct(data=rows, count=count)
+        if len(rows) == 1:
+            return SingleAPIResponse.model_construct(data=rows[0], count=count)
+        if not rows and self._single == 'maybe':
+            return None
+        raise _error('JSON object requested, multiple (or no) rows returned', 'PGRST116',
+                     details=f'The result contains {len(rows)} rows')
+
+
+class LocalRpcBuilder:
+    """rpc(fn, params): runs the registered Python twin of the SQL function"""
+
+    def __init__(self, local: 'LocalSupabase', fn: str, params: Optional[Dict[str, Any]]):
+        self._local = local
+        self._fn = fn
+        self._params = dict(params or {})
+        self._single: Optional[str] = None
+
+    def single(self) -> 'LocalRpcBuilder':
+        self._single = 'single'
+        return self
+
+    def maybe_single(self) -> 'LocalRpcBuilder':
+        self._single = 'maybe'
+        return self
+
+    def execute(self) -> Any:
+        function = self._local.functions.get(self._fn)
+        self._local.delay()
+        if function is None:
+            raise _error(f'Could not find the function public.{self._fn} in the schema cache', 'PGRST202')
+        # Only a parameter mismatch is PGRST202; a TypeError raised inside
+        # the twin is a bug in it and propagates as such
+        try:
+            inspect.signature(function).bind(self._local, None, **self._params)
+        except TypeError as error:
+            raise _error(f'public.{self._fn}: {error}', 'PGRST202')
+        with self._local.transaction() as conn:
+            data = function(self._local, conn, **self._params)
+        if self._single and isinstance(data, list):
+            if len(data) == 1:
+                return SingleAPIResponse.model_construct(data=data[0], count=None)
+            if not data and self._single == 'maybe':
+                return None
+            raise _error('JSON object requested, multiple (or no) rows returned', 'PGRST116')
+        return APIResponse.model_construct(data=data, count=None)
+
+
+class LocalAuth:
+    """sign_up / sign_in_with_password against an in-memory user list"""
+
+    def __init__(self):
+        self._users: Dict[str, Tuple[str, User]] = {}
+        self._lock = threading.Lock()
+
+    def create_user(self, email: str, password: str, user_id: Optional[str] = None,
+                    metadata: Optional[Dict[str, Any]] = None) -> User:
+        """Register a user directly, e.g. to seed players whose profiles already exist"""
+        email = email.lower()
+        with self._lock:
+            if email in self._users:
+                raise AuthApiError('User already registered', 422, 'user_already_exists')
+            user = User(id=str(user_id or uuid.uuid4()), email=email, aud='authenticated',
+                        app_metadata={'provider': 'email'}, user_metadata=metadata or {},
+                        created_at=datetime.now(timezone.utc))
+            self._users[email] = (password, user)
+        return user
+
+    def sign_up(self, credentials: Dict[str, Any]) -> AuthResponse:
+        user = self.create_user(credentials['email'], credentials['password'],
+                                metadata=(credentials.get('options') or {}).get('data'))
+        return AuthResponse(user=user, session=self._session(user))
+
+    def sign_in_with_password(self, credentials: Dict[str, Any]) -> AuthResponse:
+        with self._lock:
+            password, user = self._users.get(credentials['email'].lower(), (None, None))
+        if user is None or password != credentials['password']:
+            raise AuthApiError('Invalid login credentials', 400, 'invalid_credentials')
+        return AuthResponse(user=user, session=self._session(user))
+
+    @staticmethod
+    def _session(user: User) -> Session:
+        from app.utils.jwt_helper import create_token
+        return Session(access_token=create_token(user.id, user.email), refresh_token=uuid.uuid4().hex,
+                       expires_in=7 * 24 * 3600, token_type='bearer', user=user)
+
+
+class LocalSupabase:
+    """
+    In-process stand-in for a supabase Client
+
+    Args:
+        url: SQLAlchemy URL of the backing database ('sqlite://' = in memory)
+        latency_ms / jitter_ms: Injected delay per execute()
+        functions: rpc name -> twin, defaults to local_supabase_functions.FUNCTIONS
+        metadata: Model metadata to build the schema from (db.metadata)
+    """
+
+    def __init__(self, url: str = 'sqlite://', latency_ms: float = 0, jitter_ms: float = 0,
+                 functions: Optional[Dict[str, Callable]] = None, metadata: Optional[MetaData] = None):
+        from app.utils import local_supabase_functions
+
+        if metadata is None:
+            from app import db
+            import app.models
+            # Not every model is re-exported by app.models; register them all
+            for module in pkgutil.iter_modules(app.models.__path__):
+                importlib.import_module(f'app.models.{module.name}')
+            metadata = db.metadata
+
+        options = {'execution_options': {'request_metrics': False}}  # Counted as supabase calls
+        if url.startswith('sqlite'):
+            options.update(connect_args={'check_same_thread': False})
+            if url in ('sqlite://', 'sqlite:///:memory:'):
+                options.update(poolclass=StaticPool)
+        self.engine = create_engine(url, **options)
+        self.metadata = _build_metadata(metadata)
+        self.relationships = {
+            (fk.parent.table.name, fk.parent.name): (fk.column.table.name, fk.column.name)
+            for table in metadata.tables.values() for fk in table.foreign_keys
+        }
+        self.relationships.update(RELATIONSHIPS)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.functions = dict(local_supabase_functions.FUNCTIONS if functions is None else functions)
+        self.triggers = dict(local_supabase_functions.TRIGGERS)
+        self.auth = LocalAuth()
+        # SQLite allows one writer; one lock also keeps the shared
+        # in-memory connection safe for the dashboard's worker threads
+        self._lock = threading.RLock() if self.engine.dialect.name == 'sqlite' else None
+
+    @classmethod
+    def from_config(cls, config) -> 'LocalSupabase':
+        local = cls(url=config.get('LOCAL_SUPABASE_URL', 'sqlite://'),
+                    latency_ms=config.get('LOCAL_SUPABASE_LATENCY_MS', 0),
+                    jitter_ms=config.get('LOCAL_SUPABASE_JITTER_MS', 0))
+        local.create_schema()
+        return local
+
+    # -- supabase Client API --------------------------------------------------
+    def table(self, table_name: str) -> LocalQueryBuilder:
+        return LocalQueryBuilder(self, table_name)
+
+    from_ = table
+
+    def rpc(self, fn: str, params: Optional[Dict[str, Any]] = None, **_options) -> LocalRpcBuilder:
+        return LocalRpcBuilder(self, fn, params)
+
+    # -- database -------------------------------------------------------------
+    def create_schema(self) -> None:
+        """Create any missing tables (safe to call on an existing database)"""
+        self.metadata.create_all(self.engine)
+
+    def get_table(self, table_name: str) -> Table:
+        try:
+            return self.metadata.tables[TABLE_ALIASES.get(table_name, table_name)]
+        except KeyError:
+            raise _error(f'relation "public.{table_name}" does not exist', '42P01')
+
+    def delay(self) -> None:
+        if self.latency_ms or self.jitter_ms:
+            time.sleep((self.latency_ms + random.uniform(0, self.jitter_ms)) / 1000)
+
+    @contextmanager
+    def transaction(self):
+        """A connection in a transaction; database errors surface as postgrest APIError"""
+        if self._lock is not None:
+            self._lock.acquire()
+        try:
+            with self.engine.begin() as conn:
+                yield conn
+        except StatementError as error:
+            if isinstance(error.orig, APIError):
+                raise error.orig
+            if isinstance(error, IntegrityError):
+                message = str(error.orig)
+                code = '23505' if 'UNIQUE' in message.upper() else '23502' if 'NOT NULL' in message.upper() else '23000'
+                raise _error(message, code)
+            raise _error(str(error.orig), 'XX000')
+        except SQLAlchemyError as error:
+            raise _error(str(error), 'XX000')
+        finally:
+            if self._lock is not None:
+                self._lock.release()
+
+    def run_triggers(self, conn, table_name: str, rows: List[dict]) -> None:
+        trigger = self.triggers.get(table_name)
+        if trigger is not None and rows:
+            trigger(self, conn, rows)
+
+    def seed(self, table_name: str, rows: Iterable[Dict[str, Any]]) -> List[dict]:
+        """Insert fixture rows directly (no latency), returning them as stored"""
+        rows = list(rows)
+        if not rows:
+            return []
+        table = self.get_table(table_name)
+        with self.transaction() as conn:
+            written = self.table(table_name).insert(rows)._insert(conn, table)
+            self.run_triggers(conn, table.name, written)
+        return written
+
+    def shape(self, conn, table: Table, items: List[Tuple], rows: List[dict]) -> List[dict]:
+        """Project fetched rows onto the select items, loading embeds one query per embed"""
+        shaped = [{} for _ in rows]
+        for item in items:
+            if item[0] == '*':
+                for out, row in zip(shaped, rows):
+                    out.update(row)
+            elif item[0] == 'column':
+                _column(table, item[1])
+                for out, row in zip(shaped, rows):
+                    out[item[2]] = row[item[1]]
+        for item in items:
+            if item[0] == 'embed':
+                self._embed(conn, table, item, rows, shaped)
+        return shaped
+
+    def _relationship(self, parent: str, child: str) -> Tuple[str, str, bool]:
+        """(parent column, child column, child is many) for a parent(child(...)) embed"""
+        for (table, column), (target, target_column) in self.relationships.items():
+            if table == parent and target == child:
+                return column, target_column, False
+            if table == child and target == parent:
+                return target_column, column, True
+        raise _error(f"Could not find a relationship between '{parent}' and '{child}' in the schema cache",
+                     'PGRST200')
+
+    def _embed(self, conn, parent: Table, item: Tuple, rows: List[dict], shaped: List[dict]) -> None:
+        _, child_name, alias, child_items = item
+        child = self.get_table(child_name)
+        local, remote, many = self._relationship(parent.name, child.name)
+        keys = sorted({row[local] for row in rows if row.get(local) is not None})
+        children = [dict(r._mapping) for r in conn.execute(select(child).where(child.c[remote].in_(keys)))] if keys else []
+        child_shaped = self.shape(conn, child, child_items, children)
+
+        grouped: Dict[Any, List[dict]] = {}
+        for raw, out in zip(children, child_shaped):
+            grouped.setdefault(raw[remote], []).append(out)
+        for row, out in zip(rows, shaped):
+            matches = grouped.get(row.get(local), [])
+            out[alias] = matches if many else (matches[0] if matches else None)
@@ -0,0 +1,258 @@
+"""
+Python twins of the SQL functions and triggers in supabase/migrations, for
+LocalSupabase. Each one takes (local, conn, **params) - the same named
+parameters PostgREST passes to the real function - and runs inside the
+single transaction LocalSupabase opened for the call. Keep them in step with
+the migration named in each docstring.
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, func, or_, select
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def apply_balance_delta(local, conn, p_user_id: str, p_delta: Any, p_description: str,
+                        p_category: str = 'balance_adjustment') -> Dict[str, Any]:
+    """20261017000000_apply_balance_delta.sql"""
+    balances = local.get_table('user_balances')
+    delta = float(Decimal(str(p_delta)))
+    row = conn.execute(
+        select(balances.c.current_balance).where(balances.c.user_id == p_user_id).with_for_update()
+    ).first()
+    if row is None:
+        return {'success': False, 'error': 'BALANCE_NOT_FOUND'}
+
+    balance = round((row.current_balance or 0) + delta, 2)
+    if delta < 0 and balance < 0:
+        return {'success': False, 'error': 'INSUFFICIENT_FUNDS', 'current_balance': row.current_balance}
+
+    now = _now()
+    conn.execute(balances.update().where(balances.c.user_id == p_user_id)
+                 .values(current_balance=balance, updated_at=now))
+    transaction_id = str(uuid.uuid4())
+    conn.execute(local.get_table('transactions').insert().values(
+        id=transaction_id, user_id=p_user_id, type='income' if delta >= 0 else 'expense',
+        category=p_category, amount=abs(delta), description=p_description,
+        transaction_date=now, created_at=now
+    ))
+    return {'success': True, 'new_balance': balance, 'transaction_id': transaction_id}
+
+
+def toggle_void_reaction(local, conn, p_user_id: str, p_post_id: str, p_reaction_type: str,
+                         p_apply_counters: bool = True) -> Dict[str, Any]:
+    """20261017030000_void_reaction_write_behind.sql"""
+    if p_reaction_type not in ('oof', 'same'):
+        return {'success': False, 'error': 'INVALID_REACTION'}
+
+    posts = local.get_table('void_posts')
+    reactions = local.get_table('void_reactions')
+    post = conn.execute(select(posts.c.user_id, posts.c.oof_count, posts.c.same_count)
+                        .where(posts.c.id == p_post_id)).first()
+    if post is None:
+        return {'success': False, 'error': 'POST_NOT_FOUND'}
+
+    existing = conn.execute(select(reactions.c.id, reactions.c.reaction_type).where(
+        reactions.c.user_id == p_user_id, reactions.c.post_id == p_post_id).limit(1)).first()
+    if existing is None:
+        conn.execute(reactions.insert().values(user_id=p_user_id, post_id=p_post_id, reaction_type=p_reaction_type))
+        action = 'added'
+    elif existing.reaction_type == p_reaction_type:
+        conn.execute(reactions.delete().where(reactions.c.id == existing.id))
+        action = 'removed'
+    else:
+        conn.execute(reactions.update().where(reactions.c.id == existing.id).values(reaction_type=p_reaction_type))
+        action = 'switched'
+
+    deltas = {'oof': 0, 'same': 0}
+    if action in ('added', 'switched'):
+        deltas[p_reaction_type] += 1
+    if action in ('removed', 'switched'):
+        deltas[existing.reaction_type] -= 1
+
+    oof_count, same_count = post.oof_count or 0, post.same_count or 0
+    if p_apply_counters:
+        oof_count = max(0, oof_count + deltas['oof'])
+        same_count = max(0, same_count + deltas['same'])
+        conn.execute(posts.update().where(posts.c.id == p_post_id)
+                     .values(oof_count=oof_count, same_count=same_count))
+
+    if action in ('added', 'switched') and p_reaction_type == 'same' and post.user_id != p_user_id:
+        profiles = local.get_table('profiles')
+        conn.execute(profiles.update().where(profiles.c.user_id == post.user_id, profiles.c.sanity < 100)
+                     .values(sanity=profiles.c.sanity + 1))
+
+    return {
+        'success': True,
+        'action': action,
+        'reaction': None if action == 'removed' else p_reaction_type,
+        'oof_count': oof_count,
+        'same_count': same_count,
+        'oof_delta': deltas['oof'],
+        'same_delta': deltas['same'],
+    }
+
+
+def apply_void_reaction_counts(local, conn, p_deltas: List[Dict[str, Any]],
+                               p_batch_id: Optional[str] = None) -> int:
+    """20261017080000_void_counter_batches.sql"""
+    if p_batch_id is not None:
+        batches = local.get_table('void_counter_batches')
+        if conn.execute(select(batches.c.batch_id).where(batches.c.batch_id == p_batch_id)).first():
+            return 0
+        now = _now()
+        conn.execute(batches.insert().values(batch_id=p_batch_id, applied_at=now))
+        conn.execute(batches.delete().where(batches.c.applied_at < now - timedelta(days=1)))
+
+    posts = local.get_table('void_posts')
+    updated = 0
+    for delta in sorted(p_deltas, key=lambda d: str(d['post_id'])):
+        row = conn.execute(select(posts.c.oof_count, posts.c.same_count)
+                           .where(posts.c.id == delta['post_id'])).first()
+        if row is None:
+            continue
+        conn.execute(posts.update().where(posts.c.id == delta['post_id']).values(
+            oof_count=max(0, (row.oof_count or 0) + int(delta.get('oof') or 0)),
+            same_count=max(0, (row.same_count or 0) + int(delta.get('same') or 0))
+        ))
+        updated += 1
+    return updated
+
+
+def notify(local, conn, p_user_id: str, p_type: str, p_title: str, p_message: str,
+           p_collapse_key: Optional[str] = None, p_window_seconds: int = 3600,
+           p_digest_title: Optional[str] = None, p_digest_message: Optional[str] = None,
+           p_related_user_id: Optional[str] = None, p_asset_id: Optional[str] = None) -> Dict[str, Any]:
+    """20261017060000_notification_digest.sql"""
+    notifications = local.get_table('notifications')
+    now = _now()
+
+    if p_collapse_key is not None:
+        existing = conn.execute(select(notifications.c.id, notifications.c.group_count, notifications.c.related_user_id,
+                                       notifications.c.asset_id).where(
+            notifications.c.user_id == p_user_id,
+            notifications.c.collapse_key == p_collapse_key,
+            notifications.c.read.is_(False),
+            notifications.c.created_at > now - timedelta(seconds=p_window_seconds)
+        ).order_by(notifications.c.created_at.desc()).limit(1)).first()
+
+        if existing is not None:
+            count = existing.group_count + 1
+            conn.execute(notifications.update().where(notifications.c.id == existing.id).values(
+                group_count=count,
+                title=(p_digest_title or p_title).replace('{count}', str(count)),
+                message=(p_digest_message or p_message).replace('{count}', str(count)),
+                related_user_id=p_related_user_id or existing.related_user_id,
+                asset_id=p_asset_id or existing.asset_id,
+                updated_at=now
+            ))
+            return {'success': True, 'notification_id': existing.id, 'collapsed': True, 'group_count': count}
+
+    notification_id = str(uuid.uuid4())
+    conn.execute(notifications.insert().values(
+        id=notification_id, user_id=p_user_id, type=p_type, title=p_title, message=p_message,
+        related_user_id=p_related_user_id, asset_id=p_asset_id, read=False, collapse_key=p_collapse_key,
+        group_count=1, created_at=now, updated_at=now
+    ))
+    sync_notification_counters(local, conn, [{'user_id': p_user_id}])
+    return {'success': True, 'notification_id': notification_id, 'collapsed': False, 'group_count': 1}
+
+
+def send_chat_message(local, conn, p_sender_id: str, p_recipient_id: str, p_content: str,
+                      p_message_id: Optional[str] = None, p_verify_recipient: bool = True) -> Dict[str, Any]:
+    """20261017060000_notification_digest.sql (supersedes 20261017050000)"""
+    if p_verify_recipient:
+        profiles = local.get_table('profiles')
+        if conn.execute(select(profiles.c.id).where(profiles.c.user_id == p_recipient_id)).first() is None:
+            return {'success': False, 'error': 'RECIPIENT_NOT_FOUND'}
+
+    message_id = p_message_id or str(uuid.uuid4())
+    timestamp = _now()
+    conn.execute(local.get_table('chat_messages').insert().values(
+        id=message_id, sender_id=p_sender_id, recipient_id=p_recipient_id, content=p_content,
+        status='sent', type='text', timestamp=timestamp
+    ))
+    notification = notify(local, conn, p_recipient_id, 'system', 'New Message', 'You have a new message',
+                          p_collapse_key=f'chat:{p_sender_id}',
+                          p_digest_message='You have {count} new messages',
+                          p_related_user_id=p_sender_id)
+    return {
+        'success': True,
+        'message_id': message_id,
+        'timestamp': timestamp.isoformat(),
+        'notification_collapsed': notification['collapsed'],
+    }
+
+
+def chat_conversations(local, conn, p_user_id: str, p_limit: int = 20,
+                       p_before_timestamp: Optional[str] = None,
+                       p_before_peer_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """20261017040000_chat_conversations.sql"""
+    messages = local.get_table('chat_messages')
+    user_id = str(uuid.UUID(str(p_user_id)))
+    rows = conn.execute(select(messages).where(
+        or_(messages.c.sender_id == user_id, messages.c.recipient_id == user_id)
+    )).mappings().all()
+
+    latest: Dict[str, Any] = {}
+    unread: Dict[str, int] = {}
+    for row in rows:
+        peer_id = row['recipient_id'] if row['sender_id'] == user_id else row['sender_id']
+        if peer_id not in latest or (row['timestamp'], row['id']) > (latest[peer_id]['timestamp'], latest[peer_id]['id']):
+            latest[peer_id] = row
+        if row['recipient_id'] == user_id and row['sender_id'] != user_id and row['status'] != 'read':
+            unread[peer_id] = unread.get(peer_id, 0) + 1
+
+    timestamp_type = messages.c.timestamp.type
+    before = None
+    if p_before_timestamp is not None:
+        before = (timestamp_type.process_bind_param(p_before_timestamp, conn.dialect),
+                  str(uuid.UUID(str(p_before_peer_id))))
+
+    page = sorted(
+        ({'peer_id': peer_id, 'message_id': row['id'], 'sender_id': row['sender_id'],
+          'recipient_id': row['recipient_id'], 'content': row['content'], 'status': row['status'],
+          'type': row['type'], 'timestamp': row['timestamp'], 'unread_count': unread.get(peer_id, 0)}
+         for peer_id, row in latest.items()
+         if before is None or (row['timestamp'], peer_id) < before),
+        key=lambda r: (r['timestamp'], r['peer_id']), reverse=True
+    )
+    return page[:min(max(int(p_limit), 1), 101)]
+
+
+def sync_notification_counters(local, conn, rows: Iterable[Dict[str, Any]]) -> None:
+    """
+    Trigger twin from 20261017060000_notification_digest.sql: keeps
+    notification_counters.unread_count right for every user whose rows changed
+    """
+    notifications = local.get_table('notifications')
+    counters = local.get_table('notification_counters')
+    for user_id in {str(row['user_id']) for row in rows if row.get('user_id')}:
+        unread = conn.execute(select(func.count()).select_from(notifications).where(and_(
+            notifications.c.user_id == user_id, notifications.c.read.is_(False)
+        ))).scalar()
+        updated = conn.execute(counters.update().where(counters.c.user_id == user_id)
+                               .values(unread_count=unread, updated_at=_now()))
+        if not updated.rowcount:
+            conn.execute(counters.insert().values(user_id=user_id, unread_count=unread))
+
+
+FUNCTIONS = {
+    'apply_balance_delta': apply_balance_delta,
+    'toggle_void_reaction': toggle_void_reaction,
+    'apply_void_reaction_counts': apply_void_reaction_counts,
+    'notify': notify,
+    'send_chat_message': send_chat_message,
+    'chat_conversations': chat_conversations,
+}
+
+# Table -> twin run after every insert/update/delete with the affected rows
+TRIGGERS = {
+    'notifications': sync_notification_counters,
+}
@@ -0,0 +1,213 @@
+"""
+Query budgets
+=============
+
+🎓 LEARNING: N+1 patterns hide in code that looks harmless - a helper that
+does one lookup, called from a loop. They pass review, pass tests on three
+rows, and show up in production as a route making 200 calls.
+
+A query budget declares what a route or job step is allowed to cost:
+
+```python
+from app.utils.query_budget import query_budget
+
+@mission_bp.route('/start', methods=['POST'])
+@require_auth
+@query_budget('missions.start', max_calls=12, max_repeats=2)
+def start_mission(current_user_id: str):
+    ...
+
+# Or around one step of a job
+with query_budget('daily_mentor_analysis.chunk', max_sql=10, max_repeats=2):
+    MentorService.analyze_players_batch(user_ids)
+```
+
+Limits (any may be None):
+- max_calls:    Supabase round trips + SQL statements
+- max_supabase: Supabase round trips only
+- max_sql:      SQL statements only
+- max_repeats:  How often one query *shape* may run. A shape is the query
+                without its values - profiles.select(username).eq(user_id).single()
+                or the parameterized SQL text - so a loop of lookups is caught
+                even when the total stays under budget.
+
+Calls are observed through app/utils/request_metrics.py: Supabase round trips
+made via RequestScopedClient (memo hits are free) and every SQLAlchemy
+statement. Budgets nest, and the dashboard's worker threads inherit them.
+
+VIOLATIONS:
+Logged as a warning with the most repeated shapes, counted in
+app_query_budget_violations_total on /metrics and kept in recent_violations().
+With QUERY_BUDGET_STRICT (on in TestingConfig) the budget raises
+QueryBudgetExceeded instead, so a test that exercises the code path fails
+the moment an N+1 is introduced.
+"""
+
+import functools
+import logging
+import threading
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from flask import current_app, has_app_context
+
+from app.utils import request_metrics
+
+logger = logging.getLogger(__name__)
+
+MAX_RECENT_VIOLATIONS = 100
+
+# Filters whose first argument is a column name (kept in the shape; values are not)
+_COLUMN_STEPS = frozenset((
+    'select', 'eq', 'neq', 'gt', 'gte', 'lt', 'lte', 'like', 'ilike', 'is_', 'in_',
+    'contains', 'contained_by', 'filter', 'order', 'text_search',
+))
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised in strict mode when a budgeted block makes too many calls"""
+
+    def __init__(self, violation: Dict[str, Any]):
+        self.violation = violation
+        super().__init__(describe_violation(violation))
+
+
+def supabase_shape(table: str, steps: Tuple) -> str:
+    """profiles.select(username).eq(user_id).single() for a recorded builder chain"""
+    if table.startswith('rpc:'):
+        return table
+    parts = []
+    for name, args, _kwargs in steps:
+        if name in _COLUMN_STEPS and args and isinstance(args[0], str):
+            parts.append(f'{name}({args[0]})')
+        else:
+            parts.append(f'{name}()')
+    return '.'.join([table] + parts)
+
+
+def describe_violation(violation: Dict[str, Any]) -> str:
+    limits = ', '.join(violation['exceeded'])
+    repeated = '; '.join(f'{n}x {shape}' for shape, n in violation['top_shapes'])
+    return f"Query budget '{violation['name']}' exceeded ({limits}). Most repeated: {repeated}"
+
+
+class QueryBudget:
+    """Counts the calls made inside one `with` block"""
+
+    def __init__(self, name: str, max_calls: Optional[int] = None, max_supabase: Optional[int] = None,
+                 max_sql: Optional[int] = None, max_repeats: Optional[int] = None,
+                 strict: Optional[bool] = None):
+        self.name = name
+        self.max_calls = max_calls
+        self.max_supabase = max_supabase
+        self.max_sql = max_sql
+        self.max_repeats = max_repeats
+        self.strict = strict
+        self.calls = {backend: 0 for backend in request_metrics.BACKENDS}
+        self.shapes: Counter = Counter()
+        self._lock = threading.Lock()
+        self._token = None
+
+    # -- used as a decorator ------------------------------------------------
+    def __call__(self, func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # A fresh budget per call; this instance only holds the limits
+            with QueryBudget(self.name, self.max_calls, self.max_supabase, self.max_sql,
+                             self.max_repeats, self.strict):
+                return func(*args, **kwargs)
+        return wrapper
+
+    # -- used as a context manager -----------------------------------------
+    def __enter__(self) -> 'QueryBudget':
+        self._token = _active.set(_active.get() + (self,))
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _active.reset(self._token)
+        violation = self.violation()
+        if violation is None:
+            return False
+        _record(violation)
+        if exc_type is None and self._strict():
+            raise QueryBudgetExceeded(violation)
+        return False
+
+    def observe(self, backend: str, shape: str) -> None:
+        with self._lock:
+            self.calls[backend] += 1
+            self.shapes[shape] += 1
+
+    @property
+    def total(self) -> int:
+        return sum(self.calls.values())
+
+    def violation(self) -> Optional[Dict[str, Any]]:
+        """None if within budget, else what was exceeded and the repeated shapes"""
+        with self._lock:
+            exceeded = []
+            checks = (('calls', self.max_calls, self.total),
+                      ('supabase', self.max_supabase, self.calls['supabase']),
+                      ('sql', self.max_sql, self.calls['sql']))
+            for label, limit, used in checks:
+                if limit is not None and used > limit:
+                    exceeded.append(f'{label} {used} > {limit}')
+            top_shapes = self.shapes.most_common(3)
+            if self.max_repeats is not None and top_shapes and top_shapes[0][1] > self.max_repeats:
+                exceeded.append(f'repeats {top_shapes[0][1]} > {self.max_repeats}')
+            if not exceeded:
+                return None
+            return {
+                'name': self.name,
+                'exceeded': exceeded,
+                'calls': dict(self.calls),
+                'top_shapes': top_shapes,
+            }
+
+    def _strict(self) -> bool:
+        if self.strict is not None:
+            return self.strict
+        return has_app_context() and current_app.config.get('QUERY_BUDGET_STRICT', False)
+
+
+def query_budget(name: str, max_calls: Optional[int] = None, max_supabase: Optional[int] = None,
+                 max_sql: Optional[int] = None, max_repeats: Optional[int] = None,
+                 strict: Optional[bool] = None) -> QueryBudget:
+    """Budget usable as `@query_budget(...)` or `with query_budget(...)`"""
+    return QueryBudget(name, max_calls, max_supabase, max_sql, max_repeats, strict)
+
+
+_active: ContextVar[Tuple[QueryBudget, ...]] = ContextVar('query_budgets', default=())
+_recent: Deque[Dict[str, Any]] = deque(maxlen=MAX_RECENT_VIOLATIONS)
+_recent_lock = threading.Lock()
+
+
+def _observe(backend: str, target: str, shape: Optional[Callable[[], str]]) -> None:
+    budgets = _active.get()
+    if not budgets:
+        return
+    described = shape() if shape is not None else target
+    for budget in budgets:
+        budget.observe(backend, described)
+
+
+def _record(violation: Dict[str, Any]) -> None:
+    logger.warning(describe_violation(violation))
+    request_metrics.metrics.record_violation(violation['name'])
+    with _recent_lock:
+        _recent.append(violation)
+
+
+def recent_violations() -> List[Dict[str, Any]]:
+    """Most recent violations in this process, oldest first"""
+    with _recent_lock:
+        return list(_recent)
+
+
+def clear_violations() -> None:
+    with _recent_lock:
+        _recent.clear()
+
+
+request_metrics.add_observer(_observe)
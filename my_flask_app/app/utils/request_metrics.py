@@ -0,0 +1,438 @@
+"""
+Per-request database call metrics
+=================================
+
+🎓 LEARNING: gunicorn's access log tells us a request took 900ms, not that it
+made 40 PostgREST calls to get there. This module counts and times every
+upstream call and attributes it to the route that made it:
+
+- Supabase: every real round trip through RequestScopedClient
+  (app/utils/supabase_loader.py) - table reads/writes and RPCs, with the
+  JSON size of the response. Memo hits aren't round trips and aren't counted.
+- SQLAlchemy: every statement, via engine cursor events, with its rowcount.
+
+Each response gets a Server-Timing header, which browser dev tools and
+most APM agents display next to the request:
+
+    Server-Timing: app;dur=84.2, supabase;dur=71.5;desc="6 calls", sql;dur=3.1;desc="2 statements"
+
+and process totals are exposed in Prometheus text format on GET /metrics:
+
+    app_http_request_duration_seconds_bucket{route="/api/dashboard/",le="0.1"} 12
+    app_db_calls_per_request_bucket{route="/api/social/followers",backend="supabase",le="21"} 3
+    app_db_calls_total{route="/api/social/followers",backend="supabase",target="profiles"} 840
+
+Quantiles come from the histograms, e.g. in PromQL
+histogram_quantile(0.95, rate(app_db_call_duration_seconds_bucket[5m])).
+
+FINDING N+1 HOTSPOTS:
+GET /metrics/hotspots ranks routes by database calls per request, with
+p50/p95/p99 of calls per request and of request latency. A route whose
+call count grows with the size of its result is the N+1 to fix next.
+
+Routes are labelled by URL rule (/api/void/<post_id>/react), never by raw
+path, so label cardinality stays bounded. Work outside a request (push
+worker, counter flusher, jobs) is labelled "background". The dashboard
+carries its request context into its worker threads.
+
+Counters are per worker process. The endpoints require
+`Authorization: Bearer <METRICS_TOKEN>`; with no token set they answer 401,
+except under DEBUG or TESTING where they are open.
+"""
+
+import hmac
+import json
+import re
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from flask import Response, jsonify, request
+
+# Seconds; shared by request and call latency
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Upstream calls made by one request
+CALLS_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+BACKENDS = ('supabase', 'sql')
+BACKGROUND = 'background'
+UNMATCHED = 'unmatched'
+
+
+class Histogram:
+    """Cumulative-bucket histogram, Prometheus style"""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate like PromQL histogram_quantile: linear within the bucket"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        lower = 0.0
+        for bound, n in zip(self.buckets, self.counts):
+            if n and cumulative + n >= rank:
+                return lower + (bound - lower) * (rank - cumulative) / n
+            cumulative += n
+            lower = bound
+        return self.buckets[-1]
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(le, cumulative count) pairs including +Inf"""
+        pairs = []
+        running = 0
+        for bound, n in zip(self.buckets + (float('inf'),), self.counts):
+            running += n
+            pairs.append(('+Inf' if bound == float('inf') else _number(bound), running))
+        return pairs
+
+
+class RequestRecord:
+    """Calls made while serving one request; shared with its worker threads"""
+
+    def __init__(self, route: str, method: str):
+        self.route = route
+        self.method = method
+        self.started = time.perf_counter()
+        self.calls = {backend: 0 for backend in BACKENDS}
+        self.seconds = {backend: 0.0 for backend in BACKENDS}
+        self._lock = threading.Lock()
+
+    def add(self, backend: str, seconds: float) -> None:
+        with self._lock:
+            self.calls[backend] += 1
+            self.seconds[backend] += seconds
+
+    def server_timing(self, total: float) -> str:
+        parts = [f'app;dur={total * 1000:.1f}']
+        with self._lock:
+            if self.calls['supabase']:
+                parts.append(f'supabase;dur={self.seconds["supabase"] * 1000:.1f};desc="{self.calls["supabase"]} calls"')
+            if self.calls['sql']:
+                parts.append(f'sql;dur={self.seconds["sql"] * 1000:.1f};desc="{self.calls["sql"]} statements"')
+        return ', '.join(parts)
+
+
+_current: ContextVar[Optional[RequestRecord]] = ContextVar('request_metrics_record', default=None)
+
+
+def current_record() -> Optional[RequestRecord]:
+    return _current.get()
+
+
+class MetricsRegistry:
+    """Process-wide totals, rendered for Prometheus"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests: Dict[Tuple[str, str, str], int] = {}
+            self.request_seconds: Dict[str, Histogram] = {}
+            self.calls: Dict[Tuple[str, str, str], List[float]] = {}  # -> [count, seconds, payload]
+            self.call_seconds: Dict[Tuple[str, str], Histogram] = {}
+            self.calls_per_request: Dict[Tuple[str, str], Histogram] = {}
+            self.violations: Dict[str, int] = {}  # Query budget name -> count (app/utils/query_budget.py)
+
+    def record_call(self, route: str, backend: str, target: str, seconds: float, payload: int = 0) -> None:
+        with self._lock:
+            totals = self.calls.setdefault((route, backend, target), [0, 0.0, 0])
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] += payload
+            histogram = self.call_seconds.get((route, backend))
+            if histogram is None:
+                histogram = self.call_seconds[(route, backend)] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(seconds)
+
+    def record_violation(self, budget: str) -> None:
+        with self._lock:
+            self.violations[budget] = self.violations.get(budget, 0) + 1
+
+    def record_request(self, record: RequestRecord, status: int, seconds: float) -> None:
+        with self._lock:
+            key = (record.route, record.method, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            histogram = self.request_seconds.get(record.route)
+            if histogram is None:
+                histogram = self.request_seconds[record.route] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(seconds)
+            for backend in BACKENDS:
+                per_request = self.calls_per_request.get((record.route, backend))
+                if per_request is None:
+                    per_request = self.calls_per_request[(record.route, backend)] = Histogram(CALLS_BUCKETS)
+                per_request.observe(record.calls[backend])
+
+    def hotspots(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Routes ranked by mean upstream calls per request"""
+        with self._lock:
+            rows = []
+            for route, latency in self.request_seconds.items():
+                entry = {'route': route, 'requests': latency.count, 'calls_per_request': {},
+                         'latency_ms': {q: _ms(latency.quantile(p)) for q, p in _QUANTILES}}
+                mean_total = 0.0
+                for backend in BACKENDS:
+                    per_request = self.calls_per_request.get((route, backend))
+                    if per_request is None or not per_request.count:
+                        continue
+                    mean = per_request.sum / per_request.count
+                    mean_total += mean
+                    entry['calls_per_request'][backend] = dict(
+                        {'mean': round(mean, 2)},
+                        **{q: _round(per_request.quantile(p)) for q, p in _QUANTILES}
+                    )
+                entry['top_targets'] = sorted(
+                    ({'backend': backend, 'target': target, 'calls': int(totals[0]),
+                      'ms': round(totals[1] * 1000, 1)}
+                     for (r, backend, target), totals in self.calls.items() if r == route),
+                    key=lambda t: -t['calls']
+                )[:5]
+                entry['mean_calls'] = round(mean_total, 2)
+                rows.append(entry)
+        rows.sort(key=lambda e: (-e['mean_calls'], -e['requests']))
+        return rows[:limit]
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines: List[str] = []
+        with self._lock:
+            _header(lines, 'app_http_requests_total', 'counter', 'Requests served')
+            for (route, method, status), n in sorted(self.requests.items()):
+                lines.append(f'app_http_requests_total{_labels(route=route, method=method, status=status)} {n}')
+
+            _header(lines, 'app_http_request_duration_seconds', 'histogram', 'Request latency')
+            for route, histogram in sorted(self.request_seconds.items()):
+                _histogram(lines, 'app_http_request_duration_seconds', histogram, route=route)
+
+            _header(lines, 'app_db_calls_total', 'counter', 'Supabase round trips and SQL statements')
+            for (route, backend, target), totals in sorted(self.calls.items()):
+                lines.append(f'app_db_calls_total{_labels(route=route, backend=backend, target=target)} {int(totals[0])}')
+
+            _header(lines, 'app_db_call_seconds_total', 'counter', 'Time spent in upstream calls')
+            for (route, backend, target), totals in sorted(self.calls.items()):
+                lines.append(f'app_db_call_seconds_total{_labels(route=route, backend=backend, target=target)} '
+                             f'{_number(totals[1])}')
+
+            _header(lines, 'app_db_payload_total', 'counter',
+                    'Response size: JSON bytes for supabase, rows for sql')
+            for (route, backend, target), totals in sorted(self.calls.items()):
+                lines.append(f'app_db_payload_total{_labels(route=route, backend=backend, target=target)} '
+                             f'{int(totals[2])}')
+
+            _header(lines, 'app_db_call_duration_seconds', 'histogram', 'Upstream call latency')
+            for (route, backend), histogram in sorted(self.call_seconds.items()):
+                _histogram(lines, 'app_db_call_duration_seconds', histogram, route=route, backend=backend)
+
+            _header(lines, 'app_db_calls_per_request', 'histogram', 'Upstream calls made by one request')
+            for (route, backend), histogram in sorted(self.calls_per_request.items()):
+                _histogram(lines, 'app_db_calls_per_request', histogram, route=route, backend=backend)
+
+            _header(lines, 'app_query_budget_violations_total', 'counter', 'Query budgets exceeded')
+            for budget, n in sorted(self.violations.items()):
+                lines.append(f'app_query_budget_violations_total{_labels(budget=budget)} {n}')
+        return '\n'.join(lines) + '\n'
+
+
+_QUANTILES = (('p50', 0.5), ('p95', 0.95), ('p99', 0.99))
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 2)
+
+
+def _ms(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value * 1000, 1)
+
+
+def _number(value: float) -> str:
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels: str) -> str:
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + '}'
+
+
+def _header(lines: List[str], name: str, kind: str, help_text: str) -> None:
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} {kind}')
+
+
+def _histogram(lines: List[str], name: str, histogram: Histogram, **labels: str) -> None:
+    for le, n in histogram.cumulative():
+        lines.append(f'{name}_bucket{_labels(**labels, le=le)} {n}')
+    lines.append(f'{name}_sum{_labels(**labels)} {_number(histogram.sum)}')
+    lines.append(f'{name}_count{_labels(**labels)} {histogram.count}')
+
+
+# 🎓 One registry per worker process
+metrics = MetricsRegistry()
+_enabled = False
+
+# Called with (backend, target, shape) for every call, even with metrics off
+_observers: List[Callable[[str, str, Optional[Callable[[], str]]], None]] = []
+
+
+def add_observer(observer: Callable[[str, str, Optional[Callable[[], str]]], None]) -> None:
+    if observer not in _observers:
+        _observers.append(observer)
+
+
+def record_call(backend: str, target: str, seconds: float, payload: int = 0,
+                shape: Optional[Callable[[], str]] = None) -> None:
+    """
+    Attribute one upstream call to the current request (or to background work)
+
+    Args:
+        shape: Builds the value-free description of the query, only
+               called when an observer wants it
+    """
+    for observer in _observers:
+        observer(backend, target, shape)
+    if not _enabled:
+        return
+    record = _current.get()
+    if record is not None:
+        record.add(backend, seconds)
+    metrics.record_call(record.route if record else BACKGROUND, backend, target, seconds, payload)
+
+
+def payload_size(response: Any) -> int:
+    """JSON bytes of a postgrest response's data (PostgREST doesn't expose the raw body size)"""
+    data = getattr(response, 'data', None)
+    if data is None:
+        return 0
+    try:
+        return len(json.dumps(data, default=str, separators=(',', ':')))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _statement_target(statement: str) -> str:
+    verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'OTHER'
+    return verb if verb in ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH') else 'OTHER'
+
+
+_SELECT_LIST = re.compile(r'^SELECT .+? FROM ', re.IGNORECASE | re.DOTALL)
+
+
+def sql_shape(statement: str) -> str:
+    """Parameterized SQL without its select list: SELECT ... FROM profiles WHERE profiles.user_id = ?"""
+    return _SELECT_LIST.sub('SELECT ... FROM ', ' '.join(statement.split()), count=1)[:200]
+
+
+_sql_listening = False
+_sql_lock = threading.Lock()
+
+
+def _listen_sql() -> None:
+    """Time every SQLAlchemy statement (once per process, for every engine)"""
+    global _sql_listening
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    with _sql_lock:
+        if _sql_listening:
+            return
+        _sql_listening = True
+
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if not conn.get_execution_options().get('request_metrics', True):
+            return  # e.g. LocalSupabase, whose calls are already counted as supabase
+        conn.info.setdefault('request_metrics_started', []).append(time.perf_counter())
+
+    @event.listens_for(Engine, 'after_cursor_execute')
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get('request_metrics_started')
+        if not started:
+            return
+        elapsed = time.perf_counter() - started.pop()
+        rows = getattr(cursor, 'rowcount', 0) or 0
+        record_call('sql', _statement_target(statement), elapsed, max(rows, 0),
+                    shape=lambda: sql_shape(statement))
+
+    @event.listens_for(Engine, 'handle_error')
+    def _error(context):
+        started = context.connection.info.get('request_metrics_started') if context.connection else None
+        if started:
+            started.pop()
+
+
+def _authorized(app) -> bool:
+    token = app.config.get('METRICS_TOKEN')
+    if not token:
+        # Fail closed: route names and traffic shape aren't for the public
+        return app.debug or app.testing
+    header = request.headers.get('Authorization', '')
+    return header.startswith('Bearer ') and hmac.compare_digest(header[7:], token)
+
+
+def init_app(app) -> None:
+    """Record every request and expose /metrics and /metrics/hotspots"""
+    global _enabled
+    _listen_sql()  # Also feeds query budgets, so it stays on with metrics disabled
+    _enabled = app.config.get('METRICS_ENABLED', True)
+    if not _enabled:
+        return
+    metrics_paths = ('/metrics', '/metrics/hotspots')
+
+    @app.before_request
+    def start_request_metrics():
+        if request.path in metrics_paths:
+            return
+        route = request.url_rule.rule if request.url_rule is not None else UNMATCHED
+        request.environ['request_metrics.token'] = _current.set(RequestRecord(route, request.method))
+
+    @app.after_request
+    def finish_request_metrics(response):
+        record = _current.get()
+        if record is None:
+            return response
+        total = time.perf_counter() - record.started
+        metrics.record_request(record, response.status_code, total)
+        if app.config.get('METRICS_SERVER_TIMING', True):
+            response.headers['Server-Timing'] = record.server_timing(total)
+        return response
+
+    @app.teardown_request
+    def clear_request_metrics(error=None):
+        token = request.environ.pop('request_metrics.token', None)
+        if token is not None:
+            _current.reset(token)
+
+    @app.route('/metrics')
+    def prometheus_metrics():
+        if not _authorized(app):
+            return jsonify({'success': False, 'error': 'UNAUTHORIZED', 'message': 'Authentication required'}), 401
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+    @app.route('/metrics/hotspots')
+    def metrics_hotspots():
+        if not _authorized(app):
+            return jsonify({'success': False, 'error': 'UNAUTHORIZED', 'message': 'Authentication required'}), 401
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+        return jsonify({'success': True, 'data': metrics.hotspots(limit)}), 200
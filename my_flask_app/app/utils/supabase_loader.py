@@ -0,0 +1,274 @@
+"""
+Request-scoped Supabase loader
+==============================
+
+🎓 LEARNING: Within one request the same rows are sometimes fetched more than
+once - a route reads a row and a service it calls reads the identical row
+again. Each of those is a full PostgREST round trip. Only the exact same
+query chain is shared: a row re-read through a join, or on a worker thread
+(push delivery, dashboard sections), is a different query and still goes out.
+Those are batched where they happen instead: start_mission reuses the
+mission it already read, and push token lookups are resolved in bulk by
+ExpoPushService (per batch on the worker, per request without it).
+
+RequestScopedClient wraps the supabase client that create_app publishes as
+`app.supabase`, so every blueprint gets it without code changes:
+
+```python
+from app import supabase   # already the wrapped client
+
+supabase.table('profiles').select('username').eq('user_id', uid).execute()  # round trip
+supabase.table('profiles').select('username').eq('user_id', uid).execute()  # memo hit
+```
+
+RULES:
+- Only reads (chains starting with .select) are memoized, and only inside a
+  request context. Jobs and dashboard worker threads pass straight through.
+- A write (.insert/.update/.upsert/.delete) drops memoized reads that touch
+  the same table; .rpc() drops everything (a function can write anything).
+  So do SQLAlchemy writes made during the request (e.g. asset sell updating
+  a Profile), via session flush and ORM bulk-statement events.
+- Hits return a deep copy, so a handler mutating response.data can't leak
+  into the next read.
+
+Per-request counts go to the X-Supabase-Calls response header when
+SUPABASE_LOADER_REPORT_HEADER is on, and process-wide totals to stats().
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from flask import g, has_request_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.utils import request_metrics
+from app.utils.query_budget import supabase_shape
+
+logger = logging.getLogger(__name__)
+
+READ_METHODS = ('select',)
+WRITE_METHODS = ('insert', 'update', 'upsert', 'delete')
+
+# Call step = (attribute name, args, kwargs) as a hashable tuple
+Step = Tuple[str, Tuple[Any, ...], Tuple[Tuple[str, Any], ...]]
+
+
+def _freeze(value: Any) -> Any:
+    """Hashable form of a builder argument"""
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (str, int, float, bool, type(None))):
+        return value
+    return str(value)
+
+
+def _step(name: str, args: tuple = (), kwargs: Optional[dict] = None) -> Step:
+    return (name, _freeze(args), _freeze(kwargs or {}))
+
+
+class RequestStats:
+    """Counters for one request (or the whole process)"""
+
+    __slots__ = ('executes', 'round_trips', 'saved')
+
+    def __init__(self):
+        self.executes = 0     # .execute() calls made by handlers
+        self.round_trips = 0  # Calls that actually reached PostgREST
+        self.saved = 0        # Calls answered from the memo
+
+    def as_dict(self) -> Dict[str, int]:
+        return {'executes': self.executes, 'round_trips': self.round_trips, 'saved': self.saved}
+
+
+class _RequestState:
+    """Memo and counters stored on flask.g for the life of a request"""
+
+    def __init__(self):
+        self.memo: Dict[Tuple[str, Tuple[Step, ...]], Any] = {}
+        self.stats = RequestStats()
+
+    def invalidate(self, table: Optional[str] = None) -> None:
+        if table is None:
+            self.memo.clear()
+            return
+        # Also drop reads that embed the table (e.g. select('*, rental_properties(*)'))
+        stale = [key for key in self.memo if key[0] == table or table in repr(key[1])]
+        for key in stale:
+            del self.memo[key]
+
+
+def _request_state() -> Optional[_RequestState]:
+    if not has_request_context():
+        return None
+    state = getattr(g, '_supabase_loader', None)
+    if state is None:
+        state = g._supabase_loader = _RequestState()
+    return state
+
+
+def _copy(response: Any) -> Any:
+    return response.model_copy(deep=True) if hasattr(response, 'model_copy') else response
+
+
+class _RecordingBuilder:
+    """
+    Wraps a postgrest request builder and records the chain of calls
+
+    The real builder still does all the work; only execute() is intercepted
+    to consult the request memo.
+    """
+
+    def __init__(self, owner: 'RequestScopedClient', table: str, builder: Any, steps: Tuple[Step, ...]):
+        self._owner = owner
+        self._table = table
+        self._builder = builder
+        self._steps = steps
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            # Properties such as .not_ return another builder
+            return _RecordingBuilder(self._owner, self._table, attr, self._steps + (_step(name),))
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            return _RecordingBuilder(self._owner, self._table, result,
+                                     self._steps + (_step(name, args, kwargs),))
+        return call
+
+    def execute(self) -> Any:
+        return self._owner._execute(self._table, self._steps, self._builder)
+
+
+class RequestScopedClient:
+    """
+    Drop-in wrapper for a supabase Client with per-request memoization
+
+    Everything except table()/from_()/rpc() is delegated to the real client.
+    """
+
+    def __init__(self, client: Any):
+        self._client = client
+        self._lock = threading.Lock()
+        self._totals = RequestStats()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+    @property
+    def client(self) -> Any:
+        """The unwrapped supabase Client"""
+        return self._client
+
+    def table(self, table_name: str) -> _RecordingBuilder:
+        return _RecordingBuilder(self, table_name, self._client.table(table_name), ())
+
+    from_ = table
+
+    def rpc(self, fn: str, *args, **kwargs) -> _RecordingBuilder:
+        state = _request_state()
+        if state is not None:
+            state.invalidate()
+        # Wrapped only so the call is counted; RPC results are never memoized
+        return _RecordingBuilder(self, f'rpc:{fn}', self._client.rpc(fn, *args, **kwargs), (_step('rpc'),))
+
+    def stats(self) -> Dict[str, int]:
+        """Process-wide totals since startup"""
+        with self._lock:
+            return self._totals.as_dict()
+
+    def _round_trip(self, state: Optional[_RequestState], call, target: str, steps: Tuple[Step, ...] = ()) -> Any:
+        started = time.perf_counter()
+        shape = lambda: supabase_shape(target, steps)
+        try:
+            result = call()
+        except Exception:
+            request_metrics.record_call('supabase', target, time.perf_counter() - started, shape=shape)
+            raise
+        request_metrics.record_call('supabase', target, time.perf_counter() - started,
+                                    request_metrics.payload_size(result), shape=shape)
+        with self._lock:
+            self._totals.round_trips += 1
+        if state is not None:
+            state.stats.round_trips += 1
+        return result
+
+    def _execute(self, table: str, steps: Tuple[Step, ...], builder: Any) -> Any:
+        state = _request_state()
+        with self._lock:
+            self._totals.executes += 1
+        if state is None:
+            return self._round_trip(None, builder.execute, table, steps)
+
+        state.stats.executes += 1
+        first = steps[0][0] if steps else None
+
+        if first in WRITE_METHODS:
+            result = self._round_trip(state, builder.execute, table, steps)
+            state.invalidate(table)
+            return result
+
+        if first not in READ_METHODS:
+            return self._round_trip(state, builder.execute, table, steps)
+
+        key = (table, steps)
+        if key in state.memo:
+            state.stats.saved += 1
+            with self._lock:
+                self._totals.saved += 1
+            return _copy(state.memo[key])
+
+        result = self._round_trip(state, builder.execute, table, steps)
+        state.memo[key] = _copy(result)
+        return result
+
+
+def request_stats() -> Optional[Dict[str, int]]:
+    """Counters for the current request, or None outside a request"""
+    state = getattr(g, '_supabase_loader', None) if has_request_context() else None
+    return state.stats.as_dict() if state else None
+
+
+def _invalidate_orm_tables(tables) -> None:
+    state = _request_state()
+    if state is None:
+        return
+    for table in tables:
+        state.invalidate(table)
+
+
+def _after_flush(session, flush_context) -> None:
+    # Still the pre-flush collections here
+    objects = list(session.new) + list(session.dirty) + list(session.deleted)
+    _invalidate_orm_tables({obj.__table__.name for obj in objects if hasattr(obj, '__table__')})
+
+
+def _after_orm_statement(orm_execute_state) -> None:
+    # session.execute(update(Profile)...) and friends never reach a flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, 'table', None)
+        if getattr(table, 'name', None):
+            _invalidate_orm_tables((table.name,))
+
+
+def init_app(app) -> None:
+    """Report per-request savings as a header and in the debug log"""
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
+        event.listen(Session, 'do_orm_execute', _after_orm_statement)
+
+    @app.after_request
+    def report_supabase_calls(response):
+        stats = request_stats()
+        if stats and stats['executes']:
+            if app.config.get('SUPABASE_LOADER_REPORT_HEADER'):
+                response.headers['X-Supabase-Calls'] = (
+                    f"round_trips={stats['round_trips']}, saved={stats['saved']}"
+                )
+            logger.debug(f"Supabase calls: {stats}")
+        return response
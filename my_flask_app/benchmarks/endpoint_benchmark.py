@@ -0,0 +1,363 @@
+"""
+Endpoint Throughput Benchmark
+Replays scripted player sessions against the whole app on the local Supabase stand-in
+Needs no network or database - everything runs in this process:
+
+    python benchmarks/endpoint_benchmark.py [--players 20] [--sessions 5] [--concurrency 4] [--json]
+    python benchmarks/endpoint_benchmark.py --baseline benchmarks/endpoint_baseline.json
+    python benchmarks/endpoint_benchmark.py --save-baseline benchmarks/endpoint_baseline.json
+
+Every session logs in, then plays the home screen loop with a token from
+jwt_helper.create_token: dashboard, marketplace browse and purchase, void feed
+and a reaction, mission start/decision/abandon and the notification inbox.
+Players are split across worker threads, each with its own test client, so
+one player never runs two sessions at once.
+
+The report has requests/sec, p50/p95/p99 latency and Supabase/SQL calls per
+request for every step, taken from the Server-Timing header. With --baseline
+the run is compared to a stored report and exits 1 on a regression: lower
+throughput or overall p95 beyond --tolerance, new errors, or any step making
+more database calls per request. Throughput depends on the machine, so save
+the baseline where the comparison runs (e.g. the CI runner) and re-save it
+when a change makes things faster on purpose.
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Config requires these at import; nothing here ever connects to them
+for _name, _value in (('DATABASE_URL', 'sqlite://'), ('SUPABASE_URL', 'http://localhost'),
+                      ('SUPABASE_KEY', 'local'), ('SUPABASE_JWT_SECRET', 'endpoint-benchmark-local-jwt-secret')):
+    os.environ.setdefault(_name, _value)
+
+import app as app_package
+from app import create_app, db
+from app.models.profile import Profile
+from app.utils.jwt_helper import create_token
+
+PASSWORD = 'benchmark-password'
+ASSET_CATEGORIES = ('stocks', 'crypto', 'real_estate', 'vehicles')
+
+# Step name -> what it replays; also the report order
+STEPS = {
+    'login': 'POST /api/auth/login',
+    'dashboard': 'GET /api/dashboard',
+    'marketplace': 'GET /api/assets/marketplace',
+    'marketplace_category': 'GET /api/assets/marketplace?category=',
+    'purchase': 'POST /api/assets/purchase',
+    'user_assets': 'GET /api/assets/user',
+    'void_feed': 'GET /api/void/feed',
+    'void_react': 'POST /api/void/react',
+    'missions_available': 'GET /api/missions/available',
+    'mission_start': 'POST /api/missions/start',
+    'mission_active': 'GET /api/missions/active',
+    'mission_decision': 'POST /api/missions/decision',
+    'mission_abandon': 'POST /api/missions/abandon',
+    'notifications': 'GET /api/notifications/',
+    'notifications_unread': 'GET /api/notifications/unread',
+    'notifications_read_all': 'PUT /api/notifications/read-all',
+}
+
+SERVER_TIMING_CALLS = re.compile(r'(supabase|sql);dur=[\d.]+;desc="(\d+) ')
+
+# Run-to-run noise allowed on top of --tolerance. Latency is only gated on the
+# overall p95: per-step percentiles over ~100 samples swing too much to gate on
+LATENCY_NOISE_MS = 2.0
+CALLS_NOISE = 0.5  # Cache hits vary a little between runs; one more query per request does not
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def local_backend():
+    """The LocalSupabase behind the app's global client"""
+    client = app_package.supabase
+    return getattr(client, 'client', client)
+
+
+def seed_world(app, players=20, seed=7):
+    """
+    Seed a catalog, void posts, missions and `players` players
+
+    Players exist in auth (with PASSWORD), in the Supabase profiles/balances
+    and in the SQLAlchemy profiles table the dashboard reads.
+
+    Returns:
+        [{'user_id', 'email', 'token'}]
+    """
+    rng = random.Random(seed)
+    local = local_backend()
+
+    local.seed('assets', [
+        {'id': f'{category}-{n}', 'name': f'{category.title()} #{n}', 'category': category,
+         'price': round(rng.uniform(10, 500), 2), 'description': f'Benchmark {category}'}
+        for category in ASSET_CATEGORIES for n in range(5)
+    ])
+
+    roster = []
+    for n in range(players):
+        user_id = _uuid(rng)
+        email = f'player{n}@benchmark.local'
+        local.auth.create_user(email, PASSWORD, user_id=user_id, metadata={'username': f'player{n}'})
+        roster.append({'user_id': user_id, 'email': email, 'username': f'player{n}'})
+
+    profiles = [{'user_id': p['user_id'], 'username': p['username'], 'net_worth': rng.randint(1000, 50000),
+                 'monthly_income': rng.randint(2000, 8000), 'credit_score': rng.randint(550, 800)}
+                for p in roster]
+    local.seed('profiles', profiles)
+    local.seed('user_balances', [{'user_id': p['user_id'], 'current_balance': 1_000_000} for p in roster])
+    local.seed('void_posts', [{'user_id': rng.choice(roster)['user_id'], 'content': f'Rent went up again ({n})'}
+                              for n in range(50)])
+
+    for n in range(3):
+        mission = local.seed('integrated_missions', [{
+            'name': f'Benchmark Mission {n}', 'description': 'Survive the month', 'category': 'budgeting'
+        }])[0]
+        local.seed('mission_success_criteria', [
+            {'mission_id': mission['id'], 'metric': 'net_worth', 'target': 10000, 'comparison': 'gte',
+             'label': 'Grow your net worth'},
+            {'mission_id': mission['id'], 'metric': 'credit_score', 'target': 700, 'comparison': 'gte',
+             'label': 'Keep your credit healthy'},
+        ])
+        for month in (1, 2):
+            point = local.seed('mission_decision_points', [{
+                'mission_id': mission['id'], 'month': month, 'title': f'Month {month}',
+                'description': 'Your car needs repairs'
+            }])[0]
+            local.seed('mission_decision_options', [
+                {'decision_point_id': point['id'], 'label': label, 'description': label,
+                 'option_order': order, 'immediate_cash': cash}
+                for order, (label, cash) in enumerate((('Fix it', -250), ('Take the bus', 0)))
+            ])
+
+    with app.app_context():
+        Profile.__table__.create(db.engine, checkfirst=True)
+        db.session.add_all(Profile(user_id=uuid.UUID(p['user_id']), username=p['username'],
+                                   net_worth=p['net_worth'], monthly_income=p['monthly_income'],
+                                   credit_score=p['credit_score']) for p in profiles)
+        db.session.commit()
+        db.session.remove()
+        for player in roster:
+            player['token'] = create_token(player['user_id'], player['email'])
+
+    return [{key: player[key] for key in ('user_id', 'email', 'token')} for player in roster]
+
+
+def _db_calls(response):
+    calls = {'supabase': 0, 'sql': 0}
+    for backend, count in SERVER_TIMING_CALLS.findall(response.headers.get('Server-Timing', '')):
+        calls[backend] = int(count)
+    return calls['supabase'], calls['sql']
+
+
+def play_session(client, player, rng):
+    """
+    One scripted visit by `player`
+
+    Steps that need an id from an earlier response are skipped when it has
+    none, which shows up as missing requests in the report.
+
+    Returns:
+        [(step, ms, status, supabase_calls, sql_calls)]
+    """
+    samples = []
+    headers = {}
+
+    def call(step, method, path, **kwargs):
+        started = time.perf_counter()
+        response = client.open(path, method=method, headers=headers, **kwargs)
+        samples.append((step, (time.perf_counter() - started) * 1000, response.status_code) + _db_calls(response))
+        return (response.get_json(silent=True) or {}).get('data')
+
+    call('login', 'POST', '/api/auth/login', json={'email': player['email'], 'password': PASSWORD})
+    headers['Authorization'] = f"Bearer {player['token']}"
+    call('dashboard', 'GET', '/api/dashboard')
+
+    catalog = call('marketplace', 'GET', '/api/assets/marketplace') or []
+    call('marketplace_category', 'GET', f'/api/assets/marketplace?category={rng.choice(ASSET_CATEGORIES)}')
+    if catalog:
+        call('purchase', 'POST', '/api/assets/purchase', json={'asset_id': rng.choice(catalog)['id'], 'quantity': 1})
+    call('user_assets', 'GET', '/api/assets/user')
+
+    feed = call('void_feed', 'GET', '/api/void/feed?limit=20') or []
+    if feed:
+        call('void_react', 'POST', '/api/void/react', json={'post_id': rng.choice(feed)['id'],
+                                                            'type': rng.choice(('oof', 'same'))})
+
+    missions = call('missions_available', 'GET', '/api/missions/available') or []
+    if missions:
+        call('mission_start', 'POST', '/api/missions/start', json={'mission_id': rng.choice(missions)['id']})
+        active = call('mission_active', 'GET', '/api/missions/active') or {}
+        decision = active.get('next_decision')
+        if decision and decision.get('mission_decision_options'):
+            option = rng.choice(decision['mission_decision_options'])
+            call('mission_decision', 'POST', '/api/missions/decision',
+                 json={'decision_point_id': decision['id'], 'option_id': option['id']})
+        call('mission_abandon', 'POST', '/api/missions/abandon')
+
+    call('notifications', 'GET', '/api/notifications/?limit=20')
+    call('notifications_unread', 'GET', '/api/notifications/unread')
+    call('notifications_read_all', 'PUT', '/api/notifications/read-all')
+    return samples
+
+
+def _step_stats(samples):
+    latencies = [s[1] for s in samples]
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for s in samples if s[2] >= 400),
+        'mean_ms': round(statistics.mean(latencies), 3),
+        'p50_ms': round(_percentile(latencies, 50), 3),
+        'p95_ms': round(_percentile(latencies, 95), 3),
+        'p99_ms': round(_percentile(latencies, 99), 3),
+        'supabase_calls': round(statistics.mean(s[3] for s in samples), 2),
+        'sql_calls': round(statistics.mean(s[4] for s in samples), 2),
+    }
+
+
+def run_benchmark(app, players, sessions=5, concurrency=4, seed=7):
+    """
+    Play `sessions` sessions per player across `concurrency` threads
+
+    Returns:
+        {'requests', 'errors', 'duration_s', 'requests_per_sec', 'p50_ms', 'p95_ms', 'p99_ms',
+         'db_calls_per_request', 'steps': {step: {...}}}
+    """
+    workers = max(1, min(concurrency, len(players)))
+
+    def worker(index):
+        client = app.test_client()
+        rng = random.Random(seed + index)
+        samples = []
+        for _ in range(sessions):
+            for player in players[index::workers]:
+                samples.extend(play_session(client, player, rng))
+        return samples
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        samples = [s for batch in pool.map(worker, range(workers)) for s in batch]
+    duration = time.perf_counter() - started
+
+    overall = _step_stats(samples)
+    by_step = {}
+    for sample in samples:
+        by_step.setdefault(sample[0], []).append(sample)
+    return {
+        'requests': overall['requests'],
+        'errors': overall['errors'],
+        'duration_s': round(duration, 3),
+        'requests_per_sec': round(len(samples) / duration, 1),
+        'p50_ms': overall['p50_ms'],
+        'p95_ms': overall['p95_ms'],
+        'p99_ms': overall['p99_ms'],
+        'db_calls_per_request': round(overall['supabase_calls'] + overall['sql_calls'], 2),
+        'steps': {step: _step_stats(by_step[step]) for step in STEPS if step in by_step},
+    }
+
+
+def compare(report, baseline, tolerance=0.3):
+    """
+    Regressions of `report` against a stored `baseline` report
+
+    Returns:
+        Human-readable regression lines; empty when nothing regressed
+    """
+    regressions = []
+    floor = baseline['requests_per_sec'] * (1 - tolerance)
+    if report['requests_per_sec'] < floor:
+        regressions.append(f"throughput {report['requests_per_sec']} req/s < {floor:.1f} "
+                           f"(baseline {baseline['requests_per_sec']})")
+    ceiling = baseline['p95_ms'] * (1 + tolerance) + LATENCY_NOISE_MS
+    if report['p95_ms'] > ceiling:
+        regressions.append(f"p95 {report['p95_ms']}ms > {ceiling:.1f}ms (baseline {baseline['p95_ms']}ms)")
+
+    for step, before in baseline['steps'].items():
+        after = report['steps'].get(step)
+        if after is None:
+            regressions.append(f'{step}: no longer requested')
+            continue
+        if after['errors'] > before['errors']:
+            regressions.append(f"{step}: {after['errors']} errors (baseline {before['errors']})")
+        for backend in ('supabase_calls', 'sql_calls'):
+            if after[backend] > before[backend] + CALLS_NOISE:
+                regressions.append(f'{step}: {after[backend]} {backend} per request (baseline {before[backend]})')
+    return regressions
+
+
+def print_report(report):
+    print(f"{'step':<24} {'requests':>8} {'errors':>6} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'supabase':>8} {'sql':>5}")
+    for step, stats in report['steps'].items():
+        print(f"{step:<24} {stats['requests']:>8} {stats['errors']:>6} {stats['mean_ms']:>9.3f} "
+              f"{stats['p50_ms']:>9.3f} {stats['p95_ms']:>9.3f} {stats['p99_ms']:>9.3f} "
+              f"{stats['supabase_calls']:>8.2f} {stats['sql_calls']:>5.2f}")
+    print(f"\n{report['requests']} requests ({report['errors']} errors) in {report['duration_s']}s: "
+          f"{report['requests_per_sec']} req/s, p50 {report['p50_ms']}ms, p95 {report['p95_ms']}ms, "
+          f"p99 {report['p99_ms']}ms, {report['db_calls_per_request']} db calls/request")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--players', type=int, default=20)
+    parser.add_argument('--sessions', type=int, default=5, help='Sessions per player')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--latency-ms', type=float, default=1.0, help='Injected per Supabase call')
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--baseline', help='Compare against this stored report')
+    parser.add_argument('--save-baseline', metavar='PATH', help='Store this run as the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.3,
+                        help='Allowed throughput drop / p95 rise as a fraction (default: 0.3)')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    app = create_app('benchmark')
+    local = local_backend()
+    players = seed_world(app, args.players, args.seed)
+    local.latency_ms, local.jitter_ms = args.latency_ms, args.jitter_ms
+
+    report = run_benchmark(app, players, args.sessions, args.concurrency, args.seed)
+    report['settings'] = {key: getattr(args, key) for key in
+                          ('players', 'sessions', 'concurrency', 'latency_ms', 'jitter_ms', 'seed')}
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('settings') != report['settings']:
+            print(f"warning: baseline was run with {baseline.get('settings')}", file=sys.stderr)
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f'REGRESSION {line}', file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
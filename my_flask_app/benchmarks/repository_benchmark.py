@@ -0,0 +1,147 @@
+"""
+Repository Backend Benchmark
+Times each hot-table query shape on the PostgREST and SQLAlchemy backends
+Run against a real environment (DATABASE_URL, SUPABASE_URL, SUPABASE_KEY):
+
+    python benchmarks/repository_benchmark.py --user-id <uuid> [--iterations 50] [--json]
+
+Use a user with some transactions, assets and notifications so the reads
+return realistic row counts. Each shape also checks that both backends
+return the same rows, so a switch in REPOSITORY_BACKENDS is safe.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.repositories import BACKENDS, get_repository
+
+# Shape name -> (table, call(repo, user_id)); mirrors the routes that use them
+QUERY_SHAPES = {
+    'profile_by_user': ('profiles', lambda repo, uid: repo.find_one(
+        'net_worth, monthly_income, credit_score', user_id=uid)),         # /api/missions/available
+    'balance_by_user': ('user_balances', lambda repo, uid: repo.find_one(
+        'current_balance', user_id=uid)),
+    'assets_by_user': ('user_assets', lambda repo, uid: repo.find_many(
+        '*', user_id=uid)),                                               # /api/assets/user, dashboard
+    'history_page': ('transactions', lambda repo, uid: repo.find_many(
+        '*', order_by='created_at', desc=True, limit=20, user_id=uid)),   # /api/balance/history
+    'history_deep_page': ('transactions', lambda repo, uid: repo.find_many(
+        '*', order_by='created_at', desc=True, limit=20, offset=200, user_id=uid)),
+    'unread_count': ('notifications', lambda repo, uid: repo.count(
+        user_id=uid, read=False)),
+    'active_mission': ('player_mission_progress', lambda repo, uid: repo.find_one(
+        'mission_id', player_id=uid, is_active=True)),                    # /api/missions/available
+}
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _normalize(value):
+    """PostgREST and Python format timestamps and numerics slightly differently"""
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return value
+    if isinstance(value, float):
+        return round(value, 4)
+    return value
+
+
+def _comparable(result):
+    rows = result if isinstance(result, list) else [result]
+    return sorted(
+        json.dumps({k: _normalize(v) for k, v in row.items()}, sort_keys=True, default=str)
+        if isinstance(row, dict) else json.dumps(row)
+        for row in rows
+    )
+
+
+def time_shape(call, repo, user_id, iterations, warmup):
+    """Per-call latencies in milliseconds, plus the last result"""
+    result = None
+    for _ in range(warmup):
+        result = call(repo, user_id)
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        result = call(repo, user_id)
+        samples.append((time.perf_counter() - started) * 1000)
+        # Give the connection back between calls, like a request would
+        db.session.remove()
+    return samples, result
+
+
+def run_benchmark(user_id, iterations=50, warmup=5, shapes=None):
+    """
+    Benchmark every query shape on both backends
+
+    Returns:
+        {shape: {backend: {'mean_ms', 'p50_ms', 'p95_ms', 'rows'}, 'speedup': float, 'same_rows': bool}}
+    """
+    report = {}
+    for name in shapes or QUERY_SHAPES:
+        table, call = QUERY_SHAPES[name]
+        entry = {}
+        results = {}
+        for backend in BACKENDS:
+            samples, results[backend] = time_shape(call, get_repository(table, backend=backend),
+                                                   user_id, iterations, warmup)
+            rows = results[backend]
+            entry[backend] = {
+                'mean_ms': round(statistics.mean(samples), 3),
+                'p50_ms': round(_percentile(samples, 50), 3),
+                'p95_ms': round(_percentile(samples, 95), 3),
+                'rows': len(rows) if isinstance(rows, list) else (0 if rows is None else 1)
+            }
+        entry['speedup'] = round(entry['postgrest']['mean_ms'] / max(entry['sqlalchemy']['mean_ms'], 1e-6), 2)
+        entry['same_rows'] = _comparable(results['postgrest']) == _comparable(results['sqlalchemy'])
+        report[name] = entry
+    return report
+
+
+def print_report(report):
+    print(f"{'shape':<20} {'backend':<11} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'rows':>5}")
+    for name, entry in report.items():
+        for backend in BACKENDS:
+            stats = entry[backend]
+            print(f"{name:<20} {backend:<11} {stats['mean_ms']:>9.3f} {stats['p50_ms']:>9.3f} "
+                  f"{stats['p95_ms']:>9.3f} {stats['rows']:>5}")
+        flag = '' if entry['same_rows'] else '   (rows differ!)'
+        print(f"{'':<20} sqlalchemy is {entry['speedup']}x faster{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--user-id', required=True)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--shape', action='append', choices=sorted(QUERY_SHAPES),
+                        help='Only run this shape (repeatable)')
+    parser.add_argument('--config', default=os.environ.get('FLASK_CONFIG', 'production'))
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    app = create_app(args.config)
+    with app.app_context():
+        report = run_benchmark(args.user_id, args.iterations, args.warmup, args.shape)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -36,6 +36,114 @@ class Config:
     
     # API Configuration
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max request size
+
+    # Set by the Lambda runtime. An instance serves one request at a time and
+    # is frozen once it returns, so background batching has nothing to batch.
+    ON_LAMBDA = bool(os.environ.get('AWS_LAMBDA_FUNCTION_NAME'))
+
+    # 🎓 PUSH DELIVERY QUEUE (app/services/push_notification_service.py)
+    # Routes enqueue pushes and a worker thread batches them to Expo,
+    # so request latency no longer includes Expo's round trip. Off on Lambda:
+    # the handler would have to wait out the batching window before returning.
+    # Without the queue, a request's pushes are sent together as it returns.
+    PUSH_QUEUE_ENABLED = not ON_LAMBDA
+    # Seconds a worker reuses a user's push token. Token changes only reach
+    # the worker that served them, so this is how long other workers may
+    # still push to a logged-out device. 0 reads profiles on every push.
+    PUSH_TOKEN_CACHE_TTL = 30
+
+    # 🎓 REQUEST-SCOPED SUPABASE LOADER (app/utils/supabase_loader.py)
+    # Identical selects within one request hit PostgREST once; writes to a
+    # table drop its memoized reads. The header reports round trips saved.
+    SUPABASE_REQUEST_LOADER = True
+    SUPABASE_LOADER_REPORT_HEADER = False
+
+    # 🎓 LEADERBOARD SNAPSHOTS (app/services/leaderboard_service.py)
+    # Seconds between full rebuilds of the in-memory rankings; profile
+    # writes through ProfileService are applied in between.
+    LEADERBOARD_REFRESH_SECONDS = 60
+
+    # 🎓 USERNAME SEARCH INDEX (app/services/user_search_service.py)
+    # Seconds between rebuilds of the in-memory prefix/trigram index used by
+    # /api/social/search; new and renamed profiles are indexed immediately.
+    USER_SEARCH_REFRESH_SECONDS = 300
+
+    # 🎓 VOID FEED (app/services/void_feed_service.py)
+    # Seconds a shared feed page is reused across readers; each reader's
+    # own reactions are always fetched fresh. 0 disables the cache.
+    VOID_FEED_CACHE_TTL = 5
+
+    # 🎓 VOID REACTION COUNTERS (app/services/void_counter_service.py)
+    # Taps buffer their oof/same deltas per post and are written in one
+    # batch every FLUSH_MS, or sooner after FLUSH_EVENTS taps, so hot posts
+    # aren't row-locked on every tap. Off = counters update inside each tap.
+    # Only long-lived (gunicorn) workers aggregate anything: on Lambda every
+    # tap would be flushed on its own, a second round trip, so it's off there.
+    VOID_COUNTER_WRITE_BEHIND = not ON_LAMBDA
+    VOID_COUNTER_FLUSH_MS = 500
+    VOID_COUNTER_FLUSH_EVENTS = 200
+
+    # 🎓 NOTIFICATION DIGESTS (app/services/notification_service.py)
+    # Same-kind notifications collapse into one unread row (and one push)
+    # within the window; read ones older than ARCHIVE_DAYS are moved to
+    # notifications_archive by jobs/archive_notifications.py.
+    NOTIFICATION_COLLAPSE_WINDOW = 3600  # seconds
+    NOTIFICATION_ARCHIVE_DAYS = 30
+
+    # 🎓 REPOSITORIES (app/repositories/__init__.py)
+    # Backend for the hot-table reads that go through get_repository():
+    # 'postgrest' (Supabase HTTP) or 'sqlalchemy' (pooled direct connection).
+    # Per-table overrides win; compare with benchmarks/repository_benchmark.py.
+    REPOSITORY_BACKEND = 'postgrest'
+    REPOSITORY_BACKENDS = {}  # e.g. {'transactions': 'sqlalchemy'}
+
+    # 🎓 REQUEST METRICS (app/utils/request_metrics.py)
+    # Counts and times Supabase round trips and SQL statements per route.
+    # Adds a Server-Timing header and serves Prometheus text on /metrics
+    # and a ranked N+1 report on /metrics/hotspots (Bearer METRICS_TOKEN;
+    # without a token both answer 401 unless DEBUG or TESTING is on).
+    METRICS_ENABLED = True
+    METRICS_SERVER_TIMING = True
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+    # 🎓 QUERY BUDGETS (app/utils/query_budget.py)
+    # Routes and job steps declare their max Supabase/SQL calls and repeats
+    # of one query shape. Violations are logged and counted on /metrics;
+    # strict mode raises QueryBudgetExceeded instead (tests).
+    QUERY_BUDGET_STRICT = False
+
+    # 🎓 LOCAL SUPABASE (app/utils/local_supabase.py)
+    # SUPABASE_BACKEND='local' swaps the Supabase client for an in-process
+    # stand-in on SQLite (or a local Postgres URL) for offline benchmarks and
+    # load tests. Latency is injected per call to mimic the network hop.
+    SUPABASE_BACKEND = os.environ.get('SUPABASE_BACKEND', 'remote')
+    LOCAL_SUPABASE_URL = os.environ.get('LOCAL_SUPABASE_URL', 'sqlite://')
+    LOCAL_SUPABASE_LATENCY_MS = float(os.environ.get('LOCAL_SUPABASE_LATENCY_MS', '0'))
+    LOCAL_SUPABASE_JITTER_MS = float(os.environ.get('LOCAL_SUPABASE_JITTER_MS', '0'))
+
+    # 🎓 DASHBOARD FAN-OUT (app/routes/dashboard_routes.py)
+    # /api/dashboard loads its sections concurrently on a shared pool.
+    # Workers bound upstream connections per process; the timeout bounds
+    # the response, and slower sections are reported as errors. A timed-out
+    # section still holds its thread, so past MAX_PENDING queued or running
+    # sections new ones are shed (reported as OVERLOADED) instead of waiting.
+    DASHBOARD_MAX_WORKERS = 8
+    DASHBOARD_SECTION_TIMEOUT = 5  # seconds
+    DASHBOARD_MAX_PENDING = 32
+
+    # 🎓 CATALOG CACHE (app/utils/catalog_cache.py)
+    # Seconds each static catalog table is served from worker memory.
+    # These only change when we reseed; 0 disables caching for a table.
+    CATALOG_CACHE_DEFAULT_TTL = 300
+    CATALOG_CACHE_TTLS = {
+        'assets': 60,  # Prices can be nudged by admins, keep it short
+        'jobs_market': 600,
+        'rental_properties': 600,
+        'courses': 3600,
+        'luxury_items': 3600,
+        'bank_loans': 600,
+        'integrated_missions': 600,  # Shaped mission documents for /missions/available
+    }
     
     # 🎓 LAMBDA DATABASE CONNECTION POOLING
     # Lambda instances are single-threaded (one request at a time) and scale horizontally
@@ -49,6 +157,7 @@ class Config:
 
 class DevelopmentConfig(Config):
     DEBUG = True
+    SUPABASE_LOADER_REPORT_HEADER = True
     CORS_ORIGINS = ['http://localhost:8081', 'http://localhost:19000', '*']  # Expo dev server
 
 class ProductionConfig(Config):
@@ -62,10 +171,24 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     SUPABASE_JWT_SECRET = 'test-secret-key'  # Override for testing
+    CATALOG_CACHE_DEFAULT_TTL = 0  # Tests seed catalog rows, never serve stale ones
+    CATALOG_CACHE_TTLS = {}
+    VOID_FEED_CACHE_TTL = 0
+    VOID_COUNTER_WRITE_BEHIND = False  # Counts are asserted right after each tap
+    PUSH_QUEUE_ENABLED = False  # Send inline so tests never leave a worker thread behind
+    QUERY_BUDGET_STRICT = True  # An N+1 introduced in a tested path fails the test
+
+class BenchmarkConfig(ProductionConfig):
+    # benchmarks/endpoint_benchmark.py: production settings, with every
+    # Supabase call served by the in-process stand-in
+    SUPABASE_BACKEND = 'local'
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    CORS_ORIGINS = ['*']
 
 config = {
     'development': DevelopmentConfig,
     'production': ProductionConfig,
     'testing': TestingConfig,
+    'benchmark': BenchmarkConfig,
     'default': DevelopmentConfig
 }
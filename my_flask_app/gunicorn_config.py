@@ -179,6 +179,14 @@ def worker_exit(server, worker):
     Called just after a worker has been exited.
     🎓 USE CASE: Cleanup, logging
     """
+    # Deliver pushes still sitting in this worker's queue
+    from app.services.push_notification_service import ExpoPushService
+    if not ExpoPushService.flush(timeout=10):
+        server.log.warning(f"Worker {worker.pid} exited with undelivered pushes")
+    # Write reaction counts still buffered in this worker
+    from app.services.void_counter_service import void_counters
+    if not void_counters.flush():
+        server.log.warning(f"Worker {worker.pid} exited with unwritten void reaction counts")
     server.log.info(f"Worker exited (pid: {worker.pid})")
 
 # =====================================================
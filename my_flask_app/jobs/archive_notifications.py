@@ -0,0 +1,54 @@
+"""
+Notification Archive Job
+Moves read notifications older than NOTIFICATION_ARCHIVE_DAYS to notifications_archive
+Run this daily via cron or task scheduler
+"""
+
+from flask import current_app
+from app.services.notification_service import NotificationService
+from app.utils.job_runner import JobRunner
+from datetime import date
+import logging
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def _archive_partition(ctx):
+    """
+    Archive one user_id range in chunks of ARCHIVE_CHUNK_SIZE.
+    Each chunk commits its copy and delete together, so a resumed
+    partition just archives whatever is still left.
+    """
+    archived = NotificationService.archive_read(
+        older_than_days=current_app.config.get('NOTIFICATION_ARCHIVE_DAYS', 30),
+        partition=ctx.partition
+    )
+    ctx.advance(processed=archived)
+
+
+def run_archive_notifications():
+    """Archive old read notifications for all players"""
+    logger.info("Starting notification archive...")
+    
+    summary = JobRunner(
+        'archive_notifications',
+        _archive_partition,
+        run_key=date.today().isoformat()
+    ).run()
+    
+    result = {
+        'archived_count': summary['processed'],
+        'date': date.today().isoformat(),
+        'failed_partitions': summary['failed_partitions']
+    }
+    
+    logger.info(f"Archive complete. Archived: {result['archived_count']} notifications")
+    
+    return result
+
+if __name__ == '__main__':
+    run_archive_notifications()
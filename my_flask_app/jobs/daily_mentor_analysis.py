@@ -4,11 +4,12 @@ Analyzes all active players' financial data and sends mentor messages
 Run this daily via cron or task scheduler
 """
 
-from app import create_app, db
-from app.services.mentor_service import MentorService
+from app import db
+from app.services.mentor_service import MentorService, MentorTemplates
 from app.models.profile import Profile
-from app.models.user import User
-from datetime import datetime, timedelta
+from app.utils.job_runner import JobRunner
+from app.utils.query_budget import query_budget
+from datetime import date, datetime, timedelta
 import logging
 
 # Setup logging
@@ -18,76 +19,113 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def run_daily_mentor_analysis():
-    """Run daily financial analysis for all active players"""
-    app = create_app()
+def _analyze_partition(ctx):
+    """
+    Analyze one user-id partition in chunks of MentorService.BATCH_CHUNK_SIZE
     
-    with app.app_context():
-        logger.info("Starting daily mentor analysis...")
-        
-        # Get all active users (logged in within last 30 days)
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        active_users = User.query.filter(
-            User.last_login >= thirty_days_ago
-        ).all()
-        
-        logger.info(f"Found {len(active_users)} active users")
+    Metrics for a whole chunk come from a handful of grouped queries,
+    templates are loaded once per partition, and each chunk's interactions
+    are inserted in one commit before the checkpoint moves past it.
+    """
+    # Active players = profiles touched within the last 30 days
+    # (profiles carry the UUID user_id every other table is keyed on)
+    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+    templates = MentorTemplates()
+    last_user_id = ctx.cursor
+    
+    while True:
+        # Keyset pagination over user_id keeps each chunk query cheap
+        query = db.session.query(Profile.user_id, Profile.username).filter(
+            Profile.updated_at >= thirty_days_ago
+        )
+        query = ctx.partition.apply(query, Profile.user_id)
+        if last_user_id is not None:
+            query = query.filter(Profile.user_id > last_user_id)
+        chunk = query.order_by(Profile.user_id).limit(MentorService.BATCH_CHUNK_SIZE).all()
+        if not chunk:
+            break
         
-        messages_sent = 0
-        errors = 0
+        last_user_id = chunk[-1].user_id
+        usernames = {row.user_id: row.username for row in chunk}
         
-        for user in active_users:
+        # Six grouped reads and one bulk insert per chunk, whatever its size;
+        # a per-player query sneaking back in shows up as a repeated shape
+        with query_budget('daily_mentor_analysis.chunk', max_sql=10, max_repeats=2):
             try:
-                # Get profile
-                profile = Profile.query.filter_by(user_id=user.id).first()
-                if not profile:
-                    continue
-                
-                # Analyze finances
-                metrics = MentorService.analyze_player_finances(user.id)
-                if not metrics:
-                    continue
-                
-                # Check triggers
-                triggers = MentorService.check_triggers(user.id, metrics)
+                all_metrics = MentorService.analyze_players_batch(list(usernames))
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Error analyzing chunk ending at {last_user_id}: {str(e)}")
+                ctx.advance(last_user_id, processed=len(chunk), errors=len(chunk))
+                continue
+        
+            errors = 0
+            outgoing = []
+            for user_id, metrics in all_metrics.items():
+                try:
+                    # Check triggers
+                    triggers = MentorService.check_triggers(user_id, metrics)
                 
-                # Sort by priority (highest first)
-                triggers.sort(key=lambda x: x['priority'], reverse=True)
+                    # Sort by priority (highest first)
+                    triggers.sort(key=lambda x: x['priority'], reverse=True)
                 
-                # Send top 1-2 messages (don't overwhelm)
-                for trigger in triggers[:2]:
-                    mentor_data = MentorService.generate_personalized_message(
-                        user.id,
-                        trigger,
-                        profile.username
-                    )
-                    
-                    if mentor_data:
-                        MentorService.send_mentor_message(
-                            user.id,
-                            mentor_data,
-                            metrics
-                        )
-                        messages_sent += 1
-                        logger.info(
-                            f"Sent {trigger['type']} message to {profile.username}"
+                    # Send top 1-2 messages (don't overwhelm)
+                    for trigger in triggers[:2]:
+                        mentor_data = MentorService.generate_personalized_message(
+                            user_id,
+                            trigger,
+                            usernames[user_id],
+                            templates=templates
                         )
+                    
+                        if mentor_data:
+                            outgoing.append((user_id, mentor_data, metrics))
                 
-            except Exception as e:
-                errors += 1
-                logger.error(f"Error processing user {user.id}: {str(e)}")
-                continue
+                except Exception as e:
+                    errors += 1
+                    logger.error(f"Error processing user {user_id}: {str(e)}")
+                    continue
         
-        logger.info(
-            f"Daily mentor analysis complete. "
-            f"Messages sent: {messages_sent}, Errors: {errors}"
-        )
+            messages_sent = 0
+            try:
+                messages_sent = MentorService.send_mentor_messages_bulk(outgoing)
+            except Exception as e:
+                db.session.rollback()
+                errors += len(outgoing)
+                logger.error(f"Error saving {len(outgoing)} mentor messages: {str(e)}")
         
-        return {
-            'messages_sent': messages_sent,
-            'errors': errors,
-            'users_processed': len(active_users)
-        }
+        ctx.advance(last_user_id, processed=len(chunk), messages_sent=messages_sent, errors=errors)
+
+
+def run_daily_mentor_analysis():
+    """
+    Run daily financial analysis for all active players
+    
+    Partitions run in parallel via JobRunner; a run killed part-way through
+    resumes after the last committed chunk when restarted the same day.
+    """
+    logger.info("Starting daily mentor analysis...")
+    
+    summary = JobRunner(
+        'daily_mentor_analysis',
+        _analyze_partition,
+        run_key=date.today().isoformat()
+    ).run()
+    
+    messages_sent = summary['counters'].get('messages_sent', 0)
+    errors = summary['counters'].get('errors', 0)
+    
+    logger.info(
+        f"Daily mentor analysis complete. "
+        f"Messages sent: {messages_sent}, Errors: {errors}"
+    )
+    
+    return {
+        'messages_sent': messages_sent,
+        'errors': errors,
+        'users_processed': summary['processed'],
+        'failed_partitions': summary['failed_partitions']
+    }
 
 if __name__ == '__main__':
     run_daily_mentor_analysis()
@@ -4,8 +4,10 @@ Updates the value of all player liabilities based on age
 Run this monthly via cron or task scheduler (e.g., 1st of every month)
 """
 
-from app import create_app, db
+from app import create_app
 from app.services.liability_service import LiabilityService
+from app.utils.job_runner import JobRunner
+from datetime import date
 import logging
 import sys
 
@@ -16,6 +18,19 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def _depreciate_partition(ctx):
+    """
+    Depreciate one player_id range with chunked bulk UPDATEs.
+    Rows already depreciated this month are skipped, so a resumed partition
+    simply picks up the chunks that had not committed yet.
+    """
+    result = LiabilityService.apply_monthly_depreciation_bulk(partition=ctx.partition)
+    ctx.advance(
+        processed=result['updated_count'],
+        depreciation_cents=int(round(result['total_depreciation'] * 100))
+    )
+
+
 def run_monthly_depreciation():
     """Run monthly depreciation update for all active player liabilities"""
     app = create_app()
@@ -28,21 +43,32 @@ def run_monthly_depreciation():
             backfill_result = LiabilityService.backfill_existing_liabilities()
             if backfill_result['backfilled_count'] > 0:
                 logger.info(f"Backfilled {backfill_result['backfilled_count']} liabilities with initial values")
-            
-            # 2. Apply monthly depreciation
-            result = LiabilityService.apply_monthly_depreciation()
-            
-            logger.info(
-                f"Depreciation complete. "
-                f"Updated: {result['updated_count']} liabilities. "
-                f"Total value reduction: ${result['total_depreciation']:,.2f}"
-            )
-            
-            return result
-            
         except Exception as e:
             logger.error(f"Error running monthly depreciation: {str(e)}")
             return {'error': str(e)}
+    
+    # 2. Apply monthly depreciation, one player_id range per worker.
+    # The run key is the month, so a re-run skips partitions already done.
+    summary = JobRunner(
+        'monthly_depreciation',
+        _depreciate_partition,
+        run_key=date.today().strftime('%Y-%m')
+    ).run()
+    
+    result = {
+        'updated_count': summary['processed'],
+        'total_depreciation': summary['counters'].get('depreciation_cents', 0) / 100,
+        'date': date.today().isoformat(),
+        'failed_partitions': summary['failed_partitions']
+    }
+    
+    logger.info(
+        f"Depreciation complete. "
+        f"Updated: {result['updated_count']} liabilities. "
+        f"Total value reduction: ${result['total_depreciation']:,.2f}"
+    )
+    
+    return result
 
 if __name__ == '__main__':
     run_monthly_depreciation()
@@ -1,7 +1,6 @@
-from app import create_app, db
 import os
-from datetime import datetime, timedelta
-from app.services.balance_service import BalanceService
+from datetime import datetime
+from app.utils.job_runner import JobRunner
 from supabase import create_client
 from decimal import Decimal
 
@@ -10,63 +9,107 @@ SUPABASE_URL = os.getenv('SUPABASE_URL')
 SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
 supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
+# Loans fetched per PostgREST call (stays under the default max-rows of 1000)
+LOAN_PAGE_SIZE = 500
+
+def _fetch_loan_page(partition, after_borrower_id, after_loan_id=None):
+    """
+    Next page of active loans in this partition, in (borrower_id, id) order
+
+    after_loan_id continues inside after_borrower_id, so a borrower with more
+    than a page of loans is read across pages instead of being cut off.
+    """
+    query = supabase.table('bank_loans').select('*').eq('status', 'active')
+    query = partition.apply_postgrest(query, 'borrower_id')
+    if after_loan_id is not None:
+        query = query.or_(f'borrower_id.gt.{after_borrower_id},'
+                          f'and(borrower_id.eq.{after_borrower_id},id.gt.{after_loan_id})')
+    elif after_borrower_id is not None:
+        query = query.gt('borrower_id', str(after_borrower_id))
+    return query.order('borrower_id').order('id').limit(LOAN_PAGE_SIZE).execute().data
+
+def _charge_loan(loan, BalanceService, InsufficientFundsError):
+    """Charge one monthly payment; returns the counter it adds to"""
+    borrower_id = loan['borrower_id']
+    loan_id = loan['id']
+    monthly_payment = Decimal(str(loan['monthly_payment']))
+
+    # Simple check: In a real system, checking 'next_payment_date' is better.
+    # Here we just assume this runs and we process payments. 
+    # To be safe, we'll log it.
+
+    try:
+        # 1. Deduct (atomic; raises if the balance can't cover it)
+        try:
+            BalanceService.subtract_balance(
+                user_id=borrower_id, 
+                amount=monthly_payment, 
+                reason=f"Monthly Loan Payment: {loan['type']}"
+            )
+
+            # 2. Update Loan (reduce remaining amount?) 
+            # Note: bank_loans table in schema didn't have remaining_amount in the inspection result?
+            # It seems `liabilities` table is where remaining balance is tracked primarily?
+            # Since schema is fixed, we just log the payment in transactions for now.
+
+            print(f"Processed payment of ${monthly_payment} for user {borrower_id}")
+            return 'payments'
+
+        except InsufficientFundsError:
+            # Mark as missed/default?
+            print(f"User {borrower_id} insufficient funds for loan {loan_id}")
+            # In a robust system, we'd trigger a notification or penalty.
+            return 'missed'
+
+    except Exception as e:
+        print(f"Error processing loan {loan_id}: {e}")
+        return 'errors'
+
+def _deduct_partition(ctx):
+    """
+    Charge every active loan whose borrower falls in this partition.
+    The checkpoint advances after every loan, to (borrower_id, loan_id), so a
+    resumed run continues with the next loan and never charges one twice.
+    """
+    # BalanceService binds app.supabase at import time, so import it once
+    # this worker's app (and client) exists
+    from app.services.balance_service import BalanceService, InsufficientFundsError
+
+    after_borrower_id, after_loan_id = ctx.cursor, ctx.cursor_key
+    while True:
+        loans = _fetch_loan_page(ctx.partition, after_borrower_id, after_loan_id)
+
+        for loan in loans:
+            outcome = _charge_loan(loan, BalanceService, InsufficientFundsError)
+            ctx.advance(loan['borrower_id'], cursor_key=loan['id'], **{outcome: 1})
+            after_borrower_id, after_loan_id = loan['borrower_id'], loan['id']
+
+        if len(loans) < LOAN_PAGE_SIZE:
+            break
+
 def process_monthly_deductions():
     """
     Process monthly payments for all active bank loans.
     Should be run daily to check for due dates, or monthly if simplify.
-    For this implementation, we'll iterate all active loans and check if a month has passed since last update/creation.
+    For this implementation, we charge every active loan once per calendar
+    month; borrowers are split into user-id partitions run in parallel, and
+    the month is the checkpoint key so a re-run never charges twice.
     """
-    app = create_app()
-    with app.app_context():
-        print(f"[{datetime.now()}] Starting monthly deduction job...")
-        
-        # Fetch all active loans
-        try:
-            loans = supabase.table('bank_loans').select('*').eq('status', 'active').execute()
-        except Exception as e:
-            print(f"Error fetching loans: {e}")
-            return
-
-        for loan in loans.data:
-            user_id = loan['borrower_id']
-            loan_id = loan['id']
-            monthly_payment = Decimal(str(loan['monthly_payment']))
-            
-            # Simple check: In a real system, checking 'next_payment_date' is better.
-            # Here we just assume this runs and we process payments. 
-            # To be safe, we'll log it.
-            
-            try:
-                # 1. Check Balance
-                current_balance = BalanceService.get_current_balance(user_id)
-                
-                if current_balance >= monthly_payment:
-                    # 2. Deduct
-                    BalanceService.subtract_balance(
-                        user_id=user_id, 
-                        amount=monthly_payment, 
-                        reason=f"Monthly Loan Payment: {loan['type']}"
-                    )
-                    
-                    # 3. Update Loan (reduce remaining amount?) 
-                    # Note: bank_loans table in schema didn't have remaining_amount in the inspection result?
-                    # Let's check inspection again... 
-                    # It had: amount, total_interest. It did NOT have remaining_balance in Step 56.
-                    # It seems `liabilities` table is where remaining balance is tracked primarily?
-                    # But we should update the `bank_loans` if we want to track it there.
-                    # Since schema is fixed, let's just log the payment in transactions for now.
-                    
-                    print(f"Processed payment of ${monthly_payment} for user {user_id}")
-                    
-                else:
-                    # Mark as missed/default?
-                    print(f"User {user_id} insufficient funds for loan {loan_id}")
-                    # In a robust system, we'd trigger a notification or penalty.
-                    
-            except Exception as e:
-                print(f"Error processing loan {loan_id}: {e}")
-
-        print("Monthly deduction job completed.")
+    print(f"[{datetime.now()}] Starting monthly deduction job...")
+
+    summary = JobRunner(
+        'monthly_loan_deductions',
+        _deduct_partition,
+        run_key=datetime.now().strftime('%Y-%m')
+    ).run()
+
+    counters = summary['counters']
+    print(
+        f"Monthly deduction job completed. Loans: {summary['processed']}, "
+        f"paid: {counters.get('payments', 0)}, missed: {counters.get('missed', 0)}, "
+        f"errors: {counters.get('errors', 0)}, failed partitions: {summary['failed_partitions']}"
+    )
+    return summary
 
 if __name__ == "__main__":
     process_monthly_deductions()
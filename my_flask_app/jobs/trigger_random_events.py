@@ -4,14 +4,13 @@ Analyzes active players and triggers random life events every 4 days.
 Run this job DAILY (or hourly) via cron/scheduler.
 """
 
-from app import create_app, db
-from app.models.user import User
+from app import db
 from app.models.life_event import LifeEvent
 from app.models.user_life_event import UserLifeEvent
 from app.models.profile import Profile
 from app.services.push_notification_service import ExpoPushService
+from app.utils.job_runner import JobRunner
 from datetime import datetime, timedelta
-from sqlalchemy import func
 import logging
 import random
 
@@ -22,62 +21,69 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def trigger_random_events():
+# Profiles loaded per query while walking a partition
+PROFILE_PAGE_SIZE = 500
+
+def _trigger_partition(ctx):
     """
-    Check all active users and trigger a life event if they haven't had one in 4 days.
+    Trigger events for one user-id partition, walking profiles in user_id order.
+    Each profile commits on its own; the checkpoint moves past a page of
+    profiles only after that page's pushes have been sent, so a resumed run
+    never starts beyond an event whose push is still waiting.
     """
-    app = create_app()
+    # 1. Define time windows
+    now = datetime.utcnow()
+    four_days_ago = now - timedelta(days=4)
     
-    with app.app_context():
-        logger.info("Starting random event trigger job...")
-        
-        # 1. Define time windows
-        now = datetime.utcnow()
-        thirty_days_ago = now - timedelta(days=30)
-        four_days_ago = now - timedelta(days=4)
-        
-        # 2. Get all profiles (Source of Truth for UUID user_ids)
-        active_profiles = Profile.query.all()
-        
-        logger.info(f"Found {len(active_profiles)} active profiles")
+    # Active events are the same for every profile; load them once
+    active_events = LifeEvent.query.filter_by(is_active=True).all()
+    if not active_events:
+        logger.warning("No active life events found in database.")
+        return
+    
+    # 2. Walk this partition's profiles (Source of Truth for UUID user_ids)
+    # in keyset pages; each profile commits, so no cursor is held open
+    last_user_id = ctx.cursor
+    
+    while True:
+        query = ctx.partition.apply(Profile.query, Profile.user_id)
+        if last_user_id is not None:
+            query = query.filter(Profile.user_id > last_user_id)
+        profiles = query.order_by(Profile.user_id).limit(PROFILE_PAGE_SIZE).all()
+        if not profiles:
+            break
+        last_user_id = profiles[-1].user_id
         
-        events_triggered = 0
-        errors = 0
-        skipped = 0
+        # (user_id, counter) per profile, checkpointed after the page's pushes
+        outcomes = []
+        page_pushes = []
         
         # 3. Process each profile
-        for profile in active_profiles:
+        for profile in profiles:
             try:
                 user_id = profile.user_id # This is the UUID
-                
+            
                 # Check 4-day cooldown
                 last_event = UserLifeEvent.query.filter_by(user_id=user_id)\
                     .order_by(UserLifeEvent.created_at.desc())\
                     .first()
-                
+            
                 if last_event and last_event.created_at > four_days_ago:
-                    skipped += 1
+                    outcomes.append((user_id, 'skipped'))
                     continue
-                
-                # Check for push token (redundant check but safe)
-                if not profile.push_token:
-                    # We can still trigger the event for in-app logic, but log it
-                    pass
-
+            
                 # 4. Select a random event
                 # Filter out the SPECIFIC event they just had
-                query = LifeEvent.query.filter_by(is_active=True)
-                if last_event:
-                    query = query.filter(LifeEvent.id != last_event.life_event_id)
-                
-                available_events = query.all()
-                
+                available_events = [
+                    event for event in active_events
+                    if not last_event or event.id != last_event.life_event_id
+                ]
                 if not available_events:
-                    logger.warning("No active life events found in database.")
-                    break
-                
+                    outcomes.append((user_id, 'skipped'))
+                    continue
+            
                 selected_event = random.choice(available_events)
-                
+            
                 # 5. Create UserLifeEvent record (Pending)
                 new_user_event = UserLifeEvent(
                     user_id=user_id,
@@ -85,47 +91,68 @@ def trigger_random_events():
                     choice_id=None, # Pending choice
                     was_auto_selected=False
                 )
-                
+            
                 db.session.add(new_user_event)
                 db.session.commit()
-                
-                # 6. Send Push Notification
+            
+                # 6. Queue Push Notification
                 message_body = selected_event.description[:100] + "..." if len(selected_event.description) > 100 else selected_event.description
-                
+            
                 if profile.push_token:
-                    # Using local Supabase client to trigger push
-                    from supabase import create_client
-                    import os
-                    supabase_url = os.getenv('SUPABASE_URL')
-                    supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-                    
-                    if supabase_url and supabase_key:
-                        sb = create_client(supabase_url, supabase_key)
-                        ExpoPushService.send_notification_to_user(
-                            supabase_client=sb,
-                            user_id=str(user_id),
-                            title=f"Life Update: {selected_event.title}",
-                            body=message_body,
-                            notification_type="life_event",
-                            data={
-                                "type": "life_event",
-                                "eventId": str(selected_event.id),
-                                "userEventId": str(new_user_event.id)
-                            }
-                        )
+                    # Token is already on the profile row; sent with the rest of the page below
+                    page_pushes.append({
+                        'push_token': profile.push_token,
+                        'title': f"Life Update: {selected_event.title}",
+                        'body': message_body,
+                        'data': {
+                            "type": "life_event",
+                            "eventId": str(selected_event.id),
+                            "userEventId": str(new_user_event.id),
+                            "timestamp": datetime.utcnow().isoformat()
+                        }
+                    })
 
-                events_triggered += 1
+                outcomes.append((user_id, 'events_triggered'))
                 logger.info(f"Triggered event '{selected_event.title}' for user {profile.username}")
-                
+            
             except Exception as e:
                 db.session.rollback()
-                errors += 1
+                outcomes.append((profile.user_id, 'errors'))
                 logger.error(f"Error processing profile {profile.username}: {str(e)}")
                 continue
         
-        logger.info(
-            f"Job Complete. Triggered: {events_triggered}, Skipped (Cooldown): {skipped}, Errors: {errors}"
-        )
+        # 7. Send the page's pushes in MAX_BATCH_SIZE batches over one session,
+        # then checkpoint its profiles
+        if page_pushes:
+            push_result = ExpoPushService.send_batch_notifications(page_pushes)
+            ctx.add(pushes_sent=push_result['success'], pushes_failed=push_result['failed'])
+        for user_id, outcome in outcomes:
+            ctx.advance(user_id, **{outcome: 1})
+
+
+def trigger_random_events():
+    """
+    Check all active users and trigger a life event if they haven't had one in 4 days.
+    Profiles are split into user-id partitions processed in parallel; the run
+    key is the current hour, so a crashed run resumes when restarted in the
+    same hour (the 4-day cooldown covers anything later).
+    """
+    logger.info("Starting random event trigger job...")
+    
+    summary = JobRunner(
+        'trigger_random_events',
+        _trigger_partition,
+        run_key=datetime.utcnow().strftime('%Y-%m-%dT%H'),
+        checkpoint_every=50  # The cooldown already stops repeats; don't write per profile
+    ).run()
+    
+    counters = summary['counters']
+    logger.info(f"Pushes sent: {counters.get('pushes_sent', 0)}, failed: {counters.get('pushes_failed', 0)}")
+    logger.info(
+        f"Job Complete. Triggered: {counters.get('events_triggered', 0)}, "
+        f"Skipped (Cooldown): {counters.get('skipped', 0)}, Errors: {counters.get('errors', 0)}"
+    )
+    return summary
 
 if __name__ == '__main__':
     trigger_random_events()
@@ -19,6 +19,8 @@ Cold Start Optimization:
 
 from apig_wsgi import make_lambda_handler
 from app import create_app
+from app.services.push_notification_service import ExpoPushService
+from app.services.void_counter_service import void_counters
 import os
 
 # 🎓 IMPORTANT: Create Flask app at module level (outside handler function)
@@ -26,9 +28,25 @@ import os
 # Lambda containers are reused across multiple requests, so this improves performance.
 app = create_app(os.getenv('FLASK_CONFIG', 'production'))
 
-# Create the Lambda handler function
-# This is what Lambda will invoke for each request
-lambda_handler = make_lambda_handler(app)
+# Create the WSGI adapter
+_wsgi_handler = make_lambda_handler(app)
+
+
+def lambda_handler(event, context):
+    """
+    Lambda entry point
+
+    🎓 IMPORTANT: Lambda freezes the container as soon as we return, which
+    would also freeze any background thread. Config turns the push queue and
+    reaction write-behind off on Lambda (pushes are sent inline, taps use the
+    single atomic RPC); these flushes are a safety net for a FLASK_CONFIG
+    that turns them back on.
+    """
+    try:
+        return _wsgi_handler(event, context)
+    finally:
+        ExpoPushService.flush(timeout=5)
+        void_counters.flush()
 
 # 🎓 DEBUGGING TIP: Uncomment below to log incoming events during development
 # def lambda_handler_debug(event, context):
@@ -1,3 +1,5 @@
+import copy
+import re
 import pytest
 from app import create_app, db
 from app.models.user import User
@@ -18,3 +20,185 @@ def client(app):
 @pytest.fixture
 def runner(app):
     return app.test_cli_runner()
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+    def model_copy(self, deep=False):
+        return FakeResponse(copy.deepcopy(self.data) if deep else self.data, self.count)
+
+
+class FakeQuery:
+    """
+    Records the postgrest builder chain and answers it from the client's tables
+
+    Every call is kept in `steps` as (name, args, kwargs), so tests can assert
+    on the exact query as well as on its result.
+    """
+
+    def __init__(self, client, target, params=None):
+        self.client = client
+        self.target = target
+        self.params = params
+        self.steps = []
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def step(*args, **kwargs):
+            self.steps.append((name, args, kwargs))
+            return self
+        return step
+
+    @property
+    def names(self):
+        return [name for name, _, _ in self.steps]
+
+    def args(self, name):
+        """Arguments of the first `name` step, None if there was none"""
+        return next((args for step, args, _ in self.steps if step == name), None)
+
+    def execute(self):
+        self.client.executed.append(self)
+        if self.client.respond is not None:
+            result = self.client.respond(self)
+        elif self.target.startswith('rpc:'):
+            result = self.client.call_rpc(self.target[4:], self.params)
+        else:
+            result = self.client.run(self)
+        if isinstance(result, Exception):
+            raise result
+        return result if result is None or isinstance(result, FakeResponse) else FakeResponse(result)
+
+
+_OR_TERM = re.compile(r'(\w+)\.(eq|neq|lt|lte|gt|gte)\.("[^"]*"|[^,()]+)')
+
+_COMPARE = {
+    'eq': lambda a, b: a == b, 'neq': lambda a, b: a != b,
+    'lt': lambda a, b: a is not None and a < b, 'lte': lambda a, b: a is not None and a <= b,
+    'gt': lambda a, b: a is not None and a > b, 'gte': lambda a, b: a is not None and a >= b,
+}
+
+
+def _split_top_level(expression):
+    parts, depth, start = [], 0, 0
+    for i, char in enumerate(expression):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(expression[start:i])
+            start = i + 1
+    return parts + [expression[start:]]
+
+
+def _or_filter(expression, conjunction=False):
+    """Row predicate for a PostgREST or=(...) / and(...) filter string"""
+    terms = []
+    for part in _split_top_level(expression):
+        if part.startswith('and('):
+            terms.append(_or_filter(part[4:-1], conjunction=True))
+            continue
+        column, op, value = _OR_TERM.fullmatch(part).groups()
+        value = value.strip('"')
+        terms.append(lambda row, c=column, o=op, v=value: _COMPARE[o](None if row.get(c) is None else str(row[c]), v))
+    combine = all if conjunction else any
+    return lambda row: combine(term(row) for term in terms)
+
+
+class FakeSupabase:
+    """
+    In-memory stand-in for the supabase client
+
+    tables:  table name -> list of row dicts; filters, order, limit/range,
+             single/maybe_single, count='exact' and insert/update/delete
+             are applied to them like PostgREST would
+    rpcs:    function name -> callable(params) returning the data, or the
+             data itself for a canned result
+    respond: callable(query) answering every execute() instead, for tests
+             that only care about the calls made
+
+    Unknown tables and functions fail the test. Executed queries are kept
+    in `executed` (see FakeQuery).
+    """
+
+    def __init__(self, tables=None, rpcs=None, respond=None):
+        self.tables = tables if tables is not None else {}
+        self.rpcs = rpcs if rpcs is not None else {}
+        self.respond = respond
+        self.executed = []
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params=None):
+        return FakeQuery(self, f'rpc:{name}', params)
+
+    @property
+    def targets(self):
+        return [query.target for query in self.executed]
+
+    @property
+    def rpc_calls(self):
+        return [(query.target[4:], query.params) for query in self.executed if query.target.startswith('rpc:')]
+
+    def call_rpc(self, name, params):
+        if name not in self.rpcs:
+            raise AssertionError(f'unexpected rpc call: {name}')
+        handler = self.rpcs[name]
+        return handler(params) if callable(handler) else handler
+
+    def run(self, query):
+        if query.target not in self.tables:
+            raise AssertionError(f'unexpected table call: {query.target}')
+        table = self.tables[query.target]
+        filters, orders, count, write = [], [], None, None
+        start, stop, single = 0, None, None
+        for name, args, kwargs in query.steps:
+            if name in _COMPARE:
+                filters.append(lambda row, o=name, c=args[0], v=args[1]: _COMPARE[o](row.get(c), v))
+            elif name == 'in_':
+                filters.append(lambda row, c=args[0], v=list(args[1]): row.get(c) in v)
+            elif name == 'is_':
+                filters.append(lambda row, c=args[0], v=args[1]: (row.get(c) is None) == (v in (None, 'null')))
+            elif name == 'or_':
+                filters.append(_or_filter(args[0]))
+            elif name == 'order':
+                orders.append((args[0], kwargs.get('desc', False)))
+            elif name == 'limit':
+                stop = start + args[0]
+            elif name == 'range':
+                start, stop = args[0], args[1] + 1
+            elif name in ('single', 'maybe_single'):
+                single = name
+            elif name in ('select', 'insert', 'update', 'delete'):
+                count = kwargs.get('count', count)
+                if name != 'select':
+                    write = (name, args[0] if args else None)
+
+        if write and write[0] == 'insert':
+            rows = write[1] if isinstance(write[1], list) else [write[1]]
+            table.extend(dict(row) for row in rows)
+            return FakeResponse([dict(row) for row in rows], len(rows) if count else None)
+
+        rows = [row for row in table if all(f(row) for f in filters)]
+        for column, desc in reversed(orders):
+            rows.sort(key=lambda row: row[column], reverse=desc)
+        matched = len(rows)
+        if write and write[0] == 'update':
+            for row in rows:
+                row.update(write[1])
+        elif write:
+            table[:] = [row for row in table if row not in rows]
+        rows = [dict(row) for row in rows[start:stop]]
+
+        if single == 'maybe_single' and not rows:
+            return None
+        if single:
+            return FakeResponse(rows[0] if rows else None)
+        return FakeResponse(rows, matched if count else None)
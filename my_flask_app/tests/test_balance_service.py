@@ -0,0 +1,45 @@
+from decimal import Decimal
+import pytest
+from conftest import FakeSupabase
+from app.services import balance_service
+from app.services.balance_service import BalanceService, InsufficientFundsError
+
+
+def _fake(result):
+    """Replays a canned apply_balance_delta result"""
+    return FakeSupabase(rpcs={'apply_balance_delta': result})
+
+
+def test_subtract_balance_is_single_rpc(monkeypatch):
+    fake = _fake({'success': True, 'new_balance': 75.5, 'transaction_id': 'tx-1'})
+    monkeypatch.setattr(balance_service, 'supabase', fake)
+
+    result = BalanceService.subtract_balance('user-1', Decimal('24.50'), 'Bought coffee')
+
+    assert fake.rpc_calls == [('apply_balance_delta', {
+        'p_user_id': 'user-1',
+        'p_delta': '-24.50',
+        'p_description': 'Bought coffee',
+        'p_category': 'balance_adjustment'
+    })]
+    assert result['new_balance'] == Decimal('75.5')
+    assert result['transaction_id'] == 'tx-1'
+
+
+def test_subtract_balance_insufficient_funds(monkeypatch):
+    fake = _fake({'success': False, 'error': 'INSUFFICIENT_FUNDS', 'current_balance': 10})
+    monkeypatch.setattr(balance_service, 'supabase', fake)
+
+    with pytest.raises(InsufficientFundsError) as exc:
+        BalanceService.subtract_balance('user-1', Decimal('50'), 'Vacation')
+
+    assert 'Insufficient funds' in str(exc.value)
+    assert exc.value.current_balance == Decimal('10')
+    assert exc.value.required == Decimal('50')
+
+
+def test_add_balance_missing_balance_row(monkeypatch):
+    monkeypatch.setattr(balance_service, 'supabase', _fake({'success': False, 'error': 'BALANCE_NOT_FOUND'}))
+
+    with pytest.raises(Exception, match='BALANCE_NOT_FOUND'):
+        BalanceService.add_balance('user-1', Decimal('5'), 'Gift')
@@ -0,0 +1,101 @@
+import time
+import jwt
+from flask import Flask
+from app import create_app
+from app.utils import jwt_helper
+from app.utils.jwt_helper import create_token
+from app.utils.catalog_cache import CatalogCache, catalog_cache, catalog_response, invalidate_catalog
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_catalog_cache_serves_from_memory_until_ttl():
+    """Loader only runs again once the table TTL has elapsed"""
+    clock = FakeClock()
+    cache = CatalogCache(ttls={'jobs_market': 60}, clock=clock)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return [{'id': 1, 'title': 'Barista'}]
+
+    first = cache.get('jobs_market', loader)
+    second = cache.get('jobs_market', loader)
+    assert len(calls) == 1
+    assert first.etag == second.etag
+
+    clock.now += 61
+    cache.get('jobs_market', loader)
+    assert len(calls) == 2
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'entries': 1}
+
+
+def test_catalog_cache_invalidate_and_keys():
+    """Filtered variants are cached separately and dropped together"""
+    cache = CatalogCache(ttls={'assets': 60})
+    cache.get('assets', lambda: [{'category': 'stocks'}], key='stocks')
+    cache.get('assets', lambda: [{'category': 'crypto'}], key='crypto')
+    cache.get('courses', lambda: [])
+
+    assert cache.invalidate('assets') == 2
+    assert cache.stats()['entries'] == 1
+    assert cache.invalidate() == 1
+
+
+def test_catalog_cache_zero_ttl_disables_caching():
+    cache = CatalogCache(default_ttl=0)
+    calls = []
+    cache.get('courses', lambda: calls.append(1) or [])
+    cache.get('courses', lambda: calls.append(1) or [])
+    assert len(calls) == 2
+
+
+def test_catalog_response_etag_and_not_modified():
+    """A matching If-None-Match is answered with 304 and no body"""
+    flask_app = Flask(__name__)
+    catalog_cache.configure(ttls={'courses': 60})
+
+    @flask_app.route('/courses')
+    def courses():
+        return catalog_response('courses', lambda: [{'id': 'c1', 'cost': 100}])
+
+    client = flask_app.test_client()
+    response = client.get('/courses')
+    assert response.status_code == 200
+    assert response.get_json() == {'success': True, 'data': [{'id': 'c1', 'cost': 100}]}
+    etag = response.headers['ETag']
+    assert response.headers['Cache-Control'] == 'public, max-age=60'
+
+    cached = client.get('/courses', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.data == b''
+
+    invalidate_catalog('courses')
+    catalog_cache.configure(ttls={})
+
+
+def test_admin_invalidate_route_drops_cached_tables():
+    app = create_app('testing')
+    catalog_cache.configure(ttls={'courses': 60, 'assets': 60})
+    catalog_cache.get('courses', lambda: [])
+    catalog_cache.get('assets', lambda: [], key='stocks')
+    admin = jwt.encode({'sub': 'admin-1', 'aud': 'authenticated', 'exp': int(time.time()) + 60,
+                        'user_metadata': {'role': 'admin'}}, jwt_helper.SUPABASE_JWT_SECRET, algorithm='HS256')
+    client = app.test_client()
+
+    player = {'Authorization': f"Bearer {create_token('player-1', 'p@example.com')}"}
+    assert client.post('/api/admin/catalog/invalidate', headers=player).status_code == 403
+
+    headers = {'Authorization': f'Bearer {admin}'}
+    assert client.post('/api/admin/catalog/invalidate', json={'table': 'profiles'}, headers=headers).status_code == 400
+    response = client.post('/api/admin/catalog/invalidate', json={'table': 'courses'}, headers=headers)
+    assert response.get_json()['data'] == {'table': 'courses', 'removed': 1}
+    response = client.post('/api/admin/catalog/invalidate', headers=headers)
+    assert response.get_json()['data'] == {'table': None, 'removed': 1}
+    catalog_cache.configure(ttls={})
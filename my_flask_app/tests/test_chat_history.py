@@ -0,0 +1,144 @@
+import base64
+import json
+import pytest
+from conftest import FakeSupabase
+from app import create_app
+from app.routes import chat_routes
+from app.services.chat_service import ChatService, decode_chat_cursor
+from app.utils.jwt_helper import create_token
+
+ME = '00000000-0000-0000-0000-000000000001'
+BOB = '00000000-0000-0000-0000-000000000002'
+CAROL = '00000000-0000-0000-0000-000000000003'
+
+
+def _id(i):
+    return f'00000000-0000-4000-8000-{i:012d}'
+
+
+def _message(i, sender, recipient, status='read'):
+    return {'id': _id(i), 'sender_id': sender, 'recipient_id': recipient, 'content': f'hi {i}',
+            'status': status, 'type': 'text', 'timestamp': f'2026-10-17T10:00:{i:02d}+00:00'}
+
+
+MESSAGES = (
+    [_message(i, ME if i % 2 else BOB, BOB if i % 2 else ME) for i in range(10)]
+    + [_message(10, CAROL, ME, 'sent'), _message(11, CAROL, ME, 'delivered')]
+    + [_message(12, BOB, CAROL)]  # Not ours
+)
+
+
+def _conversations(params):
+    """Python twin of the chat_conversations SQL function"""
+    user = params['p_user_id']
+    latest = {}
+    for m in sorted(MESSAGES, key=lambda r: (r['timestamp'], r['id'])):
+        if user not in (m['sender_id'], m['recipient_id']):
+            continue
+        peer = m['recipient_id'] if m['sender_id'] == user else m['sender_id']
+        row = latest.setdefault(peer, {'peer_id': peer, 'unread_count': 0})
+        row.update({'message_id': m['id'], **{k: m[k] for k in ('sender_id', 'recipient_id', 'content',
+                                                                 'status', 'type', 'timestamp')}})
+        if m['recipient_id'] == user and m['status'] != 'read':
+            row['unread_count'] += 1
+    rows = sorted(latest.values(), key=lambda r: (r['timestamp'], r['peer_id']), reverse=True)
+    if params.get('p_before_timestamp'):
+        before = (params['p_before_timestamp'], params['p_before_peer_id'])
+        rows = [r for r in rows if (r['timestamp'], r['peer_id']) < before]
+    return rows[:params['p_limit']]
+
+
+def _fake():
+    return FakeSupabase(
+        tables={
+            'chat_messages': MESSAGES,
+            'profiles': [{'user_id': BOB, 'username': 'bob', 'profile_picture_url': None},
+                         {'user_id': CAROL, 'username': 'carol', 'profile_picture_url': 'c.png'}]
+        },
+        rpcs={'chat_conversations': _conversations}
+    )
+
+
+def test_history_pages_walk_the_conversation_without_gaps_or_repeats():
+    fake = _fake()
+    seen = []
+    cursor = None
+    while True:
+        page = ChatService.history(fake, ME, BOB, cursor, limit=4)
+        seen.extend(m['id'] for m in page['data'])
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+
+    assert seen == [_id(i) for i in range(9, -1, -1)]
+    assert fake.targets == ['chat_messages'] * 3
+
+
+def test_conversations_one_row_per_peer_with_unread_counts():
+    fake = _fake()
+
+    page = ChatService.conversations(fake, ME, limit=20)
+
+    assert [c['peer']['username'] for c in page['data']] == ['carol', 'bob']
+    assert page['data'][0]['last_message']['id'] == _id(11)
+    assert page['data'][0]['unread_count'] == 2
+    assert page['data'][1]['unread_count'] == 0
+    assert page['next_cursor'] is None
+    assert fake.targets == ['rpc:chat_conversations', 'profiles']
+
+
+def test_conversations_cursor():
+    fake = _fake()
+
+    first = ChatService.conversations(fake, ME, limit=1)
+    second = ChatService.conversations(fake, ME, first['next_cursor'], limit=1)
+
+    assert [c['peer']['user_id'] for c in first['data']] == [CAROL]
+    assert [c['peer']['user_id'] for c in second['data']] == [BOB]
+    assert second['next_cursor'] is None
+
+
+def test_cursor_values_are_validated_before_reaching_the_filter():
+    def cursor(timestamp, key):
+        return base64.urlsafe_b64encode(json.dumps([timestamp, key]).encode()).decode()
+
+    assert decode_chat_cursor(cursor('2026-10-17T10:00:00Z', _id(1).upper())) == \
+        ('2026-10-17T10:00:00+00:00', _id(1))
+    for bad in (cursor('2026-10-17T10:00:00', f'{_id(1)}),sender_id.eq.x'),
+                cursor('2026-10-17",content.ilike."*', _id(1)),
+                'not-base64!'):
+        with pytest.raises(ValueError):
+            decode_chat_cursor(bad)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(chat_routes, 'supabase', _fake())
+    return create_app('testing').test_client()
+
+
+def _auth():
+    return {'Authorization': f"Bearer {create_token(ME, 'me@example.com')}"}
+
+
+def test_history_route(client):
+    resp = client.get(f'/api/chat/history/{BOB}?limit=3', headers=_auth())
+
+    body = resp.get_json()
+    assert resp.status_code == 200
+    assert [m['id'] for m in body['data']] == [_id(9), _id(8), _id(7)]
+    assert body['next_cursor']
+
+
+def test_history_route_rejects_bad_input(client):
+    assert client.get('/api/chat/history/not-a-uuid', headers=_auth()).status_code == 400
+    resp = client.get(f'/api/chat/history/{BOB}?cursor=garbage', headers=_auth())
+    assert resp.status_code == 400
+    assert resp.get_json()['error'] == 'VALIDATION_ERROR'
+
+
+def test_conversations_route(client):
+    resp = client.get('/api/chat/conversations', headers=_auth())
+
+    assert resp.status_code == 200
+    assert [c['unread_count'] for c in resp.get_json()['data']] == [2, 0]
@@ -0,0 +1,100 @@
+import pytest
+from conftest import FakeSupabase
+from app import create_app
+from app.routes import chat_routes
+from app.services.chat_service import ChatService, RecipientNotFoundError, UserExistenceCache
+from app.services.push_notification_service import ExpoPushService
+from app.utils.jwt_helper import create_token
+
+ME = '11111111-1111-4111-8111-111111111111'
+BOB = '22222222-2222-4222-8222-222222222222'
+
+
+def _fake(profiles=(BOB,)):
+    """Replays send_chat_message over a profiles table"""
+    fake = FakeSupabase({'profiles': [{'user_id': user_id} for user_id in profiles]})
+    digests = set()
+
+    def send_chat_message(params):
+        if params['p_verify_recipient'] and not any(row['user_id'] == params['p_recipient_id']
+                                                    for row in fake.tables['profiles']):
+            return {'success': False, 'error': 'RECIPIENT_NOT_FOUND'}
+        # Like notify(): the sender's first unread message opens a digest,
+        # later ones fold into it
+        digest = (params['p_sender_id'], params['p_recipient_id'])
+        collapsed = digest in digests
+        digests.add(digest)
+        return {'success': True, 'message_id': params['p_message_id'],
+                'timestamp': '2026-10-17T10:00:00+00:00', 'notification_collapsed': collapsed}
+
+    fake.rpcs['send_chat_message'] = send_chat_message
+    return fake
+
+
+@pytest.fixture
+def pushes(monkeypatch):
+    sent = []
+    monkeypatch.setattr(ExpoPushService, 'send_notification_to_user',
+                        classmethod(lambda cls, **kwargs: sent.append(kwargs) or True))
+    monkeypatch.setattr(ChatService, 'known_users', UserExistenceCache())
+    return sent
+
+
+def test_send_is_one_rpc_and_queues_the_push(pushes):
+    fake = _fake()
+
+    sent = ChatService.send(fake, ME, BOB, 'hello')
+
+    assert fake.targets == ['rpc:send_chat_message']  # No extra round trips
+    assert fake.rpc_calls[0][1]['p_verify_recipient'] is True
+    assert pushes[0]['user_id'] == BOB
+    assert pushes[0]['data']['message_id'] == sent['message_id']
+
+
+def test_known_recipients_skip_the_profile_check(pushes):
+    fake = _fake()
+
+    ChatService.send(fake, ME, BOB, 'one')
+    ChatService.send(fake, ME, BOB, 'two')
+
+    assert [params['p_verify_recipient'] for _, params in fake.rpc_calls] == [True, False]
+
+
+def test_collapsed_messages_queue_no_push(pushes):
+    fake = _fake(profiles=(ME, BOB))
+
+    ChatService.send(fake, ME, BOB, 'one')
+    ChatService.send(fake, ME, BOB, 'two')
+    ChatService.send(fake, BOB, ME, 'back')
+
+    assert [push['user_id'] for push in pushes] == [BOB, ME]
+
+
+def test_unknown_recipients_are_rejected_from_the_cache(pushes):
+    fake = _fake(profiles=())
+
+    for _ in range(2):
+        with pytest.raises(RecipientNotFoundError):
+            ChatService.send(fake, ME, BOB, 'anyone there?')
+
+    assert len(fake.rpc_calls) == 1
+    assert pushes == []
+
+
+def test_send_route(monkeypatch, pushes):
+    fake = _fake()
+    monkeypatch.setattr(chat_routes, 'supabase', fake)
+    client = create_app('testing').test_client()
+    headers = {'Authorization': f"Bearer {create_token(ME, 'me@example.com')}"}
+
+    resp = client.post('/api/chat/send', json={'recipient_id': BOB, 'content': ' hi '}, headers=headers)
+
+    assert resp.status_code == 200
+    assert resp.get_json()['success'] is True
+    assert fake.rpc_calls[0][1]['p_content'] == 'hi'
+
+    fake.tables['profiles'].clear()
+    ChatService.known_users.invalidate()
+    resp = client.post('/api/chat/send', json={'recipient_id': BOB, 'content': 'hi'}, headers=headers)
+    assert resp.status_code == 404
+    assert resp.get_json()['error'] == 'RECIPIENT_NOT_FOUND'
@@ -0,0 +1,79 @@
+import time
+import pytest
+from app import create_app
+from app.routes import dashboard_routes
+from app.utils.jwt_helper import create_token
+
+
+@pytest.fixture
+def dashboard_client(monkeypatch):
+    def slow(value):
+        def loader(user_id, fields):
+            time.sleep(0.2)
+            return value
+        return loader
+
+    def broken(user_id, fields):
+        raise Exception('Failed to retrieve balance')
+
+    monkeypatch.setattr(dashboard_routes, 'DASHBOARD_SECTIONS', {
+        'profile': slow({'user_id': 'u1', 'username': 'alice', 'net_worth': 10}),
+        'balance': broken,
+        'assets': slow([{'id': 'a1', 'name': 'Tech', 'value': 5}, {'id': 'a2', 'name': 'Coin', 'value': 1}]),
+        'jobs': slow([]),
+    })
+    app = create_app('testing')
+    headers = {'Authorization': f"Bearer {create_token('u1', 'alice@example.com')}"}
+    return app.test_client(), headers
+
+
+def test_sections_load_concurrently_with_partial_failure(dashboard_client):
+    client, headers = dashboard_client
+
+    started = time.monotonic()
+    response = client.get('/api/dashboard?fields[assets]=id,value', headers=headers)
+    elapsed = time.monotonic() - started
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body['partial'] is True
+    assert body['errors'] == {'balance': {'error': 'OPERATION_FAILED', 'message': 'Failed to retrieve balance'}}
+    assert body['data']['assets'] == [{'id': 'a1', 'value': 5}, {'id': 'a2', 'value': 1}]
+    assert body['data']['profile']['username'] == 'alice'
+    # Three 0.2s sections in parallel, not 0.6s in sequence
+    assert elapsed < 0.5
+
+
+def test_section_selection_and_validation(dashboard_client):
+    client, headers = dashboard_client
+
+    body = client.get('/api/dashboard?sections=jobs', headers=headers).get_json()
+    assert body['data'] == {'jobs': []} and body['partial'] is False
+
+    response = client.get('/api/dashboard?sections=jobs,weather', headers=headers)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'VALIDATION_ERROR'
+
+    response = client.get('/api/dashboard?sections=balance', headers=headers)
+    assert response.status_code == 500
+    assert response.get_json()['errors']['balance']['error'] == 'OPERATION_FAILED'
+
+
+def test_fields_must_be_plain_columns_of_the_selected_table(dashboard_client):
+    client, headers = dashboard_client
+
+    for query in ('fields[jobs]=*,profiles(*)', 'fields[assets]=id,owner:user_id', 'fields[jobs]=no_such_column'):
+        response = client.get(f'/api/dashboard?sections=jobs&{query}', headers=headers)
+        assert response.status_code == 400, query
+        assert response.get_json()['error'] == 'VALIDATION_ERROR'
+
+
+def test_sections_past_the_pending_limit_are_shed(dashboard_client):
+    client, headers = dashboard_client
+    client.application.config['DASHBOARD_MAX_PENDING'] = 2
+
+    body = client.get('/api/dashboard?sections=profile,assets,jobs', headers=headers).get_json()
+
+    assert set(body['data']) == {'profile', 'assets'}
+    assert body['errors']['jobs']['error'] == 'OVERLOADED'
+    assert dashboard_routes._pending == 0  # Slots come back once sections finish
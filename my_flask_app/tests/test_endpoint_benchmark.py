@@ -0,0 +1,56 @@
+import copy
+import os
+import sys
+import pytest
+from app import create_app
+from app.utils.local_supabase import LocalSupabase
+from config import TestingConfig
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+import endpoint_benchmark  # noqa: E402
+
+
+@pytest.fixture
+def bench_app(monkeypatch):
+    import app
+    monkeypatch.setattr('app.supabase', app.supabase)  # Restored after the test
+    monkeypatch.setattr(TestingConfig, 'SUPABASE_BACKEND', 'local')
+    flask_app = create_app('testing')
+    assert isinstance(endpoint_benchmark.local_backend(), LocalSupabase)
+    # Routes and services bound the client of whichever app imported them first
+    for name, module in list(sys.modules.items()):
+        if name.startswith('app.') and hasattr(module, 'supabase'):
+            monkeypatch.setattr(module, 'supabase', app.supabase)
+    return flask_app
+
+
+def test_sessions_cover_every_step_without_errors(bench_app):
+    players = endpoint_benchmark.seed_world(bench_app, players=2)
+
+    report = endpoint_benchmark.run_benchmark(bench_app, players, sessions=2, concurrency=2)
+
+    assert list(report['steps']) == list(endpoint_benchmark.STEPS)
+    assert report['errors'] == 0, report['steps']
+    assert report['requests'] == 2 * 2 * len(endpoint_benchmark.STEPS)
+    assert report['steps']['dashboard']['sql_calls'] >= 1
+    assert report['steps']['mission_start']['supabase_calls'] > 0
+    assert report['requests_per_sec'] > 0
+
+
+def test_compare_flags_throughput_errors_and_extra_queries():
+    step = {'requests': 10, 'errors': 0, 'mean_ms': 5, 'p50_ms': 5, 'p95_ms': 8, 'p99_ms': 9,
+            'supabase_calls': 3.0, 'sql_calls': 0.0}
+    baseline = {'requests_per_sec': 200.0, 'p95_ms': 10.0, 'steps': {'dashboard': step, 'purchase': step}}
+    report = copy.deepcopy(baseline)
+    assert endpoint_benchmark.compare(report, baseline) == []
+
+    report['requests_per_sec'] = 120.0
+    report['steps']['dashboard'].update(supabase_calls=4.0, errors=2)
+    del report['steps']['purchase']
+
+    assert endpoint_benchmark.compare(report, baseline, tolerance=0.3) == [
+        'throughput 120.0 req/s < 140.0 (baseline 200.0)',
+        'dashboard: 2 errors (baseline 0)',
+        'dashboard: 4.0 supabase_calls per request (baseline 3.0)',
+        'purchase: no longer requested',
+    ]
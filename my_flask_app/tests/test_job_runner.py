@@ -0,0 +1,154 @@
+import uuid
+import pytest
+from app import create_app, db
+from app.models.life_event import LifeEvent
+from app.models.profile import Profile
+from app.models.user_life_event import UserLifeEvent
+from app.services.push_notification_service import ExpoPushService
+from app.utils.job_runner import JobRunner, user_id_partitions
+from jobs import trigger_random_events
+
+
+def _testing_app():
+    return create_app('testing')
+
+
+def test_partitions_cover_uuid_space_without_overlap():
+    partitions = user_id_partitions(4)
+    ids = [uuid.uuid4() for _ in range(200)] + [uuid.UUID(int=0), uuid.UUID(int=(1 << 128) - 1)]
+
+    for user_id in ids:
+        owners = [p.index for p in partitions if p.contains(user_id)]
+        assert len(owners) == 1
+
+    assert partitions[0].lower is None and partitions[-1].upper is None
+    for left, right in zip(partitions, partitions[1:]):
+        assert left.upper == right.lower
+
+
+def test_interrupted_run_resumes_after_last_checkpoint(tmp_path):
+    # Evenly spread ids: 10 per partition, so the poison (6th of its
+    # partition) always fails after a checkpoint has been written
+    user_ids = [uuid.UUID(int=i * (1 << 128) // 40 + 1) for i in range(40)]
+    poison = user_ids[25]
+    handled = []
+    state = {'fail': True}
+
+    def work(ctx):
+        for user_id in user_ids:
+            if not ctx.partition.contains(user_id):
+                continue
+            if ctx.cursor is not None and user_id <= ctx.cursor:
+                continue
+            if user_id == poison and state['fail']:
+                raise RuntimeError('worker killed')
+            handled.append(user_id)
+            ctx.advance(user_id, seen=1)
+
+    def runner():
+        return JobRunner('test_job', work, run_key='2026-10', app_factory=_testing_app,
+                         partitions=4, workers=4, db_connection_budget=2,
+                         checkpoint_dir=str(tmp_path))
+
+    first = runner().run()
+    failed = [p.index for p in user_id_partitions(4) if p.contains(poison)]
+    assert first['failed_partitions'] == failed
+    assert first['processed'] < len(user_ids)
+
+    state['fail'] = False
+    second = runner().run()
+    assert second['failed_partitions'] == []
+    assert second['processed'] == len(user_ids)
+    assert second['counters'] == {'seen': len(user_ids)}
+    # Nothing handled twice across the two runs
+    assert sorted(handled) == user_ids
+
+    stats = {s['partition']: s for s in second['partitions']}
+    assert stats[failed[0]]['resumed']
+    assert all(s['skipped'] for i, s in stats.items() if i != failed[0])
+
+    # A third run with the same key has nothing left to do
+    handled.clear()
+    third = runner().run()
+    assert handled == [] and third['processed'] == len(user_ids)
+
+
+def test_resume_inside_a_user_with_cursor_key(tmp_path):
+    """Items of one user are checkpointed one by one (loan deductions)"""
+    user_id = uuid.UUID(int=1)
+    items = [(user_id, 'loan-a'), (user_id, 'loan-b'), (user_id, 'loan-c')]
+    charged = []
+    state = {'fail': True}
+
+    def work(ctx):
+        for owner, key in items:
+            if ctx.cursor is not None and (owner, key) <= (ctx.cursor, ctx.cursor_key or ''):
+                continue
+            if key == 'loan-b' and state['fail']:
+                raise RuntimeError('worker killed')
+            charged.append(key)
+            ctx.advance(owner, cursor_key=key, charged=1)
+
+    def runner():
+        return JobRunner('test_keyed_job', work, run_key='2026-10', app_factory=_testing_app,
+                         partitions=1, workers=1, checkpoint_dir=str(tmp_path))
+
+    assert runner().run()['failed_partitions'] == [0]
+    state['fail'] = False
+    second = runner().run()
+
+    assert charged == ['loan-a', 'loan-b', 'loan-c']
+    assert second['counters'] == {'charged': 3}
+
+
+class RecordingContext:
+    """PartitionContext stand-in that logs checkpoint moves"""
+
+    def __init__(self, log):
+        self.partition = user_id_partitions(1)[0]
+        self.cursor = None
+        self.log = log
+
+    def advance(self, cursor=None, **counters):
+        self.log.append(('advance', cursor))
+
+    def add(self, **counters):
+        pass
+
+
+def test_random_events_push_each_page_before_checkpointing_it(monkeypatch):
+    log = []
+    monkeypatch.setattr(trigger_random_events, 'PROFILE_PAGE_SIZE', 2)
+    monkeypatch.setattr(ExpoPushService, 'send_batch_notifications', classmethod(
+        lambda cls, notifications: log.append(('push', len(notifications))) or
+        {'success': len(notifications), 'failed': 0}))
+    user_ids = sorted(uuid.uuid4() for _ in range(3))
+    tables = [Profile.__table__, LifeEvent.__table__, UserLifeEvent.__table__]
+
+    with create_app('testing').app_context():
+        for table in tables:
+            table.create(db.engine)
+        try:
+            db.session.add(LifeEvent(title='Windfall', description='Found money', event_type='opportunity',
+                                     is_active=True))
+            for n, user_id in enumerate(user_ids):
+                db.session.add(Profile(user_id=user_id, username=f'player{n}', push_token=f'ExpoPushToken[{n}]'))
+            db.session.commit()
+
+            trigger_random_events._trigger_partition(RecordingContext(log))
+        finally:
+            db.session.remove()
+            for table in reversed(tables):
+                table.drop(db.engine)
+
+    assert log == [('push', 2), ('advance', user_ids[0]), ('advance', user_ids[1]),
+                   ('push', 1), ('advance', user_ids[2])]
+
+
+def test_connection_budget_caps_workers():
+    runner = JobRunner('budget', lambda ctx: None, run_key='x', app_factory=_testing_app,
+                       partitions=8, workers=16, db_connection_budget=3, checkpoint_dir=None)
+    assert runner.max_workers == 3
+
+    with pytest.raises(ValueError):
+        JobRunner('bad', lambda ctx: None, run_key='x', app_factory=_testing_app, executor='fork')
@@ -0,0 +1,49 @@
+import time
+import jwt
+from app.utils import jwt_helper
+from app.utils.jwt_helper import VerifiedTokenCache, create_token, decode_jwt_cached, token_cache
+
+
+def test_decode_jwt_cached_verifies_once(monkeypatch):
+    """Repeat requests with the same token skip signature verification"""
+    token_cache.clear()
+    token = create_token('user-123', 'player@example.com')
+    calls = []
+    real_decode = jwt_helper.decode_jwt
+
+    def counting_decode(t):
+        calls.append(t)
+        return real_decode(t)
+
+    monkeypatch.setattr(jwt_helper, 'decode_jwt', counting_decode)
+
+    for _ in range(3):
+        assert decode_jwt_cached(token)['sub'] == 'user-123'
+
+    assert len(calls) == 1
+    assert token_cache.stats() == {'hits': 2, 'misses': 1, 'size': 1}
+    token_cache.clear()
+
+
+def test_invalid_tokens_are_not_cached():
+    token_cache.clear()
+    bad = jwt.encode({'sub': 'x', 'aud': 'authenticated', 'exp': int(time.time()) + 60}, 'wrong-secret', algorithm='HS256')
+
+    assert decode_jwt_cached(bad) is None
+    assert decode_jwt_cached(bad) is None
+    assert token_cache.stats()['size'] == 0
+
+
+def test_cache_evicts_expired_and_least_recent():
+    cache = VerifiedTokenCache(max_size=2)
+    now = time.time()
+    cache.put('a', {'sub': 'a', 'exp': now + 60})
+    cache.put('b', {'sub': 'b', 'exp': now + 60})
+    cache.get('a')
+    cache.put('c', {'sub': 'c', 'exp': now + 60})
+
+    assert cache.get('b') is None
+    assert cache.get('a')['sub'] == 'a'
+
+    cache.put('expired', {'sub': 'old', 'exp': now - 1})
+    assert cache.get('expired') is None
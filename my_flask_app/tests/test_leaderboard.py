@@ -0,0 +1,120 @@
+import threading
+import uuid
+from types import SimpleNamespace
+import pytest
+from app import create_app, db
+from app.models.profile import Profile
+from app.services.leaderboard_service import DISPLAY_COLUMNS, LeaderboardService, MetricRanking
+from app.services.profile_service import ProfileService
+
+
+@pytest.fixture
+def players():
+    app = create_app('testing')
+    app.config['LEADERBOARD_REFRESH_SECONDS'] = 3600
+    with app.app_context():
+        Profile.__table__.create(db.engine)
+        LeaderboardService.invalidate()
+        worths = [900, 100, 500, 500, 300, 700, 200]
+        ids = []
+        for i, worth in enumerate(worths):
+            user_id = uuid.uuid4()
+            db.session.add(Profile(user_id=user_id, username=f'player{i}', net_worth=worth, sanity=50 + i))
+            ids.append(str(user_id))
+        db.session.commit()
+        yield app, dict(zip(ids, worths))
+        LeaderboardService.invalidate()
+        db.session.remove()
+        Profile.__table__.drop(db.engine)
+
+
+def test_ranking_rank_and_ties():
+    ranking = MetricRanking({'a': 10, 'b': 30, 'c': 30, 'd': 5})
+    assert ranking.rank_of_value(30) == 1
+    assert ranking.rank_of_value(10) == 3
+    assert ranking.rank_of_value(1) == 5
+    ranking.upsert('d', 40)
+    assert ranking.keys[0] == (-40, 'd') and len(ranking) == 4
+
+
+def test_cursor_pages_cover_the_board_in_order(players):
+    app, worths = players
+    seen = []
+    cursor = None
+    while True:
+        page = LeaderboardService.top('net_worth', 3, cursor)
+        seen.extend(page['data'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+
+    assert [row['net_worth'] for row in seen] == sorted(worths.values(), reverse=True)
+    assert [row['rank'] for row in seen] == [1, 2, 3, 3, 5, 6, 7]
+    assert seen[0]['username'] == 'player0' and page['total'] == len(worths)
+
+
+def test_around_me_and_incremental_updates(players):
+    app, worths = players
+    me = next(uid for uid, w in worths.items() if w == 300)
+
+    result = LeaderboardService.around('net_worth', me, window=1)
+    assert [row['net_worth'] for row in result['data']] == [500, 300, 200]
+    assert result['rank'] == 5
+
+    # Profile writes move the player without waiting for a rebuild
+    ProfileService.update_net_worth(uuid.UUID(me), 1000)
+    assert LeaderboardService.rank_of('net_worth', me) == 1
+    assert LeaderboardService.top('net_worth', 1)['data'][0]['user_id'] == me
+
+
+def test_tied_players_get_the_same_rank_everywhere(players):
+    app, worths = players
+    tied = sorted(uid for uid, w in worths.items() if w == 500)
+
+    top = {row['user_id']: row['rank'] for row in LeaderboardService.top('net_worth', 10)['data']}
+    for me in tied:
+        around = LeaderboardService.around('net_worth', me, window=1)
+        rows = {row['user_id']: row['rank'] for row in around['data']}
+        assert top[me] == rows[me] == around['rank'] == LeaderboardService.rank_of('net_worth', me) == 3
+        assert all(rows[uid] == 3 for uid in tied)
+
+
+def test_rank_route_uses_snapshot(players):
+    app, worths = players
+    tied = [uid for uid, w in worths.items() if w == 500]
+
+    with app.test_client() as client:
+        body = client.get(f'/api/social/rank/{tied[1]}').get_json()
+    assert body == {'success': True, 'data': 3}
+
+
+def test_writes_during_a_rebuild_neither_wait_nor_get_lost(players, monkeypatch):
+    app, worths = players
+    me = next(uid for uid, w in worths.items() if w == 100)
+    scanned = LeaderboardService.build_snapshot()  # What the slow scan will return
+    started, release = threading.Event(), threading.Event()
+
+    def slow_build():
+        started.set()
+        release.wait(5)
+        return scanned
+
+    def rebuild_snapshot():
+        with app.app_context():
+            LeaderboardService.snapshot()
+
+    monkeypatch.setattr(LeaderboardService, 'build_snapshot', staticmethod(slow_build))
+    LeaderboardService.invalidate()
+    rebuild = threading.Thread(target=rebuild_snapshot)
+    rebuild.start()
+    assert started.wait(5)
+
+    row = dict(zip(DISPLAY_COLUMNS, scanned.rows[me]), net_worth=5000)
+    writer = threading.Thread(target=LeaderboardService.record_player, args=(SimpleNamespace(**row),))
+    writer.start()
+    writer.join(1)
+    assert not writer.is_alive()  # Not blocked behind the scan
+
+    release.set()
+    rebuild.join(5)
+    assert LeaderboardService.rank_of('net_worth', me) == 1
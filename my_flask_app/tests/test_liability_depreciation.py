@@ -0,0 +1,59 @@
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+import pytest
+from app import create_app, db
+from app.models.player_liability import PlayerLiability
+from app.services.liability_service import LiabilityService
+
+
+@pytest.fixture
+def liabilities_db():
+    app = create_app('testing')
+    with app.app_context():
+        PlayerLiability.__table__.create(db.engine)
+        yield
+        db.session.remove()
+        PlayerLiability.__table__.drop(db.engine)
+
+
+def _liability(price, current=None, months=0, last=None, active=True):
+    liability = PlayerLiability(player_id=uuid.uuid4(), liability_id=uuid.uuid4(), purchase_price=price,
+                                monthly_cost=10, current_value=current, months_owned=months,
+                                last_depreciation_date=last, is_active=active)
+    db.session.add(liability)
+    return liability
+
+
+def test_bulk_depreciation_matches_per_row_calculation(liabilities_db):
+    last_month = date.today().replace(day=1) - timedelta(days=1)
+    rows = [
+        _liability(10000, 9000, months=3, last=last_month),     # year 1 rate
+        _liability(10000, 8000, months=20, last=last_month),    # year 2+ rate
+        _liability(10000, 501, months=40, last=last_month),     # clamps to the 5% floor
+        _liability(10000, 500, months=50, last=last_month),     # already at the floor
+        _liability(2000, None, months=0),                       # never valued yet
+        _liability(10000, 9000, months=3, last=date.today()),   # already done this month
+        _liability(10000, 9000, months=3, active=False),        # sold
+    ]
+    db.session.commit()
+
+    expected = {row.id: LiabilityService.calculate_depreciation(row) for row in rows[:5]}
+    expected_total = sum(r['depreciation_amount'] for r in expected.values())
+
+    result = LiabilityService.apply_monthly_depreciation_bulk(chunk_size=2)
+
+    assert result['updated_count'] == 4
+    assert result['total_depreciation'] == pytest.approx(expected_total, abs=0.01)
+
+    db.session.expire_all()
+    for row in rows[:5]:
+        assert float(row.current_value) == pytest.approx(expected[row.id]['current_value'], abs=0.01)
+    assert [row.months_owned for row in rows] == [4, 21, 41, 50, 1, 3, 3]
+    assert rows[0].last_depreciation_date == date.today()
+    assert rows[5].current_value == Decimal('9000')
+
+    # Idempotent within the month
+    again = LiabilityService.apply_monthly_depreciation_bulk(chunk_size=2)
+    assert again['updated_count'] == 0
+    assert again['total_depreciation'] == 0
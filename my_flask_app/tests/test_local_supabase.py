@@ -0,0 +1,136 @@
+import time
+import uuid
+import pytest
+from postgrest.exceptions import APIError
+from app import create_app
+from app.routes import notification_routes
+from app.services.notification_service import NotificationService
+from app.utils.jwt_helper import create_token
+from app.utils.local_supabase import LocalSupabase
+from app.utils.request_metrics import metrics
+from config import TestingConfig
+
+ME = str(uuid.uuid4())
+OTHER = str(uuid.uuid4())
+
+
+@pytest.fixture
+def local():
+    local = LocalSupabase()
+    local.create_schema()
+    local.seed('profiles', [{'user_id': ME, 'username': 'me', 'sanity': 50},
+                            {'user_id': OTHER, 'username': 'other', 'sanity': 99}])
+    return local
+
+
+def test_selects_support_filters_embeds_and_counts(local):
+    prop = local.seed('rental_properties', [{'name': 'Studio', 'monthly_rent': 800, 'location': 'Downtown',
+                                             'property_type': 'apartment'}])[0]
+    local.seed('player_rentals', [{'player_id': ME, 'property_id': prop['id'], 'monthly_rent': 800}])
+
+    rental = local.table('player_rentals').select('*, rental_properties(name)')\
+        .eq('player_id', ME).eq('is_active', True).maybe_single().execute()
+    assert rental.data['rental_properties'] == {'name': 'Studio'}
+    assert rental.data['player_id'] == ME and isinstance(rental.data['rented_at'], str)
+
+    found = local.table('profiles').select('username', count='exact')\
+        .or_('username.eq.me,and(username.ilike.OTH*,sanity.gte.90)').order('username', desc=True).limit(1).execute()
+    assert found.data == [{'username': 'other'}] and found.count == 2
+    assert local.table('profiles').select('username').not_.is_('push_token', 'null').execute().data == []
+    assert local.table('profiles').select('username').eq('user_id', str(uuid.uuid4())).maybe_single().execute() is None
+
+
+def test_errors_look_like_postgrest(local):
+    cases = [
+        (lambda: local.table('profiles').select('*').eq('user_id', str(uuid.uuid4())).single(), 'PGRST116'),
+        (lambda: local.table('profiles').select('*').eq('user_id', 'not-a-uuid'), '22P02'),
+        (lambda: local.table('profiles').insert({'user_id': str(uuid.uuid4()), 'username': 'me'}), '23505'),
+        (lambda: local.table('profiles').update({'nickname': 'x'}).eq('user_id', ME), 'PGRST204'),
+        (lambda: local.table('no_such_table').select('*'), '42P01'),
+        (lambda: local.rpc('start_integrated_mission', {}), 'PGRST202'),
+    ]
+    for build, code in cases:
+        with pytest.raises(APIError) as error:
+            build().execute()
+        assert error.value.code == code
+
+
+def test_type_errors_inside_a_function_twin_are_not_reported_as_pgrst202():
+    def broken(local, conn, p_user_id):
+        return p_user_id + 1
+
+    local = LocalSupabase(functions={'broken': broken})
+    with pytest.raises(APIError) as error:
+        local.rpc('broken', {'p_user_id': ME, 'p_extra': 1}).execute()
+    assert error.value.code == 'PGRST202'
+    with pytest.raises(TypeError):
+        local.rpc('broken', {'p_user_id': ME}).execute()
+
+
+def test_function_twins_and_counter_trigger(local):
+    local.seed('user_balances', [{'user_id': ME, 'current_balance': 100}])
+    result = local.rpc('apply_balance_delta', {'p_user_id': ME, 'p_delta': '-30.50', 'p_description': 'Rent',
+                                               'p_category': 'housing'}).execute().data
+    assert result['success'] and result['new_balance'] == 69.5
+    assert local.rpc('apply_balance_delta', {'p_user_id': ME, 'p_delta': '-100', 'p_description': 'x'})\
+        .execute().data['error'] == 'INSUFFICIENT_FUNDS'
+
+    post = local.seed('void_posts', [{'user_id': OTHER, 'content': 'rent is due'}])[0]
+    reaction = local.rpc('toggle_void_reaction', {'p_user_id': ME, 'p_post_id': post['id'],
+                                                  'p_reaction_type': 'same'}).execute().data
+    assert (reaction['action'], reaction['same_count']) == ('added', 1)
+    assert local.table('profiles').select('sanity').eq('user_id', OTHER).single().execute().data['sanity'] == 100
+
+    # A resent write-behind batch (same id) is acknowledged without reapplying
+    batch = {'p_deltas': [{'post_id': post['id'], 'oof': 2, 'same': 0}], 'p_batch_id': str(uuid.uuid4())}
+    assert local.rpc('apply_void_reaction_counts', batch).execute().data == 1
+    assert local.rpc('apply_void_reaction_counts', batch).execute().data == 0
+    assert local.table('void_posts').select('oof_count').eq('id', post['id']).single().execute().data['oof_count'] == 2
+
+    for n in range(3):
+        local.rpc('send_chat_message', {'p_sender_id': ME, 'p_recipient_id': OTHER, 'p_content': f'hi {n}'}).execute()
+    assert NotificationService.unread_count(local, OTHER) == 1  # Collapsed into one digest
+    inbox = local.rpc('chat_conversations', {'p_user_id': OTHER}).execute().data
+    assert [(row['peer_id'], row['content'], row['unread_count']) for row in inbox] == [(ME, 'hi 2', 3)]
+
+    mark = NotificationService.list_page(local, OTHER)['high_water_mark']
+    assert NotificationService.mark_read(local, OTHER) == 1
+    assert NotificationService.unread_count(local, OTHER) == 0
+    assert NotificationService.list_page(local, OTHER, since=mark)['data'] == []  # Reading doesn't resync
+
+
+def test_latency_is_injected_per_call():
+    local = LocalSupabase(latency_ms=20)
+    local.create_schema()
+
+    started = time.perf_counter()
+    local.table('profiles').select('*').execute()
+    local.table('profiles').select('*').execute()
+
+    assert time.perf_counter() - started >= 0.04
+
+
+def test_create_app_serves_routes_from_the_local_backend(monkeypatch):
+    import app
+    monkeypatch.setattr('app.supabase', app.supabase)  # Restored after the test
+    monkeypatch.setattr(TestingConfig, 'SUPABASE_BACKEND', 'local')
+    flask_app = create_app('testing')
+    assert isinstance(app.supabase.client, LocalSupabase)
+    monkeypatch.setattr(notification_routes, 'supabase', app.supabase)
+    for n in range(3):
+        app.supabase.client.rpc('notify', {'p_user_id': ME, 'p_type': 'system', 'p_title': f't{n}',
+                                           'p_message': f'm{n}'}).execute()
+    metrics.reset()
+    client = flask_app.test_client()
+    headers = {'Authorization': f"Bearer {create_token(ME, 'me@example.com')}"}
+
+    first = client.get('/api/notifications/?limit=2', headers=headers).get_json()
+    second = client.get(f"/api/notifications/?limit=2&cursor={first['next_cursor']}", headers=headers).get_json()
+    unread = client.get('/api/notifications/unread', headers=headers)
+
+    assert [row['title'] for row in first['data'] + second['data']] == ['t2', 't1', 't0']
+    assert unread.get_json()['data'] == 3
+    assert 'supabase;dur=' in unread.headers['Server-Timing'] and 'sql;' not in unread.headers['Server-Timing']
+    assert 'app_db_calls_total{route="/api/notifications/unread",backend="supabase",' \
+           'target="notification_counters"} 1' in metrics.render()
+    metrics.reset()
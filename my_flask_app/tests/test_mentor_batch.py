@@ -0,0 +1,82 @@
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from app import create_app, db
+from app.models.profile import Profile
+from app.models.user_asset import UserAsset
+from app.models.liability import Liability
+from app.models.user_balance import UserBalance
+from app.models.job import Job
+from app.models.transaction import Transaction
+from app.services.mentor_service import MentorService
+from app.utils.query_budget import QueryBudgetExceeded, query_budget
+
+# Only the tables the metrics read (the full schema uses JSONB, which SQLite can't create)
+METRIC_TABLES = [Profile, UserAsset, Liability, UserBalance, Job, Transaction]
+
+
+@pytest.fixture
+def metrics_db():
+    app = create_app('testing')
+    with app.app_context():
+        for model in METRIC_TABLES:
+            model.__table__.create(db.engine)
+        yield
+        db.session.remove()
+        for model in reversed(METRIC_TABLES):
+            model.__table__.drop(db.engine)
+
+
+def _seed_player(username, with_assets=True):
+    user_id = uuid.uuid4()
+    now = datetime.utcnow()
+    db.session.add(Profile(user_id=user_id, username=username, net_worth=12000, monthly_income=3000,
+                           monthly_savings=1000, engagement_days=200, created_at=now - timedelta(days=400),
+                           updated_at=now - timedelta(days=8)))
+    db.session.add(UserBalance(user_id=user_id, current_balance=5000))
+    if with_assets:
+        db.session.add(UserAsset(user_id=user_id, asset_type='stocks', name='Tech', value=4000, purchase_price=3000,
+                                 purchase_date=now - timedelta(days=90)))
+        db.session.add(UserAsset(user_id=user_id, asset_type='crypto', name='Coin', value=1000, purchase_price=1500,
+                                 purchase_date=now - timedelta(days=30)))
+    db.session.add(Liability(user_id=user_id, name='Car', liability_type='car_loan', amount=8000, monthly_payment=400))
+    db.session.add(Job(user_id=user_id, title='Dev', salary=3000, work_hours_per_week=65,
+                       start_date=now - timedelta(days=240)))
+    db.session.add(Transaction(user_id=user_id, type='expense', category='rent', amount=2800,
+                               transaction_date=now - timedelta(days=3)))
+    db.session.add(Transaction(user_id=user_id, type='income', category='salary', amount=2500,
+                               transaction_date=now - timedelta(days=2)))
+    db.session.add(Transaction(user_id=user_id, type='income', category='salary', amount=9999,
+                               transaction_date=now - timedelta(days=60)))
+    return user_id
+
+
+def test_batch_metrics_match_per_player_analysis(metrics_db):
+    """The grouped-query path yields the same metrics dict as the per-player path"""
+    player_ids = [_seed_player('alice'), _seed_player('bob', with_assets=False)]
+    db.session.commit()
+
+    batch = MentorService.analyze_players_batch(player_ids + [uuid.uuid4()])
+
+    assert set(batch) == set(player_ids)
+    for player_id in player_ids:
+        single = MentorService.analyze_player_finances(player_id)
+        assert batch[player_id].pop('asset_types') == single.pop('asset_types')
+        assert batch[player_id] == pytest.approx(single)
+
+
+def test_batch_cost_does_not_grow_with_players(metrics_db):
+    """Same budget as the daily_mentor_analysis chunk; the per-player path blows it"""
+    player_ids = [_seed_player(f'player{i}') for i in range(8)]
+    db.session.commit()
+
+    with query_budget('mentor.batch', max_sql=6, max_repeats=1) as budget:
+        MentorService.analyze_players_batch(player_ids)
+    assert budget.calls['sql'] == 6
+
+    with pytest.raises(QueryBudgetExceeded) as error:
+        with query_budget('mentor.per_player', max_sql=6, max_repeats=1):
+            for player_id in player_ids:
+                MentorService.analyze_player_finances(player_id)
+    shape, repeats = error.value.violation['top_shapes'][0]
+    assert repeats == 2 * len(player_ids) and shape.startswith('SELECT ... FROM transactions WHERE')
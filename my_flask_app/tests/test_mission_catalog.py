@@ -0,0 +1,54 @@
+import pytest
+from conftest import FakeSupabase
+from app import create_app
+from app.routes import mission_routes
+from app.utils.catalog_cache import catalog_cache
+from app.utils.jwt_helper import create_token
+
+MISSIONS = [
+    {'id': 'm1', 'name': 'Frugal Month', 'description': 'Spend less', 'category': 'budgeting',
+     'difficulty': 'easy', 'duration_months': 1, 'income_multiplier': 1, 'max_loan_amount': None,
+     'mission_decision_points': [{'id': 'd1'}], 'mission_success_criteria': []},
+    {'id': 'm2', 'name': 'Side Hustle', 'description': 'Earn more', 'category': 'income',
+     'difficulty': 'medium', 'duration_months': 3, 'max_loan_amount': 5000,
+     'mission_decision_points': [], 'mission_success_criteria': [{'id': 'c1'}]},
+]
+
+
+@pytest.fixture
+def mission_client(monkeypatch):
+    app = create_app('testing')
+    catalog_cache.configure(ttls={'integrated_missions': 60})
+    fake = FakeSupabase({
+        'profiles': [{'user_id': 'u1', 'net_worth': 0, 'monthly_income': 0, 'credit_score': 700}],
+        'integrated_missions': MISSIONS,
+        'mission_completion_results': [{'player_id': 'u1', 'mission_id': 'm1', 'completed': True}],
+        'player_mission_progress': [],
+    })
+    monkeypatch.setattr(mission_routes, 'supabase', fake)
+    headers = {'Authorization': f"Bearer {create_token('u1', 'alice@example.com')}"}
+    yield app.test_client(), headers, fake
+    catalog_cache.configure(ttls={}, default_ttl=0)
+
+
+def test_available_missions_come_from_cached_catalog(mission_client):
+    client, headers, fake = mission_client
+
+    for _ in range(3):
+        body = client.get('/api/missions/available', headers=headers).get_json()
+
+    assert fake.targets.count('integrated_missions') == 1
+    assert [m['id'] for m in body['data']] == ['m2']
+    mission = body['data'][0]
+    assert mission['constraints']['max_loan_amount'] == 5000.0
+    assert mission['success_criteria'] == [{'id': 'c1'}]
+    assert mission['can_start'] is True and mission['prerequisite_reasons'] == []
+
+
+def test_active_mission_hides_catalog(mission_client):
+    client, headers, fake = mission_client
+    fake.tables['player_mission_progress'].append({'player_id': 'u1', 'mission_id': 'm2', 'is_active': True})
+
+    body = client.get('/api/missions/available', headers=headers).get_json()
+
+    assert body['data'] == [] and body['has_active_mission'] is True
@@ -0,0 +1,109 @@
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from conftest import FakeSupabase
+from app import create_app, db
+from app.models.notification import Notification
+from app.models.notification_archive import NotificationArchive
+from app.services.notification_service import NotificationService
+from app.services.push_notification_service import ExpoPushService
+from app.utils.job_runner import user_id_partitions
+
+
+def _notify(rows, params):
+    """Python twin of the notify function's collapse rule"""
+    for row in rows:
+        if (params['p_collapse_key'] and row['collapse_key'] == params['p_collapse_key']
+                and row['user_id'] == params['p_user_id'] and not row['read']):
+            row['group_count'] += 1
+            row['message'] = params['p_digest_message'].replace('{count}', str(row['group_count']))
+            return {'success': True, 'notification_id': row['id'], 'collapsed': True, 'group_count': row['group_count']}
+    row = {'id': f'n{len(rows)}', 'user_id': params['p_user_id'], 'message': params['p_message'],
+           'collapse_key': params['p_collapse_key'], 'group_count': 1, 'read': False}
+    rows.append(row)
+    return {'success': True, 'notification_id': row['id'], 'collapsed': False, 'group_count': 1}
+
+
+def _fake():
+    fake = FakeSupabase({'notifications': [], 'notification_counters': []})
+    fake.rpcs['notify'] = lambda params: _notify(fake.tables['notifications'], params)
+    return fake
+
+
+@pytest.fixture
+def pushes(monkeypatch):
+    sent = []
+    monkeypatch.setattr(ExpoPushService, 'send_notification_to_user',
+                        classmethod(lambda cls, **kwargs: sent.append(kwargs) or True))
+    return sent
+
+
+def _follow(fake, user_id='u1'):
+    return NotificationService.notify(
+        fake, user_id, 'follow', 'New Follower', 'Someone started following you!',
+        collapse_key='follow', digest_message='{count} new followers',
+        push={'title': 'New Follower', 'body': 'Someone started following you!'}
+    )
+
+
+def test_burst_collapses_into_one_row_and_one_push(pushes):
+    fake = _fake()
+
+    results = [_follow(fake) for _ in range(5)]
+
+    assert [r['collapsed'] for r in results] == [False, True, True, True, True]
+    assert len(fake.tables['notifications']) == 1
+    assert fake.tables['notifications'][0]['message'] == '5 new followers'
+    assert len(pushes) == 1
+
+
+def test_read_digest_starts_a_new_one(pushes):
+    fake = _fake()
+    _follow(fake)
+    fake.tables['notifications'][0]['read'] = True
+
+    assert _follow(fake)['collapsed'] is False
+    assert len(fake.tables['notifications']) == 2
+    assert len(pushes) == 2
+
+
+def test_unread_count_reads_the_counter():
+    fake = _fake()
+    fake.tables['notification_counters'].append({'user_id': 'u1', 'unread_count': 7})
+
+    assert NotificationService.unread_count(fake, 'u1') == 7
+    assert NotificationService.unread_count(fake, 'nobody') == 0
+
+
+@pytest.fixture
+def notifications_db():
+    app = create_app('testing')
+    with app.app_context():
+        Notification.__table__.create(db.engine)
+        NotificationArchive.__table__.create(db.engine)
+        yield
+        db.session.remove()
+        NotificationArchive.__table__.drop(db.engine)
+        Notification.__table__.drop(db.engine)
+
+
+def _notification(read, age_days, user_id=None):
+    db.session.add(Notification(user_id=user_id or uuid.uuid4(), type='follow', title='t', message='m',
+                                read=read, created_at=datetime.utcnow() - timedelta(days=age_days)))
+
+
+def test_archive_moves_only_old_read_rows(notifications_db):
+    for _ in range(5):
+        _notification(read=True, age_days=60)
+    _notification(read=False, age_days=60)   # Unread: kept
+    _notification(read=True, age_days=1)     # Recent: kept
+    db.session.commit()
+
+    archived = sum(NotificationService.archive_read(30, partition=p, chunk_size=2)
+                   for p in user_id_partitions(4))
+
+    assert archived == 5
+    assert Notification.query.count() == 2
+    assert NotificationArchive.query.count() == 5
+    assert all(row.archived_at for row in NotificationArchive.query)
+    assert NotificationService.archive_read(30) == 0
@@ -0,0 +1,104 @@
+import base64
+import json
+import pytest
+from conftest import FakeSupabase
+from app import create_app
+from app.routes import notification_routes
+from app.services.notification_service import NotificationService, decode_notification_cursor
+from app.utils.jwt_helper import create_token
+
+ME = 'u1'
+
+
+def _id(i):
+    return f'00000000-0000-4000-8000-{i:012d}'
+
+
+def _row(i, read=False, user_id=ME):
+    return {'id': _id(i), 'user_id': user_id, 'title': f'note {i}', 'read': read,
+            'updated_at': f'2026-10-17T10:00:{i:02d}+00:00'}
+
+
+def _fake(rows):
+    return FakeSupabase({'notifications': rows})
+
+
+def test_cursor_pages_walk_newest_first():
+    fake = _fake([_row(i) for i in range(7)] + [_row(9, user_id='u2')])
+    seen, cursor = [], None
+    first = NotificationService.list_page(fake, ME, limit=3)
+    while True:
+        page = NotificationService.list_page(fake, ME, cursor=cursor, limit=3)
+        seen.extend(r['id'] for r in page['data'])
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+
+    assert seen == [_id(i) for i in range(6, -1, -1)]
+    assert first['high_water_mark']
+
+
+def test_since_returns_only_the_delta_and_advances_the_mark():
+    fake = _fake([_row(i) for i in range(3)])
+    mark = NotificationService.list_page(fake, ME)['high_water_mark']
+
+    nothing = NotificationService.list_page(fake, ME, since=mark)
+    assert nothing['data'] == [] and nothing['high_water_mark'] == mark
+
+    fake.tables['notifications'] += [_row(i) for i in range(3, 8)]
+    fake.tables['notifications'][0]['updated_at'] = '2026-10-17T10:00:59+00:00'  # A digest that grew
+
+    first = NotificationService.list_page(fake, ME, since=mark, limit=4)
+    second = NotificationService.list_page(fake, ME, since=first['high_water_mark'], limit=4)
+
+    assert [r['id'] for r in first['data']] == [_id(3), _id(4), _id(5), _id(6)]
+    assert first['has_more'] is True
+    assert [r['id'] for r in second['data']] == [_id(7), _id(0)]
+    assert second['has_more'] is False
+
+
+def test_mark_read_up_to_leaves_newer_rows_unread():
+    fake = _fake([_row(i) for i in range(5)])
+    mark = NotificationService.list_page(fake, ME)['high_water_mark']
+    fake.tables['notifications'].append(_row(8))
+
+    assert NotificationService.mark_read(fake, ME, up_to=mark) == 5
+    assert [r['id'] for r in fake.tables['notifications'] if not r['read']] == [_id(8)]
+    assert NotificationService.mark_read(fake, ME) == 1
+
+
+def test_cursor_values_are_validated_before_reaching_the_filter():
+    def cursor(updated_at, notification_id):
+        return base64.urlsafe_b64encode(json.dumps([updated_at, notification_id]).encode()).decode()
+
+    assert decode_notification_cursor(cursor('2026-10-17T10:00:00Z', _id(1).upper())) == \
+        ('2026-10-17T10:00:00+00:00', _id(1))
+    for bad in (cursor('2026-10-17T10:00:00', f'{_id(1)}),user_id.neq.x'),
+                cursor('2026-10-17",title.ilike."*', _id(1)),
+                'not-base64!'):
+        with pytest.raises(ValueError):
+            decode_notification_cursor(bad)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = _fake([_row(i) for i in range(4)])
+    monkeypatch.setattr(notification_routes, 'supabase', fake)
+    return create_app('testing').test_client(), fake
+
+
+def _auth():
+    return {'Authorization': f"Bearer {create_token(ME, 'alice@example.com')}"}
+
+
+def test_routes(client):
+    client, fake = client
+
+    body = client.get('/api/notifications/?limit=2', headers=_auth()).get_json()
+    assert [r['id'] for r in body['data']] == [_id(3), _id(2)]
+    assert body['has_more'] is True
+
+    resp = client.put('/api/notifications/read-all', json={'up_to': body['high_water_mark']}, headers=_auth())
+    assert resp.get_json()['marked'] == 4
+
+    assert client.get('/api/notifications/?since=garbage', headers=_auth()).status_code == 400
@@ -0,0 +1,133 @@
+import requests
+from flask import Flask
+from conftest import FakeSupabase
+from app.services.push_notification_service import ExpoPushService, PushDeliveryQueue, PushTokenResolver
+
+
+def test_queue_coalesces_into_batches_and_flushes():
+    delivered = []
+    push_queue = PushDeliveryQueue(delivered.append, max_batch_size=3, flush_interval=0.2)
+
+    for i in range(7):
+        push_queue.enqueue({'message': {'to': f'ExpoPushToken[{i}]'}})
+
+    assert push_queue.flush(timeout=5)
+    assert push_queue.pending() == 0
+    assert sum(len(batch) for batch in delivered) == 7
+    assert all(len(batch) <= 3 for batch in delivered)
+    assert len(delivered) < 7
+
+
+def test_queue_survives_delivery_errors():
+    def explode(batch):
+        raise RuntimeError('expo down')
+
+    push_queue = PushDeliveryQueue(explode, max_batch_size=10, flush_interval=0.01)
+    push_queue.enqueue({'message': {}})
+    assert push_queue.flush(timeout=5)
+
+
+class FakeHttpResponse:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self._payload = payload or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(str(self.status_code), response=self)
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.posts = 0
+
+    def post(self, url, json=None, timeout=None):
+        self.posts += 1
+        return self.responses.pop(0)
+
+
+def test_post_messages_retries_transient_errors(monkeypatch):
+    session = FakeSession([FakeHttpResponse(503), FakeHttpResponse(200, {'data': [{'status': 'ok'}]})])
+    monkeypatch.setattr(ExpoPushService, '_session', session)
+    monkeypatch.setattr(ExpoPushService, 'RETRY_BACKOFF_SECONDS', 0)
+
+    tickets = ExpoPushService._post_messages([{'to': 'ExpoPushToken[x]'}])
+
+    assert tickets == [{'status': 'ok'}]
+    assert session.posts == 2
+
+
+def _looked_up(client):
+    """user_ids asked for by each profiles query"""
+    return [list(query.args('in_')[1]) for query in client.executed]
+
+
+def test_token_resolver_bulk_lookup_and_invalidation():
+    """Misses are fetched in chunked `in` queries; hits never query, and
+    users without a token are never cached"""
+    client = FakeSupabase({'profiles': [
+        {'user_id': 'u1', 'push_token': 'ExpoPushToken[1]'},
+        {'user_id': 'u2', 'push_token': None},
+        {'user_id': 'u3', 'push_token': 'ExpoPushToken[3]'},
+    ]})
+    resolver = PushTokenResolver()
+    resolver.LOOKUP_CHUNK_SIZE = 2
+
+    tokens = resolver.resolve_many(client, ['u1', 'u2', 'u3', 'u4'])
+    assert tokens == {'u1': 'ExpoPushToken[1]', 'u2': None, 'u3': 'ExpoPushToken[3]', 'u4': None}
+    assert _looked_up(client) == [['u1', 'u2'], ['u3', 'u4']]
+
+    assert resolver.resolve(client, 'u1') == 'ExpoPushToken[1]'
+    assert len(client.executed) == 2
+
+    # A token registered on another worker is picked up on the next push
+    client.tables['profiles'][1]['push_token'] = 'ExpoPushToken[2]'
+    assert resolver.resolve(client, 'u2') == 'ExpoPushToken[2]'
+    assert _looked_up(client)[-1] == ['u2']
+
+    resolver.set('u3', None)  # Unregistered on this worker
+    client.tables['profiles'][2]['push_token'] = None
+    assert resolver.resolve(client, 'u3') is None
+
+    resolver.invalidate('u1')
+    resolver.resolve(client, 'u1')
+    assert _looked_up(client)[-1] == ['u1']
+
+
+def test_token_cache_ttl_comes_from_config(monkeypatch):
+    monkeypatch.setattr(ExpoPushService, 'token_resolver', PushTokenResolver())
+    app = Flask(__name__)
+    app.config['PUSH_TOKEN_CACHE_TTL'] = 0
+    ExpoPushService.init_app(app)
+    client = FakeSupabase({'profiles': [{'user_id': 'u1', 'push_token': 'ExpoPushToken[1]'}]})
+
+    for _ in range(2):
+        assert ExpoPushService.token_resolver.resolve(client, 'u1') == 'ExpoPushToken[1]'
+    assert len(client.executed) == 2
+
+
+def test_pushes_without_the_queue_go_out_together_after_the_request(monkeypatch):
+    client = FakeSupabase({'profiles': [
+        {'user_id': 'u1', 'push_token': 'ExpoPushToken[1]'},
+        {'user_id': 'u2', 'push_token': 'ExpoPushToken[2]'},
+    ]})
+    posts = []
+    monkeypatch.setattr(ExpoPushService, 'token_resolver', PushTokenResolver())
+    monkeypatch.setattr(ExpoPushService, '_post_messages',
+                        classmethod(lambda cls, messages, timeout=10: posts.append(messages) or []))
+    app = Flask(__name__)
+    app.config['PUSH_QUEUE_ENABLED'] = False
+    ExpoPushService.init_app(app)
+
+    with app.test_request_context():
+        for user_id in ('u1', 'u2'):
+            assert ExpoPushService.send_notification_to_user(client, user_id, 'Hi', 'there')
+        assert posts == [] and client.executed == []
+        app.process_response(app.response_class())
+
+    assert _looked_up(client) == [['u1', 'u2']]
+    assert [[m['to'] for m in batch] for batch in posts] == [['ExpoPushToken[1]', 'ExpoPushToken[2]']]
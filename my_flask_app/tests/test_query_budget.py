@@ -0,0 +1,124 @@
+import uuid
+import pytest
+from flask import Flask
+from conftest import FakeSupabase
+from app import create_app, db
+from app.models.profile import Profile
+from app.routes import mission_routes
+from app.services.push_notification_service import ExpoPushService
+from app.utils.jwt_helper import create_token
+from app.utils.query_budget import QueryBudgetExceeded, clear_violations, query_budget, recent_violations
+from app.utils.request_metrics import metrics
+from app.utils.supabase_loader import RequestScopedClient
+
+ME = str(uuid.uuid4())
+
+
+@pytest.fixture(autouse=True)
+def fresh_violations():
+    clear_violations()
+    metrics.reset()
+    yield
+    clear_violations()
+    metrics.reset()
+
+
+def _lookup_client():
+    return RequestScopedClient(FakeSupabase(respond=lambda query: [{'user_id': 'u1', 'username': 'alice'}]))
+
+
+def test_repeated_shape_is_reported_with_its_shape():
+    supabase = _lookup_client()
+    app = Flask(__name__)
+
+    with app.test_request_context():
+        with pytest.raises(QueryBudgetExceeded) as error:
+            with query_budget('followers', max_calls=10, max_repeats=2, strict=True):
+                for uid in ('u1', 'u2', 'u3'):
+                    supabase.table('profiles').select('username').eq('user_id', uid).single().execute()
+
+    violation = error.value.violation
+    assert violation['exceeded'] == ['repeats 3 > 2']
+    assert violation['top_shapes'] == [('profiles.select(username).eq(user_id).single()', 3)]
+    assert 'profiles.select(username).eq(user_id).single()' in str(error.value)
+
+
+def test_non_strict_budgets_log_and_count_but_never_raise():
+    supabase = _lookup_client()
+    app = Flask(__name__)
+
+    with app.test_request_context():
+        with query_budget('inbox', max_supabase=1) as budget:
+            supabase.table('profiles').select('*').execute()
+            supabase.table('profiles').select('username').execute()
+            supabase.table('profiles').select('*').execute()  # Memo hit, free
+
+    assert budget.calls == {'supabase': 2, 'sql': 0}
+    assert [v['exceeded'] for v in recent_violations()] == [['supabase 2 > 1']]
+    assert 'app_query_budget_violations_total{budget="inbox"} 1' in metrics.render()
+
+
+def test_decorator_budgets_each_call_and_counts_sql():
+    app = create_app('testing')
+
+    @query_budget('profile_lookups', max_sql=2)
+    def lookups(n):
+        for _ in range(n):
+            Profile.query.filter_by(user_id=uuid.uuid4()).first()
+
+    with app.app_context():
+        Profile.__table__.create(db.engine)
+        try:
+            lookups(2)
+            lookups(2)  # A fresh budget each call
+            with pytest.raises(QueryBudgetExceeded) as error:
+                lookups(3)  # QUERY_BUDGET_STRICT is on in TestingConfig
+        finally:
+            db.session.remove()
+            Profile.__table__.drop(db.engine)
+
+    shape, repeats = error.value.violation['top_shapes'][0]
+    assert repeats == 3 and shape.startswith('SELECT ... FROM profiles WHERE profiles.user_id = ?')
+
+
+def _mission_responder(query):
+    table, steps = query.target, query.names
+    if table == 'integrated_missions':
+        return {'id': 'm1', 'name': 'Frugal Month'}
+    if table == 'player_mission_progress':
+        if 'insert' in steps:
+            return [{'id': 'pm1'}]
+        return {'id': 'pm1'} if 'single' in steps else []  # No active mission yet
+    if table == 'profiles':
+        return {'net_worth': 100, 'monthly_income': 10, 'credit_score': 700}
+    if table == 'mission_success_criteria':
+        return [{'id': f'c{i}', 'metric': 'net_worth'} for i in range(5)]
+    if table == 'rpc:start_integrated_mission':
+        return Exception('function missing')  # Forces the manual fallback
+    if table == 'rpc:notify':
+        return {'success': True, 'notification_id': 'n1', 'collapsed': True}
+    return []
+
+
+def test_start_mission_fallback_inserts_criteria_in_one_call(monkeypatch):
+    app = create_app('testing')
+    fake = FakeSupabase(respond=_mission_responder)
+    monkeypatch.setattr(mission_routes, 'supabase', RequestScopedClient(fake))
+    monkeypatch.setattr(ExpoPushService, 'send_notification_to_user', lambda **kwargs: True)
+
+    response = app.test_client().post(
+        '/api/missions/start', json={'mission_id': 'm1'},
+        headers={'Authorization': f"Bearer {create_token(ME, 'me@example.com')}"}
+    )
+
+    assert response.status_code == 200, response.get_json()
+    tracking = [query for query in fake.executed if query.target == 'player_mission_success_tracking']
+    assert len(tracking) == 1 and tracking[0].names == ['insert']
+    rows, = tracking[0].args('insert')
+    assert [row['criteria_id'] for row in rows] == [f'c{i}' for i in range(5)]
+    assert recent_violations() == []
+
+    # The mission read up front is reused instead of re-read through the join
+    assert response.get_json()['data']['integrated_missions']['name'] == 'Frugal Month'
+    selects = [query.args('select') for query in fake.executed if 'select' in query.names]
+    assert not any('integrated_missions' in columns for (columns,) in selects)
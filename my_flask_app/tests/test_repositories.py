@@ -0,0 +1,123 @@
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+import pytest
+from conftest import FakeResponse, FakeSupabase
+from app import create_app, db
+from app.models.transaction import Transaction
+from app.models.user_asset import UserAsset
+from app.repositories import PostgrestRepository, SqlRepository, backend_for, get_repository
+from app.repositories.base import Repository
+from app.utils.jwt_helper import create_token
+
+ME = str(uuid.uuid4())
+OTHER = str(uuid.uuid4())
+START = datetime(2026, 10, 1, 12, 0, 0)
+
+
+def _fake():
+    return FakeSupabase(respond=lambda query: FakeResponse([{'id': 'row'}], count=7))
+
+
+@pytest.fixture
+def sql_app():
+    app = create_app('testing')
+    with app.app_context():
+        Transaction.__table__.create(db.engine)
+        UserAsset.__table__.create(db.engine)
+        for i in range(5):
+            db.session.add(Transaction(user_id=uuid.UUID(ME), type='expense', category='food',
+                                       amount=Decimal('10.50') + i, created_at=START + timedelta(days=i)))
+        db.session.add(Transaction(user_id=uuid.UUID(OTHER), type='income', category='salary',
+                                   amount=Decimal('99.00'), created_at=START))
+        db.session.add(UserAsset(user_id=uuid.UUID(ME), asset_type='stocks', name='ACME', value=Decimal('250.00')))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        UserAsset.__table__.drop(db.engine)
+        Transaction.__table__.drop(db.engine)
+
+
+def test_sql_backend_filters_orders_pages_and_serializes(sql_app):
+    repo = get_repository('transactions', backend='sqlalchemy')
+    assert isinstance(repo, SqlRepository)
+
+    page = repo.find_many('id, user_id, amount, created_at', order_by='created_at', desc=True,
+                          limit=2, offset=1, user_id=ME)
+
+    assert [row['amount'] for row in page] == [13.5, 12.5]
+    assert page[0]['user_id'] == ME and isinstance(page[0]['id'], str)
+    assert page[0]['created_at'].startswith('2026-10-04T12:00:00')
+    assert set(page[0]) == {'id', 'user_id', 'amount', 'created_at'}
+
+    assert repo.count(user_id=ME) == 5
+    assert repo.count(user_id=[ME, OTHER]) == 6
+    assert repo.find_one('category', user_id=OTHER) == {'category': 'salary'}
+    assert repo.find_one(user_id=str(uuid.uuid4())) is None
+
+    with pytest.raises(ValueError):
+        repo.find_many('nope', user_id=ME)
+    with pytest.raises(ValueError):
+        repo.find_many('*, profiles(*)', user_id=ME)
+
+
+def test_postgrest_backend_builds_the_same_query():
+    fake = _fake()
+    repo = PostgrestRepository('transactions', fake)
+
+    assert repo.find_many('*', order_by='created_at', desc=True, limit=20, offset=40,
+                          user_id=ME, type=['income', 'expense']) == [{'id': 'row'}]
+    query, = fake.executed
+    assert query.target == 'transactions'
+    assert query.steps == [
+        ('select', ('*',), {}),
+        ('eq', ('user_id', ME), {}),
+        ('in_', ('type', ['income', 'expense']), {}),
+        ('order', ('created_at',), {'desc': True}),
+        ('range', (40, 59), {}),
+    ]
+
+    assert repo.find_one('id', user_id=ME) == {'id': 'row'}
+    assert ('limit', (1,), {}) in fake.executed[-1].steps
+    assert repo.count(user_id=ME) == 7
+
+
+def test_backends_share_the_interface_and_its_rules(sql_app):
+    with pytest.raises(TypeError):
+        Repository('transactions')
+
+    for repo in (get_repository('transactions', backend='sqlalchemy'), PostgrestRepository('transactions', _fake())):
+        with pytest.raises(ValueError, match='offset requires limit'):
+            repo.find_many('*', offset=10, user_id=ME)
+
+
+def test_backend_comes_from_config(sql_app):
+    sql_app.config['REPOSITORY_BACKENDS'] = {'transactions': 'sqlalchemy'}
+
+    assert backend_for('transactions') == 'sqlalchemy'
+    assert backend_for('profiles') == 'postgrest'
+    assert isinstance(get_repository('profiles', _fake()), PostgrestRepository)
+
+    sql_app.config['REPOSITORY_BACKEND'] = 'graphql'
+    with pytest.raises(ValueError):
+        get_repository('profiles')
+
+
+def test_history_route_switches_backend(sql_app, monkeypatch):
+    fake = _fake()
+    monkeypatch.setattr('app.supabase', fake)
+    client = sql_app.test_client()
+    headers = {'Authorization': f"Bearer {create_token(ME, 'me@example.com')}"}
+
+    sql_app.config['REPOSITORY_BACKENDS'] = {'transactions': 'sqlalchemy'}
+    body = client.get('/api/balance/history?limit=3', headers=headers).get_json()
+
+    assert [row['amount'] for row in body['data']] == [14.5, 13.5, 12.5]
+    assert fake.executed == []
+
+    sql_app.config['REPOSITORY_BACKENDS'] = {}
+    body = client.get('/api/balance/history?limit=3', headers=headers).get_json()
+
+    assert body['data'] == [{'id': 'row'}]
+    steps = fake.executed[-1].steps
+    assert ('range', (0, 2), {}) not in steps and ('limit', (3,), {}) in steps
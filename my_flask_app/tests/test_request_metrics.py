@@ -0,0 +1,105 @@
+import re
+import uuid
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from conftest import FakeSupabase
+from app import create_app, db
+from app.models.transaction import Transaction
+from app.utils.jwt_helper import create_token
+from app.utils.request_metrics import Histogram, metrics
+from app.utils.supabase_loader import RequestScopedClient
+
+ME = str(uuid.uuid4())
+
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    histogram = Histogram((1, 2, 4, 8))
+    for value in (1, 1, 2, 3, 3, 3, 5, 7, 20, 1):
+        histogram.observe(value)
+
+    assert histogram.count == 10 and histogram.sum == 46
+    assert histogram.quantile(0.5) == pytest.approx(2 + 2 / 3)
+    assert histogram.quantile(0.95) == 8  # +Inf bucket reports the highest finite bound
+    assert histogram.cumulative()[-1] == ('+Inf', 10)
+    assert Histogram((1,)).quantile(0.5) is None
+
+
+@pytest.fixture
+def metrics_app(monkeypatch):
+    app = create_app('testing')
+    fake = RequestScopedClient(FakeSupabase(respond=lambda query: [{'id': 't1', 'amount': 5.0}]))
+    monkeypatch.setattr('app.supabase', fake)
+    metrics.reset()
+    # No app context held open: each request needs its own flask.g
+    with app.app_context():
+        Transaction.__table__.create(db.engine)
+        db.session.add(Transaction(user_id=uuid.UUID(ME), type='expense', category='food',
+                                   amount=Decimal('1.00'), created_at=datetime(2026, 10, 1)))
+        db.session.commit()
+    yield app
+    with app.app_context():
+        Transaction.__table__.drop(db.engine)
+    metrics.reset()
+
+
+def _auth():
+    return {'Authorization': f"Bearer {create_token(ME, 'me@example.com')}"}
+
+
+def test_calls_are_attributed_to_the_route(metrics_app):
+    client = metrics_app.test_client()
+
+    for _ in range(2):
+        response = client.get('/api/balance/history', headers=_auth())
+        assert re.fullmatch(r'app;dur=[\d.]+, supabase;dur=[\d.]+;desc="1 calls"',
+                            response.headers['Server-Timing'])
+
+    metrics_app.config['REPOSITORY_BACKENDS'] = {'transactions': 'sqlalchemy'}
+    response = client.get('/api/balance/history', headers=_auth())
+    assert 'sql;dur=' in response.headers['Server-Timing']
+    assert 'supabase' not in response.headers['Server-Timing']
+
+    text = client.get('/metrics').get_data(as_text=True)
+    assert 'app_http_requests_total{route="/api/balance/history",method="GET",status="200"} 3' in text
+    assert 'app_db_calls_total{route="/api/balance/history",backend="supabase",target="transactions"} 2' in text
+    assert 'app_db_calls_total{route="/api/balance/history",backend="sql",target="SELECT"} 1' in text
+    assert 'app_db_payload_total{route="/api/balance/history",backend="supabase",target="transactions"} 52' in text
+    assert 'app_db_calls_per_request_bucket{route="/api/balance/history",backend="supabase",le="1.0"} 3' in text
+    assert '# TYPE app_http_request_duration_seconds histogram' in text
+    assert '/metrics' not in re.findall(r'route="([^"]+)"', text)
+
+
+def test_hotspots_rank_routes_by_calls_per_request(metrics_app):
+    client = metrics_app.test_client()
+    client.get('/api/balance/history', headers=_auth())
+    client.get('/health')
+
+    hotspots = client.get('/metrics/hotspots').get_json()['data']
+
+    assert [h['route'] for h in hotspots] == ['/api/balance/history', '/health']
+    assert hotspots[0]['calls_per_request']['supabase']['mean'] == 1
+    assert hotspots[0]['top_targets'][0] == dict(hotspots[0]['top_targets'][0], backend='supabase',
+                                                 target='transactions', calls=1)
+    assert set(hotspots[0]['latency_ms']) == {'p50', 'p95', 'p99'}
+
+
+def test_rpc_round_trips_are_counted_and_token_is_enforced(metrics_app):
+    import app
+    with metrics_app.test_request_context():
+        app.supabase.rpc('notify', {'p_user_id': ME}).execute()
+    metrics_app.config['METRICS_TOKEN'] = 's3cret'
+    client = metrics_app.test_client()
+
+    assert client.get('/metrics').status_code == 401
+    text = client.get('/metrics', headers={'Authorization': 'Bearer s3cret'}).get_data(as_text=True)
+    assert 'app_db_calls_total{route="background",backend="supabase",target="rpc:notify"} 1' in text
+
+
+def test_endpoints_fail_closed_without_a_token_outside_testing(metrics_app):
+    client = metrics_app.test_client()
+    assert client.get('/metrics').status_code == 200
+
+    metrics_app.config['TESTING'] = False
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics/hotspots').status_code == 401
@@ -0,0 +1,76 @@
+import uuid
+from flask import Flask
+from conftest import FakeSupabase
+from sqlalchemy import update
+from app import create_app, db
+from app.models.profile import Profile
+from app.utils.supabase_loader import RequestScopedClient
+
+
+def _client():
+    return FakeSupabase({'profiles': [{'user_id': 'u1', 'username': 'alice'},
+                                    {'user_id': 'u2', 'username': 'bob'}]})
+
+
+def test_identical_reads_hit_postgrest_once_per_request():
+    fake = _client()
+    supabase = RequestScopedClient(fake)
+    app = Flask(__name__)
+
+    with app.test_request_context():
+        first = supabase.table('profiles').select('username').eq('user_id', 'u1').execute()
+        first.data[0]['username'] = 'mutated'
+        second = supabase.table('profiles').select('username').eq('user_id', 'u1').execute()
+        assert second.data[0]['username'] == 'alice'
+        assert len(fake.executed) == 1
+
+        # A write to the table drops its memoized reads
+        supabase.table('profiles').update({'username': 'al'}).eq('user_id', 'u1').execute()
+        supabase.table('profiles').select('username').eq('user_id', 'u1').execute()
+        assert len(fake.executed) == 3
+
+    with app.test_request_context():
+        # New request, fresh memo
+        supabase.table('profiles').select('username').eq('user_id', 'u1').execute()
+        assert len(fake.executed) == 4
+
+    assert supabase.stats() == {'executes': 5, 'round_trips': 4, 'saved': 1}
+
+
+def test_sqlalchemy_writes_drop_memoized_reads_of_their_table():
+    fake = _client()
+    supabase = RequestScopedClient(fake)
+    app = create_app('testing')
+
+    def read():
+        supabase.table('profiles').select('username').eq('user_id', 'u1').execute()
+
+    with app.test_request_context():
+        Profile.__table__.create(db.engine)
+        try:
+            read()
+            read()
+            assert len(fake.executed) == 1
+
+            user_id = uuid.uuid4()
+            db.session.add(Profile(user_id=user_id, username='carol'))
+            db.session.commit()  # Flushed ORM write
+            read()
+            assert len(fake.executed) == 2
+
+            db.session.execute(update(Profile).where(Profile.user_id == user_id).values(net_worth=5))
+            db.session.commit()  # Bulk ORM statement, no flush
+            read()
+            assert len(fake.executed) == 3
+        finally:
+            db.session.remove()
+            Profile.__table__.drop(db.engine)
+
+
+def test_outside_request_context_passes_through():
+    fake = _client()
+    supabase = RequestScopedClient(fake)
+
+    for _ in range(2):
+        supabase.table('profiles').select('*').execute()
+    assert len(fake.executed) == 2
@@ -0,0 +1,103 @@
+import uuid
+import pytest
+from app import create_app, db
+from app.models.profile import Profile
+from app.services.profile_service import ProfileService
+from app.services import user_search_service
+from app.services.user_search_service import UsernameIndex, UserSearchService
+
+NAMES = ['alice', 'alicia', 'malice', 'alex', 'bob', 'Alice_Wonder']
+
+
+def _index():
+    return UsernameIndex([(f'id-{name}', name, None, 'Beginner') for name in NAMES])
+
+
+def test_exact_then_prefix_then_substring_ranking():
+    results = _index().search('alice', limit=3)
+
+    assert [r['username'] for r in results] == ['alice', 'Alice_Wonder', 'malice']
+    assert [r['match'] for r in results] == ['exact', 'prefix', 'substring']
+    assert set(results[0]) == {'user_id', 'username', 'profile_picture_url', 'wealth_level', 'match', 'score'}
+
+
+def test_fuzzy_matches_typos_and_limit_applies():
+    index = _index()
+
+    typo = index.search('alise', limit=10)
+    assert typo[0]['username'] == 'alice'
+    assert all(r['match'] == 'fuzzy' for r in typo)
+
+    assert [r['username'] for r in index.search('al', limit=2)] == ['alex', 'alice']
+    assert index.search('alise', limit=10, fuzzy=False) == []
+
+
+def test_incremental_updates():
+    index = _index()
+    index.upsert(('id-bob', 'robert', None, 'Beginner'))
+    index.remove('id-alex')
+
+    assert index.search('bob', limit=5) == []
+    assert index.search('rob', limit=5)[0]['user_id'] == 'id-bob'
+    assert 'alex' not in [r['username'] for r in index.search('al', limit=10)]
+
+
+def test_short_prefix_matches_beyond_the_first_lexical_ones_still_rank():
+    names = [f'sam{n}_long_name' for n in range(12)] + ['samz']
+    index = UsernameIndex([(f'id-{name}', name, None, 'Beginner') for name in names])
+
+    assert [r['username'] for r in index.search('sam', limit=2)] == ['samz', 'sam0_long_name']
+
+
+def test_upserted_copy_leaves_the_published_index_untouched():
+    index = _index()
+
+    renamed = index.upserted(('id-bob', 'alibaba', None, 'Beginner'))
+
+    assert renamed.search('aliba', limit=1)[0]['user_id'] == 'id-bob'
+    assert index.search('aliba', limit=1, fuzzy=False) == []
+    assert index.search('bob', limit=1)[0]['user_id'] == 'id-bob'
+
+    # The base is shared, not copied; the renamed row's old name no longer matches
+    assert renamed.rows is index.rows and renamed.postings is index.postings
+    assert renamed.search('bob', limit=1) == []
+    assert [r['username'] for r in renamed.search('ali', limit=10, fuzzy=False)] == \
+        ['alice', 'alicia', 'alibaba', 'Alice_Wonder']
+
+
+def test_overlay_is_folded_into_a_new_base_when_full(monkeypatch):
+    monkeypatch.setattr(user_search_service, 'MAX_OVERLAY', 2)
+    index = _index()
+    for n in range(3):
+        index = index.upserted((f'id-new{n}', f'newbie{n}', None, 'Beginner'))
+
+    assert len(index.overlay) == 0 and len(index.rows) == len(NAMES) + 3
+    assert [r['username'] for r in index.search('newbie', limit=5)] == ['newbie0', 'newbie1', 'newbie2']
+
+
+@pytest.fixture
+def search_app():
+    app = create_app('testing')
+    with app.app_context():
+        Profile.__table__.create(db.engine)
+        UserSearchService.invalidate()
+        for name in NAMES:
+            db.session.add(Profile(user_id=uuid.uuid4(), username=name))
+        db.session.commit()
+        yield app
+        UserSearchService.invalidate()
+        db.session.remove()
+        Profile.__table__.drop(db.engine)
+
+
+def test_search_route_uses_index_and_sees_renames(search_app):
+    client = search_app.test_client()
+
+    body = client.get('/api/social/search?query=ali&limit=3').get_json()
+    assert [r['username'] for r in body['data']] == ['alice', 'alicia', 'Alice_Wonder']
+
+    bob = Profile.query.filter_by(username='bob').first()
+    ProfileService.update_profile(bob.user_id, username='alibaba')
+
+    body = client.get('/api/social/search?query=aliba').get_json()
+    assert body['data'][0]['username'] == 'alibaba'
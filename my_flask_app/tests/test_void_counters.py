@@ -0,0 +1,139 @@
+import threading
+import pytest
+from app.services import void_reaction_service
+from app.services.void_counter_service import VoidCounterAggregator, void_counters
+from app.services.void_reaction_service import VoidReactionService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class Recorder:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.batch_ids = []
+        self.fail = fail
+
+    def __call__(self, rows, batch_id):
+        self.batch_ids.append(batch_id)
+        if self.fail:
+            raise RuntimeError('db down')
+        self.batches.append(rows)
+
+
+def test_taps_on_one_post_collapse_into_one_row():
+    writes = Recorder()
+    counters = VoidCounterAggregator(write=writes, flush_interval=60)
+    for _ in range(300):
+        counters.add('p1', same_delta=1)
+    counters.add('p1', oof_delta=1, same_delta=-1)  # A switch
+    counters.add('p0', oof_delta=1)
+
+    assert counters.flush()
+
+    assert writes.batches == [[
+        {'post_id': 'p0', 'oof': 1, 'same': 0},
+        {'post_id': 'p1', 'oof': 1, 'same': 299}
+    ]]
+    assert counters.pending('p1') == (0, 0)
+    assert counters.flush()  # Nothing left: no second write
+    assert len(writes.batches) == 1
+
+
+def test_pending_deltas_are_merged_into_reads():
+    counters = VoidCounterAggregator(write=Recorder(), flush_interval=60)
+    counters.add('p1', oof_delta=2)
+
+    post = counters.apply({'id': 'p1', 'oof_count': 5, 'same_count': 0})
+
+    assert post == {'id': 'p1', 'oof_count': 7, 'same_count': 0}
+    assert counters.apply({'id': 'p2', 'oof_count': 1, 'same_count': 1})['oof_count'] == 1
+
+
+def test_cached_rows_include_deltas_flushed_after_they_were_read():
+    clock = FakeClock()
+    counters = VoidCounterAggregator(write=Recorder(), flush_interval=60, clock=clock)
+    counters.configure(retention=5)
+    counters.add('p1', same_delta=1)
+    counters.flush()
+
+    read_at = clock.now = 101.0  # Page cached after the first flush
+    counters.add('p1', same_delta=3)
+    clock.now = 102.0
+    counters.flush()
+
+    assert counters.pending('p1', since=read_at) == (0, 3)
+    assert counters.pending('p1') == (0, 0)  # Fresh reads already include it
+
+    clock.now = 110.0
+    counters.add('p9', oof_delta=1)
+    counters.flush()  # Prunes entries older than the retention window
+    assert counters.pending('p1', since=read_at) == (0, 0)
+
+
+def test_failed_flush_keeps_deltas_for_the_next_one():
+    writes = Recorder(fail=True)
+    counters = VoidCounterAggregator(write=writes, flush_interval=60)
+    counters.add('p1', oof_delta=1)
+
+    assert not counters.flush()
+    assert counters.pending('p1') == (1, 0)  # Still visible to readers
+
+    counters.add('p1', oof_delta=1)
+    writes.fail = False
+    assert counters.flush()
+    # The failed batch is resent as is under its id; the new tap goes separately
+    assert writes.batches == [[{'post_id': 'p1', 'oof': 1, 'same': 0}]] * 2
+    assert writes.batch_ids[1] == writes.batch_ids[0] != writes.batch_ids[2]
+
+
+def test_event_threshold_wakes_the_flusher():
+    flushed = threading.Event()
+
+    def write(rows, batch_id):
+        flushed.set()
+
+    counters = VoidCounterAggregator(write=write, flush_interval=60, max_pending_events=3)
+    for _ in range(3):
+        counters.add('p1', oof_delta=1)
+
+    assert flushed.wait(2)
+
+
+@pytest.fixture
+def write_behind(monkeypatch):
+    writes = Recorder()
+    monkeypatch.setattr(void_counters, '_write', writes)
+    monkeypatch.setattr(void_counters, 'flush_interval', 60)
+    monkeypatch.setattr(void_counters, 'enabled', True)
+    yield writes
+    void_counters.flush()
+
+
+def test_toggle_defers_counters_to_the_aggregator(monkeypatch, write_behind):
+    calls = []
+
+    class FakeSupabase:
+        def rpc(self, name, params):
+            calls.append((name, params))
+            data = {'success': True, 'action': 'added', 'reaction': 'oof',
+                    'oof_count': 4, 'same_count': 1, 'oof_delta': 1, 'same_delta': 0}
+            return type('Rpc', (), {'execute': lambda self: type('Response', (), {'data': data})})()
+
+    monkeypatch.setattr(void_reaction_service, 'supabase', FakeSupabase())
+
+    first = VoidReactionService.toggle('u1', 'post-1', 'oof')
+    second = VoidReactionService.toggle('u2', 'post-1', 'oof')
+
+    assert calls[0][1]['p_apply_counters'] is False
+    # Stored count + every delta still buffered in this worker
+    assert first['oof_count'] == 5
+    assert second['oof_count'] == 6
+
+    void_counters.flush()
+    assert write_behind.batches == [[{'post_id': 'post-1', 'oof': 2, 'same': 0}]]
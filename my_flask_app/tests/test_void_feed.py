@@ -0,0 +1,67 @@
+import base64
+import json
+import pytest
+from conftest import FakeSupabase
+from app.services.void_feed_service import VoidFeedService, decode_feed_cursor, feed_cache
+
+
+def _id(i):
+    return f'00000000-0000-4000-8000-{i:012d}'
+
+
+POSTS = [
+    {'id': _id(i), 'user_id': 'u1' if i % 3 == 0 else 'u2', 'content': f'scream {i}',
+     'oof_count': i, 'same_count': 0, 'created_at': f'2026-10-17T10:{i // 2:02d}:00+00:00'}
+    for i in range(10)
+]
+
+
+def _fake():
+    return FakeSupabase({'void_posts': POSTS,
+                         'void_reactions': [{'user_id': 'u1', 'post_id': _id(8), 'reaction_type': 'same'}]})
+
+
+def test_keyset_pages_walk_the_feed_without_gaps_or_repeats():
+    VoidFeedService.configure(0)
+    fake = _fake()
+
+    seen, cursor = [], None
+    while True:
+        page = VoidFeedService.feed_for_user(fake, 'u1', cursor, limit=4)
+        seen.extend(page['data'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+
+    assert [p['id'] for p in seen] == [_id(i) for i in reversed(range(10))]
+    assert next(p for p in seen if p['id'] == _id(8))['my_reaction'] == 'same'
+    assert [p['is_mine'] for p in seen[:3]] == [True, False, False]
+
+
+def test_shared_page_is_cached_but_overlay_is_per_reader():
+    VoidFeedService.configure(60)
+    fake = _fake()
+    try:
+        first = VoidFeedService.feed_for_user(fake, 'u1', limit=5)
+        second = VoidFeedService.feed_for_user(fake, 'u2', limit=5)
+
+        assert fake.targets.count('void_posts') == 1
+        assert fake.targets.count('void_reactions') == 2
+        assert first['data'][1]['my_reaction'] == 'same' and second['data'][1]['my_reaction'] is None
+        assert first['data'][1]['is_mine'] is False and second['data'][1]['is_mine'] is True
+    finally:
+        VoidFeedService.configure(0)
+        feed_cache.invalidate()
+
+
+def test_cursor_values_are_validated_before_reaching_the_filter():
+    def cursor(created_at, post_id):
+        return base64.urlsafe_b64encode(json.dumps([created_at, post_id]).encode()).decode()
+
+    assert decode_feed_cursor(cursor('2026-10-17T10:00:00Z', _id(1).upper())) == \
+        ('2026-10-17T10:00:00+00:00', _id(1))
+    for bad in (cursor('2026-10-17T10:00:00', f'{_id(1)}),user_id.eq.x'),
+                cursor('2026-10-17",content.ilike."*', _id(1)),
+                'not-base64!'):
+        with pytest.raises(ValueError):
+            decode_feed_cursor(bad)
@@ -0,0 +1,82 @@
+import pytest
+from conftest import FakeSupabase
+from app import create_app
+from app.services import void_reaction_service
+from app.services.void_counter_service import void_counters
+from app.services.void_reaction_service import VoidReactionService, PostNotFoundError
+from app.utils.jwt_helper import create_token
+
+
+def _fake(result):
+    """Replays a canned toggle_void_reaction result"""
+    return FakeSupabase(rpcs={'toggle_void_reaction': result})
+
+
+@pytest.fixture(autouse=True)
+def counters_in_rpc(monkeypatch):
+    # Write-behind is covered in test_void_counters.py
+    monkeypatch.setattr(void_counters, 'enabled', False)
+
+
+@pytest.fixture
+def client():
+    app = create_app('testing')
+    return app.test_client()
+
+
+def _auth():
+    return {'Authorization': f"Bearer {create_token('u1', 'alice@example.com')}"}
+
+
+def test_toggle_is_single_rpc(monkeypatch):
+    fake = _fake({'success': True, 'action': 'switched', 'reaction': 'same',
+                         'oof_count': 2, 'same_count': 5})
+    monkeypatch.setattr(void_reaction_service, 'supabase', fake)
+
+    result = VoidReactionService.toggle('user-1', 'post-1', 'same')
+
+    assert fake.rpc_calls == [('toggle_void_reaction', {
+        'p_user_id': 'user-1',
+        'p_post_id': 'post-1',
+        'p_reaction_type': 'same'
+    })]
+    assert result == {'action': 'switched', 'reaction': 'same', 'oof_count': 2, 'same_count': 5}
+
+
+def test_toggle_rejects_unknown_type_without_calling_db(monkeypatch):
+    fake = _fake({'success': True})
+    monkeypatch.setattr(void_reaction_service, 'supabase', fake)
+
+    with pytest.raises(ValueError):
+        VoidReactionService.toggle('user-1', 'post-1', 'lol')
+    assert fake.rpc_calls == []
+
+
+def test_toggle_missing_post(monkeypatch):
+    monkeypatch.setattr(void_reaction_service, 'supabase', _fake({'success': False, 'error': 'POST_NOT_FOUND'}))
+
+    with pytest.raises(PostNotFoundError):
+        VoidReactionService.toggle('user-1', 'post-1', 'oof')
+
+
+def test_react_route_returns_new_counts(monkeypatch, client):
+    fake = _fake({'success': True, 'action': 'removed', 'reaction': None,
+                         'oof_count': 0, 'same_count': 1})
+    monkeypatch.setattr(void_reaction_service, 'supabase', fake)
+
+    resp = client.post('/api/void/react', json={'post_id': 'post-1', 'type': 'oof'}, headers=_auth())
+
+    assert resp.status_code == 200
+    assert resp.get_json() == {'success': True, 'data': {
+        'action': 'removed', 'reaction': None, 'oof_count': 0, 'same_count': 1
+    }}
+    assert fake.rpc_calls[0][1]['p_user_id'] == 'u1'
+
+
+def test_react_route_missing_post_is_404(monkeypatch, client):
+    monkeypatch.setattr(void_reaction_service, 'supabase', _fake({'success': False, 'error': 'POST_NOT_FOUND'}))
+
+    resp = client.post('/api/void/react', json={'post_id': 'gone', 'type': 'same'}, headers=_auth())
+
+    assert resp.status_code == 404
+    assert resp.get_json() == {'success': False, 'message': 'Post not found'}
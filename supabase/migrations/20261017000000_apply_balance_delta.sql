@@ -0,0 +1,67 @@
+-- Atomic balance mutation used by BalanceService.apply_delta
+--
+-- Applies a signed delta to user_balances, rejects debits that would go
+-- below zero, and writes the matching transactions row, all in one call.
+-- The conditional UPDATE takes the row lock, so concurrent requests for the
+-- same user serialize instead of overwriting each other.
+
+CREATE OR REPLACE FUNCTION public.apply_balance_delta(
+    p_user_id uuid,
+    p_delta numeric,
+    p_description text,
+    p_category text DEFAULT 'balance_adjustment'
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_balance numeric;
+    v_transaction_id uuid := gen_random_uuid();
+BEGIN
+    UPDATE user_balances
+       SET current_balance = current_balance + p_delta,
+           updated_at = now()
+     WHERE user_id = p_user_id
+       AND (p_delta >= 0 OR current_balance + p_delta >= 0)
+    RETURNING current_balance INTO v_balance;
+
+    IF NOT FOUND THEN
+        SELECT current_balance INTO v_balance
+          FROM user_balances
+         WHERE user_id = p_user_id;
+
+        IF NOT FOUND THEN
+            RETURN jsonb_build_object('success', false, 'error', 'BALANCE_NOT_FOUND');
+        END IF;
+
+        RETURN jsonb_build_object(
+            'success', false,
+            'error', 'INSUFFICIENT_FUNDS',
+            'current_balance', v_balance
+        );
+    END IF;
+
+    INSERT INTO transactions (id, user_id, type, category, amount, description, transaction_date, created_at)
+    VALUES (
+        v_transaction_id,
+        p_user_id,
+        CASE WHEN p_delta >= 0 THEN 'income' ELSE 'expense' END,
+        p_category,
+        abs(p_delta),
+        p_description,
+        now(),
+        now()
+    );
+
+    RETURN jsonb_build_object(
+        'success', true,
+        'new_balance', v_balance,
+        'transaction_id', v_transaction_id
+    );
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.apply_balance_delta(uuid, numeric, text, text) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.apply_balance_delta(uuid, numeric, text, text) TO service_role;
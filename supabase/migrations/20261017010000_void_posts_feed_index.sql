@@ -0,0 +1,8 @@
+-- Keyset index for VoidFeedService
+--
+-- The void feed pages newest-first on (created_at, id). This index serves
+-- both the first page (ORDER BY ... LIMIT) and every "(created_at, id) <
+-- cursor" page with an index range scan instead of a sort over void_posts.
+
+CREATE INDEX IF NOT EXISTS idx_void_posts_feed
+    ON public.void_posts (created_at DESC, id DESC);
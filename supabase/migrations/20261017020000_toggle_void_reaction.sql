@@ -0,0 +1,93 @@
+-- Atomic reaction toggle used by VoidReactionService.toggle
+--
+-- One call replaces up to seven round trips: it reads the existing
+-- reaction, then inserts, switches or removes it, adjusts oof_count and
+-- same_count, and rewards the poster's sanity (+1, capped at 100) when a
+-- 'same' lands. Locking the post row first serializes taps on the same post,
+-- so concurrent reactions can no longer lose counter increments.
+
+CREATE OR REPLACE FUNCTION public.toggle_void_reaction(
+    p_user_id uuid,
+    p_post_id uuid,
+    p_reaction_type text
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_poster_id uuid;
+    v_reaction_id uuid;
+    v_existing_type text;
+    v_action text;
+    v_oof_delta integer := 0;
+    v_same_delta integer := 0;
+    v_oof_count integer;
+    v_same_count integer;
+BEGIN
+    IF p_reaction_type NOT IN ('oof', 'same') THEN
+        RETURN jsonb_build_object('success', false, 'error', 'INVALID_REACTION');
+    END IF;
+
+    SELECT user_id INTO v_poster_id
+      FROM void_posts
+     WHERE id = p_post_id
+       FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('success', false, 'error', 'POST_NOT_FOUND');
+    END IF;
+
+    SELECT id, reaction_type INTO v_reaction_id, v_existing_type
+      FROM void_reactions
+     WHERE user_id = p_user_id
+       AND post_id = p_post_id
+     LIMIT 1;
+
+    IF v_reaction_id IS NULL THEN
+        INSERT INTO void_reactions (user_id, post_id, reaction_type)
+        VALUES (p_user_id, p_post_id, p_reaction_type);
+        v_action := 'added';
+    ELSIF v_existing_type = p_reaction_type THEN
+        DELETE FROM void_reactions WHERE id = v_reaction_id;
+        v_action := 'removed';
+    ELSE
+        UPDATE void_reactions SET reaction_type = p_reaction_type WHERE id = v_reaction_id;
+        v_action := 'switched';
+    END IF;
+
+    -- Counter deltas: +1 for the new reaction, -1 for the one replaced/removed
+    IF v_action IN ('added', 'switched') THEN
+        IF p_reaction_type = 'oof' THEN v_oof_delta := v_oof_delta + 1; ELSE v_same_delta := v_same_delta + 1; END IF;
+    END IF;
+    IF v_action IN ('removed', 'switched') THEN
+        IF v_existing_type = 'oof' THEN v_oof_delta := v_oof_delta - 1; ELSE v_same_delta := v_same_delta - 1; END IF;
+    END IF;
+
+    UPDATE void_posts
+       SET oof_count = GREATEST(0, COALESCE(oof_count, 0) + v_oof_delta),
+           same_count = GREATEST(0, COALESCE(same_count, 0) + v_same_delta)
+     WHERE id = p_post_id
+    RETURNING oof_count, same_count INTO v_oof_count, v_same_count;
+
+    -- A 'same' from someone else is validation: +1 sanity, capped at 100
+    IF v_action IN ('added', 'switched') AND p_reaction_type = 'same' AND v_poster_id <> p_user_id THEN
+        UPDATE profiles
+           SET sanity = LEAST(100, sanity + 1)
+         WHERE user_id = v_poster_id
+           AND sanity < 100;
+    END IF;
+
+    RETURN jsonb_build_object(
+        'success', true,
+        'action', v_action,
+        'reaction', CASE WHEN v_action = 'removed' THEN NULL ELSE p_reaction_type END,
+        'oof_count', v_oof_count,
+        'same_count', v_same_count
+    );
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.toggle_void_reaction(uuid, uuid, text) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.toggle_void_reaction(uuid, uuid, text) TO service_role;
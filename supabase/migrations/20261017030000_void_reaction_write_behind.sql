@@ -0,0 +1,144 @@
+-- Write-behind reaction counters for hot void posts
+--
+-- With p_apply_counters => false, toggle_void_reaction only records the
+-- reaction and returns the counter deltas; it no longer locks the void_posts
+-- row. The app aggregates deltas per post in memory (VoidCounterAggregator)
+-- and applies them in batches with apply_void_reaction_counts, so a burst of
+-- taps on a viral post becomes one row update per flush instead of one row
+-- lock per tap. The default (true) keeps the atomic behaviour of
+-- 20261017020000_toggle_void_reaction.sql.
+
+DROP FUNCTION IF EXISTS public.toggle_void_reaction(uuid, uuid, text);
+
+CREATE OR REPLACE FUNCTION public.toggle_void_reaction(
+    p_user_id uuid,
+    p_post_id uuid,
+    p_reaction_type text,
+    p_apply_counters boolean DEFAULT true
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_poster_id uuid;
+    v_reaction_id uuid;
+    v_existing_type text;
+    v_action text;
+    v_oof_delta integer := 0;
+    v_same_delta integer := 0;
+    v_oof_count integer;
+    v_same_count integer;
+BEGIN
+    IF p_reaction_type NOT IN ('oof', 'same') THEN
+        RETURN jsonb_build_object('success', false, 'error', 'INVALID_REACTION');
+    END IF;
+
+    IF p_apply_counters THEN
+        SELECT user_id INTO v_poster_id
+          FROM void_posts
+         WHERE id = p_post_id
+           FOR UPDATE;
+    ELSE
+        -- Serialize taps by the same user on the same post only; other
+        -- readers and reactors of the post are not blocked
+        PERFORM pg_advisory_xact_lock(hashtext(p_user_id::text || ':' || p_post_id::text));
+        SELECT user_id, COALESCE(oof_count, 0), COALESCE(same_count, 0)
+          INTO v_poster_id, v_oof_count, v_same_count
+          FROM void_posts
+         WHERE id = p_post_id;
+    END IF;
+
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('success', false, 'error', 'POST_NOT_FOUND');
+    END IF;
+
+    SELECT id, reaction_type INTO v_reaction_id, v_existing_type
+      FROM void_reactions
+     WHERE user_id = p_user_id
+       AND post_id = p_post_id
+     LIMIT 1;
+
+    IF v_reaction_id IS NULL THEN
+        INSERT INTO void_reactions (user_id, post_id, reaction_type)
+        VALUES (p_user_id, p_post_id, p_reaction_type);
+        v_action := 'added';
+    ELSIF v_existing_type = p_reaction_type THEN
+        DELETE FROM void_reactions WHERE id = v_reaction_id;
+        v_action := 'removed';
+    ELSE
+        UPDATE void_reactions SET reaction_type = p_reaction_type WHERE id = v_reaction_id;
+        v_action := 'switched';
+    END IF;
+
+    -- Counter deltas: +1 for the new reaction, -1 for the one replaced/removed
+    IF v_action IN ('added', 'switched') THEN
+        IF p_reaction_type = 'oof' THEN v_oof_delta := v_oof_delta + 1; ELSE v_same_delta := v_same_delta + 1; END IF;
+    END IF;
+    IF v_action IN ('removed', 'switched') THEN
+        IF v_existing_type = 'oof' THEN v_oof_delta := v_oof_delta - 1; ELSE v_same_delta := v_same_delta - 1; END IF;
+    END IF;
+
+    IF p_apply_counters THEN
+        UPDATE void_posts
+           SET oof_count = GREATEST(0, COALESCE(oof_count, 0) + v_oof_delta),
+               same_count = GREATEST(0, COALESCE(same_count, 0) + v_same_delta)
+         WHERE id = p_post_id
+        RETURNING oof_count, same_count INTO v_oof_count, v_same_count;
+    END IF;
+
+    -- A 'same' from someone else is validation: +1 sanity, capped at 100
+    IF v_action IN ('added', 'switched') AND p_reaction_type = 'same' AND v_poster_id <> p_user_id THEN
+        UPDATE profiles
+           SET sanity = LEAST(100, sanity + 1)
+         WHERE user_id = v_poster_id
+           AND sanity < 100;
+    END IF;
+
+    -- Deferred calls return the stored counts; the caller adds its pending deltas
+    RETURN jsonb_build_object(
+        'success', true,
+        'action', v_action,
+        'reaction', CASE WHEN v_action = 'removed' THEN NULL ELSE p_reaction_type END,
+        'oof_count', v_oof_count,
+        'same_count', v_same_count,
+        'oof_delta', v_oof_delta,
+        'same_delta', v_same_delta
+    );
+END;
+$$;
+
+-- Apply aggregated counter deltas: p_deltas = [{"post_id", "oof", "same"}, ...]
+CREATE OR REPLACE FUNCTION public.apply_void_reaction_counts(p_deltas jsonb)
+RETURNS integer
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_updated integer;
+BEGIN
+    -- Lock in id order so two workers flushing overlapping posts can't deadlock
+    PERFORM 1
+       FROM void_posts
+      WHERE id IN (SELECT (d->>'post_id')::uuid FROM jsonb_array_elements(p_deltas) AS d)
+      ORDER BY id
+        FOR UPDATE;
+
+    UPDATE void_posts p
+       SET oof_count = GREATEST(0, COALESCE(p.oof_count, 0) + d.oof),
+           same_count = GREATEST(0, COALESCE(p.same_count, 0) + d.same)
+      FROM jsonb_to_recordset(p_deltas) AS d(post_id uuid, oof integer, same integer)
+     WHERE p.id = d.post_id;
+
+    GET DIAGNOSTICS v_updated = ROW_COUNT;
+    RETURN v_updated;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.toggle_void_reaction(uuid, uuid, text, boolean) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.toggle_void_reaction(uuid, uuid, text, boolean) TO service_role;
+
+REVOKE ALL ON FUNCTION public.apply_void_reaction_counts(jsonb) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.apply_void_reaction_counts(jsonb) TO service_role;
@@ -0,0 +1,70 @@
+-- Chat inbox and history for ChatService
+--
+-- idx_chat_messages_pair_timestamp serves /api/chat/history/<peer_id>: both
+-- directions of a conversation are (sender_id, recipient_id) prefixes, so a
+-- "timestamp < cursor ORDER BY timestamp DESC LIMIT n" page is an index range
+-- scan. The recipient-first twin serves the "recipient_id = me" half of the
+-- inbox and its unread counts.
+
+CREATE INDEX IF NOT EXISTS idx_chat_messages_pair_timestamp
+    ON public.chat_messages (sender_id, recipient_id, "timestamp" DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_chat_messages_recipient_pair_timestamp
+    ON public.chat_messages (recipient_id, sender_id, "timestamp" DESC, id DESC);
+
+-- One row per peer: the latest message and how many of theirs are unread.
+-- Newest conversation first; (p_before_timestamp, p_before_peer_id) is the
+-- keyset cursor of the previous page.
+CREATE OR REPLACE FUNCTION public.chat_conversations(
+    p_user_id uuid,
+    p_limit integer DEFAULT 20,
+    p_before_timestamp timestamptz DEFAULT NULL,
+    p_before_peer_id uuid DEFAULT NULL
+)
+RETURNS TABLE (
+    peer_id uuid,
+    message_id uuid,
+    sender_id uuid,
+    recipient_id uuid,
+    content text,
+    status varchar,
+    type varchar,
+    "timestamp" timestamptz,
+    unread_count bigint
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    WITH mine AS (
+        SELECT m.*,
+               CASE WHEN m.sender_id = p_user_id THEN m.recipient_id ELSE m.sender_id END AS peer_id
+          FROM chat_messages m
+         WHERE m.sender_id = p_user_id
+        UNION ALL
+        SELECT m.*, m.sender_id AS peer_id
+          FROM chat_messages m
+         WHERE m.recipient_id = p_user_id
+           AND m.sender_id <> p_user_id
+    ),
+    latest AS (
+        SELECT DISTINCT ON (mine.peer_id)
+               mine.peer_id, mine.id, mine.sender_id, mine.recipient_id, mine.content,
+               mine.status, mine.type, mine."timestamp",
+               count(*) FILTER (WHERE mine.recipient_id = p_user_id AND mine.status <> 'read')
+                   OVER (PARTITION BY mine.peer_id) AS unread_count
+          FROM mine
+         ORDER BY mine.peer_id, mine."timestamp" DESC, mine.id DESC
+    )
+    SELECT latest.peer_id, latest.id, latest.sender_id, latest.recipient_id, latest.content,
+           latest.status, latest.type, latest."timestamp", latest.unread_count
+      FROM latest
+     WHERE p_before_timestamp IS NULL
+        OR (latest."timestamp", latest.peer_id) < (p_before_timestamp, p_before_peer_id)
+     ORDER BY latest."timestamp" DESC, latest.peer_id DESC
+     LIMIT LEAST(GREATEST(p_limit, 1), 101);
+$$;
+
+REVOKE ALL ON FUNCTION public.chat_conversations(uuid, integer, timestamptz, uuid) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.chat_conversations(uuid, integer, timestamptz, uuid) TO service_role;
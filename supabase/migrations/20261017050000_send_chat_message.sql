@@ -0,0 +1,41 @@
+-- One-call chat send used by ChatService.send
+--
+-- Checks the recipient (unless the app already knows they exist), writes
+-- the chat_messages row and the recipient's notifications row in one
+-- transaction. Replaces three sequential PostgREST calls per message.
+
+CREATE OR REPLACE FUNCTION public.send_chat_message(
+    p_sender_id uuid,
+    p_recipient_id uuid,
+    p_content text,
+    p_message_id uuid DEFAULT gen_random_uuid(),
+    p_verify_recipient boolean DEFAULT true
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_timestamp timestamptz := now();
+BEGIN
+    IF p_verify_recipient AND NOT EXISTS (SELECT 1 FROM profiles WHERE user_id = p_recipient_id) THEN
+        RETURN jsonb_build_object('success', false, 'error', 'RECIPIENT_NOT_FOUND');
+    END IF;
+
+    INSERT INTO chat_messages (id, sender_id, recipient_id, content, status, type, "timestamp")
+    VALUES (p_message_id, p_sender_id, p_recipient_id, p_content, 'sent', 'text', v_timestamp);
+
+    INSERT INTO notifications (user_id, type, title, message, related_user_id, read)
+    VALUES (p_recipient_id, 'system', 'New Message', 'You have a new message', p_sender_id, false);
+
+    RETURN jsonb_build_object(
+        'success', true,
+        'message_id', p_message_id,
+        'timestamp', v_timestamp
+    );
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.send_chat_message(uuid, uuid, text, uuid, boolean) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.send_chat_message(uuid, uuid, text, uuid, boolean) TO service_role;
@@ -0,0 +1,230 @@
+-- Notification digests, maintained unread counters and archiving
+--
+-- 1. notify() collapses same-kind notifications: while a row with the same
+--    collapse_key is unread and younger than the window, a new event bumps
+--    its group_count and rewrites it as a digest ("5 new followers") instead
+--    of inserting another row.
+-- 2. notification_counters keeps unread_count per user, maintained by
+--    statement-level triggers, so /api/notifications/unread is a primary key
+--    lookup instead of count='exact' over the user's notifications.
+-- 3. Old read notifications are moved to notifications_archive in bulk by
+--    jobs/archive_notifications.py.
+
+ALTER TABLE public.notifications
+    ADD COLUMN IF NOT EXISTS collapse_key text,
+    ADD COLUMN IF NOT EXISTS group_count integer NOT NULL DEFAULT 1,
+    ADD COLUMN IF NOT EXISTS updated_at timestamptz NOT NULL DEFAULT now();
+
+-- Digest lookup: the user's newest unread row for a collapse key
+CREATE INDEX IF NOT EXISTS idx_notifications_collapse
+    ON public.notifications (user_id, collapse_key, created_at DESC)
+    WHERE NOT read AND collapse_key IS NOT NULL;
+
+-- Archive scan: read rows by age
+CREATE INDEX IF NOT EXISTS idx_notifications_read_created
+    ON public.notifications (created_at)
+    WHERE read;
+
+-- ---------------------------------------------------------------------
+-- Unread counters
+-- ---------------------------------------------------------------------
+
+CREATE TABLE IF NOT EXISTS public.notification_counters (
+    user_id uuid PRIMARY KEY,
+    unread_count integer NOT NULL DEFAULT 0,
+    updated_at timestamptz NOT NULL DEFAULT now()
+);
+
+ALTER TABLE public.notification_counters ENABLE ROW LEVEL SECURITY;
+
+CREATE OR REPLACE FUNCTION public.sync_notification_counters()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    -- One counter update per user per statement, however many rows changed
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO notification_counters AS c (user_id, unread_count)
+        SELECT user_id, count(*) FROM new_rows WHERE NOT read GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE
+            SET unread_count = c.unread_count + EXCLUDED.unread_count,
+                updated_at = now();
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE notification_counters c
+           SET unread_count = GREATEST(0, c.unread_count - d.n),
+               updated_at = now()
+          FROM (SELECT user_id, count(*) AS n FROM old_rows WHERE NOT read GROUP BY user_id) d
+         WHERE c.user_id = d.user_id;
+    ELSE
+        -- Only read <-> unread flips change the count
+        WITH d AS (
+            SELECT n.user_id, sum((NOT n.read)::int - (NOT o.read)::int) AS delta
+              FROM new_rows n
+              JOIN old_rows o ON o.id = n.id
+             GROUP BY n.user_id
+            HAVING sum((NOT n.read)::int - (NOT o.read)::int) <> 0
+        ),
+        updated AS (
+            UPDATE notification_counters c
+               SET unread_count = GREATEST(0, c.unread_count + d.delta),
+                   updated_at = now()
+              FROM d
+             WHERE c.user_id = d.user_id
+            RETURNING c.user_id
+        )
+        INSERT INTO notification_counters (user_id, unread_count)
+        SELECT d.user_id, GREATEST(0, d.delta)
+          FROM d
+         WHERE d.user_id NOT IN (SELECT user_id FROM updated)
+        ON CONFLICT (user_id) DO NOTHING;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS notifications_counters_insert ON public.notifications;
+CREATE TRIGGER notifications_counters_insert
+    AFTER INSERT ON public.notifications
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.sync_notification_counters();
+
+DROP TRIGGER IF EXISTS notifications_counters_update ON public.notifications;
+CREATE TRIGGER notifications_counters_update
+    AFTER UPDATE ON public.notifications
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.sync_notification_counters();
+
+DROP TRIGGER IF EXISTS notifications_counters_delete ON public.notifications;
+CREATE TRIGGER notifications_counters_delete
+    AFTER DELETE ON public.notifications
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.sync_notification_counters();
+
+-- Backfill from the rows that exist today
+INSERT INTO public.notification_counters (user_id, unread_count)
+SELECT user_id, count(*) FILTER (WHERE NOT read)
+  FROM public.notifications
+ GROUP BY user_id
+ON CONFLICT (user_id) DO UPDATE SET unread_count = EXCLUDED.unread_count, updated_at = now();
+
+-- ---------------------------------------------------------------------
+-- Digesting
+-- ---------------------------------------------------------------------
+
+-- {count} in the digest title/message is replaced with the group size
+CREATE OR REPLACE FUNCTION public.notify(
+    p_user_id uuid,
+    p_type text,
+    p_title text,
+    p_message text,
+    p_collapse_key text DEFAULT NULL,
+    p_window_seconds integer DEFAULT 3600,
+    p_digest_title text DEFAULT NULL,
+    p_digest_message text DEFAULT NULL,
+    p_related_user_id uuid DEFAULT NULL,
+    p_asset_id uuid DEFAULT NULL
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_id uuid;
+    v_count integer;
+BEGIN
+    IF p_collapse_key IS NOT NULL THEN
+        SELECT id INTO v_id
+          FROM notifications
+         WHERE user_id = p_user_id
+           AND collapse_key = p_collapse_key
+           AND NOT read
+           AND created_at > now() - make_interval(secs => p_window_seconds)
+         ORDER BY created_at DESC
+         LIMIT 1
+           FOR UPDATE;
+
+        IF FOUND THEN
+            UPDATE notifications
+               SET group_count = group_count + 1,
+                   title = replace(COALESCE(p_digest_title, p_title), '{count}', (group_count + 1)::text),
+                   message = replace(COALESCE(p_digest_message, p_message), '{count}', (group_count + 1)::text),
+                   related_user_id = COALESCE(p_related_user_id, related_user_id),
+                   asset_id = COALESCE(p_asset_id, asset_id),
+                   updated_at = now()
+             WHERE id = v_id
+            RETURNING group_count INTO v_count;
+
+            RETURN jsonb_build_object('success', true, 'notification_id', v_id,
+                                      'collapsed', true, 'group_count', v_count);
+        END IF;
+    END IF;
+
+    INSERT INTO notifications (user_id, type, title, message, related_user_id, asset_id, read, collapse_key)
+    VALUES (p_user_id, p_type, p_title, p_message, p_related_user_id, p_asset_id, false, p_collapse_key)
+    RETURNING id INTO v_id;
+
+    RETURN jsonb_build_object('success', true, 'notification_id', v_id,
+                              'collapsed', false, 'group_count', 1);
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.notify(uuid, text, text, text, text, integer, text, text, uuid, uuid) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.notify(uuid, text, text, text, text, integer, text, text, uuid, uuid) TO service_role;
+
+-- Chat notifications collapse per sender ("3 new messages from the same person")
+CREATE OR REPLACE FUNCTION public.send_chat_message(
+    p_sender_id uuid,
+    p_recipient_id uuid,
+    p_content text,
+    p_message_id uuid DEFAULT gen_random_uuid(),
+    p_verify_recipient boolean DEFAULT true
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_timestamp timestamptz := now();
+    v_notification jsonb;
+BEGIN
+    IF p_verify_recipient AND NOT EXISTS (SELECT 1 FROM profiles WHERE user_id = p_recipient_id) THEN
+        RETURN jsonb_build_object('success', false, 'error', 'RECIPIENT_NOT_FOUND');
+    END IF;
+
+    INSERT INTO chat_messages (id, sender_id, recipient_id, content, status, type, "timestamp")
+    VALUES (p_message_id, p_sender_id, p_recipient_id, p_content, 'sent', 'text', v_timestamp);
+
+    v_notification := notify(
+        p_recipient_id, 'system', 'New Message', 'You have a new message',
+        p_collapse_key => 'chat:' || p_sender_id::text,
+        p_digest_message => 'You have {count} new messages',
+        p_related_user_id => p_sender_id
+    );
+
+    RETURN jsonb_build_object(
+        'success', true,
+        'message_id', p_message_id,
+        'timestamp', v_timestamp,
+        'notification_collapsed', (v_notification->>'collapsed')::boolean
+    );
+END;
+$$;
+
+-- ---------------------------------------------------------------------
+-- Archive
+-- ---------------------------------------------------------------------
+
+CREATE TABLE IF NOT EXISTS public.notifications_archive (
+    LIKE public.notifications INCLUDING DEFAULTS,
+    archived_at timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (id)
+);
+
+ALTER TABLE public.notifications_archive ENABLE ROW LEVEL SECURITY;
+
+CREATE INDEX IF NOT EXISTS idx_notifications_archive_user
+    ON public.notifications_archive (user_id, created_at DESC);
@@ -0,0 +1,15 @@
+-- Keyset paging and incremental sync for NotificationService.list_page
+--
+-- /api/notifications/ pages newest-first on (updated_at, id) and ?since=
+-- reads forward from a high-water mark on the same key; both are index
+-- range scans on this index.
+
+CREATE INDEX IF NOT EXISTS idx_notifications_user_updated
+    ON public.notifications (user_id, updated_at DESC, id DESC);
+
+-- Rows that existed before updated_at was added all got the migration time;
+-- give them back their own order. Digests (group_count > 1) keep theirs.
+UPDATE public.notifications
+   SET updated_at = created_at
+ WHERE group_count = 1
+   AND updated_at <> created_at;
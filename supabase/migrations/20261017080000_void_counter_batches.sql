@@ -0,0 +1,68 @@
+-- Idempotent write-behind counter flushes
+--
+-- VoidCounterAggregator resends a batch whose apply_void_reaction_counts call
+-- raised. If the first call committed and only the response was lost (timeout,
+-- connection reset), the retry used to add the same deltas a second time.
+-- Every batch now carries a UUID that is recorded in the same transaction as
+-- the counter update; a batch id seen before is acknowledged without applying
+-- anything. Ids are kept for a day, far longer than any retry.
+
+CREATE TABLE IF NOT EXISTS public.void_counter_batches (
+    batch_id uuid PRIMARY KEY,
+    applied_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS void_counter_batches_applied_at_idx
+    ON public.void_counter_batches (applied_at);
+
+ALTER TABLE public.void_counter_batches ENABLE ROW LEVEL SECURITY;
+
+DROP FUNCTION IF EXISTS public.apply_void_reaction_counts(jsonb);
+
+-- p_deltas = [{"post_id", "oof", "same"}, ...]; returns the number of posts
+-- updated, or 0 if p_batch_id was already applied
+CREATE OR REPLACE FUNCTION public.apply_void_reaction_counts(
+    p_deltas jsonb,
+    p_batch_id uuid DEFAULT NULL
+)
+RETURNS integer
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_updated integer;
+BEGIN
+    IF p_batch_id IS NOT NULL THEN
+        INSERT INTO void_counter_batches (batch_id)
+        VALUES (p_batch_id)
+        ON CONFLICT (batch_id) DO NOTHING;
+
+        IF NOT FOUND THEN
+            RETURN 0;
+        END IF;
+
+        DELETE FROM void_counter_batches
+         WHERE applied_at < now() - interval '1 day';
+    END IF;
+
+    -- Lock in id order so two workers flushing overlapping posts can't deadlock
+    PERFORM 1
+       FROM void_posts
+      WHERE id IN (SELECT (d->>'post_id')::uuid FROM jsonb_array_elements(p_deltas) AS d)
+      ORDER BY id
+        FOR UPDATE;
+
+    UPDATE void_posts p
+       SET oof_count = GREATEST(0, COALESCE(p.oof_count, 0) + d.oof),
+           same_count = GREATEST(0, COALESCE(p.same_count, 0) + d.same)
+      FROM jsonb_to_recordset(p_deltas) AS d(post_id uuid, oof integer, same integer)
+     WHERE p.id = d.post_id;
+
+    GET DIAGNOSTICS v_updated = ROW_COUNT;
+    RETURN v_updated;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.apply_void_reaction_counts(jsonb, uuid) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.apply_void_reaction_counts(jsonb, uuid) TO service_role;